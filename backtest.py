@@ -16,6 +16,9 @@ from rich.progress import Progress
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from data_sources.yfinance_source import download_closes
+from utils.price_store import PriceStore
+
 # Fix Hebrew encoding for Windows console
 if sys.platform == "win32":
     import codecs
@@ -98,6 +101,13 @@ class FundBacktest:
             pd.DataFrame: נתונים היסטוריים
         """
         try:
+            store = PriceStore.from_settings()
+            if store is not None:
+                # history() treats end as exclusive; the store's ranges are inclusive
+                start, end = start_date.strftime('%Y-%m-%d'), (end_date - timedelta(days=1)).strftime('%Y-%m-%d')
+                store.ensure([symbol], start, end, download_closes)
+                return store.closes(symbol, start, end).to_frame('Close')
+
             ticker = yf.Ticker(symbol)
             hist = ticker.history(
                 start=start_date.strftime('%Y-%m-%d'),
@@ -116,6 +126,16 @@ class FundBacktest:
 
         all_data = {}
 
+        store = PriceStore.from_settings()
+        if store is not None:
+            # One bulk download for every uncovered date; the loop below then reads locally
+            store.ensure(
+                list(self.portfolio.keys()) + ['^GSPC', '^IXIC'],
+                self.start_date.strftime('%Y-%m-%d'),
+                (self.end_date - timedelta(days=1)).strftime('%Y-%m-%d'),
+                download_closes,
+            )
+
         with Progress() as progress:
             # שליפת נתוני מניות
             task1 = progress.add_task(
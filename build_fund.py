@@ -17,6 +17,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 import time
+import threading
 import json
 
 # Fix Windows console encoding for Hebrew
@@ -34,7 +35,12 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from config import settings
+from fund_builder.eligibility import failure_reasons, screen
+from fund_builder.selection import select_distinct
 from utils.date_utils import get_quarter_and_year, format_fund_name, get_current_date_string, get_fund_output_dir
+from utils.cache_manifest import manifest_status, record_cached
+from utils.constituent_registry import ConstituentRegistry
+from utils.score_cache import format_stats, get_score_cache
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +60,7 @@ def parse_arguments():
   python build_fund.py --index SP500 --no-cache
   python build_fund.py --index SP500 --update
   python build_fund.py --index SP500 --update --dry-run
+  python build_fund.py --index SP500 --quarter Q4 --year 2025 --offline
         """
     )
 
@@ -84,6 +91,25 @@ def parse_arguments():
         help="כפה רענון נתונים (התעלם מ-cache)"
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="בנייה אינקרמנטלית: דוחות נשלפים רק למניות שייתכן שפרסמו דוח שנתי חדש (מחירים תמיד מתרעננים)"
+    )
+
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="המשך ריצת בנייה שנקטעה מה-checkpoint שלה (רק מניות חסרות נשלפות, שלבים שהסתיימו משוחזרים)"
+    )
+
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="דירוג ובחירה מחדש לרבעון מתוך snapshot שמור של נתוני יסוד (ללא API, ללא שמירת קבצים)"
+    )
+
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -116,16 +142,27 @@ def validate_settings():
         return False
 
 
-def save_stock_to_cache(stock, cache_dir):
+def save_stock_to_cache(stock, cache_dir, quarter=None, year=None):
     """
     שמירת מניה ל-cache
 
     Args:
         stock: אובייקט Stock לשמירה
         cache_dir: תיקיית cache
+        quarter: רבעון ה-snapshot (רק ל-CACHE_BACKEND=sqlite; ברירת מחדל: נוכחי)
+        year: שנת ה-snapshot (רק ל-CACHE_BACKEND=sqlite; ברירת מחדל: נוכחית)
     """
     import json
 
+    if settings.CACHE_BACKEND == "sqlite":
+        save_stocks_to_cache([stock], cache_dir, quarter, year)
+        return
+    if settings.CACHE_BACKEND == "msgpack":
+        from utils.stock_pack import write_stock_pack
+        write_stock_pack(stock, cache_dir)
+        record_cached([stock])
+        return
+
     stock_cache = cache_dir / f"{stock.symbol.replace('.', '_')}.json"
 
     try:
@@ -142,6 +179,7 @@ def save_stock_to_cache(stock, cache_dir):
 
         with open(stock_cache, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        record_cached([stock])
 
         logger.debug(f"✓ Successfully wrote {stock_cache.name} ({stock_cache.stat().st_size} bytes)")
 
@@ -150,12 +188,37 @@ def save_stock_to_cache(stock, cache_dir):
         raise
 
 
+def save_stocks_to_cache(stocks, cache_dir, quarter=None, year=None):
+    """
+    שמירת מניות רבות ל-cache - בטרנזקציה אחת במאגר ה-SQLite
+
+    Args:
+        stocks: רשימת אובייקטי Stock
+        cache_dir: תיקיית cache (מבנה JSON)
+        quarter: רבעון ה-snapshot (רק ל-CACHE_BACKEND=sqlite)
+        year: שנת ה-snapshot (רק ל-CACHE_BACKEND=sqlite)
+    """
+    if settings.CACHE_BACKEND != "sqlite":
+        for stock in stocks:
+            save_stock_to_cache(stock, cache_dir)
+        return
+
+    from utils.stock_store import get_stock_store
+    try:
+        saved = get_stock_store().put_many(stocks, quarter, year)
+        record_cached(stocks)
+        logger.debug(f"✓ Saved {saved} stocks to {get_stock_store().path.name}")
+    except Exception as e:
+        logger.error(f"Failed to save {len(stocks)} stocks to the stock store: {e}")
+        raise
+
+
 def get_base_company_name(stock):
     """
     חילוץ שם החברה הבסיסי מתוך שם החברה או סימול
 
     מסיר סיומות כגון: Class A, Class B, Class C, Inc, Ltd, Corp, וכו'
-    כדי לזהות חברות עם מספר סוגי מניות.
+    כדי לזהות חברות עם מספר סוגי מניות. מחושב פעם אחת לכל מניה (Stock.company_key).
 
     Args:
         stock: מניה
@@ -163,38 +226,7 @@ def get_base_company_name(stock):
     Returns:
         str: שם בסיסי של החברה
     """
-    import re
-
-    name = stock.name.upper()
-    symbol = stock.symbol.upper()
-
-    # הסרת סיומות נפוצות מהשם
-    patterns_to_remove = [
-        r'\s+CLASS\s+[ABC]',  # Class A, Class B, Class C
-        r'\s+SERIES\s+[ABC]',  # Series A, Series B, Series C
-        r'\s+INC\.?$',  # Inc, Inc.
-        r'\s+LTD\.?$',  # Ltd, Ltd.
-        r'\s+CORP\.?$',  # Corp, Corp.
-        r'\s+PLC\.?$',  # PLC, PLC.
-        r'\s+LP\.?$',  # LP, LP.
-        r'\s+LLC\.?$',  # LLC, LLC.
-        r'\s+SA\.?$',  # SA, SA.
-        r'\s+AG\.?$',  # AG, AG.
-        r'\s+NV\.?$',  # NV, NV.
-        r'\s+\(.*\)$',  # (Class A), (NYSE), etc.
-    ]
-
-    base_name = name
-    for pattern in patterns_to_remove:
-        base_name = re.sub(pattern, '', base_name)
-
-    base_name = base_name.strip()
-
-    # אם השם הבסיסי ריק, השתמש בסימול (בלי סיומת)
-    if not base_name:
-        base_name = symbol.split('.')[0]
-
-    return base_name
+    return stock.company_key
 
 
 def select_stocks_skip_duplicates(ranked_stocks, count):
@@ -216,26 +248,7 @@ def select_stocks_skip_duplicates(ranked_stocks, count):
     Returns:
         List[Stock]: רשימת מניות נבחרות (ללא כפילויות)
     """
-    selected = []
-    seen_companies = set()
-
-    for stock in ranked_stocks:
-        # קבל שם בסיסי של החברה
-        base_name = get_base_company_name(stock)
-
-        # אם כבר יש לנו מניה מחברה זו, דלג
-        if base_name in seen_companies:
-            continue
-
-        # הוסף את המניה
-        selected.append(stock)
-        seen_companies.add(base_name)
-
-        # אם הגענו למספר הנדרש, עצור
-        if len(selected) >= count:
-            break
-
-    return selected
+    return select_distinct(ranked_stocks, count)
 
 
 def write_data_quality_log(
@@ -244,7 +257,9 @@ def write_data_quality_log(
     year: int,
     constituents: list,
     validated_stocks: list,
-    data_failures: dict
+    data_failures: dict,
+    fetch_stats: dict = None,
+    eligibility: dict = None
 ) -> str:
     """
     כתיבת דוח איכות נתונים לקובץ לוג
@@ -257,6 +272,8 @@ def write_data_quality_log(
         constituents: Original list of index constituents
         validated_stocks: List of stocks that passed validation
         data_failures: Dictionary of data failure categories
+        fetch_stats: Incremental rebuild stats (statements_reused, credits_saved), or None
+        eligibility: fund_builder.eligibility.screen result for validated_stocks, or None
 
     Returns:
         str: Path to created log file
@@ -287,6 +304,27 @@ def write_data_quality_log(
         f.write(f"Successfully validated: {passed_stocks}\n")
         f.write(f"Failed validation: {failed_stocks}\n\n")
 
+        if fetch_stats:
+            f.write("INCREMENTAL REBUILD\n")
+            f.write("-" * 70 + "\n")
+            f.write(f"Statements reused from cache: {fetch_stats['statements_reused']}\n")
+            f.write(f"Statements fetched: {total_stocks - fetch_stats['statements_reused']}\n")
+            f.write(f"Estimated credits saved: ~{fetch_stats['credits_saved']:,}\n\n")
+
+        if eligibility:
+            f.write("ELIGIBILITY SCREENING\n")
+            f.write("-" * 70 + "\n")
+            for label, key in (("Base", "base"), ("Potential", "potential")):
+                f.write(f"{label} eligible: {int(eligibility[key].sum())} / {passed_stocks}\n")
+                for rule, failed in eligibility[f"{key}_failures"].items():
+                    f.write(f"   {rule}: {int(failed.sum())} failed\n")
+            f.write("\nBase screening failures:\n")
+            for i, stock in enumerate(validated_stocks):
+                reasons = failure_reasons(eligibility["base_failures"], i)
+                if reasons:
+                    f.write(f"   - {stock.symbol}: {', '.join(reasons)}\n")
+            f.write("\n")
+
         # Detailed failures by category
         f.write("VALIDATION FAILURES BY CATEGORY\n")
         f.write("-" * 70 + "\n\n")
@@ -347,30 +385,39 @@ def write_data_quality_log(
     return log_filename
 
 
-def build_fund(index_name: str, quarter: str, year: int, use_cache: bool):
+def build_fund(index_name: str, quarter: str, year: int, use_cache: bool, resume_run_id: str = None,
+               incremental: bool = False):
     """
-    תהליך בניית הקרן - 14 שלבים
+    תהליך בניית הקרן - 14 שלבים, מורצים כגרף תלויות (fund_builder.stage_graph)
 
     Args:
         index_name: שם המדד (TASE125/SP500)
         quarter: רבעון (Q1-Q4)
         year: שנה
         use_cache: האם להשתמש ב-cache
+        resume_run_id: מזהה ריצה קודמת להמשך מה-checkpoint (None = ריצה חדשה);
+            שלבים שהסתיימו באותה ריצה משוחזרים מערכי הביניים השמורים
+        incremental: שליפת דוחות רק למניות שייתכן שפרסמו דוח שנתי חדש (לפי לוח הדיווחים)
     """
-    import json
     import os
     from pathlib import Path
     from data_sources.router import DataSourceRouter
     from data_sources.adapter import DataSourceAdapter
+    from data_sources.twelvedata_async import create_async_source
     from data_sources.exceptions import (
         DataSourceError,
         DataSourceConnectionError,
         DataSourceAuthenticationError,
-        DataSourceRateLimitError,
-        DataSourceNotFoundError
+        DataSourceRateLimitError
     )
-    from models import Stock, Fund, FundPosition
+    from models import Fund, FundPosition
     from fund_builder import FundBuilder
+    from fund_builder.fetcher import ConstituentFetcher
+    from fund_builder.pipeline import fetch_pipeline, format_metrics
+    from fund_builder.stage_graph import StageGraph, Step, StepFailedError, StepStore, format_timings
+    from utils.checkpoint import BuildCheckpoint
+    from utils.cache_writer import CacheWriter
+    from utils.snapshot_store import capture_snapshot
     from rich.table import Table
 
     console.print(Panel.fit(
@@ -443,6 +490,7 @@ def build_fund(index_name: str, quarter: str, year: int, use_cache: bool):
             pricing_source = financial_source  # Fallback to financial source
 
     builder = FundBuilder(index_name)
+    builder.score_cache = get_score_cache()
     fund_name = format_fund_name(quarter, year, index_name)
 
     # תיקיות cache ופלט
@@ -451,589 +499,601 @@ def build_fund(index_name: str, quarter: str, year: int, use_cache: bool):
     cache_dir.mkdir(parents=True, exist_ok=True)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console
-    ) as progress:
+    # כתיבת cache ברקע: שמירות חוזרות של אותה מניה מתאחדות ונשטפות במנות
+    cache_writer = CacheWriter(cache_dir, quarter, year)
 
-        # ===== שלב 1: איסוף רשימת מניות מהמדד =====
-        task1 = progress.add_task("[cyan]שלב 1: איסוף רשימת מניות מהמדד...", total=None)
-        try:
-            constituents_cache = cache_dir.parent / "index_constituents" / f"{index_name}_{quarter}_{year}.json"
-            constituents_cache.parent.mkdir(parents=True, exist_ok=True)
+    # יומן checkpoint - כל מניה שהסתיימה נרשמת מיד; ערכי הביניים של השלבים נשמרים לצדו
+    if resume_run_id:
+        checkpoint = BuildCheckpoint.open(resume_run_id)
+    else:
+        checkpoint = BuildCheckpoint.create(index_name, quarter, year)
+    step_store = StepStore(checkpoint.path.with_suffix(".steps"))
 
-            if use_cache and constituents_cache.exists():
-                with open(constituents_cache, "r", encoding="utf-8") as f:
-                    constituents = json.load(f)
-                console.print(f"  [green]✓[/green] נטענו {len(constituents)} מניות מ-cache")
-            else:
-                constituents = financial_source.get_index_constituents(index_name)
-                with open(constituents_cache, "w", encoding="utf-8") as f:
-                    json.dump(constituents, f, ensure_ascii=False, indent=2)
-                console.print(f"  [green]✓[/green] נמצאו {len(constituents)} מניות במדד")
-
-            # Display estimated processing time
-            import math
-            # Financial only: 3 calls × ~100 credits = ~300 credits/stock
-            # With Pro 1597 plan and 65% safety: 1597 * 0.65 / 300 = ~3.5 stocks/min
-            # yfinance handles pricing (free, no rate limit)
-            estimated_stocks_per_minute = 3  # With yfinance for pricing + 65% safety margin
-            minutes_needed = math.ceil(len(constituents) / estimated_stocks_per_minute)
+    # ===== שלב 1: איסוף רשימת מניות מהמדד =====
+    def collect_constituents():
+        registry = ConstituentRegistry(cache_dir.parent / "index_constituents")
+        constituents = registry.load(index_name, quarter, year) if use_cache else None
+
+        if constituents:
+            console.print(f"  [green]✓[/green] נטענו {len(constituents)} מניות מ-cache")
+        else:
+            constituents = financial_source.get_index_constituents(index_name)
+            registry.save(index_name, quarter, year, constituents)
+            console.print(f"  [green]✓[/green] נמצאו {len(constituents)} מניות במדד")
+
+        # השוואה לרבעון הקודם - משפיעה על השליפה רק עם --incremental (מניות חדשות במדד נשלפות במלואן)
+        membership = registry.diff(index_name, quarter, year)
+        if membership["previous"]:
+            prev_quarter, prev_year = membership["previous"]
             console.print(
-                f"\n  ⏱️  [yellow]זמן משוער / Estimated time: {minutes_needed}-{minutes_needed + 5} דקות / minutes[/yellow]"
+                f"  [cyan]לעומת {prev_quarter} {prev_year}: {len(membership['added'])} נוספו, "
+                f"{len(membership['removed'])} הוסרו, {len(membership['unchanged'])} ללא שינוי[/cyan]"
             )
+
+        # Display estimated processing time
+        import math
+        # Financial only: 3 calls × ~100 credits = ~300 credits/stock
+        # The credit token bucket sustains ~95% of the plan: Pro 1597 → 1597 * 0.95 / 300 = ~5 stocks/min
+        # yfinance handles pricing (free, no rate limit)
+        estimated_stocks_per_minute = max(1, getattr(financial_source, '_max_stocks_per_minute', 0) or 3)
+        minutes_needed = math.ceil(len(constituents) / estimated_stocks_per_minute)
+        console.print(
+            f"\n  ⏱️  [yellow]זמן משוער / Estimated time: {minutes_needed}-{minutes_needed + 5} דקות / minutes[/yellow]"
+        )
+        console.print(
+            f"  [dim](~{estimated_stocks_per_minute} מניות לדקה - ~300 credits/stock for financials, yfinance for pricing)[/dim]"
+        )
+        return {"constituents": constituents, "membership": membership}
+
+    # ===== שלב 2: שליפת רכיבי המדד וסינון מניות בסיס =====
+    def fetch_constituents(constituents, membership):
+        # Initialize failure tracking
+        data_failures = {
+            'not_found': [],           # Stock not found in data source
+            'api_error': [],           # API errors during fetch
+            'financial_validation': [], # Financial data failed validation
+            'pricing_validation': [],  # Pricing data failed validation
+        }
+
+        # Initialize progress tracking
+        total_credits_estimate = 0
+        credits_per_stock = 300  # ~100 credits/call × 3 financial calls (pricing via yfinance = free)
+        statements_reused = 0
+        stocks_processed = 0
+        start_time = time.time()
+
+        async_source = create_async_source(financial_source)
+        # Fetch workers only do network I/O - validation and writes run in the pipeline
+        fetcher = ConstituentFetcher(
+            index_name, financial_source, pricing_source,
+            adapter=adapter, async_source=async_source, defer_finish=True
+        )
+        console.print(
+            f"  [dim]שליפה מקבילית: {fetcher.max_workers} workers | "
+            f"תיקוף: {settings.PIPELINE_VALIDATE_WORKERS} | כתיבה: {settings.PIPELINE_PERSIST_WORKERS} "
+            f"(תורים של {settings.PIPELINE_QUEUE_SIZE})[/dim]"
+        )
+        progress_lock = threading.Lock()
+
+        # מניות שכבר נרשמו ביומן בריצה הקודמת לא נשלפות שוב
+        replayed = checkpoint.load() if resume_run_id else {}
+        if resume_run_id:
+            console.print(
+                f"  [cyan]ממשיך ריצה {checkpoint.run_id}: "
+                f"{len(replayed)} מניות נטענו מה-checkpoint[/cyan]"
+            )
+        console.print(
+            f"  [dim]Checkpoint: {checkpoint.run_id} "
+            f"(להמשך אחרי הפסקה: --resume {checkpoint.run_id})[/dim]"
+        )
+        if async_source is not None:
             console.print(
-                f"  [dim](~{estimated_stocks_per_minute} מניות לדקה - ~300 credits/stock for financials, yfinance for pricing)[/dim]"
+                f"  [dim]דוחות כספיים נשלפים אסינכרונית "
+                f"({async_source.max_concurrency} מניות במקביל)[/dim]"
             )
 
-            progress.update(task1, completed=True)
-        except Exception as e:
-            progress.update(task1, completed=True)
-            raise RuntimeError(f"שלב 1 נכשל: {e}")
+        def persist_stock(result):
+            """שלב הכתיבה בצנרת: checkpoint, cache והתקדמות (הכשירות נבדקת לכל היקום בסוף השלב)"""
+            nonlocal stocks_processed, total_credits_estimate
 
-        # ===== שלב 2: סינון מניות בסיס =====
-        task2 = progress.add_task("[cyan]שלב 2: סינון מניות לקרן הבסיס...", total=None)
-        try:
-            suffix = ".US" if index_name == "SP500" else ".TA"
-            base_eligible = []
-            all_loaded_stocks = []
-
-            # Initialize failure tracking
-            data_failures = {
-                'not_found': [],           # Stock not found in data source
-                'api_error': [],           # API errors during fetch
-                'financial_validation': [], # Financial data failed validation
-                'pricing_validation': [],  # Pricing data failed validation
-            }
+            if not result.get("replayed"):
+                checkpoint.record(result)
+
+            stock = result["stock"]
+            if stock is None:
+                if settings.DEBUG_MODE and result.get("error"):
+                    console.print(f"  [yellow]⚠[/yellow] שגיאה בטעינת {result['symbol']}: {result['error']}")
+                return
+
+            # שמירה/עדכון cache (ברקע)
+            cache_writer.save(stock)
 
-            # Initialize progress tracking
-            total_credits_estimate = 0
-            stocks_processed = 0
-            start_time = time.time()
-
-            for constituent in constituents:  # עובר על כל המניות במדד
-                symbol = constituent["symbol"]
-                if not symbol.endswith(suffix):
-                    symbol = f"{symbol}{suffix}"
-
-                stock_cache = cache_dir / f"{symbol.replace('.', '_')}.json"
-
-                try:
-                    # ALWAYS fetch fresh data from API (no cache loading for stock data)
-                    # אופטימיזציה: קריאה מאוחדת אם שני המקורות זהים
-                    if use_unified_call:
-                        logger.info(f"שולף נתוני {symbol} באמצעות קריאה מאוחדת מ-{financial_source_name}")
-                        try:
-                            financial_data, market_data = financial_source.get_stock_data(symbol, years=5)
-                        except DataSourceNotFoundError:
-                            # Track failure
-                            data_failures['not_found'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Stock not found in data source'
-                            })
-                            logger.warning(f"מניה {symbol} לא נמצאה ב-{financial_source_name}, מדלג")
-                            continue
-                        except DataSourceRateLimitError as e:
-                            logger.error(f"הגעת למגבלת קריאות API: {e}")
-                            console.print(
-                                f"[yellow]⚠ הגעת למגבלת קריאות API של {financial_source_name}[/yellow]\n"
-                                "[yellow]נסה שוב מאוחר יותר או פנה לתמיכה[/yellow]"
-                            )
-                            raise  # Stop processing
-                        except DataSourceError as e:
-                            # Track failure
-                            data_failures['api_error'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': f'API error: {str(e)}'
-                            })
-                            logger.error(f"שגיאה בשליפת נתונים עבור {symbol}: {e}, מדלג")
-                            continue
-
-                        # תיקוף נתונים פיננסיים (strict validation for all indices)
-                        if not adapter.validate_financial_data(financial_data, symbol, financial_source_name,
-                                                              is_index_constituent=False):
-                            # Track failure
-                            data_failures['financial_validation'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Invalid financial data (see logs for details)'
-                            })
-                            logger.error(f"נתונים פיננסיים לא תקינים עבור {symbol}, מדלג")
-                            continue
-
-                        # תיקוף נתוני שוק (strict validation for all indices)
-                        if not adapter.validate_market_data(market_data, symbol, financial_source_name,
-                                                           is_index_constituent=False):
-                            # Track failure
-                            data_failures['pricing_validation'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Invalid pricing data (see logs for details)'
-                            })
-                            logger.error(f"נתוני מחירים לא תקינים עבור {symbol}, מדלג")
-                            continue
-
-                    else:
-                        # שליפה ממקורות נפרדים - נתונים פיננסיים ומחירים
-                        logger.info(
-                            f"שולף נתוני {symbol}: "
-                            f"פיננסיים מ-{financial_source_name}, "
-                            f"מחירים מ-{pricing_source_name}"
-                        )
-
-                        # שליפת נתונים פיננסיים
-                        try:
-                            financial_data = financial_source.get_stock_financials(symbol, years=5)
-                        except DataSourceNotFoundError:
-                            # Track failure
-                            data_failures['not_found'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Stock not found in financial data source'
-                            })
-                            logger.warning(f"מניה {symbol} לא נמצאה ב-{financial_source_name}, מדלג")
-                            continue
-                        except DataSourceRateLimitError as e:
-                            logger.error(f"הגעת למגבלת קריאות API: {e}")
-                            console.print(
-                                f"[yellow]⚠ הגעת למגבלת קריאות API של {financial_source_name}[/yellow]\n"
-                                "[yellow]נסה שוב מאוחר יותר או פנה לתמיכה[/yellow]"
-                            )
-                            raise  # Stop processing
-                        except DataSourceError as e:
-                            # Track failure
-                            data_failures['api_error'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': f'Financial API error: {str(e)}'
-                            })
-                            logger.error(f"שגיאה בשליפת נתונים פיננסיים עבור {symbol}: {e}, מדלג")
-                            continue
-
-                        # תיקוף נתונים פיננסיים (strict validation for all indices)
-                        if not adapter.validate_financial_data(financial_data, symbol, financial_source_name,
-                                                              is_index_constituent=False):
-                            # Track failure
-                            data_failures['financial_validation'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Invalid financial data (see logs for details)'
-                            })
-                            logger.error(f"נתונים פיננסיים לא תקינים עבור {symbol}, מדלג")
-                            continue
-
-                        # שליפת נתוני מחירים
-                        # Normalize symbol for pricing source (e.g., strip .US for yfinance)
-                        _source_name_map = {'YFinanceSource': 'yfinance', 'TwelveDataSource': 'twelvedata', 'AlphaVantageSource': 'alphavantage'}
-                        pricing_symbol = adapter.normalize_symbol(symbol, index_name, _source_name_map.get(pricing_source_name, 'yfinance'))
-
-                        # Get fiscal dates from financial source for discrete price fetching
-                        fiscal_dates = None
-                        if hasattr(financial_source, '_last_fiscal_dates'):
-                            fiscal_dates = financial_source._last_fiscal_dates.get(symbol)
-
-                        try:
-                            market_data = pricing_source.get_stock_market_data(pricing_symbol, fiscal_dates=fiscal_dates)
-                        except DataSourceNotFoundError:
-                            # Track failure
-                            data_failures['not_found'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Pricing data not found'
-                            })
-                            logger.warning(f"נתוני מחירים עבור {symbol} לא נמצאו ב-{pricing_source_name}, מדלג")
-                            continue
-                        except DataSourceError as e:
-                            # Track failure
-                            data_failures['api_error'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': f'Pricing API error: {str(e)}'
-                            })
-                            logger.error(f"שגיאה בשליפת נתוני מחירים עבור {symbol}: {e}, מדלג")
-                            continue
-
-                        # תיקוף נתוני שוק (strict validation for all indices)
-                        if not adapter.validate_market_data(market_data, symbol, pricing_source_name,
-                                                           is_index_constituent=False):
-                            # Track failure
-                            data_failures['pricing_validation'].append({
-                                'symbol': symbol,
-                                'name': constituent['name'],
-                                'reason': 'Invalid pricing data (see logs for details)'
-                            })
-                            logger.error(f"נתוני מחירים לא תקינים עבור {symbol}, מדלג")
-                            continue
-
-                    # יצירת אובייקט המניה
-                    stock = Stock(
-                        symbol=symbol,
-                        name=constituent["name"],
-                        index=index_name,
-                        financial_data=financial_data,
-                        market_data=market_data
-                    )
-
-                    all_loaded_stocks.append(stock)
-
-                    # בדיקת כשירות ועדכון דגלים
-                    stock.is_eligible_for_base = stock.check_base_eligibility()
-                    stock.is_eligible_for_potential = stock.check_potential_eligibility()
-
-                    if stock.is_eligible_for_base:
-                        base_eligible.append(stock)
-
-                    # שמירה/עדכון cache
-                    save_stock_to_cache(stock, cache_dir)
-
-                    # Update progress tracking
-                    stocks_processed += 1
-                    credits_per_stock = 300  # ~100 credits/call × 3 financial calls (pricing via yfinance = free)
+            # Update progress tracking
+            with progress_lock:
+                stocks_processed += 1
+                if not result.get("replayed") and not result.get("reused_financials"):
                     total_credits_estimate += credits_per_stock
-                    elapsed_time = time.time() - start_time
-
-                    # Display progress every stock
-                    if settings.DEBUG_MODE or stocks_processed % 5 == 0 or stocks_processed <= 10:
-                        console.print(
-                            f"  [green]✓[/green] {symbol} | "
-                            f"מניה {stocks_processed}/{len(constituents)} | "
-                            f"זיכויים משוערים: ~{total_credits_estimate} | "
-                            f"זמן: {elapsed_time:.0f}s"
-                        )
-
-                except Exception as e:
-                    if settings.DEBUG_MODE:
-                        console.print(f"  [yellow]⚠[/yellow] שגיאה בטעינת {symbol}: {e}")
-                    continue
-
-            builder.all_stocks = all_loaded_stocks
-            builder.base_candidates = base_eligible
-
-            # Report data acquisition statistics
-            total_constituents = len(constituents)
-            total_loaded = len(all_loaded_stocks)
-            total_failed = sum(len(failures) for failures in data_failures.values())
-
-            # Credit Usage Summary
-            total_elapsed_minutes = (time.time() - start_time) / 60
-            effective_rate = stocks_processed / total_elapsed_minutes if total_elapsed_minutes > 0 else 0
-            avg_credits = total_credits_estimate / stocks_processed if stocks_processed > 0 else 0
-
-            console.print(f"\n[bold green]💳 סיכום שימוש בזיכויים / Credit Usage Summary[/bold green]")
-            console.print(f"  מניות שעובדו / Stocks processed: {stocks_processed}")
-            console.print(f"  ממוצע זיכויים למניה / Avg credits/stock: {avg_credits:.1f}")
-            console.print(f"  סה\"כ זיכויים משוערים / Total credits (est): ~{total_credits_estimate}")
-            console.print(f"  זמן כולל / Total time: {total_elapsed_minutes:.1f} minutes")
-            console.print(f"  קצב עיבוד / Effective rate: {effective_rate:.1f} stocks/minute")
-
-            console.print(f"\n[bold cyan]📊 סטטיסטיקת רכישת נתונים / Data Acquisition Statistics[/bold cyan]")
-            console.print(f"  סה\"כ מניות במדד / Total constituents: {total_constituents}")
-            console.print(f"  נטענו בהצלחה / Successfully loaded: {total_loaded} ({total_loaded/total_constituents*100:.1f}%)")
-            console.print(f"  נכשלו / Failed: {total_failed} ({total_failed/total_constituents*100:.1f}%)")
-
-            if total_failed > 0:
-                console.print("\n[yellow]📋 פירוט כשלונות / Failure Breakdown:[/yellow]")
-
-                if data_failures['not_found']:
-                    console.print(f"\n  [yellow]לא נמצאו במקור הנתונים / Not found ({len(data_failures['not_found'])}):[/yellow]")
-                    for failure in data_failures['not_found']:
-                        console.print(f"    • {failure['symbol']} - {failure['name']}")
-
-                if data_failures['api_error']:
-                    console.print(f"\n  [yellow]שגיאות API / API errors ({len(data_failures['api_error'])}):[/yellow]")
-                    for failure in data_failures['api_error']:
-                        console.print(f"    • {failure['symbol']} - {failure['name']}")
-                        console.print(f"      {failure['reason']}")
-
-                if data_failures['financial_validation']:
-                    console.print(f"\n  [red]נתונים פיננסיים לא תקינים / Invalid financial data ({len(data_failures['financial_validation'])}):[/red]")
-                    for failure in data_failures['financial_validation']:
-                        console.print(f"    • {failure['symbol']} - {failure['name']}")
-
-                if data_failures['pricing_validation']:
-                    console.print(f"\n  [red]נתוני מחירים לא תקינים / Invalid pricing data ({len(data_failures['pricing_validation'])}):[/red]")
-                    for failure in data_failures['pricing_validation']:
-                        console.print(f"    • {failure['symbol']} - {failure['name']}")
-
-                # Log failures to file for analysis
-                failure_log = {
-                    'timestamp': datetime.now().isoformat(),
-                    'index': index_name,
-                    'quarter': quarter,
-                    'year': year,
-                    'total_constituents': total_constituents,
-                    'loaded': total_loaded,
-                    'failed': total_failed,
-                    'failures': data_failures
+                processed, credits = stocks_processed, total_credits_estimate
+            elapsed_time = time.time() - start_time
+
+            # Display progress every stock
+            if settings.DEBUG_MODE or processed % 5 == 0 or processed <= 10:
+                console.print(
+                    f"  [green]✓[/green] {stock.symbol} | "
+                    f"מניה {processed}/{len(constituents)} | "
+                    f"זיכויים משוערים: ~{credits} | "
+                    f"זמן: {elapsed_time:.0f}s"
+                )
+
+        replayed_results = {}
+        pending = []
+        for constituent in constituents:
+            symbol = fetcher.normalize_symbol(constituent)
+            if symbol in replayed:
+                replayed_results[symbol] = {
+                    "symbol": symbol, "constituent": constituent, "replayed": True, **replayed[symbol]
                 }
+            else:
+                pending.append(constituent)
+
+        # בנייה אינקרמנטלית: דוחות מה-cache למניות שעוד לא יכלו לפרסם דוח שנתי חדש
+        if incremental:
+            from utils.cache_loader import load_cached_stocks
+            from utils.filing_calendar import plan_incremental_refresh
+
+            pending_symbols = [fetcher.normalize_symbol(c) for c in pending]
+            # Members added to the index since the previous quarter always get the full fetch
+            added = {fetcher.normalize_symbol(c) for c in membership["added"]} if membership["previous"] else set()
+            # The manifest already knows which stocks are due a new annual report - skip reading them
+            status = manifest_status(pending_symbols, index_name)
+            stale = set(status["stale"]) if status else set()
+            loaded = load_cached_stocks([s for s in pending_symbols if s not in stale | added], cache_dir)
+            cached_stocks = {symbol: loaded.get(symbol) for symbol in pending_symbols}
+
+            refresh_plan = plan_incremental_refresh(cached_stocks, index_name)
+            fetcher.seed_financials(refresh_plan["reuse"])
+            statements_reused = len(refresh_plan["reuse"])
+            console.print(
+                f"  [cyan]בנייה אינקרמנטלית: {statements_reused} מניות ללא דוח שנתי חדש צפוי "
+                f"(דוחות מה-cache, מחירים מתרעננים), {len(refresh_plan['refresh'])} לשליפה מלאה[/cyan]"
+            )
 
-                log_dir = Path('logs')
-                log_dir.mkdir(exist_ok=True)
-                log_file = log_dir / f'data_failures_{index_name}_Q{quarter}_{year}.json'
+        # שליפה → תיקוף → כתיבה בתורים חסומים; היציאה מה-with ממתינה שהכול ייכתב ל-checkpoint
+        with fetch_pipeline(fetcher, persist_stock) as pipeline:
+            for result in replayed_results.values():
+                pipeline.put(result)
+            try:
+                fetched = iter(fetcher.fetch_all(pending, on_result=pipeline.put))
+            except DataSourceRateLimitError:
+                console.print(
+                    f"[yellow]⚠ הגעת למגבלת קריאות API של {financial_source_name}[/yellow]\n"
+                    "[yellow]נסה שוב מאוחר יותר או פנה לתמיכה[/yellow]\n"
+                    f"[yellow]להמשך מהנקודה שנעצרה: python build_fund.py --index {index_name} "
+                    f"--resume {checkpoint.run_id}[/yellow]"
+                )
+                raise  # Stop processing
+        console.print(f"  [dim]Pipeline (backpressure = blocked):\n{format_metrics(pipeline.metrics())}[/dim]")
+
+        fetch_results = [
+            replayed_results.get(fetcher.normalize_symbol(c)) or next(fetched)
+            for c in constituents
+        ]
 
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    json.dump(failure_log, f, indent=2, ensure_ascii=False)
+        response_cache = getattr(financial_source, 'response_cache', None)
+        if response_cache is not None:
+            cache_stats = response_cache.stats()
+            console.print(
+                f"  [dim]Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"(~{cache_stats['credits_saved']:,} זיכויים נחסכו)[/dim]"
+            )
 
-                logger.info(f"Failure log saved to {log_file}")
+        # איסוף התוצאות לפי סדר המדד (סדר השלמה משתנה בין ריצות)
+        all_loaded_stocks = [r["stock"] for r in fetch_results if r["stock"] is not None]
+
+        # בדיקת כשירות ועדכון דגלים - כל היקום במעבר אחד
+        eligibility = screen(all_loaded_stocks)
+        base_eligible = [stock for stock in all_loaded_stocks if stock.is_eligible_for_base]
+        for r in fetch_results:
+            if r["failure"]:
+                category, entry = r["failure"]
+                data_failures[category].append(entry)
+
+        # Report data acquisition statistics
+        total_constituents = len(constituents)
+        total_loaded = len(all_loaded_stocks)
+        total_failed = sum(len(failures) for failures in data_failures.values())
+
+        # Credit Usage Summary
+        total_elapsed_minutes = (time.time() - start_time) / 60
+        effective_rate = stocks_processed / total_elapsed_minutes if total_elapsed_minutes > 0 else 0
+        avg_credits = total_credits_estimate / stocks_processed if stocks_processed > 0 else 0
+
+        console.print(f"\n[bold green]💳 סיכום שימוש בזיכויים / Credit Usage Summary[/bold green]")
+        console.print(f"  מניות שעובדו / Stocks processed: {stocks_processed}")
+        console.print(f"  ממוצע זיכויים למניה / Avg credits/stock: {avg_credits:.1f}")
+        console.print(f"  סה\"כ זיכויים משוערים / Total credits (est): ~{total_credits_estimate}")
+        if incremental:
+            console.print(
+                f"  דוחות ממוחזרים / Statements reused: {statements_reused} "
+                f"(~{statements_reused * credits_per_stock:,} זיכויים נחסכו / credits saved)"
+            )
+        console.print(f"  זמן כולל / Total time: {total_elapsed_minutes:.1f} minutes")
+        console.print(f"  קצב עיבוד / Effective rate: {effective_rate:.1f} stocks/minute")
+
+        console.print(f"\n[bold cyan]📊 סטטיסטיקת רכישת נתונים / Data Acquisition Statistics[/bold cyan]")
+        console.print(f"  סה\"כ מניות במדד / Total constituents: {total_constituents}")
+        console.print(f"  נטענו בהצלחה / Successfully loaded: {total_loaded} ({total_loaded/total_constituents*100:.1f}%)")
+        console.print(f"  נכשלו / Failed: {total_failed} ({total_failed/total_constituents*100:.1f}%)")
+
+        if total_failed > 0:
+            console.print("\n[yellow]📋 פירוט כשלונות / Failure Breakdown:[/yellow]")
+
+            if data_failures['not_found']:
+                console.print(f"\n  [yellow]לא נמצאו במקור הנתונים / Not found ({len(data_failures['not_found'])}):[/yellow]")
+                for failure in data_failures['not_found']:
+                    console.print(f"    • {failure['symbol']} - {failure['name']}")
+
+            if data_failures['api_error']:
+                console.print(f"\n  [yellow]שגיאות API / API errors ({len(data_failures['api_error'])}):[/yellow]")
+                for failure in data_failures['api_error']:
+                    console.print(f"    • {failure['symbol']} - {failure['name']}")
+                    console.print(f"      {failure['reason']}")
+
+            if data_failures['financial_validation']:
+                console.print(f"\n  [red]נתונים פיננסיים לא תקינים / Invalid financial data ({len(data_failures['financial_validation'])}):[/red]")
+                for failure in data_failures['financial_validation']:
+                    console.print(f"    • {failure['symbol']} - {failure['name']}")
+
+            if data_failures['pricing_validation']:
+                console.print(f"\n  [red]נתוני מחירים לא תקינים / Invalid pricing data ({len(data_failures['pricing_validation'])}):[/red]")
+                for failure in data_failures['pricing_validation']:
+                    console.print(f"    • {failure['symbol']} - {failure['name']}")
+
+            # Log failures to file for analysis
+            failure_log = {
+                'timestamp': datetime.now().isoformat(),
+                'index': index_name,
+                'quarter': quarter,
+                'year': year,
+                'total_constituents': total_constituents,
+                'loaded': total_loaded,
+                'failed': total_failed,
+                'failures': data_failures
+            }
 
-            console.print(f"\n  [green]✓[/green] נמצאו {len(base_eligible)} מניות כשירות לקרן בסיס")
-            progress.update(task2, completed=True)
+            log_dir = Path('logs')
+            log_dir.mkdir(exist_ok=True)
+            log_file = log_dir / f'data_failures_{index_name}_Q{quarter}_{year}.json'
+
+            with open(log_file, 'w', encoding='utf-8') as f:
+                json.dump(failure_log, f, indent=2, ensure_ascii=False)
+
+            logger.info(f"Failure log saved to {log_file}")
+
+        console.print(f"\n  [green]✓[/green] נמצאו {len(base_eligible)} מניות כשירות לקרן בסיס")
+        return {
+            "all_stocks": all_loaded_stocks,
+            "base_candidates": base_eligible,
+            "eligibility": eligibility,
+            "data_failures": data_failures,
+            "fetch_stats": {
+                'statements_reused': statements_reused,
+                'credits_saved': statements_reused * credits_per_stock,
+            } if incremental else None,
+        }
+
+    # ===== יומן איכות נתונים (במקביל לדירוג) =====
+    def data_quality_log(constituents, all_stocks, data_failures, eligibility, fetch_stats):
+        log_file = write_data_quality_log(
+            index_name=index_name,
+            quarter=quarter,
+            year=year,
+            constituents=constituents,
+            validated_stocks=all_stocks,
+            data_failures=data_failures,
+            eligibility=eligibility,
+            fetch_stats=fetch_stats
+        )
+        console.print(f"  [cyan]📋 Data quality log: {log_file}[/cyan]")
+        return {"quality_log": str(log_file)}
+
+    # ===== שלב 3: חישוב וציון מניות הבסיס =====
+    def rank_base_stocks(base_candidates):
+        if builder.score_cache is not None:
+            # מניות שנשלפו בריצה זו נרשמות במניפסט רק אחרי שנכתבו - ה-cache מזהה שינויים לפיו
+            cache_writer.flush()
+        # הציונים נכתבים לעותקים - all_stocks נשאר כפי שנשלף ושלבים אחרים קוראים אותו במקביל
+        ranked_base = builder.score_and_rank_base_stocks([stock.model_copy() for stock in base_candidates])
+
+        # עדכון cache עם ציונים
+        logger.info(f"Step 3: Updating cache for {len(ranked_base)} base stocks...")
+        if settings.DEBUG_MODE:
+            for stock in ranked_base[:5]:  # Log first 5 in debug mode
+                logger.debug(f"  Saving {stock.symbol} with base_score={stock.base_score}")
+        cache_writer.save_many(ranked_base)
+        logger.info(f"Step 3: {len(ranked_base)} stocks queued for cache write")
+
+        console.print(f"  [green]✓[/green] דורגו {len(ranked_base)} מניות")
+        return {"ranked_base": ranked_base}
+
+    # ===== שלב 4: בחירת 6 מניות הבסיס =====
+    def select_base(ranked_base):
+        # בחירה תוך דילוג על כפילויות של Alphabet
+        selected_base = select_stocks_skip_duplicates(ranked_base, 6)
+        console.print(f"  [green]✓[/green] נבחרו 6 מניות בסיס")
+        return {"selected_base": selected_base}
+
+    # ===== שלב 5: הכנת רשימה למניות פוטנציאל =====
+    def prepare_potential_pool(all_stocks, selected_base):
+        base_symbols = {s.symbol for s in selected_base}
+        potential_pool = [s for s in all_stocks if s.symbol not in base_symbols]
+        console.print(f"  [green]✓[/green] {len(potential_pool)} מניות זמינות לפוטנציאל")
+        return {"potential_pool": potential_pool}
+
+    # ===== שלב 6: סינון מניות פוטנציאל =====
+    def filter_potential(potential_pool):
+        # הכשירות לפוטנציאל נבדקה בשלב 2
+        potential_eligible = [stock for stock in potential_pool if stock.is_eligible_for_potential]
+        console.print(f"  [green]✓[/green] נמצאו {len(potential_eligible)} מניות כשירות לפוטנציאל")
+        return {"potential_candidates": potential_eligible}
+
+    # ===== P/E המדד (קריאת רשת - לא תלויה בדירוג) =====
+    def fetch_index_pe():
+        return {"index_pe": financial_source.get_index_pe_ratio(index_name)}
+
+    # ===== snapshot נתוני יסוד לרבעון (לדירוג מחדש ב---offline) =====
+    def snapshot(all_stocks, index_pe):
+        return {"snapshot_rows": capture_snapshot(all_stocks, index_name, quarter, year, "build", index_pe)}
+
+    # ===== שלב 7: חישוב ציון פוטנציאל =====
+    def rank_potential_stocks(potential_candidates, index_pe, ranked_base):
+        # עותקים כמו בשלב 3; ציון הבסיס שחושב שם עובר לעותק כדי שה-cache ישמור את שני הציונים
+        base_scored = {stock.symbol: stock for stock in ranked_base}
+        copies = []
+        for stock in potential_candidates:
+            scored = base_scored.get(stock.symbol)
+            if scored:
+                stock = stock.model_copy(update={
+                    "base_score": scored.base_score, "base_scores_detail": scored.base_scores_detail,
+                })
+            else:
+                stock = stock.model_copy()
+            copies.append(stock)
+        ranked_potential = builder.score_and_rank_potential_stocks(copies, index_pe)
 
-            # Generate data quality log
-            log_file = write_data_quality_log(
-                index_name=index_name,
-                quarter=quarter,
-                year=year,
-                constituents=constituents,
-                validated_stocks=all_loaded_stocks,
-                data_failures=data_failures
-            )
-            console.print(f"  [cyan]📋 Data quality log: {log_file}[/cyan]")
+        # עדכון cache עם ציונים
+        logger.info(f"Step 7: Updating cache for {len(ranked_potential)} potential stocks...")
+        if settings.DEBUG_MODE:
+            for stock in ranked_potential[:5]:  # Log first 5 in debug mode
+                logger.debug(f"  Saving {stock.symbol} with potential_score={stock.potential_score}")
+        cache_writer.save_many(ranked_potential)
+        logger.info(f"Step 7: {len(ranked_potential)} stocks queued for cache write")
+
+        console.print(f"  [green]✓[/green] דורגו {len(ranked_potential)} מניות פוטנציאל")
+        score_cache_summary = format_stats(builder.score_cache)
+        if score_cache_summary:
+            console.print(f"  [dim]{score_cache_summary}[/dim]")
+        return {"ranked_potential": ranked_potential}
+
+    # ===== שלב 8: בחירת ארבע מניות פוטנציאל =====
+    def select_potential(ranked_potential):
+        # בחירה תוך דילוג על כפילויות של Alphabet
+        selected_potential = select_stocks_skip_duplicates(ranked_potential, 4)
+        console.print(f"  [green]✓[/green] נבחרו 4 מניות פוטנציאל")
+        return {"selected_potential": selected_potential}
+
+    # ===== שלב 9: הקצאת משקלים =====
+    def assign_weights(selected_base, selected_potential):
+        # המשקל נקבע לפי המיקום ברשימה (settings.FUND_WEIGHTS[i])
+        all_selected = selected_base + selected_potential
+        console.print(f"  [green]✓[/green] הוקצו משקלים ל-10 מניות")
+        return {"all_selected": all_selected}
+
+    # ===== שלב 10: חישוב עלות מינימלית ליחידת קרן =====
+    def minimum_cost(all_selected):
+        positions = [(stock, settings.FUND_WEIGHTS[i]) for i, stock in enumerate(all_selected)]
+        min_cost, shares_dict = builder.calculate_minimum_fund_cost(positions)
+        console.print(f"  [green]✓[/green] עלות מינימלית: {min_cost:,.2f}")
+        return {"min_cost": min_cost, "shares": shares_dict}
+
+    # ===== שלב 11: הצגת הקרן הסופית =====
+    def build_fund_table(all_selected, min_cost, shares):
+        fund_positions = []
+        for i, stock in enumerate(all_selected):
+            position_type = "בסיס" if i < 6 else "פוטנציאל"
+            fund_positions.append(FundPosition(
+                stock=stock,
+                weight=settings.FUND_WEIGHTS[i],
+                shares_per_unit=shares.get(stock.symbol, 0),
+                position_type=position_type
+            ))
+
+        fund = Fund(
+            name=fund_name,
+            quarter=quarter,
+            year=year,
+            index=index_name,
+            positions=fund_positions,
+            minimum_cost=min_cost
+        )
+        console.print(f"  [green]✓[/green] נוצרה טבלת קרן עם 10 מניות")
+        return {"fund": fund}
+
+    # ===== סטטיסטיקות סינון (משותפות למסמך העדכון ולמסמך הסופי) =====
+    def filter_statistics(constituents, all_stocks, base_candidates, potential_candidates):
+        total_stocks = len(constituents)
+        num_base_eligible = len(base_candidates)
+        num_potential_eligible = len(potential_candidates)
+        # מניות שלא עברו אף סינון (לא בסיס ולא פוטנציאל)
+        num_rejected = total_stocks - len([
+            s for s in all_stocks
+            if s.is_eligible_for_base or s.is_eligible_for_potential
+        ])
+        pct = lambda n: f"{n / total_stocks * 100:.1f}%" if total_stocks > 0 else "0%"
+
+        stats_table = (
+            "## סטטיסטיקות סינון\n\n"
+            "| מדד | מספר | אחוז |\n"
+            "|-----|------|------|\n"
+            f"| סה\"כ מניות במדד | {total_stocks} | 100% |\n"
+            f"| כשירות לבסיס | {num_base_eligible} | {pct(num_base_eligible)} |\n"
+            f"| כשירות לפוטנציאל | {num_potential_eligible} | {pct(num_potential_eligible)} |\n"
+            f"| נדחו (לא עברו סינון) | {num_rejected} | {pct(num_rejected)} |\n"
+            "\n"
+        )
+        return {"stats_table": stats_table}
+
+    # ===== שלב 12: יצירת מסמך עדכון קרן =====
+    def write_update_doc(fund, stats_table, ranked_base, ranked_potential):
+        update_doc_path = output_dir / f"{fund_name}_Update.md"
+        with open(update_doc_path, "w", encoding="utf-8") as f:
+            f.write(f"# עדכון קרן {fund_name}\n\n")
+            f.write(f"תאריך עדכון: {get_current_date_string()}\n\n")
+            f.write(stats_table)
+            f.write("## מניות בסיס מדורגות\n\n")
+            f.write("| דירוג | שם חברה | סימול | ציון |\n")
+            f.write("|-------|---------|-------|------|\n")
+            for i, stock in enumerate(ranked_base, 1):
+                f.write(f"| {i} | {stock.name} | {stock.symbol} | {stock.base_score:.2f} |\n")
+            f.write("\n## מניות פוטנציאל מדורגות\n\n")
+            f.write("| דירוג | שם חברה | סימול | ציון |\n")
+            f.write("|-------|---------|-------|------|\n")
+            for i, stock in enumerate(ranked_potential, 1):
+                f.write(f"| {i} | {stock.name} | {stock.symbol} | {stock.potential_score:.2f} |\n")
+            f.write("\n## הרכב קרן סופי\n\n")
+            f.write(fund.to_markdown())
+        console.print(f"  [green]✓[/green] נוצר מסמך עדכון: {update_doc_path.name}")
+        return {"update_doc": str(update_doc_path)}
+
+    # ===== שלב 13: יצירת מסמכי קרן סופיים =====
+    def write_final_doc(fund, stats_table, min_cost):
+        final_doc_path = output_dir / f"{fund_name}.md"
+        with open(final_doc_path, "w", encoding="utf-8") as f:
+            f.write(f"# {fund_name}\n\n")
+            f.write(f"תאריך יצירה: {get_current_date_string()}\n\n")
+            f.write(f"מדד: {index_name}\n\n")
+            f.write(stats_table)
+            f.write(fund.to_markdown())
+            f.write(f"\n**עלות מינימלית ליחידת קרן:** {min_cost:,.2f}\n")
+        console.print(f"  [green]✓[/green] נוצר מסמך סופי: {final_doc_path.name}")
+        return {"final_doc": str(final_doc_path)}
+
+    # ===== שלב 14: ולידציה ואימות =====
+    def validate(fund):
+        errors = builder.validate_fund(fund)
+        if errors:
+            console.print(f"  [red]✗[/red] נמצאו {len(errors)} שגיאות:")
+            for error in errors:
+                console.print(f"    - {error}")
+            raise RuntimeError("אימות הקרן נכשל")
+        console.print(f"  [green]✓[/green] הקרן עברה את כל בדיקות האימות")
+        return {"validated": True}
+
+    steps = [
+        Step("constituents", collect_constituents, (), ("constituents", "membership"),
+             "שלב 1", "איסוף רשימת מניות מהמדד"),
+        Step("fetch", fetch_constituents, ("constituents", "membership"),
+             ("all_stocks", "base_candidates", "eligibility", "data_failures", "fetch_stats"),
+             "שלב 2", "סינון מניות לקרן הבסיס"),
+        Step("index_pe", fetch_index_pe, (), ("index_pe",), "P/E המדד", "שליפת P/E המדד"),
+        Step("quality_log", data_quality_log,
+             ("constituents", "all_stocks", "data_failures", "eligibility", "fetch_stats"), ("quality_log",),
+             "יומן איכות נתונים", "כתיבת יומן איכות נתונים"),
+        Step("rank_base", rank_base_stocks, ("base_candidates",), ("ranked_base",),
+             "שלב 3", "חישוב וציון מניות הבסיס"),
+        Step("select_base", select_base, ("ranked_base",), ("selected_base",),
+             "שלב 4", "בחירת 6 מניות הבסיס"),
+        Step("potential_pool", prepare_potential_pool, ("all_stocks", "selected_base"), ("potential_pool",),
+             "שלב 5", "הכנת רשימה למניות פוטנציאל"),
+        Step("filter_potential", filter_potential, ("potential_pool",), ("potential_candidates",),
+             "שלב 6", "סינון מניות פוטנציאל"),
+        Step("snapshot", snapshot, ("all_stocks", "index_pe"), ("snapshot_rows",),
+             "snapshot", "snapshot נתוני יסוד"),
+        Step("rank_potential", rank_potential_stocks, ("potential_candidates", "index_pe", "ranked_base"),
+             ("ranked_potential",),
+             "שלב 7", "חישוב ציון פוטנציאל"),
+        Step("select_potential", select_potential, ("ranked_potential",), ("selected_potential",),
+             "שלב 8", "בחירת ארבע מניות פוטנציאל"),
+        Step("weights", assign_weights, ("selected_base", "selected_potential"), ("all_selected",),
+             "שלב 9", "הקצאת משקלים קבועים"),
+        Step("min_cost", minimum_cost, ("all_selected",), ("min_cost", "shares"),
+             "שלב 10", "חישוב עלות מינימלית ליחידת קרן"),
+        Step("fund", build_fund_table, ("all_selected", "min_cost", "shares"), ("fund",),
+             "שלב 11", "יצירת טבלת הקרן"),
+        Step("statistics", filter_statistics,
+             ("constituents", "all_stocks", "base_candidates", "potential_candidates"), ("stats_table",),
+             "סטטיסטיקות סינון", "חישוב סטטיסטיקות סינון"),
+        Step("update_doc", write_update_doc, ("fund", "stats_table", "ranked_base", "ranked_potential"),
+             ("update_doc",), "שלב 12", "יצירת מסמך עדכון"),
+        Step("final_doc", write_final_doc, ("fund", "stats_table", "min_cost"), ("final_doc",),
+             "שלב 13", "יצירת מסמך קרן סופי"),
+        Step("validate", validate, ("fund",), ("validated",), "שלב 14", "ולידציה ואימות"),
+    ]
+    graph = StageGraph(steps)
 
-        except Exception as e:
-            progress.update(task2, completed=True)
-            raise RuntimeError(f"שלב 2 נכשל: {e}")
+    with cache_writer, Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console
+    ) as progress:
+        tasks = {}
+        restored = []
 
-        # ===== שלב 3: חישוב וציון מניות הבסיס =====
-        task3 = progress.add_task("[cyan]שלב 3: חישוב וציון מניות הבסיס...", total=None)
-        try:
-            ranked_base = builder.score_and_rank_base_stocks(builder.base_candidates)
-
-            # עדכון cache עם ציונים
-            logger.info(f"Step 3: Updating cache for {len(ranked_base)} base stocks...")
-            for i, stock in enumerate(ranked_base):
-                if settings.DEBUG_MODE and i < 5:  # Log first 5 in debug mode
-                    logger.debug(f"  Saving {stock.symbol} with base_score={stock.base_score}")
-                save_stock_to_cache(stock, cache_dir)
-            logger.info(f"Step 3: Cache update complete for {len(ranked_base)} stocks")
-
-            console.print(f"  [green]✓[/green] דורגו {len(ranked_base)} מניות")
-            progress.update(task3, completed=True)
-        except Exception as e:
-            progress.update(task3, completed=True)
-            raise RuntimeError(f"שלב 3 נכשל: {e}")
-
-        # ===== שלב 4: בחירת 6 מניות הבסיס =====
-        task4 = progress.add_task("[cyan]שלב 4: בחירת 6 מניות הבסיס...", total=None)
-        try:
-            # בחירה תוך דילוג על כפילויות של Alphabet
-            builder.selected_base = select_stocks_skip_duplicates(ranked_base, 6)
-            console.print(f"  [green]✓[/green] נבחרו 6 מניות בסיס")
-            progress.update(task4, completed=True)
-        except Exception as e:
-            progress.update(task4, completed=True)
-            raise RuntimeError(f"שלב 4 נכשל: {e}")
-
-        # ===== שלב 5: הכנת רשימה למניות פוטנציאל =====
-        task5 = progress.add_task("[cyan]שלב 5: הכנת רשימה למניות פוטנציאל...", total=None)
-        try:
-            base_symbols = {s.symbol for s in builder.selected_base}
-            potential_pool = [s for s in builder.all_stocks if s.symbol not in base_symbols]
-            console.print(f"  [green]✓[/green] {len(potential_pool)} מניות זמינות לפוטנציאל")
-            progress.update(task5, completed=True)
-        except Exception as e:
-            progress.update(task5, completed=True)
-            raise RuntimeError(f"שלב 5 נכשל: {e}")
-
-        # ===== שלב 6: סינון מניות פוטנציאל =====
-        task6 = progress.add_task("[cyan]שלב 6: סינון מניות פוטנציאל...", total=None)
-        try:
-            potential_eligible = []
-            for stock in potential_pool:
-                if stock.check_potential_eligibility():
-                    potential_eligible.append(stock)
-            builder.potential_candidates = potential_eligible
-            console.print(f"  [green]✓[/green] נמצאו {len(potential_eligible)} מניות כשירות לפוטנציאל")
-            progress.update(task6, completed=True)
-        except Exception as e:
-            progress.update(task6, completed=True)
-            raise RuntimeError(f"שלב 6 נכשל: {e}")
-
-        # ===== שלב 7: חישוב ציון פוטנציאל =====
-        task7 = progress.add_task("[cyan]שלב 7: חישוב ציון פוטנציאל...", total=None)
-        try:
-            index_pe = financial_source.get_index_pe_ratio(index_name)
-            ranked_potential = builder.score_and_rank_potential_stocks(builder.potential_candidates, index_pe)
-
-            # עדכון cache עם ציונים
-            logger.info(f"Step 7: Updating cache for {len(ranked_potential)} potential stocks...")
-            for i, stock in enumerate(ranked_potential):
-                if settings.DEBUG_MODE and i < 5:  # Log first 5 in debug mode
-                    logger.debug(f"  Saving {stock.symbol} with potential_score={stock.potential_score}")
-                save_stock_to_cache(stock, cache_dir)
-            logger.info(f"Step 7: Cache update complete for {len(ranked_potential)} stocks")
-
-            console.print(f"  [green]✓[/green] דורגו {len(ranked_potential)} מניות פוטנציאל")
-            progress.update(task7, completed=True)
-        except Exception as e:
-            progress.update(task7, completed=True)
-            raise RuntimeError(f"שלב 7 נכשל: {e}")
-
-        # ===== שלב 8: בחירת ארבע מניות פוטנציאל =====
-        task8 = progress.add_task("[cyan]שלב 8: בחירת ארבע מניות פוטנציאל...", total=None)
-        try:
-            # בחירה תוך דילוג על כפילויות של Alphabet
-            builder.selected_potential = select_stocks_skip_duplicates(ranked_potential, 4)
-            console.print(f"  [green]✓[/green] נבחרו 4 מניות פוטנציאל")
-            progress.update(task8, completed=True)
-        except Exception as e:
-            progress.update(task8, completed=True)
-            raise RuntimeError(f"שלב 8 נכשל: {e}")
-
-        # ===== שלב 9: הקצאת משקלים =====
-        task9 = progress.add_task("[cyan]שלב 9: הקצאת משקלים קבועים...", total=None)
-        try:
-            all_selected = builder.selected_base + builder.selected_potential
-            for i, stock in enumerate(all_selected):
-                stock._assigned_weight = settings.FUND_WEIGHTS[i]
-            console.print(f"  [green]✓[/green] הוקצו משקלים ל-10 מניות")
-            progress.update(task9, completed=True)
-        except Exception as e:
-            progress.update(task9, completed=True)
-            raise RuntimeError(f"שלב 9 נכשל: {e}")
-
-        # ===== שלב 10: חישוב עלות מינימלית ליחידת קרן =====
-        task10 = progress.add_task("[cyan]שלב 10: חישוב עלות מינימלית ליחידת קרן...", total=None)
-        try:
-            positions = [(stock, stock._assigned_weight) for stock in all_selected]
-            min_cost, shares_dict = builder.calculate_minimum_fund_cost(positions)
-            console.print(f"  [green]✓[/green] עלות מינימלית: {min_cost:,.2f}")
-            progress.update(task10, completed=True)
-        except Exception as e:
-            progress.update(task10, completed=True)
-            raise RuntimeError(f"שלב 10 נכשל: {e}")
-
-        # ===== שלב 11: הצגת הקרן הסופית =====
-        task11 = progress.add_task("[cyan]שלב 11: יצירת טבלת הקרן...", total=None)
-        try:
-            fund_positions = []
-            for i, stock in enumerate(all_selected):
-                position_type = "בסיס" if i < 6 else "פוטנציאל"
-                fund_positions.append(FundPosition(
-                    stock=stock,
-                    weight=stock._assigned_weight,
-                    shares_per_unit=shares_dict.get(stock.symbol, 0),
-                    position_type=position_type
-                ))
-
-            fund = Fund(
-                name=fund_name,
-                quarter=quarter,
-                year=year,
-                index=index_name,
-                positions=fund_positions,
-                minimum_cost=min_cost
-            )
-            console.print(f"  [green]✓[/green] נוצרה טבלת קרן עם 10 מניות")
-            progress.update(task11, completed=True)
-        except Exception as e:
-            progress.update(task11, completed=True)
-            raise RuntimeError(f"שלב 11 נכשל: {e}")
-
-        # ===== שלב 12: יצירת מסמך עדכון קרן =====
-        task12 = progress.add_task("[cyan]שלב 12: יצירת מסמך עדכון...", total=None)
+        def on_step_start(step):
+            tasks[step.name] = progress.add_task(f"[cyan]{step.title}: {step.description}...", total=None)
+
+        def on_step_finish(step, timing):
+            if timing["status"] == "restored":
+                restored.append(step.title)
+            elif step.name in tasks:
+                progress.update(tasks[step.name], completed=True)
+
+        if resume_run_id and step_store.exists():
+            console.print(f"  [cyan]שלבים שהסתיימו בריצה {checkpoint.run_id} ישוחזרו מערכי הביניים[/cyan]")
         try:
-            update_doc_path = output_dir / f"{fund_name}_Update.md"
-
-            # חישוב סטטיסטיקות סינון
-            total_stocks = len(constituents)
-            num_base_eligible = len(base_eligible)
-            num_potential_eligible = len(potential_eligible)
-            # מניות שלא עברו אף סינון (לא בסיס ולא פוטנציאל)
-            num_rejected = total_stocks - len([
-                s for s in all_loaded_stocks
-                if s.is_eligible_for_base or s.is_eligible_for_potential
-            ])
-            pct = lambda n: f"{n / total_stocks * 100:.1f}%" if total_stocks > 0 else "0%"
-
-            stats_table = (
-                "## סטטיסטיקות סינון\n\n"
-                "| מדד | מספר | אחוז |\n"
-                "|-----|------|------|\n"
-                f"| סה\"כ מניות במדד | {total_stocks} | 100% |\n"
-                f"| כשירות לבסיס | {num_base_eligible} | {pct(num_base_eligible)} |\n"
-                f"| כשירות לפוטנציאל | {num_potential_eligible} | {pct(num_potential_eligible)} |\n"
-                f"| נדחו (לא עברו סינון) | {num_rejected} | {pct(num_rejected)} |\n"
-                "\n"
+            run = graph.run(store=step_store, on_start=on_step_start, on_finish=on_step_finish)
+        except StepFailedError as e:
+            console.print(
+                f"[yellow]להרצה חוזרת משלב זה (ללא שליפה מחדש של שלבים שהסתיימו): "
+                f"python build_fund.py --index {index_name} --resume {checkpoint.run_id}[/yellow]"
             )
+            raise RuntimeError(str(e)) from e.__cause__
+        values, timings = run["values"], run["timings"]
+        # The build finished - intermediates are only needed to resume a failed run
+        step_store.clear()
+        if restored:
+            console.print(f"  [dim]שוחזרו {len(restored)} שלבים: {', '.join(restored)}[/dim]")
 
-            with open(update_doc_path, "w", encoding="utf-8") as f:
-                f.write(f"# עדכון קרן {fund_name}\n\n")
-                f.write(f"תאריך עדכון: {get_current_date_string()}\n\n")
-                f.write(stats_table)
-                f.write("## מניות בסיס מדורגות\n\n")
-                f.write("| דירוג | שם חברה | סימול | ציון |\n")
-                f.write("|-------|---------|-------|------|\n")
-                for i, stock in enumerate(ranked_base, 1):
-                    f.write(f"| {i} | {stock.name} | {stock.symbol} | {stock.base_score:.2f} |\n")
-                f.write("\n## מניות פוטנציאל מדורגות\n\n")
-                f.write("| דירוג | שם חברה | סימול | ציון |\n")
-                f.write("|-------|---------|-------|------|\n")
-                for i, stock in enumerate(ranked_potential, 1):
-                    f.write(f"| {i} | {stock.name} | {stock.symbol} | {stock.potential_score:.2f} |\n")
-                f.write("\n## הרכב קרן סופי\n\n")
-                f.write(fund.to_markdown())
-            console.print(f"  [green]✓[/green] נוצר מסמך עדכון: {update_doc_path.name}")
-            progress.update(task12, completed=True)
-        except Exception as e:
-            progress.update(task12, completed=True)
-            raise RuntimeError(f"שלב 12 נכשל: {e}")
-
-        # ===== שלב 13: יצירת מסמכי קרן סופיים =====
-        task13 = progress.add_task("[cyan]שלב 13: יצירת מסמך קרן סופי...", total=None)
-        try:
-            final_doc_path = output_dir / f"{fund_name}.md"
-            with open(final_doc_path, "w", encoding="utf-8") as f:
-                f.write(f"# {fund_name}\n\n")
-                f.write(f"תאריך יצירה: {get_current_date_string()}\n\n")
-                f.write(f"מדד: {index_name}\n\n")
-                f.write(stats_table)
-                f.write(fund.to_markdown())
-                f.write(f"\n**עלות מינימלית ליחידת קרן:** {min_cost:,.2f}\n")
-            console.print(f"  [green]✓[/green] נוצר מסמך סופי: {final_doc_path.name}")
-            progress.update(task13, completed=True)
-        except Exception as e:
-            progress.update(task13, completed=True)
-            raise RuntimeError(f"שלב 13 נכשל: {e}")
-
-        # ===== שלב 14: ולידציה ואימות =====
-        task14 = progress.add_task("[cyan]שלב 14: ולידציה ואימות...", total=None)
-        try:
-            errors = builder.validate_fund(fund)
-            if errors:
-                console.print(f"  [red]✗[/red] נמצאו {len(errors)} שגיאות:")
-                for error in errors:
-                    console.print(f"    - {error}")
-                raise RuntimeError("אימות הקרן נכשל")
-            else:
-                console.print(f"  [green]✓[/green] הקרן עברה את כל בדיקות האימות")
-            progress.update(task14, completed=True)
-        except Exception as e:
-            progress.update(task14, completed=True)
-            raise RuntimeError(f"שלב 14 נכשל: {e}")
+        builder.all_stocks = values["all_stocks"]
+        builder.base_candidates = values["base_candidates"]
+        builder.potential_candidates = values["potential_candidates"]
+        builder.selected_base = values["selected_base"]
+        builder.selected_potential = values["selected_potential"]
+
+        console.print(f"  [dim]זמני שלבים / Step timings:\n{format_timings(graph.order(), timings)}[/dim]")
 
         # ===== Verification: Check cache was updated with scores =====
         console.print("[cyan]Verifying cache was updated with scores...[/cyan]")
         sample_stocks = []
-        if builder.selected_base:
+        # Scores restored from an earlier run were written to the cache by that run
+        if builder.selected_base and timings["rank_base"]["status"] == "done":
             sample_stocks.append(builder.selected_base[0])
-        if builder.selected_potential:
+        if builder.selected_potential and timings["rank_potential"]["status"] == "done":
             sample_stocks.append(builder.selected_potential[0])
 
+        cache_writer.flush()
+
         cache_verification_passed = True
         for stock in sample_stocks:
-            stock_cache = cache_dir / f"{stock.symbol.replace('.', '_')}.json"
             try:
-                with open(stock_cache, "r", encoding="utf-8") as f:
-                    cached_data = json.load(f)
+                flushed = cache_writer.flushed_state(stock.symbol)
+                if flushed is None:
+                    raise LookupError(f"{stock.symbol} was never written to cache")
 
                 memory_base = stock.base_score
                 memory_potential = stock.potential_score
-                cached_base = cached_data.get('base_score')
-                cached_potential = cached_data.get('potential_score')
+                cached_base = flushed['base_score']
+                cached_potential = flushed['potential_score']
 
                 # Check if in-memory score matches cached score
                 if memory_base is not None and cached_base is None:
@@ -1088,29 +1148,64 @@ def main():
 
     use_cache = settings.USE_CACHE and not args.no_cache
 
-    # בדיקת תקינות הגדרות
-    if not validate_settings():
+    # --no-cache עוקף גם את ה-response cache של ה-API (תשובות חדשות עדיין נשמרות בו)
+    if args.no_cache:
+        settings.RESPONSE_CACHE_BYPASS = True
+
+    # בדיקת תקינות הגדרות (מצב --offline אינו משתמש במפתחות API)
+    if not args.offline and not validate_settings():
         sys.exit(1)
 
     # חישוב רבעון ושנה
     quarter_arg = args.quarter or settings.FUND_QUARTER
     year_arg = args.year or settings.FUND_YEAR
 
+    # בהמשך ריצה - הרבעון והשנה נלקחים מה-checkpoint
+    if args.resume:
+        from utils.checkpoint import BuildCheckpoint
+
+        if args.update or args.offline:
+            console.print("[red]שגיאה:[/red] --resume זמין רק לבנייה מלאה (לא עם --update / --offline)")
+            sys.exit(1)
+        try:
+            checkpoint = BuildCheckpoint.open(args.resume)
+        except (FileNotFoundError, ValueError) as e:
+            console.print(f"[red]שגיאה:[/red] {e}")
+            sys.exit(1)
+        if checkpoint.index_name != args.index:
+            console.print(
+                f"[red]שגיאה:[/red] ה-checkpoint {args.resume} שייך למדד {checkpoint.index_name}, "
+                f"לא ל-{args.index}"
+            )
+            sys.exit(1)
+        quarter_arg, year_arg = checkpoint.quarter, checkpoint.year
+
     try:
         quarter, year = get_quarter_and_year(quarter_arg, year_arg)
     except ValueError as e:
         console.print(f"[red]שגיאה:[/red] {e}")
         sys.exit(1)
 
+    if args.offline and args.update:
+        console.print("[red]שגיאה:[/red] --offline אינו זמין עם --update")
+        sys.exit(1)
+
     # הצגת פרמטרים
-    mode = "עדכון רבעוני (LTM)" if args.update else "בנייה מלאה"
+    if args.offline:
+        mode = "דירוג מחדש מ-snapshot (offline)"
+    else:
+        mode = "עדכון רבעוני (LTM)" if args.update else "בנייה מלאה"
     console.print("[bold]פרמטרים:[/bold]")
     console.print(f"  מצב: [cyan]{mode}[/cyan]")
     console.print(f"  מדד: [cyan]{args.index}[/cyan]")
     console.print(f"  רבעון: [cyan]{quarter}[/cyan]")
     console.print(f"  שנה: [cyan]{year}[/cyan]")
-    if not args.update:
+    if not args.update and not args.offline:
         console.print(f"  שימוש ב-cache: [cyan]{'כן' if use_cache else 'לא'}[/cyan]")
+    if args.resume:
+        console.print(f"  המשך ריצה: [cyan]{args.resume}[/cyan]")
+    if args.incremental and not args.update:
+        console.print(f"  [cyan]בנייה אינקרמנטלית (לפי לוח דיווחים)[/cyan]")
     console.print(f"  נתונים פיננסיים: [cyan]{settings.FINANCIAL_DATA_SOURCE}[/cyan]")
     console.print(f"  נתוני מחירים: [cyan]{settings.PRICING_DATA_SOURCE}[/cyan]")
     if args.dry_run:
@@ -1118,12 +1213,16 @@ def main():
     console.print()
 
     try:
-        if args.update:
+        if args.offline:
+            # דירוג מחדש מ-snapshot - ללא מקורות נתונים
+            _run_offline_rebuild(args.index, quarter, year)
+        elif args.update:
             # עדכון רבעוני
             _run_quarterly_update(args.index, quarter, year, args)
         else:
             # בנייה מלאה
-            build_fund(args.index, quarter, year, use_cache)
+            build_fund(args.index, quarter, year, use_cache, resume_run_id=args.resume,
+                       incremental=args.incremental)
     except KeyboardInterrupt:
         console.print("\n[yellow]התהליך בוטל על ידי המשתמש[/yellow]")
         sys.exit(0)
@@ -1171,5 +1270,56 @@ def _run_quarterly_update(index_name: str, quarter: str, year: int, args):
     )
 
 
+def _run_offline_rebuild(index_name: str, quarter: str, year: int):
+    """
+    דירוג ובחירה מחדש לרבעון מתוך snapshot של נתוני יסוד - ללא API וללא כתיבת קבצים
+
+    Args:
+        index_name: שם המדד
+        quarter: רבעון ה-snapshot
+        year: שנת ה-snapshot
+    """
+    from fund_builder import FundBuilder
+    from rich.table import Table
+
+    builder = FundBuilder(index_name)
+    try:
+        result = builder.rebuild_from_snapshot(quarter, year)
+    except ValueError as e:
+        console.print(f"[red]שגיאה:[/red] {e}")
+        console.print("[yellow]רשימת snapshots זמינים: python -m utils.snapshot_store list[/yellow]")
+        sys.exit(1)
+
+    fund = result["fund"]
+    summary = (
+        f"[green]✓[/green] {result['stocks']} מניות ב-snapshot | "
+        f"כשירות לבסיס: {result['base_eligible']} | כשירות לפוטנציאל: {result['potential_eligible']}"
+    )
+    if result["index_pe"]:
+        summary += f" | P/E מדד: {result['index_pe']:.2f}"
+    console.print(summary)
+
+    table = Table(title=f"{fund.name} (offline)")
+    table.add_column("סוג")
+    table.add_column("סימול")
+    table.add_column("שם")
+    table.add_column("משקל", justify="right")
+    table.add_column("ציון", justify="right")
+    for position in fund.positions:
+        score = position.stock.base_score if position.position_type == "בסיס" else position.stock.potential_score
+        table.add_row(
+            position.position_type,
+            position.stock.symbol,
+            position.stock.name,
+            f"{position.weight * 100:.0f}%",
+            f"{score:.2f}" if score is not None else "-",
+        )
+    console.print(table)
+    console.print(f"  עלות מינימלית ליחידת קרן: {fund.minimum_cost or 0:,.2f}")
+
+    for error in builder.validate_fund(fund):
+        console.print(f"  [yellow]⚠[/yellow] {error}")
+
+
 if __name__ == "__main__":
     main()
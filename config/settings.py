@@ -87,12 +87,69 @@ class Settings:
     # Rate limit overrides (0 = auto-detect from API)
     TWELVEDATA_CREDITS_PER_MINUTE = int(os.getenv("TWELVEDATA_CREDITS_PER_MINUTE", "0"))
     TWELVEDATA_MAX_STOCKS_PER_MINUTE = int(os.getenv("TWELVEDATA_MAX_STOCKS_PER_MINUTE", "0"))
+    # Fraction of the plan's credits/minute the token bucket may use (headroom for other clients)
+    TWELVEDATA_CREDIT_UTILIZATION = float(os.getenv("TWELVEDATA_CREDIT_UTILIZATION", "0.95"))
+    # לקוח אסינכרוני: שלושת הדוחות של כל מניה נשלפים במקביל ומניות רבות בצנרת אחת
+    TWELVEDATA_ASYNC = os.getenv("TWELVEDATA_ASYNC", "false").lower() == "true"
+    TWELVEDATA_ASYNC_CONCURRENCY = int(os.getenv("TWELVEDATA_ASYNC_CONCURRENCY", "16"))
+
+    # HTTP: sessions עם connection pooling ו-keep-alive לכל מקור נתונים
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))  # חיבורים מקסימליים לכל host
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))  # שניות
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))  # שגיאות חיבור ו-5xx בלבד (לא 429)
+
+    # cache תשובות API (SQLite) - דוחות כספיים לא משתנים עד דיווח חדש, אין טעם לשלם עליהם שוב
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_PATH = BASE_DIR / os.getenv("RESPONSE_CACHE_PATH", "./cache/http_responses.sqlite")
+    RESPONSE_CACHE_STATEMENT_TTL_HOURS = float(os.getenv("RESPONSE_CACHE_STATEMENT_TTL_HOURS", "168"))
+    RESPONSE_CACHE_STATISTICS_TTL_HOURS = float(os.getenv("RESPONSE_CACHE_STATISTICS_TTL_HOURS", "24"))
+    RESPONSE_CACHE_QUOTE_TTL_MINUTES = float(os.getenv("RESPONSE_CACHE_QUOTE_TTL_MINUTES", "15"))
+    # מעקף קריאה (--no-cache): תשובות חדשות נשלפות ומרעננות את ה-cache
+    RESPONSE_CACHE_BYPASS = os.getenv("RESPONSE_CACHE_BYPASS", "false").lower() == "true"
+
+    # שליפה מקבילית של רכיבי מדד (שלב 2)
+    # מספר ה-workers המקסימלי; הכניסה בפועל מוגבלת על ידי תקציב הזיכויים של מקור הנתונים
+    FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+    # תמחור במנות (yfinance): מספר מניות בכל הורדה מרובת-סימולים (0 = תמחור פרטני)
+    PRICING_BATCH_SIZE = int(os.getenv("PRICING_BATCH_SIZE", "50"))
+    # צנרת זורמת (שליפה → תיקוף → כתיבה): קיבולת התורים בין השלבים ומספר threads לכל שלב
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+    PIPELINE_VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "2"))
+    PIPELINE_PERSIST_WORKERS = int(os.getenv("PIPELINE_PERSIST_WORKERS", "1"))
+    # גרף שלבי הבנייה: מספר שלבים בלתי תלויים שרצים במקביל
+    BUILD_STEP_WORKERS = int(os.getenv("BUILD_STEP_WORKERS", "4"))
+    # מאגר מחירי סגירה יומיים מקומי (memmap) - משותף לתמחור fiscal ול-backtest; רק תאריכים חסרים מורדים
+    PRICE_STORE_ENABLED = os.getenv("PRICE_STORE_ENABLED", "true").lower() == "true"
+    PRICE_STORE_DIR = BASE_DIR / os.getenv("PRICE_STORE_DIR", "./cache/prices")
+
+    # בנייה אינקרמנטלית (--incremental): ימים מסוף שנת הכספים עד שדוח שנתי חדש עשוי להתפרסם
+    FILING_LAG_DAYS_US = int(os.getenv("FILING_LAG_DAYS_US", "30"))
+    FILING_LAG_DAYS_TASE = int(os.getenv("FILING_LAG_DAYS_TASE", "60"))
 
     # הגדרות קרן
     FUND_QUARTER: Optional[str] = os.getenv("FUND_QUARTER") or None
     FUND_YEAR: Optional[int] = int(os.getenv("FUND_YEAR")) if os.getenv("FUND_YEAR") else None
     # הגדרות כלליות
     USE_CACHE = os.getenv("USE_CACHE", "true").lower() == "true"
+    # אחסון נתוני מניות: "json" (קובץ לכל מניה ב-cache/stocks_data), "sqlite" (מאגר יחיד מאונדקס)
+    # או "msgpack" (קובץ בינארי לכל מניה, פענוח עצל - דורש את חבילת msgpack)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "json").lower()
+    STOCK_STORE_PATH = BASE_DIR / os.getenv("STOCK_STORE_PATH", "./cache/stocks.sqlite")
+    # כתיבת cache ברקע: שטיפה כל N מניות מלוכלכות או כל X שניות (המוקדם מביניהם)
+    CACHE_WRITE_BATCH_SIZE = int(os.getenv("CACHE_WRITE_BATCH_SIZE", "50"))
+    CACHE_WRITE_INTERVAL = float(os.getenv("CACHE_WRITE_INTERVAL", "2.0"))
+    # טעינת cache מרוכזת: מספר threads לקריאת קבצי מניות
+    CACHE_LOAD_WORKERS = int(os.getenv("CACHE_LOAD_WORKERS", "8"))
+    # מניפסט ה-cache: מקור, זמן שליפה, סוף שנת כספים אחרונה, hash וציונים לכל מניה
+    CACHE_MANIFEST_ENABLED = os.getenv("CACHE_MANIFEST_ENABLED", "true").lower() == "true"
+    CACHE_MANIFEST_PATH = BASE_DIR / os.getenv("CACHE_MANIFEST_PATH", "./cache/manifest.sqlite")
+    # snapshots רבעוניים של נתוני יסוד (append-only) לדירוג מחדש ללא API (--offline)
+    SNAPSHOT_STORE_ENABLED = os.getenv("SNAPSHOT_STORE_ENABLED", "true").lower() == "true"
+    SNAPSHOT_STORE_PATH = BASE_DIR / os.getenv("SNAPSHOT_STORE_PATH", "./cache/snapshots.sqlite")
+    # זיכרון ציונים גולמיים בין ריצות, לפי content_hash שבמניפסט (דורש CACHE_MANIFEST_ENABLED)
+    SCORE_CACHE_ENABLED = os.getenv("SCORE_CACHE_ENABLED", "true").lower() == "true"
+    # סריקת פרמטרים (python -m fund_builder.sweep): מספר תהליכים, 0 = מספר המעבדים
+    SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "0"))
     DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 
     # משקלות קרן (קבועים) - 10 מניות: 6 בסיס + 4 פוטנציאל
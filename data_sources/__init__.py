@@ -2,6 +2,7 @@
 
 from .alphavantage_api import AlphaVantageSource
 from .twelvedata_api import TwelveDataSource
+from .twelvedata_async import AsyncTwelveDataSource
 from .yfinance_source import YFinanceSource
 from .router import DataSourceRouter
 from .adapter import DataSourceAdapter
@@ -10,6 +11,7 @@ __all__ = [
 
     "AlphaVantageSource",
     "TwelveDataSource",
+    "AsyncTwelveDataSource",
     "YFinanceSource",
     "DataSourceRouter",
     "DataSourceAdapter"
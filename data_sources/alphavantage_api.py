@@ -6,12 +6,15 @@ Alpha Vantage API Data Source
 import requests
 import time
 import logging
+import threading
 import yfinance as yf
 from typing import List, Dict, Optional
 from datetime import datetime
 from collections import deque
 from models import FinancialData, MarketData
 from .base_data_source import BaseDataSource
+from .http import create_session
+from .response_cache import ResponseCache
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -31,12 +34,17 @@ class AlphaVantageSource(BaseDataSource):
         self.api_key = api_key or settings.ALPHAVANTAGE_API_KEY
         self.rate_limit = rate_limit or settings.ALPHAVANTAGE_RATE_LIMIT
         self.base_url = "https://www.alphavantage.co/query"
+        # Pooled keep-alive session shared by all fetch workers (see http.py)
+        self.session = create_session()
+        # Persistent response cache: hits skip both the request and the rate limit (None = disabled)
+        self.response_cache = ResponseCache.from_settings()
 
         if not self.api_key:
             raise ValueError("ALPHAVANTAGE_API_KEY חסר בהגדרות")
 
         # Track API requests for rate limiting
         self.request_times = deque(maxlen=100)
+        self._rate_lock = threading.Lock()  # shared by concurrent fetch workers
 
         # Rate limits
         if self.rate_limit == "paid":
@@ -47,25 +55,59 @@ class AlphaVantageSource(BaseDataSource):
         logger.info(f"אתחול Alpha Vantage API (rate limit: {self.rate_limit} - {self.requests_per_minute} req/min)")
 
     def _enforce_rate_limit(self):
-        """אכיפת rate limit - sleep אם צריך"""
-        now = time.time()
-
-        # Remove requests older than 60 seconds
-        while self.request_times and (now - self.request_times[0]) > 60:
-            self.request_times.popleft()
-
-        # If we're at the limit, wait
-        if len(self.request_times) >= self.requests_per_minute:
-            sleep_time = 60 - (now - self.request_times[0])
-            if sleep_time > 0:
-                logger.debug(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-                # Clear old requests after sleeping
-                self._enforce_rate_limit()
+        """אכיפת rate limit - sleep אם צריך (thread-safe)"""
+        with self._rate_lock:
+            while True:
+                now = time.time()
+
+                # Remove requests older than 60 seconds
+                while self.request_times and (now - self.request_times[0]) > 60:
+                    self.request_times.popleft()
+
+                # If we're at the limit, wait (holding the lock keeps other workers queued)
+                if len(self.request_times) >= self.requests_per_minute:
+                    sleep_time = 60 - (now - self.request_times[0])
+                    if sleep_time > 0:
+                        logger.debug(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
+                        time.sleep(sleep_time)
+                        continue
+
+                # Record this request
+                self.request_times.append(time.time())
                 return
 
-        # Record this request
-        self.request_times.append(time.time())
+    def _get_json(self, params: dict) -> dict:
+        """
+        בקשת GET ל-API דרך ה-response cache
+
+        Alpha Vantage reports throttling and bad symbols with HTTP 200 ("Note",
+        "Information", "Error Message"), so only payloads without those keys are cached.
+
+        Args:
+            params: פרמטרי הבקשה (function, symbol, ...) - ללא apikey
+
+        Returns:
+            dict: תשובת ה-API
+
+        Raises:
+            requests.exceptions.RequestException: שגיאת HTTP/רשת
+        """
+        function = params["function"]
+        if self.response_cache is not None:
+            cached = self.response_cache.get("alphavantage", function, params)
+            if cached is not None:
+                return cached
+
+        self._enforce_rate_limit()
+        response = self.session.get(
+            self.base_url, params=dict(params, apikey=self.api_key), timeout=settings.HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        if self.response_cache is not None and not {"Note", "Information", "Error Message"} & set(data):
+            self.response_cache.put("alphavantage", function, params, data)
+        return data
 
     def login(self) -> bool:
         """
@@ -82,7 +124,7 @@ class AlphaVantageSource(BaseDataSource):
                 "symbol": "AAPL",
                 "apikey": self.api_key
             }
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = self.session.get(self.base_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -102,8 +144,10 @@ class AlphaVantageSource(BaseDataSource):
             return False
 
     def logout(self):
-        """לא נדרש עבור Alpha Vantage API (stateless)"""
-        pass
+        """סגירת חיבורי ה-session וה-response cache (ה-API עצמו stateless)"""
+        self.session.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
 
     def get_index_constituents(self, index_name: str) -> List[Dict]:
         """
@@ -174,42 +218,15 @@ class AlphaVantageSource(BaseDataSource):
 
             # 1. Income Statement
             logger.debug(f"מושך Income Statement עבור {clean_symbol}")
-            self._enforce_rate_limit()
-
-            income_params = {
-                "function": "INCOME_STATEMENT",
-                "symbol": clean_symbol,
-                "apikey": self.api_key
-            }
-            income_response = requests.get(self.base_url, params=income_params, timeout=30)
-            income_response.raise_for_status()
-            income_data = income_response.json()
+            income_data = self._get_json({"function": "INCOME_STATEMENT", "symbol": clean_symbol})
 
             # 2. Balance Sheet
             logger.debug(f"מושך Balance Sheet עבור {clean_symbol}")
-            self._enforce_rate_limit()
-
-            balance_params = {
-                "function": "BALANCE_SHEET",
-                "symbol": clean_symbol,
-                "apikey": self.api_key
-            }
-            balance_response = requests.get(self.base_url, params=balance_params, timeout=30)
-            balance_response.raise_for_status()
-            balance_data = balance_response.json()
+            balance_data = self._get_json({"function": "BALANCE_SHEET", "symbol": clean_symbol})
 
             # 3. Cash Flow
             logger.debug(f"מושך Cash Flow עבור {clean_symbol}")
-            self._enforce_rate_limit()
-
-            cashflow_params = {
-                "function": "CASH_FLOW",
-                "symbol": clean_symbol,
-                "apikey": self.api_key
-            }
-            cashflow_response = requests.get(self.base_url, params=cashflow_params, timeout=30)
-            cashflow_response.raise_for_status()
-            cashflow_data = cashflow_response.json()
+            cashflow_data = self._get_json({"function": "CASH_FLOW", "symbol": clean_symbol})
 
             # Parse annual reports
             income_reports = income_data.get("annualReports", [])
@@ -295,16 +312,7 @@ class AlphaVantageSource(BaseDataSource):
             clean_symbol = symbol.split('.')[0]
 
             # Get overview data from Alpha Vantage
-            self._enforce_rate_limit()
-
-            overview_params = {
-                "function": "OVERVIEW",
-                "symbol": clean_symbol,
-                "apikey": self.api_key
-            }
-            response = requests.get(self.base_url, params=overview_params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json({"function": "OVERVIEW", "symbol": clean_symbol})
 
             # Extract data
             name = data.get("Name", clean_symbol)
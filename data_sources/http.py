@@ -0,0 +1,58 @@
+"""
+HTTP session factory
+יצירת sessions עם connection pooling ו-keep-alive עבור מקורות הנתונים
+"""
+
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+
+# Transient server/network failures are retried at the transport level.
+# 429 is deliberately excluded: the sources handle it with credit-aware backoff.
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff_factor: float = 0.5,
+) -> requests.Session:
+    """
+    יצירת requests.Session עם pool של חיבורים ו-retry adapter
+
+    Args:
+        pool_size: מספר חיבורים מקסימלי לכל host (ברירת מחדל: settings.HTTP_POOL_SIZE)
+        max_retries: ניסיונות חוזרים לשגיאות חיבור ו-5xx (ברירת מחדל: settings.HTTP_MAX_RETRIES)
+        backoff_factor: מקדם המתנה בין ניסיונות (0.5s, 1s, 2s, ...)
+
+    Returns:
+        requests.Session: session מוכן לשימוש משותף בין threads
+    """
+    pool_size = pool_size or settings.HTTP_POOL_SIZE
+    max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        backoff_factor=backoff_factor,
+        raise_on_status=False,  # Let the source inspect the final response
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+        pool_block=True,  # Wait for a free connection instead of opening throwaway ones
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
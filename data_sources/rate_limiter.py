@@ -0,0 +1,151 @@
+"""
+Token-bucket credit scheduler
+מתזמן זיכויים מבוסס token bucket עבור Twelve Data - הדלי מתמלא ברציפות לפי ה-plan,
+ובקשות שומרות את העלות מראש כך ש-workers מקבילים ממתינים לפי סדר הגעה
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+# עלות זיכויים לכל endpoint (לפי מחירון Twelve Data)
+# Statements are by far the most expensive calls; price endpoints cost a single credit.
+ENDPOINT_CREDIT_COST = {
+    "/income_statement": 100,
+    "/balance_sheet": 100,
+    "/cash_flow": 100,
+    "/statistics": 50,
+    "/quote": 1,
+    "/eod": 1,
+    "/time_series": 1,
+    "/api_usage": 0,
+}
+
+DEFAULT_CREDIT_COST = 1
+
+
+def endpoint_cost(endpoint: str) -> int:
+    """
+    עלות הזיכויים המשוערת של endpoint
+
+    Args:
+        endpoint: נתיב ה-API (e.g., /income_statement)
+
+    Returns:
+        int: מספר זיכויים (ברירת מחדל: 1 עבור endpoint לא מוכר)
+    """
+    return ENDPOINT_CREDIT_COST.get(endpoint, DEFAULT_CREDIT_COST)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket עם מילוי רציף
+
+    capacity: גודל הדלי (הזיכויים לדקה)
+    refill_per_second: קצב המילוי (capacity / 60 עבור תקציב לדקה)
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: Optional[float] = None,
+        initial: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            capacity: מספר הטוקנים המקסימלי
+            refill_per_second: קצב מילוי (ברירת מחדל: capacity / 60)
+            initial: יתרה התחלתית (ברירת מחדל: דלי מלא)
+            clock: פונקציית זמן (ניתנת להחלפה בבדיקות)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second or capacity / 60.0)
+        self._clock = clock
+        self._tokens = self.capacity if initial is None else min(float(initial), self.capacity)
+        self._updated = clock()
+        self._outstanding = 0.0  # Reserved but not yet confirmed by the server
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """מילוי הדלי לפי הזמן שעבר (נקרא תחת self._lock)"""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+            self._updated = now
+
+    @property
+    def available(self) -> float:
+        """יתרת הטוקנים הנוכחית (שלילית = יש תור ממתינים)"""
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def reserve(self, cost: float) -> float:
+        """
+        הזמנת טוקנים והחזרת זמן ההמתנה הנדרש (ללא שינה)
+
+        Args:
+            cost: מספר טוקנים (מוגבל ל-capacity כדי שבקשה יקרה לא תיתקע לעולם)
+
+        Returns:
+            float: שניות להמתנה לפני ביצוע הבקשה
+        """
+        cost = min(float(cost), self.capacity)
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= cost
+            self._outstanding += cost
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def acquire(self, cost: float) -> float:
+        """
+        הזמנת טוקנים ושינה עד שהם זמינים
+
+        Returns:
+            float: השניות שחיכינו בפועל
+        """
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, cost: float, credits_left: Optional[int] = None):
+        """
+        אישור בקשה שהסתיימה וסנכרון מול כותרת api-credits-left
+
+        The server's count does not yet include requests still in flight, so the
+        reported balance is reduced by the credits we have reserved for them.
+        The bucket is only ever lowered by a sync, never raised above our own view.
+
+        Args:
+            cost: העלות שהוזמנה עבור הבקשה
+            credits_left: ערך api-credits-left מהתשובה (None = לא ידוע)
+        """
+        cost = min(float(cost), self.capacity)
+        with self._lock:
+            self._outstanding = max(0.0, self._outstanding - cost)
+            if credits_left is None:
+                return
+            self._refill(self._clock())
+            server_view = float(credits_left) - self._outstanding
+            if server_view < self._tokens:
+                self._tokens = server_view
+
+    def refund(self, cost: float):
+        """החזרת טוקנים עבור בקשה שלא חויבה (e.g., נדחתה עם 429 לפני החיוב)"""
+        cost = min(float(cost), self.capacity)
+        with self._lock:
+            self._outstanding = max(0.0, self._outstanding - cost)
+            self._tokens = min(self.capacity, self._tokens + cost)
+
+    def drain(self):
+        """ריקון הדלי (אחרי 429) - כל הבקשות הבאות ימתינו למילוי"""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(self._tokens, 0.0)
@@ -0,0 +1,214 @@
+"""
+Persistent HTTP response cache
+cache קבוע (SQLite) לתשובות API, עם TTL לפי סוג endpoint (ttl_for).
+מפתח ה-API אינו חלק מהמפתח, ורק תשובות תקינות נשמרות.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import settings
+from .rate_limiter import endpoint_cost
+
+logger = logging.getLogger(__name__)
+
+# Parameters that identify the caller, not the data
+SECRET_PARAMS = frozenset({"apikey", "api_key", "token"})
+
+STATEMENT_ENDPOINTS = frozenset({"income_statement", "balance_sheet", "cash_flow"})
+STATISTICS_ENDPOINTS = frozenset({"statistics", "overview"})
+QUOTE_ENDPOINTS = frozenset({"quote"})
+HISTORY_ENDPOINTS = frozenset({"eod", "time_series"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    namespace   TEXT NOT NULL,
+    endpoint    TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    expires_at  REAL           -- NULL = never expires
+)
+"""
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """'/income_statement' (Twelve Data) ו-'INCOME_STATEMENT' (Alpha Vantage) → 'income_statement'"""
+    return endpoint.strip("/").lower()
+
+
+def normalize_params(params: Dict) -> str:
+    """פרמטרים ממוינים כ-JSON, ללא מפתחות API"""
+    clean = {k: str(v) for k, v in params.items() if k.lower() not in SECRET_PARAMS and v is not None}
+    return json.dumps(clean, sort_keys=True, ensure_ascii=False)
+
+
+def ttl_for(endpoint: str, params: Dict) -> Optional[float]:
+    """
+    TTL בשניות עבור תשובה
+
+    Returns:
+        Optional[float]: שניות עד תפוגה; None = לתמיד; 0 = לא לשמור
+    """
+    name = normalize_endpoint(endpoint)
+    quote_ttl = settings.RESPONSE_CACHE_QUOTE_TTL_MINUTES * 60
+
+    if name in STATEMENT_ENDPOINTS:
+        return settings.RESPONSE_CACHE_STATEMENT_TTL_HOURS * 3600
+    if name in STATISTICS_ENDPOINTS:
+        return settings.RESPONSE_CACHE_STATISTICS_TTL_HOURS * 3600
+    if name in QUOTE_ENDPOINTS:
+        return quote_ttl
+    if name in HISTORY_ENDPOINTS:
+        # A closed trading day never changes; a range that reaches today still might
+        last_day = params.get("end_date") or params.get("date")
+        if last_day and str(last_day)[:10] < date.today().isoformat():
+            return None
+        return quote_ttl
+    return 0
+
+
+class ResponseCache:
+    """
+    cache של תשובות JSON בקובץ SQLite, משותף בין threads
+
+    Args:
+        path: קובץ ה-SQLite
+        read_enabled: False = מעקף (--no-cache): לא קוראים מה-cache אבל כן מרעננים אותו
+    """
+
+    def __init__(self, path: Path, read_enabled: bool = True):
+        self.path = Path(path)
+        self.read_enabled = read_enabled
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._writes = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["ResponseCache"]:
+        """
+        cache לפי ההגדרות, או None אם RESPONSE_CACHE_ENABLED כבוי
+
+        The cache is an optimization: if the file cannot be opened, sources run uncached.
+        """
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        try:
+            return cls(settings.RESPONSE_CACHE_PATH, read_enabled=not settings.RESPONSE_CACHE_BYPASS)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache disabled - cannot open {settings.RESPONSE_CACHE_PATH}: {e}")
+            return None
+
+    @staticmethod
+    def make_key(namespace: str, endpoint: str, params: Dict) -> str:
+        raw = f"{namespace}|{normalize_endpoint(endpoint)}|{normalize_params(params)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, endpoint: str, params: Dict) -> Optional[Dict]:
+        """
+        חיפוש תשובה שמורה שטרם פגה
+
+        Returns:
+            Optional[Dict]: ה-payload, או None (miss / פג תוקף / מעקף)
+        """
+        if not self.read_enabled:
+            return None
+
+        name = normalize_endpoint(endpoint)
+        if ttl_for(endpoint, params) == 0:
+            return None
+
+        key = self.make_key(namespace, endpoint, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (row[1] is None or row[1] > time.time()):
+                self._hits[name] = self._hits.get(name, 0) + 1
+                payload = row[0]
+            else:
+                self._misses[name] = self._misses.get(name, 0) + 1
+                return None
+
+        logger.debug(f"Response cache hit: {namespace} {endpoint} {params.get('symbol', '')}")
+        return json.loads(payload)
+
+    def put(self, namespace: str, endpoint: str, params: Dict, payload: Dict):
+        """שמירת תשובה מוצלחת (לפי מדיניות ה-TTL של ה-endpoint)"""
+        ttl = ttl_for(endpoint, params)
+        if ttl == 0:
+            return
+
+        now = time.time()
+        row = (
+            self.make_key(namespace, endpoint, params),
+            namespace,
+            normalize_endpoint(endpoint),
+            normalize_params(params),
+            json.dumps(payload, ensure_ascii=False),
+            now,
+            None if ttl is None else now + ttl,
+        )
+        try:
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                self._conn.commit()
+                self._writes += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed for {endpoint}: {e}")
+
+    def purge_expired(self) -> int:
+        """מחיקת רשומות שפג תוקפן; מחזיר את מספר הרשומות שנמחקו"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """
+        סטטיסטיקת hit/miss מאז יצירת ה-cache
+
+        Returns:
+            Dict: hits, misses, writes, hit_rate, credits_saved (Twelve Data credit
+                  costs; one per request for other APIs), by_endpoint
+        """
+        with self._lock:
+            hits = dict(self._hits)
+            misses = dict(self._misses)
+            writes = self._writes
+
+        total_hits = sum(hits.values())
+        total_lookups = total_hits + sum(misses.values())
+        return {
+            "hits": total_hits,
+            "misses": sum(misses.values()),
+            "writes": writes,
+            "hit_rate": total_hits / total_lookups if total_lookups else 0.0,
+            "credits_saved": sum(endpoint_cost(f"/{name}") * count for name, count in hits.items()),
+            "by_endpoint": {
+                name: {"hits": hits.get(name, 0), "misses": misses.get(name, 0)}
+                for name in sorted(set(hits) | set(misses))
+            },
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
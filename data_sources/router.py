@@ -30,8 +30,9 @@ class DataSourceRouter:
         # This is critical for TwelveDataSource: when both financial and pricing
         # sources are "twelvedata", reusing the same instance ensures:
         # 1. financial_source == pricing_source → True → unified call path is used
-        # 2. Credit tracking is shared (single _credits_used_this_minute counter)
+        # 2. Credit tracking is shared (single credit token bucket)
         # 3. Rate limiting works correctly across both data types
+        # 4. One pooled keep-alive HTTP session per source (see http.py)
         self._instance_cache: Dict[str, BaseDataSource] = {}
 
     def get_financial_source(self, index_name: str) -> BaseDataSource:
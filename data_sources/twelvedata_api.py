@@ -7,12 +7,18 @@ Twelve Data API Data Source
 import requests
 import time
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from typing import List, Dict, Optional, Tuple
 from models import FinancialData, MarketData
 from .base_data_source import BaseDataSource
+from .http import create_session
+from .rate_limiter import TokenBucket, endpoint_cost
+from .response_cache import ResponseCache
 from config import settings
+from utils.price_lookup import prices_for_dates, DEFAULT_MAX_DAYS_BACK
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +33,25 @@ class TwelveDataSource(BaseDataSource):
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.TWELVEDATA_API_KEY
         self.base_url = "https://api.twelvedata.com"
-        self._request_delay = 0.5  # Increased from 0.15s to 0.5s for better rate limiting
-        self._minute_start = time.time()
-        self._stocks_this_minute = 0
-        self._credits_used_this_minute = 0
-        self._last_request_time = 0  # Track last API call for throttling
+        # Pooled keep-alive session shared by all fetch workers (see http.py)
+        self.session = create_session()
+        # Persistent response cache: hits cost no credits (None = disabled)
+        self.response_cache = ResponseCache.from_settings()
+        self._credits_used_this_minute = 0  # Last cumulative 'api-credits-used' header
         self._credits_remaining = None  # Actual remaining credits from API headers
+        self._stocks_in_flight = 0  # Stocks admitted but not yet completed (concurrent fetching)
+        self._stocks_completed = 0
+        self._credit_wait_seconds = 0.0  # Total time spent waiting for the credit bucket
+
+        # Guards rate-limit counters so several fetch workers can share one credit budget.
+        # Re-entrant so helpers can safely be called while it is held.
+        self._lock = threading.RLock()
 
         # These will be set by _detect_plan_limits()
         self._credits_per_minute = 0
         self._max_stocks_per_minute = 0
+        self._credit_bucket: Optional[TokenBucket] = None  # Continuous-refill credit budget
+        self._stock_bucket: Optional[TokenBucket] = None  # Optional stocks/min cap (manual override)
 
         # Cache for fiscal dates to avoid duplicate API calls
         # Maps symbol -> list of fiscal dates
@@ -50,26 +65,26 @@ class TwelveDataSource(BaseDataSource):
 
     def _detect_plan_limits(self):
         """
-        Detect API plan tier and set appropriate rate limits
+        Detect API plan tier and configure the credit scheduler
 
-        Calculates optimal max_stocks_per_minute based on:
-        - Plan tier credits/minute
-        - 65% safety headroom (proven safe with deterministic 300 credits/stock)
-        - Estimated credits per stock based on ACTUAL API response headers:
-          * Financial only (3 calls): ~300 credits/stock (recommended config with yfinance for pricing)
-          * Pricing only (2+N calls): ~700+ credits/stock
-          * Both unified (worst case): ~360 credits/stock
+        Credits are scheduled by a continuous-refill token bucket (see rate_limiter.py):
+        - Bucket size = plan credits/minute × TWELVEDATA_CREDIT_UTILIZATION
+        - Refill rate = bucket size / 60 credits per second
+        - Each request reserves its endpoint cost and waits only for the deficit
+        - The bucket is synced down to the 'api-credits-left' header after every call
 
         NOTE: Each TwelveData financial API call costs ~100 credits.
-        3 financial calls (income, balance, cashflow) = ~300 credits/stock.
-        The 429 retry logic and real-time credit tracking provide safety nets.
+        3 financial calls (income, balance, cashflow) = ~300 credits/stock,
+        so max_stocks_per_minute is informational unless overridden in .env.
 
         Respects manual overrides from .env if set.
         """
+        utilization = settings.TWELVEDATA_CREDIT_UTILIZATION
+
         # Check for manual overrides first
         if settings.TWELVEDATA_CREDITS_PER_MINUTE > 0:
             self._credits_per_minute = settings.TWELVEDATA_CREDITS_PER_MINUTE
-            self._max_stocks_per_minute = settings.TWELVEDATA_MAX_STOCKS_PER_MINUTE or int((self._credits_per_minute * 0.65) / 300)
+            self._configure_rate_limits(0)
             logger.info(
                 f"✓ TwelveData: Using manual override from .env: "
                 f"{self._credits_per_minute} credits/min, {self._max_stocks_per_minute} stocks/min"
@@ -80,43 +95,36 @@ class TwelveDataSource(BaseDataSource):
             # Note: _api_request can't be used before init is complete, so we make a direct call
             params = {"apikey": self.api_key}
             url = f"{self.base_url}/api_usage"
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=settings.HTTP_TIMEOUT)
             response.raise_for_status()
             data = response.json()
 
             plan = data.get("plan_category", "basic").lower()
             plan_limit = data.get("plan_limit", 0)  # Credits per minute from API
+            current_usage = int(data.get("current_usage", 0) or 0)
 
             # Set limits based on detected plan
             if "basic" in plan or "free" in plan:
                 self._credits_per_minute = 8
+                self._configure_rate_limits(current_usage)
                 self._max_stocks_per_minute = 0  # Will warn user
                 logger.warning(
                     "⚠️  TwelveData Basic plan detected - NOT SUITABLE for fund building!\n"
                     "   Basic plan (8 credits/min) would take 3-12 hours per run.\n"
                     "   Please upgrade to Pro 610 or higher."
                 )
-            elif "pro" in plan:
-                # Pro plans: Pro 610, Pro 1000, Pro 1597, etc.
+            else:
+                # Pro plans: Pro 610, Pro 1000, Pro 1597, etc. / Grow, Enterprise, etc.
                 # Use actual limit from API, or conservative default
-                self._credits_per_minute = plan_limit if plan_limit > 0 else 610
-                # Financial only (3 calls: income, balance, cashflow): ~300 credits/stock
-                # With yfinance handling pricing, TwelveData only does financials
-                # Formula: (credits * 0.65) / 300 = max stocks/min with 65% safety margin
-                self._max_stocks_per_minute = max(1, int((self._credits_per_minute * 0.65) / 300))
+                default_limit = 610 if "pro" in plan else 1500
+                self._credits_per_minute = plan_limit if plan_limit > 0 else default_limit
+                self._configure_rate_limits(current_usage)
                 estimated_minutes = 125 / max(self._max_stocks_per_minute, 1)
-                logger.info(
-                    f"✓ TwelveData Pro plan detected: {self._credits_per_minute} credits/min, "
-                    f"{self._max_stocks_per_minute} stocks/min (with 65% safety margin, ~300 credits/stock)\n"
-                    f"  TASE125 (~125 stocks) will take ~{estimated_minutes:.0f} minutes"
-                )
-            else:  # Grow, Enterprise, etc.
-                self._credits_per_minute = plan_limit if plan_limit > 0 else 1500
-                self._max_stocks_per_minute = max(1, int((self._credits_per_minute * 0.65) / 300))
                 logger.info(
                     f"✓ TwelveData {plan.title()} plan detected: {self._credits_per_minute} credits/min, "
-                    f"{self._max_stocks_per_minute} stocks/min (with 65% safety margin)\n"
-                    f"  TASE125 (~125 stocks) will take ~{125 / max(self._max_stocks_per_minute, 1):.0f} minutes"
+                    f"~{self._max_stocks_per_minute} stocks/min "
+                    f"({utilization:.0%} utilization, ~300 credits/stock)\n"
+                    f"  TASE125 (~125 stocks) will take ~{estimated_minutes:.0f} minutes"
                 )
 
         except Exception as e:
@@ -124,7 +132,27 @@ class TwelveDataSource(BaseDataSource):
             # Fallback to Pro 610 defaults (safe for most users)
             # Each financial call costs ~100 credits, 3 calls/stock = ~300 credits
             self._credits_per_minute = 610
-            self._max_stocks_per_minute = max(1, int((610 * 0.65) / 300))  # = 1
+            self._configure_rate_limits(0)
+
+    def _configure_rate_limits(self, current_usage: int):
+        """
+        בניית ה-token buckets לפי תקציב הזיכויים
+
+        Args:
+            current_usage: זיכויים שכבר נוצלו בדקה הנוכחית (מ-/api_usage)
+        """
+        budget = max(1.0, self._credits_per_minute * settings.TWELVEDATA_CREDIT_UTILIZATION)
+        self._credit_bucket = TokenBucket(budget, initial=budget - current_usage)
+
+        # Financial only (3 calls: income, balance, cashflow): ~300 credits/stock
+        self._max_stocks_per_minute = max(1, int(budget / 300))
+
+        # Optional hard cap on stocks/minute (manual override only)
+        if settings.TWELVEDATA_MAX_STOCKS_PER_MINUTE > 0:
+            self._max_stocks_per_minute = settings.TWELVEDATA_MAX_STOCKS_PER_MINUTE
+            self._stock_bucket = TokenBucket(self._max_stocks_per_minute)
+        else:
+            self._stock_bucket = None
 
     def _get_exchange(self, symbol: str) -> Optional[str]:
         """
@@ -159,82 +187,46 @@ class TwelveDataSource(BaseDataSource):
 
     def _wait_for_rate_limit(self):
         """
-        CONSERVATIVE: Wait if processing next stock would exceed safe threshold
+        Admit one stock into the run
 
-        Uses TWO signals for throttle decisions:
-        1. Stock count vs max_stocks_per_minute
-        2. Actual credits remaining from API response headers (api-credits-left)
+        Credits are not gated per stock: every API call reserves its own cost
+        from the credit bucket in _api_request and waits only for the deficit.
+        A stock is held back here only when TWELVEDATA_MAX_STOCKS_PER_MINUTE is set,
+        in which case it waits for the next token of the stocks/minute bucket.
 
-        Each financial API call costs ~100 credits. A full stock with 3 financial
-        calls costs ~300 credits. This method ensures we don't start a new stock
-        if we don't have enough credits remaining.
+        Thread-safe: the buckets are internally locked, and in-flight stocks are
+        counted under self._lock for progress logging.
         """
-        elapsed = time.time() - self._minute_start
-
-        # Check if we should reset counters (new minute)
-        if elapsed >= 62:
-            logger.debug(f"✅ Minute reset: {self._stocks_this_minute} stocks, {self._credits_used_this_minute} credits")
-            self._stocks_this_minute = 0
-            self._credits_used_this_minute = 0
-            self._credits_remaining = self._credits_per_minute  # Reset remaining
-            self._minute_start = time.time()
-            return
-
-        # Check stock limit
-        if self._stocks_this_minute >= self._max_stocks_per_minute:
-            wait_time = 62 - elapsed
-            logger.info(
-                f"⏱️  Stock limit reached: {self._stocks_this_minute}/{self._max_stocks_per_minute} stocks "
-                f"({self._credits_used_this_minute} credits). "
-                f"Waiting {wait_time:.0f}s for next minute..."
-            )
-            time.sleep(wait_time)
-            self._stocks_this_minute = 0
-            self._credits_used_this_minute = 0
-            self._credits_remaining = self._credits_per_minute
-            self._minute_start = time.time()
-            return
-
-        # LOOK-AHEAD using ACTUAL remaining credits from API headers
-        # Each stock needs ~300 credits for 3 financial calls (when yfinance handles pricing)
-        estimated_credits_per_stock = 300
-        # Use actual remaining credits if available, otherwise estimate
-        if self._credits_remaining is not None and self._credits_remaining > 0:
-            if self._credits_remaining < estimated_credits_per_stock:
-                wait_time = 62 - elapsed
-                logger.warning(
-                    f"⏸️  CREDIT THROTTLE: Only {self._credits_remaining} credits remaining "
-                    f"(need ~{estimated_credits_per_stock} for next stock). "
-                    f"Waiting {wait_time:.0f}s for next minute..."
+        if self._stock_bucket is not None:
+            waited = self._stock_bucket.acquire(1)
+            if waited > 1:
+                logger.info(
+                    f"⏱️  Stock limit: waited {waited:.1f}s "
+                    f"({self._max_stocks_per_minute} stocks/min cap)"
                 )
-                time.sleep(wait_time)
-                self._stocks_this_minute = 0
-                self._credits_used_this_minute = 0
-                self._credits_remaining = self._credits_per_minute
-                self._minute_start = time.time()
-                return
-
-        # Fallback: estimate-based threshold (65% safety margin)
-        safe_threshold = int(self._credits_per_minute * 0.65)
-        projected_credits = self._credits_used_this_minute + estimated_credits_per_stock
-
-        if projected_credits > safe_threshold:
-            wait_time = 62 - elapsed
-            logger.warning(
-                f"⏸️  ESTIMATED THROTTLE: {self._credits_used_this_minute} credits used, "
-                f"next stock needs ~{estimated_credits_per_stock} more (total: {projected_credits}). "
-                f"Safe limit: {safe_threshold}/{self._credits_per_minute}. "
-                f"Waiting {wait_time:.0f}s for next minute..."
-            )
-            time.sleep(wait_time)
-            self._stocks_this_minute = 0
-            self._credits_used_this_minute = 0
-            self._credits_remaining = self._credits_per_minute
-            self._minute_start = time.time()
+
+        with self._lock:
+            self._stocks_in_flight += 1
 
     def _notify_stock_complete(self):
         """Call after all API calls for a single stock are done"""
-        self._stocks_this_minute += 1
+        with self._lock:
+            self._stocks_in_flight = max(0, self._stocks_in_flight - 1)
+            self._stocks_completed += 1
+
+    @contextmanager
+    def _stock_slot(self):
+        """
+        Admit one stock into the credit budget for the duration of the block
+
+        Releases the in-flight slot even when a call inside the block fails,
+        so a failing stock cannot permanently shrink the budget of other workers.
+        """
+        self._wait_for_rate_limit()
+        try:
+            yield
+        finally:
+            self._notify_stock_complete()
 
     def _api_request(self, endpoint: str, params: dict, retry_count: int = 0) -> dict:
         """
@@ -251,44 +243,91 @@ class TwelveDataSource(BaseDataSource):
         Raises:
             RuntimeError: אם הבקשה נכשלה
         """
+        if retry_count == 0 and self.response_cache is not None:
+            cached = self.response_cache.get("twelvedata", endpoint, params)
+            if cached is not None:
+                return cached
+
         params["apikey"] = self.api_key
         url = f"{self.base_url}{endpoint}"
 
-        # Enforce minimum delay between requests
-        if self._last_request_time > 0:
-            elapsed_since_last = time.time() - self._last_request_time
-            if elapsed_since_last < self._request_delay:
-                sleep_time = self._request_delay - elapsed_since_last
-                time.sleep(sleep_time)
-
-        self._last_request_time = time.time()
+        # Reserve this call's credits; sleeps only for the deficit (if any)
+        cost = endpoint_cost(endpoint)
+        self._record_credit_wait(endpoint, cost, self._credit_bucket.acquire(cost))
 
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=settings.HTTP_TIMEOUT)
 
             # Handle 429 Rate Limit with exponential backoff
             if response.status_code == 429:
-                if retry_count < 3:
-                    wait_time = 2 ** retry_count  # Exponential: 1s, 2s, 4s
-                    logger.warning(
-                        f"⚠️  Rate limit exceeded (429), waiting {wait_time}s before retry {retry_count + 1}/3..."
-                    )
-                    time.sleep(wait_time)
-                    return self._api_request(endpoint, params, retry_count + 1)
-                else:
-                    raise RuntimeError(
-                        "Rate limit exceeded after 3 retries. "
-                        "This should not happen with proper rate limiting. "
-                        "Please check your plan limits or reduce max_stocks_per_minute."
-                    )
+                wait_time = self._on_rate_limited(cost, retry_count)
+                time.sleep(wait_time)
+                return self._api_request(endpoint, params, retry_count + 1)
 
-            response.raise_for_status()
+            data = self._handle_response(endpoint, response, cost)
+        except requests.exceptions.RequestException as e:
+            self._credit_bucket.settle(cost)
+            raise RuntimeError(f"Twelve Data API request failed: {e}")
+
+        self._store_response(endpoint, params, data)
+        return data
+
+    def _store_response(self, endpoint: str, params: dict, data: dict):
+        """שמירת תשובה מוצלחת ב-response cache (משותף ללקוח האסינכרוני)"""
+        if self.response_cache is not None:
+            self.response_cache.put("twelvedata", endpoint, params, data)
+
+    def _record_credit_wait(self, endpoint: str, cost: int, waited: float):
+        """רישום זמן ההמתנה ל-credit bucket"""
+        if waited > 0:
+            with self._lock:
+                self._credit_wait_seconds += waited
+            if waited > 1:
+                logger.debug(f"⏳ Credit bucket: waited {waited:.1f}s for {endpoint} ({cost} credits)")
 
-            # Track actual credits from response headers
-            # Note: 'api-credits-used' is CUMULATIVE (total used this minute), not per-call
-            credits_used_total = int(response.headers.get('api-credits-used', 0))
-            credits_left = int(response.headers.get('api-credits-left', 0))
+    def _on_rate_limited(self, cost: int, retry_count: int) -> float:
+        """
+        טיפול בתשובת 429: החזרת הזיכויים וריקון ה-bucket
+
+        Returns:
+            float: שניות להמתנה לפני ניסיון חוזר (exponential: 1s, 2s, 4s)
 
+        Raises:
+            RuntimeError: אחרי 3 ניסיונות חוזרים
+        """
+        # The call was not charged; everyone else should back off until the bucket refills
+        self._credit_bucket.refund(cost)
+        self._credit_bucket.drain()
+        if retry_count >= 3:
+            raise RuntimeError(
+                "Rate limit exceeded after 3 retries. "
+                "This should not happen with proper rate limiting. "
+                "Please check your plan limits or reduce max_stocks_per_minute."
+            )
+        wait_time = 2 ** retry_count
+        logger.warning(
+            f"⚠️  Rate limit exceeded (429), waiting {wait_time}s before retry {retry_count + 1}/3..."
+        )
+        return wait_time
+
+    def _handle_response(self, endpoint: str, response: requests.Response, cost: int) -> dict:
+        """
+        עיבוד תשובת API: מעקב זיכויים מה-headers, סנכרון ה-bucket ובדיקת שגיאות
+
+        Shared by the blocking client and AsyncTwelveDataSource.
+
+        Raises:
+            requests.exceptions.HTTPError: סטטוס HTTP שגוי
+            RuntimeError: שגיאת API בפורמט של Twelve Data
+        """
+        response.raise_for_status()
+
+        # Track actual credits from response headers
+        # Note: 'api-credits-used' is CUMULATIVE (total used this minute), not per-call
+        credits_used_total = int(response.headers.get('api-credits-used', 0))
+        credits_left = int(response.headers.get('api-credits-left', 0))
+
+        with self._lock:
             # Calculate credits for THIS call only
             if self._credits_used_this_minute > 0:
                 credits_this_call = credits_used_total - self._credits_used_this_minute
@@ -296,40 +335,45 @@ class TwelveDataSource(BaseDataSource):
                 credits_this_call = credits_used_total
 
             self._credits_used_this_minute = credits_used_total
-            self._credits_remaining = credits_left  # Track actual remaining for throttle decisions
-
-            # Progressive warnings based on remaining credits
-            if credits_left == 0:
-                logger.error(f"🛑 OUT OF CREDITS! Used {credits_used_total}/{self._credits_per_minute}")
-            elif credits_left < 200:  # Changed from 100 - more aggressive warning
-                logger.warning(f"🔴 DANGER: Only {credits_left} credits remaining! ({credits_used_total} used)")
-            elif credits_left < 400:  # Changed from 300 - earlier warning
-                logger.warning(f"🟡 WARNING: {credits_left} credits remaining ({credits_used_total}/{self._credits_per_minute} used)")
-            elif credits_left < 600:  # New tier - informational
-                logger.info(f"🟢 {credits_left} credits remaining ({credits_used_total}/{self._credits_per_minute} used)")
-
-            logger.debug(f"API call: {endpoint}, this_call={credits_this_call}, total_used={credits_used_total}, left={credits_left}")
-
-            # Enhanced debug mode logging with emoji stats
-            if settings.DEBUG_MODE:
-                logger.debug(
-                    f"📊 API Stats: endpoint={endpoint}, "
-                    f"credits_this_call={credits_this_call}, "
-                    f"cumulative={credits_used_total}, "
-                    f"remaining={credits_left}, "
-                    f"stocks_this_minute={self._stocks_this_minute}"
-                )
+            self._credits_remaining = credits_left  # Track actual remaining for logging
+
+        # Sync the bucket down to the server's view (only when the header is present),
+        # keeping the utilization headroom out of the usable balance
+        header_left = None
+        if 'api-credits-left' in response.headers:
+            header_left = credits_left - (self._credits_per_minute - self._credit_bucket.capacity)
+        self._credit_bucket.settle(cost, header_left)
+
+        # Progressive warnings based on remaining credits
+        if credits_left == 0:
+            logger.error(f"🛑 OUT OF CREDITS! Used {credits_used_total}/{self._credits_per_minute}")
+        elif credits_left < 200:  # Changed from 100 - more aggressive warning
+            logger.warning(f"🔴 DANGER: Only {credits_left} credits remaining! ({credits_used_total} used)")
+        elif credits_left < 400:  # Changed from 300 - earlier warning
+            logger.warning(f"🟡 WARNING: {credits_left} credits remaining ({credits_used_total}/{self._credits_per_minute} used)")
+        elif credits_left < 600:  # New tier - informational
+            logger.info(f"🟢 {credits_left} credits remaining ({credits_used_total}/{self._credits_per_minute} used)")
+
+        logger.debug(f"API call: {endpoint}, this_call={credits_this_call}, total_used={credits_used_total}, left={credits_left}")
+
+        # Enhanced debug mode logging with emoji stats
+        if settings.DEBUG_MODE:
+            logger.debug(
+                f"📊 API Stats: endpoint={endpoint}, "
+                f"credits_this_call={credits_this_call}, "
+                f"cumulative={credits_used_total}, "
+                f"remaining={credits_left}, "
+                f"stocks_in_flight={self._stocks_in_flight}"
+            )
 
-            data = response.json()
+        data = response.json()
 
-            # Twelve Data error format
-            if data.get("status") == "error" or data.get("code"):
-                error_msg = data.get("message", "Unknown error")
-                raise RuntimeError(f"Twelve Data API error: {error_msg}")
+        # Twelve Data error format
+        if data.get("status") == "error" or data.get("code"):
+            error_msg = data.get("message", "Unknown error")
+            raise RuntimeError(f"Twelve Data API error: {error_msg}")
 
-            return data
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"Twelve Data API request failed: {e}")
+        return data
 
     def _is_tase_symbol(self, symbol: str) -> bool:
         return symbol.endswith(".TA")
@@ -358,8 +402,10 @@ class TwelveDataSource(BaseDataSource):
             return False
 
     def logout(self):
-        """לא נדרש עבור Twelve Data API"""
-        pass
+        """סגירת חיבורי ה-session וה-response cache (ה-API עצמו stateless)"""
+        self.session.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
 
     def get_index_constituents(self, index_name: str) -> List[Dict]:
         """
@@ -375,21 +421,14 @@ class TwelveDataSource(BaseDataSource):
         Returns:
             List[Dict]: רשימת מניות
         """
-        import json
-        from pathlib import Path
-
-        # Try to load from existing cache first (any quarter)
-        cache_dir = settings.CACHE_DIR / "index_constituents"
-        if cache_dir.exists():
-            for cache_file in sorted(cache_dir.glob(f"{index_name}_*.json"), reverse=True):
-                try:
-                    with open(cache_file, "r", encoding="utf-8") as f:
-                        constituents = json.load(f)
-                    if constituents:
-                        logger.info(f"Loaded {len(constituents)} constituents from cache: {cache_file.name}")
-                        return constituents
-                except Exception:
-                    continue
+        from utils.constituent_registry import ConstituentRegistry
+
+        # Try the most recent cached quarter first (ordered by year and quarter, not file name)
+        latest = ConstituentRegistry().latest(index_name)
+        if latest:
+            quarter, year, constituents = latest
+            logger.info(f"Loaded {len(constituents)} constituents from cache: {index_name} {quarter} {year}")
+            return constituents
 
         # Fallback: fetch TASE stock list from Twelve Data
         if index_name == "TASE125":
@@ -433,15 +472,13 @@ class TwelveDataSource(BaseDataSource):
         Returns:
             Tuple[FinancialData, MarketData]: נתונים פיננסיים ונתוני שוק
         """
-        self._wait_for_rate_limit()
+        with self._stock_slot():
+            # Get financials AND fiscal dates in one call (internal method)
+            financial_data, fiscal_dates = self._get_financials_with_dates(symbol, years)
 
-        # Get financials AND fiscal dates in one call (internal method)
-        financial_data, fiscal_dates = self._get_financials_with_dates(symbol, years)
+            # Pass fiscal_dates to avoid duplicate API call
+            market_data = self.get_stock_market_data(symbol, fiscal_dates)
 
-        # Pass fiscal_dates to avoid duplicate API call
-        market_data = self.get_stock_market_data(symbol, fiscal_dates)
-
-        self._notify_stock_complete()
         return financial_data, market_data
 
     def get_stock_financials(self, symbol: str, years: int = 5) -> FinancialData:
@@ -460,16 +497,31 @@ class TwelveDataSource(BaseDataSource):
         Returns:
             FinancialData: נתונים פיננסיים
         """
-        self._wait_for_rate_limit()
-
-        financial_data, fiscal_dates = self._get_financials_with_dates(symbol, years)
+        with self._stock_slot():
+            financial_data, fiscal_dates = self._get_financials_with_dates(symbol, years)
 
         # Cache fiscal dates for potential reuse in get_stock_market_data()
         self._last_fiscal_dates[symbol] = fiscal_dates
 
-        self._notify_stock_complete()
         return financial_data
 
+    def _statement_params(self, symbol: str, period: str) -> dict:
+        """
+        פרמטרים משותפים לשלושת הדוחות הכספיים
+
+        Args:
+            symbol: סימול המניה (e.g., LUMI.TA)
+            period: annual / quarterly
+
+        Returns:
+            dict: פרמטרים לבקשה
+        """
+        params = {"symbol": self._clean_symbol(symbol), "period": period}
+        exchange = self._get_exchange(symbol)
+        if exchange:
+            params["exchange"] = exchange
+        return params
+
     def _get_financials_with_dates(self, symbol: str, years: int = 5) -> Tuple[FinancialData, List[str]]:
         """
         שליפת נתונים פיננסיים למניה (internal method with fiscal dates)
@@ -484,12 +536,7 @@ class TwelveDataSource(BaseDataSource):
             Tuple[FinancialData, List[str]]: נתונים פיננסיים ורשימת תאריכי fiscal
                                               (to avoid duplicate API call in get_stock_market_data)
         """
-        clean_sym = self._clean_symbol(symbol)
-        exchange = self._get_exchange(symbol)
-
-        params = {"symbol": clean_sym, "period": "annual"}
-        if exchange:
-            params["exchange"] = exchange
+        params = self._statement_params(symbol, "annual")
 
         # API Call 1: Income Statement
         try:
@@ -498,6 +545,45 @@ class TwelveDataSource(BaseDataSource):
             logger.error(f"Failed to fetch income statement for {symbol}: {e}")
             raise
 
+        # API Call 2: Balance Sheet
+        try:
+            balance_data = self._api_request("/balance_sheet", params)
+        except RuntimeError as e:
+            logger.warning(f"Failed to fetch balance sheet for {symbol}: {e}")
+            balance_data = None
+
+        # API Call 3: Cash Flow
+        try:
+            cf_data = self._api_request("/cash_flow", params)
+        except RuntimeError as e:
+            logger.warning(f"Failed to fetch cash flow for {symbol}: {e}")
+            cf_data = None
+
+        return self._parse_annual_statements(symbol, years, income_data, balance_data, cf_data)
+
+    def _parse_annual_statements(
+        self,
+        symbol: str,
+        years: int,
+        income_data: dict,
+        balance_data: Optional[dict],
+        cf_data: Optional[dict],
+    ) -> Tuple[FinancialData, List[str]]:
+        """
+        המרת תשובות הדוחות השנתיים ל-FinancialData (ללא קריאות API)
+
+        Shared by the blocking client and AsyncTwelveDataSource.
+
+        Args:
+            symbol: סימול המניה
+            years: מספר שנים
+            income_data: תשובת /income_statement
+            balance_data: תשובת /balance_sheet (None אם נכשלה)
+            cf_data: תשובת /cash_flow (None אם נכשלה)
+
+        Returns:
+            Tuple[FinancialData, List[str]]: נתונים פיננסיים ורשימת תאריכי fiscal
+        """
         statements = income_data.get("income_statement", [])
 
         revenues = {}
@@ -541,13 +627,9 @@ class TwelveDataSource(BaseDataSource):
         # Even if financial statements aren't filed yet, we need price data for alignment
         # Example: In Q1 2026, Dec 31 FY-end stocks may have FY2024 financials but we need 2025-12-31 price
         if fiscal_dates:
-            from datetime import datetime, timedelta
-            from dateutil.relativedelta import relativedelta
-
             # Determine the fiscal year-end month/day from the most recent fiscal date
             latest_fiscal = fiscal_dates[0]  # e.g., "2024-12-31"
             latest_date = datetime.strptime(latest_fiscal, "%Y-%m-%d")
-            latest_year = latest_date.year
 
             # Calculate what the next fiscal year-end date would be
             next_fy_end = latest_date + relativedelta(years=1)
@@ -563,35 +645,12 @@ class TwelveDataSource(BaseDataSource):
                         f"(FY{next_fy_end.year} ended but financials not yet available)"
                     )
 
-        # API Call 2: Balance Sheet
-        total_debt = 0.0
-        total_equity = 0.0
-        try:
-            balance_data = self._api_request("/balance_sheet", params)
-            sheets = balance_data.get("balance_sheet", [])
-            if sheets:
-                latest = sheets[0]
-
-                liabilities = latest.get("liabilities", {})
-                non_current = liabilities.get("non_current_liabilities", {})
-                ltd = non_current.get("long_term_debt")
-                total_debt = float(ltd) if ltd is not None else 0.0
-
-                equity_section = latest.get("shareholders_equity", {})
-                te = equity_section.get("total_shareholders_equity")
-                if te is not None:
-                    total_equity = float(te)
-                else:
-                    # Try alternate path
-                    common = equity_section.get("common_stock_equity")
-                    total_equity = float(common) if common is not None else 0.0
-        except RuntimeError as e:
-            logger.warning(f"Failed to fetch balance sheet for {symbol}: {e}")
+        # Balance Sheet
+        total_debt, total_equity = self._parse_debt_and_equity(balance_data)
 
-        # API Call 3: Cash Flow
+        # Cash Flow
         operating_cash_flows = {}
-        try:
-            cf_data = self._api_request("/cash_flow", params)
+        if cf_data is not None:
             flows = cf_data.get("cash_flow", [])
             for flow in flows[:years]:
                 fiscal_date = flow.get("fiscal_date", "")
@@ -602,8 +661,6 @@ class TwelveDataSource(BaseDataSource):
                 ops = flow.get("operating_activities", {})
                 ocf = ops.get("operating_cash_flow")
                 operating_cash_flows[year] = float(ocf) if ocf is not None else 0.0
-        except RuntimeError as e:
-            logger.warning(f"Failed to fetch cash flow for {symbol}: {e}")
 
         financial_data = FinancialData(
             symbol=symbol,
@@ -618,6 +675,39 @@ class TwelveDataSource(BaseDataSource):
         # Return both financial data and fiscal dates (to avoid duplicate API call)
         return financial_data, fiscal_dates
 
+    @staticmethod
+    def _parse_debt_and_equity(balance_data: Optional[dict]) -> Tuple[float, float]:
+        """
+        חילוץ חוב לטווח ארוך והון עצמי מהמאזן האחרון
+
+        Returns:
+            Tuple[float, float]: (total_debt, total_equity) - 0.0 אם חסר
+        """
+        total_debt = 0.0
+        total_equity = 0.0
+        if balance_data is None:
+            return total_debt, total_equity
+
+        sheets = balance_data.get("balance_sheet", [])
+        if sheets:
+            latest = sheets[0]
+
+            liabilities = latest.get("liabilities", {})
+            non_current = liabilities.get("non_current_liabilities", {})
+            ltd = non_current.get("long_term_debt")
+            total_debt = float(ltd) if ltd is not None else 0.0
+
+            equity_section = latest.get("shareholders_equity", {})
+            te = equity_section.get("total_shareholders_equity")
+            if te is not None:
+                total_equity = float(te)
+            else:
+                # Try alternate path
+                common = equity_section.get("common_stock_equity")
+                total_equity = float(common) if common is not None else 0.0
+
+        return total_debt, total_equity
+
     def get_quarterly_financials(self, symbol: str, num_quarters: int = 4) -> dict:
         """
         שליפת נתונים פיננסיים רבעוניים למניה (לחישוב LTM)
@@ -637,53 +727,16 @@ class TwelveDataSource(BaseDataSource):
                 total_debt: float (from latest quarter balance sheet)
                 total_equity: float (from latest quarter balance sheet)
         """
-        self._wait_for_rate_limit()
-
-        clean_sym = self._clean_symbol(symbol)
-        exchange = self._get_exchange(symbol)
-
-        params = {"symbol": clean_sym, "period": "quarterly"}
-        if exchange:
-            params["exchange"] = exchange
+        with self._stock_slot():
+            return self._fetch_quarterly_statements(symbol, num_quarters)
 
-        result = {
-            "quarterly_revenues": [],
-            "quarterly_net_incomes": [],
-            "quarterly_operating_incomes": [],
-            "quarterly_operating_cash_flows": [],
-            "total_debt": 0.0,
-            "total_equity": 0.0,
-        }
+    def _fetch_quarterly_statements(self, symbol: str, num_quarters: int) -> dict:
+        """שליפת שלושת הדוחות הרבעוניים (נקרא מתוך _stock_slot)"""
+        params = self._statement_params(symbol, "quarterly")
 
         # API Call 1: Quarterly Income Statement
         try:
             income_data = self._api_request("/income_statement", params)
-            statements = income_data.get("income_statement", [])
-
-            for stmt in statements[:num_quarters]:
-                fiscal_date = stmt.get("fiscal_date", "")
-                if not fiscal_date:
-                    continue
-
-                sales = stmt.get("sales")
-                ni = stmt.get("net_income")
-                oi = stmt.get("operating_income")
-
-                # Fallback for operating income
-                if oi is None:
-                    oi = stmt.get("pretax_income")
-                if oi is None:
-                    oi = stmt.get("ebitda")
-
-                result["quarterly_revenues"].append(
-                    (fiscal_date, float(sales) if sales is not None else 0.0)
-                )
-                result["quarterly_net_incomes"].append(
-                    (fiscal_date, float(ni) if ni is not None else 0.0)
-                )
-                result["quarterly_operating_incomes"].append(
-                    (fiscal_date, float(oi) if oi is not None else 0.0)
-                )
         except RuntimeError as e:
             logger.error(f"Failed to fetch quarterly income statement for {symbol}: {e}")
             raise
@@ -691,28 +744,68 @@ class TwelveDataSource(BaseDataSource):
         # API Call 2: Quarterly Balance Sheet (latest only for debt/equity snapshot)
         try:
             balance_data = self._api_request("/balance_sheet", params)
-            sheets = balance_data.get("balance_sheet", [])
-            if sheets:
-                latest = sheets[0]
-
-                liabilities = latest.get("liabilities", {})
-                non_current = liabilities.get("non_current_liabilities", {})
-                ltd = non_current.get("long_term_debt")
-                result["total_debt"] = float(ltd) if ltd is not None else 0.0
-
-                equity_section = latest.get("shareholders_equity", {})
-                te = equity_section.get("total_shareholders_equity")
-                if te is not None:
-                    result["total_equity"] = float(te)
-                else:
-                    common = equity_section.get("common_stock_equity")
-                    result["total_equity"] = float(common) if common is not None else 0.0
         except RuntimeError as e:
             logger.warning(f"Failed to fetch quarterly balance sheet for {symbol}: {e}")
+            balance_data = None
 
         # API Call 3: Quarterly Cash Flow
         try:
             cf_data = self._api_request("/cash_flow", params)
+        except RuntimeError as e:
+            logger.warning(f"Failed to fetch quarterly cash flow for {symbol}: {e}")
+            cf_data = None
+
+        return self._parse_quarterly_statements(symbol, num_quarters, income_data, balance_data, cf_data)
+
+    def _parse_quarterly_statements(
+        self,
+        symbol: str,
+        num_quarters: int,
+        income_data: dict,
+        balance_data: Optional[dict],
+        cf_data: Optional[dict],
+    ) -> dict:
+        """
+        המרת תשובות הדוחות הרבעוניים למבנה של get_quarterly_financials (ללא קריאות API)
+        """
+        result = {
+            "quarterly_revenues": [],
+            "quarterly_net_incomes": [],
+            "quarterly_operating_incomes": [],
+            "quarterly_operating_cash_flows": [],
+            "total_debt": 0.0,
+            "total_equity": 0.0,
+        }
+
+        statements = income_data.get("income_statement", [])
+        for stmt in statements[:num_quarters]:
+            fiscal_date = stmt.get("fiscal_date", "")
+            if not fiscal_date:
+                continue
+
+            sales = stmt.get("sales")
+            ni = stmt.get("net_income")
+            oi = stmt.get("operating_income")
+
+            # Fallback for operating income
+            if oi is None:
+                oi = stmt.get("pretax_income")
+            if oi is None:
+                oi = stmt.get("ebitda")
+
+            result["quarterly_revenues"].append(
+                (fiscal_date, float(sales) if sales is not None else 0.0)
+            )
+            result["quarterly_net_incomes"].append(
+                (fiscal_date, float(ni) if ni is not None else 0.0)
+            )
+            result["quarterly_operating_incomes"].append(
+                (fiscal_date, float(oi) if oi is not None else 0.0)
+            )
+
+        result["total_debt"], result["total_equity"] = self._parse_debt_and_equity(balance_data)
+
+        if cf_data is not None:
             flows = cf_data.get("cash_flow", [])
             for flow in flows[:num_quarters]:
                 fiscal_date = flow.get("fiscal_date", "")
@@ -724,8 +817,6 @@ class TwelveDataSource(BaseDataSource):
                 result["quarterly_operating_cash_flows"].append(
                     (fiscal_date, float(ocf) if ocf is not None else 0.0)
                 )
-        except RuntimeError as e:
-            logger.warning(f"Failed to fetch quarterly cash flow for {symbol}: {e}")
 
         logger.debug(
             f"{symbol}: Fetched {len(result['quarterly_revenues'])} quarters of data"
@@ -737,7 +828,7 @@ class TwelveDataSource(BaseDataSource):
         שליפת נתוני שוק למניה
 
         2 API calls: quote (current price) + statistics (market cap, P/E)
-        + N API calls for price history (1 per fiscal date)
+        + 1 API call for price history (/time_series over all fiscal dates)
 
         Args:
             symbol: סימול המניה
@@ -816,43 +907,17 @@ class TwelveDataSource(BaseDataSource):
             else:
                 logger.debug(f"Using cached/provided fiscal dates for {symbol}: {fiscal_dates}")
 
-            # Fetch EOD price for each fiscal date
-            # If a date falls on a weekend/holiday, try nearby business days
-            from datetime import datetime as _dt, timedelta as _td
-            for fiscal_date in fiscal_dates:
-                fetched = False
-                # Try the fiscal date itself, then up to 3 previous days (to handle weekends/holidays)
-                for day_offset in range(0, 4):
-                    try:
-                        attempt_date = (_dt.strptime(fiscal_date, "%Y-%m-%d") - _td(days=day_offset)).strftime("%Y-%m-%d")
-                        eod_params = {
-                            "symbol": clean_sym,
-                            "date": attempt_date
-                        }
-                        if exchange:
-                            eod_params["exchange"] = exchange
-
-                        eod_data = self._api_request("/eod", eod_params)
-                        close_val = eod_data.get("close")
-
-                        if close_val is not None:
-                            raw = float(close_val)
-                            price_history[fiscal_date] = raw / ILA_TO_ILS if is_tase else raw
-                            if day_offset > 0:
-                                logger.debug(f"Fetched price for {symbol} on {attempt_date} (fallback from {fiscal_date}): {price_history[fiscal_date]}")
-                            else:
-                                logger.debug(f"Fetched price for {symbol} on {fiscal_date}: {price_history[fiscal_date]}")
-                            fetched = True
-                            break
-                    except RuntimeError as e:
-                        if day_offset < 3:
-                            logger.debug(f"No data for {symbol} on {attempt_date}, trying previous day...")
-                            continue
-                        else:
-                            logger.warning(f"Failed to fetch price for {symbol} near {fiscal_date} after {day_offset+1} attempts: {e}")
-
-                if not fetched:
-                    logger.warning(f"Could not fetch price for {symbol} near {fiscal_date}")
+            # One /time_series request covering all fiscal dates; weekends/holidays
+            # are resolved locally to the nearest prior trading day
+            if fiscal_dates:
+                closes = self._fetch_daily_closes(clean_sym, exchange, fiscal_dates)
+                for fiscal_date, raw in prices_for_dates(closes, fiscal_dates).items():
+                    price_history[fiscal_date] = raw / ILA_TO_ILS if is_tase else raw
+                    logger.debug(f"Fetched price for {symbol} near {fiscal_date}: {price_history[fiscal_date]}")
+
+                for fiscal_date in fiscal_dates:
+                    if fiscal_date not in price_history:
+                        logger.warning(f"Could not fetch price for {symbol} near {fiscal_date}")
 
         except Exception as e:
             logger.warning(f"Failed to fetch price history for {symbol}: {e}")
@@ -866,6 +931,38 @@ class TwelveDataSource(BaseDataSource):
             price_history=price_history
         )
 
+    def _fetch_daily_closes(self, clean_sym: str, exchange: Optional[str], fiscal_dates: List[str]) -> Dict[str, float]:
+        """
+        שליפת מחירי סגירה יומיים בבקשת /time_series אחת (1 credit)
+
+        The range runs from a few days before the earliest fiscal date (so a
+        year-end on a weekend still has a prior trading day) through the latest one.
+
+        Returns:
+            Dict[str, float]: תאריך מסחר → מחיר סגירה גולמי (ILA עבור TASE)
+        """
+        start = datetime.strptime(min(fiscal_dates), "%Y-%m-%d") - timedelta(days=DEFAULT_MAX_DAYS_BACK + 4)
+        params = {
+            "symbol": clean_sym,
+            "interval": "1day",
+            "start_date": start.strftime("%Y-%m-%d"),
+            # end_date is exclusive on some plans/intervals - include the latest fiscal date explicitly
+            "end_date": (datetime.strptime(max(fiscal_dates), "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "outputsize": 5000,
+        }
+        if exchange:
+            params["exchange"] = exchange
+
+        data = self._api_request("/time_series", params)
+
+        closes = {}
+        for row in data.get("values", []):
+            close = row.get("close")
+            dt = row.get("datetime", "")
+            if close is not None and dt:
+                closes[dt[:10]] = float(close)
+        return closes
+
     def get_index_pe_ratio(self, index_name: str) -> Optional[float]:
         """
         חישוב P/E ממוצע של המדד
@@ -0,0 +1,278 @@
+"""
+Async Twelve Data client
+לקוח אסינכרוני ל-Twelve Data - שליפה מקבילית של דוחות כספיים,
+מעל ה-session וה-token bucket של TwelveDataSource
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from config import settings
+from models import FinancialData, MarketData
+from .rate_limiter import TokenBucket, endpoint_cost
+from .twelvedata_api import TwelveDataSource
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_ENDPOINTS = ("/income_statement", "/balance_sheet", "/cash_flow")
+
+
+class AsyncCreditLimiter:
+    """
+    מגביל זיכויים אסינכרוני מעל TokenBucket משותף
+
+    Reservations are made on the shared (thread-safe) bucket, so async requests and
+    blocking requests from worker threads are queued against one budget. Waiting
+    uses asyncio.sleep, so a throttled request never blocks the event loop.
+    """
+
+    def __init__(self, bucket: TokenBucket, stock_bucket: Optional[TokenBucket] = None):
+        self.bucket = bucket
+        self.stock_bucket = stock_bucket
+
+    async def acquire(self, cost: float) -> float:
+        """הזמנת זיכויים והמתנה (ללא חסימת ה-event loop)"""
+        wait = self.bucket.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    async def acquire_stock(self) -> float:
+        """המתנה לטוקן מניה (רק אם הוגדר TWELVEDATA_MAX_STOCKS_PER_MINUTE)"""
+        if self.stock_bucket is None:
+            return 0.0
+        wait = self.stock_bucket.reserve(1)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AsyncTwelveDataSource:
+    """גרסה אסינכרונית של TwelveDataSource עבור דוחות כספיים"""
+
+    def __init__(self, source: Optional[TwelveDataSource] = None, max_concurrency: Optional[int] = None):
+        """
+        Args:
+            source: מופע TwelveDataSource קיים (משותף עם ה-router); ייווצר חדש אם לא סופק
+            max_concurrency: מספר מניות מקסימלי בעיבוד בו-זמנית
+                             (ברירת מחדל: settings.TWELVEDATA_ASYNC_CONCURRENCY)
+        """
+        self.source = source or TwelveDataSource()
+        self.max_concurrency = max(1, max_concurrency or settings.TWELVEDATA_ASYNC_CONCURRENCY)
+        self.limiter = AsyncCreditLimiter(self.source._credit_bucket, self.source._stock_bucket)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ==================== Transport ====================
+
+    async def _run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """הרצת קריאה חוסמת על ה-thread pool הייעודי"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _api_request(self, endpoint: str, params: dict, retry_count: int = 0) -> dict:
+        """
+        בקשת API אסינכרונית עם אותו credit tracking ו-429 retry כמו בלקוח החוסם
+
+        Raises:
+            RuntimeError: אם הבקשה נכשלה
+        """
+        cache = self.source.response_cache
+        if retry_count == 0 and cache is not None:
+            cached = cache.get("twelvedata", endpoint, params)  # local SQLite lookup, no network
+            if cached is not None:
+                return cached
+
+        params = dict(params, apikey=self.source.api_key)
+        url = f"{self.source.base_url}{endpoint}"
+
+        cost = endpoint_cost(endpoint)
+        self.source._record_credit_wait(endpoint, cost, await self.limiter.acquire(cost))
+
+        try:
+            response = await self._run_blocking(
+                self.source.session.get, url, params=params, timeout=settings.HTTP_TIMEOUT
+            )
+
+            if response.status_code == 429:
+                wait_time = self.source._on_rate_limited(cost, retry_count)
+                await asyncio.sleep(wait_time)
+                return await self._api_request(endpoint, params, retry_count + 1)
+
+            data = self.source._handle_response(endpoint, response, cost)
+        except requests.exceptions.RequestException as e:
+            self.limiter.bucket.settle(cost)
+            raise RuntimeError(f"Twelve Data API request failed: {e}")
+
+        self.source._store_response(endpoint, params, data)
+        return data
+
+    @asynccontextmanager
+    async def _stock_slot(self):
+        """גרסה אסינכרונית של TwelveDataSource._stock_slot"""
+        await self.limiter.acquire_stock()
+        with self.source._lock:
+            self.source._stocks_in_flight += 1
+        try:
+            yield
+        finally:
+            self.source._notify_stock_complete()
+
+    async def _fetch_statements(self, symbol: str, period: str) -> Tuple[dict, Optional[dict], Optional[dict]]:
+        """
+        שליפת שלושת הדוחות במקביל
+
+        Income statement failures are fatal (as in the blocking client);
+        balance sheet and cash flow failures are logged and returned as None.
+        """
+        params = self.source._statement_params(symbol, period)
+        label = "quarterly " if period == "quarterly" else ""
+
+        income, balance, cash_flow = await asyncio.gather(
+            *(self._api_request(endpoint, params) for endpoint in STATEMENT_ENDPOINTS),
+            return_exceptions=True
+        )
+
+        if isinstance(income, BaseException):
+            logger.error(f"Failed to fetch {label}income statement for {symbol}: {income}")
+            raise income
+        if isinstance(balance, BaseException):
+            logger.warning(f"Failed to fetch {label}balance sheet for {symbol}: {balance}")
+            balance = None
+        if isinstance(cash_flow, BaseException):
+            logger.warning(f"Failed to fetch {label}cash flow for {symbol}: {cash_flow}")
+            cash_flow = None
+
+        return income, balance, cash_flow
+
+    # ==================== Data methods ====================
+
+    async def get_financials_with_dates(self, symbol: str, years: int = 5) -> Tuple[FinancialData, List[str]]:
+        """נתונים פיננסיים שנתיים + תאריכי fiscal (3 קריאות מקבילות)"""
+        async with self._stock_slot():
+            income, balance, cash_flow = await self._fetch_statements(symbol, "annual")
+        financial_data, fiscal_dates = self.source._parse_annual_statements(
+            symbol, years, income, balance, cash_flow
+        )
+        # Cache fiscal dates for reuse by get_stock_market_data() (same as the blocking client)
+        self.source._last_fiscal_dates[symbol] = fiscal_dates
+        return financial_data, fiscal_dates
+
+    async def get_stock_financials(self, symbol: str, years: int = 5) -> FinancialData:
+        """שליפת נתונים פיננסיים למניה (async)"""
+        financial_data, _ = await self.get_financials_with_dates(symbol, years)
+        return financial_data
+
+    async def get_stock_data(self, symbol: str, years: int = 5) -> Tuple[FinancialData, MarketData]:
+        """
+        שליפה מאוחדת: דוחות כספיים במקביל, ואז נתוני שוק לפי תאריכי ה-fiscal
+
+        Market data still goes through the blocking client (on the thread pool),
+        drawing from the same credit bucket.
+        """
+        financial_data, fiscal_dates = await self.get_financials_with_dates(symbol, years)
+        market_data = await self._run_blocking(self.source.get_stock_market_data, symbol, fiscal_dates)
+        return financial_data, market_data
+
+    async def get_quarterly_financials(self, symbol: str, num_quarters: int = 4) -> dict:
+        """שליפת נתונים רבעוניים (3 קריאות מקבילות) - אותו מבנה כמו TwelveDataSource"""
+        async with self._stock_slot():
+            income, balance, cash_flow = await self._fetch_statements(symbol, "quarterly")
+        return self.source._parse_quarterly_statements(symbol, num_quarters, income, balance, cash_flow)
+
+    # ==================== Pipelining ====================
+
+    async def map_symbols(
+        self,
+        fetch: Callable[[str], Awaitable[Any]],
+        symbols: Iterable[str],
+        on_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        הרצת fetch על מניות רבות במקביל (עד max_concurrency בו-זמנית)
+
+        Returns:
+            Dict[str, Any]: סימול → תוצאה, או ה-Exception שנזרק עבורו
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: Dict[str, Any] = {}
+
+        async def run(symbol: str):
+            async with semaphore:
+                try:
+                    results[symbol] = await fetch(symbol)
+                except Exception as e:
+                    results[symbol] = e
+            if on_done:
+                on_done(symbol, results[symbol])
+
+        await asyncio.gather(*(run(symbol) for symbol in symbols))
+        return results
+
+    def run(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        הרצת קורוטינה מקוד סינכרוני עם thread pool ייעודי לבקשות HTTP
+
+        Each symbol has up to three statement requests in flight.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * len(STATEMENT_ENDPOINTS),
+            thread_name_prefix="twelvedata-async"
+        )
+        try:
+            return asyncio.run(coro_factory())
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def prefetch_financials(
+        self,
+        symbols: List[str],
+        years: int = 5,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        שליפה מוקדמת של נתונים פיננסיים שנתיים עבור רשימת מניות (ממשק סינכרוני)
+
+        Returns:
+            Dict[str, Any]: סימול → (FinancialData, fiscal_dates) או Exception
+        """
+        return self.run(lambda: self.map_symbols(
+            lambda symbol: self.get_financials_with_dates(symbol, years), symbols, on_done
+        ))
+
+    def prefetch_quarterly(
+        self,
+        symbols: List[str],
+        num_quarters: int = 4,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        שליפה מוקדמת של נתונים רבעוניים עבור רשימת מניות (ממשק סינכרוני)
+
+        Returns:
+            Dict[str, Any]: סימול → dict רבעוני (כמו get_quarterly_financials) או Exception
+        """
+        return self.run(lambda: self.map_symbols(
+            lambda symbol: self.get_quarterly_financials(symbol, num_quarters), symbols, on_done
+        ))
+
+
+def create_async_source(financial_source) -> Optional[AsyncTwelveDataSource]:
+    """
+    יצירת לקוח אסינכרוני אם הוגדר TWELVEDATA_ASYNC ומקור הנתונים הוא TwelveData
+
+    Args:
+        financial_source: מקור הנתונים הפיננסיים מה-router
+
+    Returns:
+        Optional[AsyncTwelveDataSource]: None אם המצב האסינכרוני כבוי או לא רלוונטי
+    """
+    if not settings.TWELVEDATA_ASYNC or not isinstance(financial_source, TwelveDataSource):
+        return None
+    return AsyncTwelveDataSource(financial_source)
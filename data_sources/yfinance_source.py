@@ -3,15 +3,62 @@ YFinance Data Source - Free pricing data from Yahoo Finance
 """
 
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from config import settings
 from models import FinancialData, MarketData
 from data_sources.base_data_source import BaseDataSource
+from utils.price_lookup import prices_for_dates
+from utils.price_store import PriceStore
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def download_closes(symbols: List[str], start: str, end: str) -> Dict[str, Dict[str, float]]:
+    """
+    הורדת מחירי סגירה יומיים (מותאמים) לכל הסימולים בבקשה אחת
+
+    Args:
+        symbols: סימולים בפורמט yfinance
+        start, end: טווח התאריכים (YYYY-MM-DD, כולל שני הקצוות)
+
+    Returns:
+        Dict[str, Dict[str, float]]: סימול → (תאריך → מחיר סגירה)
+    """
+    # yf.download treats end as exclusive
+    end_exclusive = (datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        frame = yf.download(
+            symbols,
+            start=start,
+            end=end_exclusive,
+            auto_adjust=True,  # Same prices as Ticker.history()
+            group_by="column",
+            threads=True,
+            progress=False,
+        )
+    except Exception as e:
+        logger.error(f"Bulk price download failed for {len(symbols)} symbols: {e}")
+        return {}
+
+    if frame is None or frame.empty or "Close" not in frame.columns.get_level_values(0):
+        return {}
+
+    close = frame["Close"]
+    if getattr(close, "ndim", 1) == 1:  # Single ticker without a ticker level
+        close = close.to_frame(name=symbols[0])
+
+    closes_by_symbol = {}
+    for symbol in close.columns:
+        series = close[symbol].dropna()
+        closes_by_symbol[str(symbol)] = {
+            idx.strftime("%Y-%m-%d"): float(value) for idx, value in series.items()
+        }
+    return closes_by_symbol
+
+
 class YFinanceSource(BaseDataSource):
     """
     Lightweight wrapper for yfinance (Yahoo Finance).
@@ -136,15 +183,18 @@ class YFinanceSource(BaseDataSource):
             ticker = yf.Ticker(symbol)
             info = ticker.info
 
-            current_price = float(info.get("currentPrice") or info.get("regularMarketPrice", 0)) if (info.get("currentPrice") or info.get("regularMarketPrice")) else 0
-            market_cap = float(info.get("marketCap", 0)) if info.get("marketCap") else 0
-            pe_ratio = float(info.get("trailingPE")) if info.get("trailingPE") else None
-            stock_name = info.get("longName", symbol)
-
             price_history = {}
 
-            # Fetch close price for each fiscal date
-            if fiscal_dates:
+            store = PriceStore.from_settings()
+            if fiscal_dates and store is not None:
+                # Served from the local daily close store; only uncovered dates are downloaded
+                closes = self._download_closes([symbol], {symbol: fiscal_dates}).get(symbol, {})
+                price_history = prices_for_dates(closes, fiscal_dates, max_days_back=5)
+                for fiscal_date in fiscal_dates:
+                    if fiscal_date not in price_history:
+                        logger.warning(f"Could not fetch price for {symbol} near {fiscal_date}")
+            elif fiscal_dates:
+                # Fetch close price for each fiscal date
                 for fiscal_date in fiscal_dates:
                     price = self._get_price_for_date(ticker, fiscal_date)
                     if price is not None:
@@ -152,24 +202,114 @@ class YFinanceSource(BaseDataSource):
                     else:
                         logger.warning(f"Could not fetch price for {symbol} near {fiscal_date}")
 
-            return MarketData(
-                symbol=symbol,
-                name=stock_name,
-                market_cap=market_cap,
-                current_price=current_price,
-                pe_ratio=pe_ratio,
-                price_history=price_history
-            )
+            return self._market_data_from_info(symbol, info, price_history)
         except Exception as e:
             logger.error(f"Error fetching market data for {symbol} from yfinance: {e}")
-            return MarketData(
-                symbol=symbol,
-                name=symbol,
-                market_cap=0,
-                current_price=0,
-                pe_ratio=None,
-                price_history={}
-            )
+            return self._empty_market_data(symbol)
+
+    def _market_data_from_info(self, symbol: str, info: dict, price_history: Dict[str, float]) -> MarketData:
+        """בניית MarketData משדות ticker.info ומחירי fiscal"""
+        current_price = float(info.get("currentPrice") or info.get("regularMarketPrice", 0)) if (info.get("currentPrice") or info.get("regularMarketPrice")) else 0
+        market_cap = float(info.get("marketCap", 0)) if info.get("marketCap") else 0
+        pe_ratio = float(info.get("trailingPE")) if info.get("trailingPE") else None
+        stock_name = info.get("longName", symbol)
+
+        return MarketData(
+            symbol=symbol,
+            name=stock_name,
+            market_cap=market_cap,
+            current_price=current_price,
+            pe_ratio=pe_ratio,
+            price_history=price_history
+        )
+
+    @staticmethod
+    def _empty_market_data(symbol: str) -> MarketData:
+        return MarketData(
+            symbol=symbol,
+            name=symbol,
+            market_cap=0,
+            current_price=0,
+            pe_ratio=None,
+            price_history={}
+        )
+
+    def get_bulk_market_data(
+        self,
+        symbols: List[str],
+        fiscal_dates_by_symbol: Optional[Dict[str, Optional[List[str]]]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, MarketData]:
+        """
+        שליפת נתוני שוק לרשימת מניות בבת אחת
+
+        מחירי הסגירה של כל המניות נשלפים בהורדה אחת (yf.download מרובה-סימולים)
+        וכל תאריך fiscal נענה מתוך הטבלה; שדות ticker.info נשלפים במקביל.
+
+        Args:
+            symbols: סימולים בפורמט yfinance (e.g., AAPL, TEVA.TA)
+            fiscal_dates_by_symbol: סימול → רשימת תאריכי fiscal (אופציונלי)
+            max_workers: threads לשליפת info (ברירת מחדל: settings.FETCH_MAX_WORKERS)
+
+        Returns:
+            Dict[str, MarketData]: סימול → נתוני שוק (אותה תוצאה כמו get_stock_market_data)
+        """
+        fiscal_dates_by_symbol = fiscal_dates_by_symbol or {}
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        closes_by_symbol = self._download_closes(symbols, fiscal_dates_by_symbol)
+
+        def build(symbol: str) -> MarketData:
+            try:
+                info = yf.Ticker(symbol).info
+            except Exception as e:
+                logger.error(f"Error fetching market data for {symbol} from yfinance: {e}")
+                return self._empty_market_data(symbol)
+
+            fiscal_dates = fiscal_dates_by_symbol.get(symbol) or []
+            # Same tolerance as _get_price_for_date (5-day window before the target)
+            price_history = prices_for_dates(closes_by_symbol.get(symbol, {}), fiscal_dates, max_days_back=5)
+            for fiscal_date in fiscal_dates:
+                if fiscal_date not in price_history:
+                    logger.warning(f"Could not fetch price for {symbol} near {fiscal_date}")
+
+            return self._market_data_from_info(symbol, info, price_history)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers or settings.FETCH_MAX_WORKERS)) as executor:
+            return dict(zip(symbols, executor.map(build, symbols)))
+
+    def _download_closes(
+        self,
+        symbols: List[str],
+        fiscal_dates_by_symbol: Dict[str, Optional[List[str]]],
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        מחירי סגירה יומיים לכל הסימולים בחלון תאריכי ה-fiscal
+
+        כאשר PRICE_STORE_ENABLED, המחירים נקראים ממאגר המחירים המקומי ורק
+        תאריכים חסרים מורדים; אחרת - הורדה אחת לכל הסימולים.
+
+        Returns:
+            Dict[str, Dict[str, float]]: סימול → (תאריך → מחיר סגירה)
+        """
+        all_dates = [d for s in symbols for d in (fiscal_dates_by_symbol.get(s) or [])]
+        if not all_dates:
+            return {}
+
+        start = (datetime.strptime(min(all_dates), "%Y-%m-%d") - timedelta(days=7)).strftime("%Y-%m-%d")
+        end = (datetime.strptime(max(all_dates), "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        store = PriceStore.from_settings()
+        if store is None:
+            return download_closes(symbols, start, end)
+
+        store.ensure(symbols, start, end, download_closes)
+        return {
+            symbol: {idx.strftime("%Y-%m-%d"): value for idx, value in store.closes(symbol, start, end).items()}
+            for symbol in symbols
+        }
 
     def _get_price_for_date(self, ticker, target_date_str: str) -> Optional[float]:
         """
@@ -5,6 +5,8 @@ Fund Builder - לוגיקת בניית קרן
 from typing import List, Dict, Tuple, Optional
 from models import Stock, Fund, FundPosition
 from config import settings
+from fund_builder import eligibility, scoring_engine
+from fund_builder.selection import select_distinct
 import math
 import logging
 from functools import reduce
@@ -28,6 +30,8 @@ class FundBuilder:
         self.potential_candidates: List[Stock] = []
         self.selected_base: List[Stock] = []
         self.selected_potential: List[Stock] = []
+        # cache ציונים גולמיים בין ריצות (utils.score_cache) - נקבע ע"י build_fund
+        self.score_cache = None
 
     def calculate_growth_rate(self, values: Dict[int, float], years: int = 3) -> Optional[float]:
         """
@@ -171,60 +175,24 @@ class FundBuilder:
         """
         ציון ודירוג מניות בסיס
 
+        Scores are computed for the whole list at once by the vectorized engine
+        (fund_builder.scoring_engine); results match calculate_base_score +
+        normalize_score applied stock by stock.
+
         Args:
             stocks: רשימת מניות
 
         Returns:
             List[Stock]: מניות ממוינות לפי ציון
         """
-        scored_stocks = []
-
-        for stock in stocks:
-            scores = self.calculate_base_score(stock)
-            if scores:
-                stock._raw_scores = scores
-                scored_stocks.append(stock)
-
-        # נרמול ציונים
-        if scored_stocks:
-            net_income_scores = [s._raw_scores["net_income_growth"] for s in scored_stocks]
-            revenue_scores = [s._raw_scores["revenue_growth"] for s in scored_stocks]
-            market_cap_scores = [s._raw_scores["market_cap"] for s in scored_stocks]
-
-            normalized_net_income = self.normalize_score(net_income_scores)
-            normalized_revenue = self.normalize_score(revenue_scores)
-            normalized_market_cap = self.normalize_score(market_cap_scores)
-
-            for i, stock in enumerate(scored_stocks):
-                final_score = (
-                    normalized_net_income[i] * settings.BASE_SCORE_WEIGHTS["net_income_growth"] +
-                    normalized_revenue[i] * settings.BASE_SCORE_WEIGHTS["revenue_growth"] +
-                    normalized_market_cap[i] * settings.BASE_SCORE_WEIGHTS["market_cap"]
-                )
-                stock.base_score = final_score
-                # שמירת ציונים משנה
-                stock.base_scores_detail = {
-                    "net_income_growth_raw": stock._raw_scores["net_income_growth"],
-                    "revenue_growth_raw": stock._raw_scores["revenue_growth"],
-                    "market_cap_raw": stock._raw_scores["market_cap"],
-                    "net_income_growth_normalized": normalized_net_income[i],
-                    "revenue_growth_normalized": normalized_revenue[i],
-                    "market_cap_normalized": normalized_market_cap[i]
-                }
-
-                # Verify assignment
-                if stock.base_score is None:
-                    logger.error(f"BUG: Failed to assign base_score to {stock.symbol}")
-                elif i < 5:  # Log first 5 stocks
-                    logger.debug(f"{stock.symbol}: base_score={stock.base_score:.2f}")
-
-        # מיון לפי ציון סופי
-        scored_stocks.sort(key=lambda s: s.base_score or 0, reverse=True)
-        return scored_stocks
+        ranked = scoring_engine.rank_base(stocks, cache=self.score_cache)
+        for stock in ranked[:5]:
+            logger.debug(f"{stock.symbol}: base_score={stock.base_score:.2f}")
+        return ranked
 
     def score_and_rank_potential_stocks(self, stocks: List[Stock], index_pe: Optional[float]) -> List[Stock]:
         """
-        ציון ודירוג מניות פוטנציאל
+        ציון ודירוג מניות פוטנציאל (מנוע וקטורי, ראה score_and_rank_base_stocks)
 
         Args:
             stocks: רשימת מניות
@@ -233,50 +201,10 @@ class FundBuilder:
         Returns:
             List[Stock]: מניות ממוינות לפי ציון
         """
-        scored_stocks = []
-
-        for stock in stocks:
-            scores = self.calculate_potential_score(stock, index_pe)
-            if scores:
-                stock._raw_scores = scores
-                scored_stocks.append(stock)
-
-        # נרמול ציונים
-        if scored_stocks:
-            future_growth_scores = [s._raw_scores["future_growth"] for s in scored_stocks]
-            momentum_scores = [s._raw_scores["momentum"] for s in scored_stocks]
-            valuation_scores = [s._raw_scores["valuation"] for s in scored_stocks]
-
-            normalized_growth = self.normalize_score(future_growth_scores)
-            normalized_momentum = self.normalize_score(momentum_scores)
-            normalized_valuation = self.normalize_score(valuation_scores)
-
-            for i, stock in enumerate(scored_stocks):
-                final_score = (
-                    normalized_growth[i] * settings.POTENTIAL_SCORE_WEIGHTS["future_growth"] +
-                    normalized_momentum[i] * settings.POTENTIAL_SCORE_WEIGHTS["momentum"] +
-                    normalized_valuation[i] * settings.POTENTIAL_SCORE_WEIGHTS["valuation"]
-                )
-                stock.potential_score = final_score
-                # שמירת ציונים משנה
-                stock.potential_scores_detail = {
-                    "future_growth_raw": stock._raw_scores["future_growth"],
-                    "momentum_raw": stock._raw_scores["momentum"],
-                    "valuation_raw": stock._raw_scores["valuation"],
-                    "future_growth_normalized": normalized_growth[i],
-                    "momentum_normalized": normalized_momentum[i],
-                    "valuation_normalized": normalized_valuation[i]
-                }
-
-                # Verify assignment
-                if stock.potential_score is None:
-                    logger.error(f"BUG: Failed to assign potential_score to {stock.symbol}")
-                elif i < 5:  # Log first 5 stocks
-                    logger.debug(f"{stock.symbol}: potential_score={stock.potential_score:.2f}")
-
-        # מיון לפי ציון סופי
-        scored_stocks.sort(key=lambda s: s.potential_score or 0, reverse=True)
-        return scored_stocks
+        ranked = scoring_engine.rank_potential(stocks, index_pe, cache=self.score_cache)
+        for stock in ranked[:5]:
+            logger.debug(f"{stock.symbol}: potential_score={stock.potential_score:.2f}")
+        return ranked
 
     def calculate_lcm(self, numbers: List[int]) -> int:
         """
@@ -346,6 +274,92 @@ class FundBuilder:
 
         return actual_cost, shares_per_stock
 
+    def select_fund(self, stocks: List[Stock], index_pe: Optional[float], quarter: str, year: int) -> Dict:
+        """
+        סינון, ציון, בחירה ושקלול מתוך נתוני יסוד קיימים (שלבים 2-11 ללא שליפה)
+
+        Args:
+            stocks: מניות עם financial_data / market_data (ציונים קודמים נדרסים)
+            index_pe: P/E המדד לציון פוטנציאל
+            quarter, year: רבעון ושנת הקרן
+
+        Returns:
+            Dict: fund, ranked_base, ranked_potential, base_eligible, potential_eligible
+        """
+        from utils.date_utils import format_fund_name
+
+        self.all_stocks = stocks
+        eligibility.screen(stocks)
+        self.base_candidates = [s for s in stocks if s.is_eligible_for_base]
+
+        ranked_base = self.score_and_rank_base_stocks(self.base_candidates)
+        self.selected_base = select_distinct(ranked_base, 6)
+
+        base_symbols = {s.symbol for s in self.selected_base}
+        self.potential_candidates = [
+            s for s in stocks if s.symbol not in base_symbols and s.is_eligible_for_potential
+        ]
+        ranked_potential = self.score_and_rank_potential_stocks(self.potential_candidates, index_pe)
+        self.selected_potential = select_distinct(ranked_potential, 4)
+
+        positions = list(zip(self.selected_base + self.selected_potential, settings.FUND_WEIGHTS))
+        minimum_cost, shares_per_stock = self.calculate_minimum_fund_cost(positions)
+
+        fund = Fund(
+            name=format_fund_name(quarter, year, self.index_name),
+            index=self.index_name,
+            quarter=quarter,
+            year=year,
+            positions=[],
+            minimum_cost=minimum_cost,
+        )
+        for i, (stock, weight) in enumerate(positions):
+            position_type = "בסיס" if i < len(self.selected_base) else "פוטנציאל"
+            fund.add_position(stock, weight, shares_per_stock.get(stock.symbol, 1), position_type)
+
+        return {
+            "fund": fund,
+            "ranked_base": ranked_base,
+            "ranked_potential": ranked_potential,
+            "base_eligible": len(self.base_candidates),
+            "potential_eligible": len(self.potential_candidates),
+        }
+
+    def rebuild_from_snapshot(self, quarter: str, year: int, store=None) -> Dict:
+        """
+        בניית הקרן מחדש עבור רבעון קודם, אך ורק מ-snapshot של נתוני יסוד (ללא API)
+
+        Uses the current weights and eligibility rules, so the result answers
+        "what would we have held" for that quarter's data.
+
+        Args:
+            quarter, year: ה-snapshot
+            store: SnapshotStore (ברירת מחדל: המאגר המשותף)
+
+        Returns:
+            Dict: כמו select_fund, בתוספת stocks (מספר מניות) ו-index_pe
+
+        Raises:
+            ValueError: אם אין snapshot לרבעון
+        """
+        if store is None:
+            from utils.snapshot_store import get_snapshot_store
+            store = get_snapshot_store()
+
+        stocks = store.load(self.index_name, quarter, year)
+        if not stocks:
+            raise ValueError(f"No fundamentals snapshot for {self.index_name} {quarter} {year}")
+
+        index_pe = store.index_pe(self.index_name, quarter, year)
+        if index_pe is None:
+            # Same fallback as the quarterly updater: mean P/E of the snapshot
+            pe_values = [s.pe_ratio for s in stocks if s.pe_ratio and s.pe_ratio > 0]
+            index_pe = sum(pe_values) / len(pe_values) if pe_values else None
+
+        result = self.select_fund(stocks, index_pe, quarter, year)
+        result.update({"stocks": len(stocks), "index_pe": index_pe})
+        return result
+
     def validate_fund(self, fund: Fund) -> List[str]:
         """
         אימות תקינות הקרן
@@ -0,0 +1,150 @@
+"""
+מנוע כשירות עמודתי - סינון בסיס ופוטנציאל לכל היקום במעבר אחד
+כל כלל מחזיר מסכת כישלון, כך שדוח איכות הנתונים מציין למה מניה נפסלה
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from fund_builder.scoring_engine import FundamentalsMatrix
+from models import Stock
+
+BASE_RULES = ("financial_data", "profitable_years", "operating_profit_years", "positive_cash_flow", "debt_to_equity")
+POTENTIAL_RULES = ("financial_data", "profitable_years", "growth_history")
+
+
+def _latest_years(matrix: FundamentalsMatrix, years: int) -> np.ndarray:
+    """מסכת `years` השנים האחרונות שיש להן ערך, לכל מניה"""
+    present_from_right = np.cumsum(matrix.present[:, ::-1], axis=1)[:, ::-1]
+    return matrix.present & (present_from_right <= years)
+
+
+class EligibilityMatrix:
+    """
+    נתוני הכשירות של היקום כמערכים - נבנה פעם אחת, נבדק מול כל סט כללים
+
+    Args:
+        stocks: המניות (מניות ללא financial_data נכשלות בכלל financial_data בלבד)
+    """
+
+    def __init__(self, stocks: Sequence[Stock]):
+        financials = [s.financial_data for s in stocks]
+        self.has_financial = np.array([f is not None for f in financials], dtype=bool)
+        self.net_incomes = FundamentalsMatrix.from_dicts([f.net_incomes if f else None for f in financials])
+        self.operating_incomes = FundamentalsMatrix.from_dicts([f.operating_incomes if f else None for f in financials])
+        self.cash_flows = FundamentalsMatrix.from_dicts([f.operating_cash_flows if f else None for f in financials])
+        self.revenue_years = np.array([len(f.revenues) if f else 0 for f in financials], dtype=np.int64)
+
+        ratios = [f.debt_to_equity_ratio if f else None for f in financials]
+        self.debt_to_equity = np.array([np.nan if r is None else r for r in ratios], dtype=np.float64)
+
+    def profitable_years(self, years: int) -> np.ndarray:
+        """רווח נקי חיובי ב-`years` השנים האחרונות (FinancialData.has_profitable_years)"""
+        matrix = self.net_incomes
+        recent_positive = (_latest_years(matrix, years) & (matrix.values > 0)).sum(axis=1)
+        return (matrix.present.sum(axis=1) >= years) & (recent_positive == years)
+
+    def operating_profit_years(self, required_years: int, total_years: int) -> np.ndarray:
+        """רווח תפעולי חיובי ב-`required_years` מתוך `total_years` האחרונות"""
+        matrix = self.operating_incomes
+        recent_positive = (_latest_years(matrix, total_years) & (matrix.values > 0)).sum(axis=1)
+        return (matrix.present.sum(axis=1) >= total_years) & (recent_positive >= required_years)
+
+    def positive_cash_flow(self) -> np.ndarray:
+        """תזרים מפעילות שוטפת חיובי ביותר ממחצית השנים"""
+        matrix = self.cash_flows
+        years = matrix.present.sum(axis=1)
+        positive = (matrix.present & (matrix.values > 0)).sum(axis=1)
+        return (years > 0) & (2 * positive > years)
+
+    def base_failures(self, rules: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """
+        כללי הבסיס שכל מניה נכשלה בהם
+
+        Args:
+            rules: min_profitable_years, min_operating_profit_years, max_debt_to_equity
+                   (ברירת מחדל: settings.BASE_ELIGIBILITY)
+
+        Returns:
+            Dict[str, np.ndarray]: מסכה לכל כלל ב-BASE_RULES (True = נכשלה)
+        """
+        rules = rules or settings.BASE_ELIGIBILITY
+        years = rules["min_profitable_years"]
+        has = self.has_financial
+        with np.errstate(invalid="ignore"):
+            too_leveraged = self.debt_to_equity > rules["max_debt_to_equity"]
+        return {
+            "financial_data": ~has,
+            "profitable_years": has & ~self.profitable_years(years),
+            "operating_profit_years": has & ~self.operating_profit_years(rules["min_operating_profit_years"], years),
+            "positive_cash_flow": has & ~self.positive_cash_flow(),
+            "debt_to_equity": has & too_leveraged,
+        }
+
+    def potential_failures(self, rules: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """
+        כללי הפוטנציאל שכל מניה נכשלה בהם
+
+        Args:
+            rules: min_profitable_years (ברירת מחדל: settings.POTENTIAL_ELIGIBILITY)
+
+        Returns:
+            Dict[str, np.ndarray]: מסכה לכל כלל ב-POTENTIAL_RULES (True = נכשלה)
+        """
+        rules = rules or settings.POTENTIAL_ELIGIBILITY
+        has = self.has_financial
+        net_income_years = self.net_incomes.present.sum(axis=1)
+        return {
+            "financial_data": ~has,
+            "profitable_years": has & ~self.profitable_years(rules["min_profitable_years"]),
+            "growth_history": has & ((self.revenue_years < 2) | (net_income_years < 2)),
+        }
+
+
+def passed(failures: Dict[str, np.ndarray]) -> np.ndarray:
+    """מסכת המניות שלא נכשלו באף כלל"""
+    return ~np.logical_or.reduce(list(failures.values()))
+
+
+def failure_reasons(failures: Dict[str, np.ndarray], i: int) -> List[str]:
+    """שמות הכללים שהמניה במקום `i` נכשלה בהם"""
+    return [rule for rule, failed in failures.items() if failed[i]]
+
+
+def screen(
+    stocks: Sequence[Stock],
+    base_rules: Optional[Dict] = None,
+    potential_rules: Optional[Dict] = None,
+) -> Dict:
+    """
+    בדיקת כשירות בסיס ופוטנציאל לכל המניות וסימון is_eligible_for_base / is_eligible_for_potential
+
+    Returns:
+        Dict: base, potential - מסכות בוליאניות; base_failures, potential_failures - מסכה לכל כלל
+    """
+    stocks = list(stocks)
+    if not stocks:
+        empty = np.zeros(0, dtype=bool)
+        return {
+            "base": empty, "potential": empty,
+            "base_failures": {rule: empty for rule in BASE_RULES},
+            "potential_failures": {rule: empty for rule in POTENTIAL_RULES},
+        }
+
+    matrix = EligibilityMatrix(stocks)
+    base_failures = matrix.base_failures(base_rules)
+    potential_failures = matrix.potential_failures(potential_rules)
+    base, potential = passed(base_failures), passed(potential_failures)
+
+    for stock, is_base, is_potential in zip(stocks, base.tolist(), potential.tolist()):
+        stock.is_eligible_for_base = is_base
+        stock.is_eligible_for_potential = is_potential
+
+    return {
+        "base": base,
+        "potential": potential,
+        "base_failures": base_failures,
+        "potential_failures": potential_failures,
+    }
@@ -0,0 +1,508 @@
+"""
+שליפה מקבילית של רכיבי מדד - שלב 2 בבניית קרן
+
+workers מוגבלים בתקציב הזיכויים של מקור הנתונים. דוחות יכולים להישלף מראש (לקוח אסינכרוני)
+או להיות מוזרקים מה-cache (seed_financials), ומחירים נשלפים במנות (get_bulk_market_data).
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from models import Stock
+from data_sources.adapter import DataSourceAdapter
+from data_sources.exceptions import (
+    DataSourceError,
+    DataSourceRateLimitError,
+    DataSourceNotFoundError
+)
+
+logger = logging.getLogger(__name__)
+
+# Maps data source class names to the names used by DataSourceAdapter.normalize_symbol
+SOURCE_NAME_MAP = {
+    'YFinanceSource': 'yfinance',
+    'TwelveDataSource': 'twelvedata',
+    'AlphaVantageSource': 'alphavantage'
+}
+
+
+class ConstituentFetcher:
+    """
+    שליפת נתוני רכיבי מדד עם מאגר workers מוגבל
+
+    כל תוצאה היא dict עם המפתחות:
+        symbol: סימול מנורמל (עם סיומת בורסה)
+        constituent: רשומת המקור מרשימת המדד
+        stock: אובייקט Stock (או None אם נכשל)
+        failure: (category, entry) עבור data_failures, או None
+        error: הודעת שגיאה לא מסווגת (רק אם השליפה נכשלה מסיבה אחרת)
+        reused_financials: True אם הדוחות הגיעו מ-seed_financials (ללא עלות זיכויים)
+
+    עם defer_finish=True, תוצאה שהגיעה עד נתוני השוק נושאת גם market_data ו-market_source,
+    ו-stock נוצר רק ב-finish().
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        financial_source,
+        pricing_source,
+        adapter: Optional[DataSourceAdapter] = None,
+        max_workers: Optional[int] = None,
+        async_source=None,
+        defer_finish: bool = False,
+    ):
+        """
+        Args:
+            index_name: שם המדד (TASE125/SP500)
+            financial_source: מקור נתונים פיננסיים
+            pricing_source: מקור נתוני מחירים
+            adapter: מתאם לתיקוף נתונים
+            max_workers: מספר workers מקסימלי (ברירת מחדל: settings.FETCH_MAX_WORKERS)
+            async_source: AsyncTwelveDataSource לשליפה מוקדמת של הדוחות הכספיים (אופציונלי)
+            defer_finish: לא לתקף נתוני שוק ולא ליצור Stock ב-workers - הקורא מריץ finish()
+        """
+        self.index_name = index_name
+        self.financial_source = financial_source
+        self.pricing_source = pricing_source
+        self.adapter = adapter or DataSourceAdapter()
+        self.max_workers = max(1, max_workers or settings.FETCH_MAX_WORKERS)
+        self.suffix = ".US" if index_name == "SP500" else ".TA"
+        self.async_source = async_source
+        self.defer_finish = defer_finish
+
+        # symbol -> (FinancialData, fiscal_dates) או Exception,
+        # ממולא על ידי prefetch_financials (async) ו-seed_financials (דוחות שמורים)
+        self._prefetched: Dict[str, Any] = {}
+        self._seeded: set = set()
+
+        self.financial_source_name = financial_source.__class__.__name__
+        self.pricing_source_name = pricing_source.__class__.__name__
+
+        # בדיקה אם שני המקורות זהים ותומכים בקריאה מאוחדת
+        self.use_unified_call = (
+            financial_source == pricing_source and
+            hasattr(financial_source, 'get_stock_data') and
+            callable(getattr(financial_source, 'get_stock_data', None))
+        )
+
+        # תמחור במנות: רק במקורות נפרדים, ורק אם מקור המחירים תומך בכך
+        self.pricing_batch_size = settings.PRICING_BATCH_SIZE
+        self.use_bulk_pricing = (
+            not self.use_unified_call and
+            self.pricing_batch_size > 0 and
+            callable(getattr(pricing_source, 'get_bulk_market_data', None))
+        )
+
+    def normalize_symbol(self, constituent: Dict) -> str:
+        """הוספת סיומת בורסה לסימול אם חסרה"""
+        symbol = constituent["symbol"]
+        if not symbol.endswith(self.suffix):
+            symbol = f"{symbol}{self.suffix}"
+        return symbol
+
+    def fetch_all(
+        self,
+        constituents: List[Dict],
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        שליפת כל רכיבי המדד במקביל
+
+        התוצאות מוחזרות לפי סדר הרשימה המקורית (כדי לשמור על דירוג דטרמיניסטי),
+        בעוד ש-on_result נקרא מה-thread הראשי ברגע שכל מניה מסתיימת.
+
+        Args:
+            constituents: רשימת רכיבי המדד
+            on_result: callback שנקרא עבור כל תוצאה (לדיווח התקדמות ושמירה ל-cache)
+
+        Returns:
+            List[Dict]: תוצאות לפי סדר הקלט
+
+        Raises:
+            DataSourceRateLimitError: אם מקור הנתונים חסם את הריצה - שאר המשימות מבוטלות
+        """
+        results: List[Optional[Dict]] = [None] * len(constituents)
+
+        # Bulk mode: workers fetch financials only, pricing is done per batch below
+        task = self.fetch_financials if self.use_bulk_pricing else self.fetch_one
+        pending: List[Tuple[int, Dict]] = []
+        completed: queue.Queue = queue.Queue()
+        submit_lock = threading.Lock()
+        stopped = False
+
+        # symbol -> אינדקסים שממתינים לדוחות מהלקוח האסינכרוני
+        waiting: Dict[str, List[int]] = {}
+        if self.async_source is not None:
+            for i, constituent in enumerate(constituents):
+                symbol = self.normalize_symbol(constituent)
+                if symbol not in self._prefetched:
+                    waiting.setdefault(symbol, []).append(i)
+
+        def submit(index: int):
+            with submit_lock:
+                if stopped:
+                    return
+                future = executor.submit(task, constituents[index])
+            future.add_done_callback(lambda f: completed.put((index, f)))
+
+        def ready(symbol: str):
+            for i in waiting.pop(symbol, []):
+                submit(i)
+
+        def prefetch():
+            """Each symbol goes to the pool as soon as its statements arrive"""
+            try:
+                self.prefetch_financials([constituents[indexes[0]] for indexes in waiting.values()], on_ready=ready)
+            except Exception as e:
+                logger.warning(f"שליפה אסינכרונית נכשלה, {len(waiting)} מניות יישלפו ב-workers: {e}")
+            # Anything the async client did not deliver is fetched synchronously by the workers
+            for symbol in list(waiting):
+                ready(symbol)
+
+        def emit(index: int, result: Dict):
+            results[index] = result
+            if on_result:
+                on_result(result)
+
+        def flush():
+            for index, result in self.price_batch(pending):
+                emit(index, result)
+            pending.clear()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        prefetcher = threading.Thread(target=prefetch, name="fetch-prefetch", daemon=True)
+        try:
+            waiting_indexes = {i for indexes in waiting.values() for i in indexes}
+            for i in range(len(constituents)):
+                if i not in waiting_indexes:
+                    submit(i)
+            if waiting:
+                prefetcher.start()
+
+            for _ in constituents:
+                index, future = completed.get()
+                result = future.result()  # DataSourceRateLimitError propagates here
+                if self.use_bulk_pricing and result.get("financial_data") is not None:
+                    pending.append((index, result))
+                    if len(pending) >= self.pricing_batch_size:
+                        flush()
+                else:
+                    emit(index, result)
+            flush()
+        except BaseException:
+            # Statements still in flight are dropped; nothing new reaches the pool
+            with submit_lock:
+                stopped = True
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        if prefetcher.is_alive():
+            prefetcher.join()
+        executor.shutdown(wait=True)
+
+        return results
+
+    def price_batch(self, batch: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+        """
+        תמחור מנה של מניות שהשלימו נתונים פיננסיים בקריאה אחת ל-get_bulk_market_data
+
+        Args:
+            batch: רשימת (אינדקס, תוצאה חלקית מ-fetch_financials)
+
+        Returns:
+            List[Tuple[int, Dict]]: אותן תוצאות, מושלמות (Stock או failure)
+        """
+        if not batch:
+            return []
+
+        fiscal_dates_by_symbol = {r["pricing_symbol"]: r["fiscal_dates"] for _, r in batch}
+        try:
+            market_data_by_symbol = self.pricing_source.get_bulk_market_data(
+                list(fiscal_dates_by_symbol), fiscal_dates_by_symbol
+            )
+        except Exception as e:
+            # Fall back to per-symbol pricing for this batch
+            logger.warning(f"תמחור במנה נכשל ({len(batch)} מניות), עובר לתמחור פרטני: {e}")
+            return [(index, self.fetch_pricing(result)) for index, result in batch]
+
+        completed = []
+        for index, result in batch:
+            market_data = market_data_by_symbol.get(result["pricing_symbol"])
+            if market_data is None:
+                logger.warning(
+                    f"נתוני מחירים עבור {result['symbol']} לא נמצאו ב-{self.pricing_source_name}, מדלג"
+                )
+                completed.append((index, self._fail(result, 'not_found', 'Pricing data not found')))
+            else:
+                completed.append((index, self._complete(result, market_data)))
+        return completed
+
+    def prefetch_financials(self, constituents: List[Dict], on_ready: Optional[Callable[[str], None]] = None):
+        """
+        שליפה מוקדמת של הדוחות הכספיים של כל המניות דרך הלקוח האסינכרוני
+
+        Args:
+            constituents: רשימת רכיבי המדד
+            on_ready: callback שנקרא עם הסימול ברגע שהדוחות שלו נשמרו (מה-thread של הלקוח)
+        """
+        symbols = [self.normalize_symbol(c) for c in constituents]
+        done = 0
+
+        def on_done(symbol, result):
+            nonlocal done
+            self._prefetched[symbol] = result
+            done += 1
+            if done % 25 == 0 or done == len(symbols):
+                logger.info(f"שליפה אסינכרונית של דוחות כספיים: {done}/{len(symbols)}")
+            if on_ready:
+                on_ready(symbol)
+
+        if symbols:
+            self.async_source.prefetch_financials(symbols, years=5, on_done=on_done)
+
+    def seed_financials(self, financials: Dict[str, Tuple[Any, List[str]]]):
+        """
+        הזרקת דוחות כספיים קיימים (בנייה אינקרמנטלית) - לא נשלפים שוב מהמקור
+
+        Args:
+            financials: symbol -> (FinancialData, fiscal_dates)
+        """
+        self._prefetched.update(financials)
+        self._seeded.update(financials)
+
+    def _get_financials(self, symbol: str):
+        """
+        נתונים פיננסיים - מהשליפה המוקדמת אם קיימת, אחרת מהמקור
+
+        Returns:
+            Tuple[FinancialData, Optional[List[str]]]: הנתונים ותאריכי ה-fiscal (אם ידועים)
+        """
+        if symbol not in self._prefetched:
+            return self.financial_source.get_stock_financials(symbol, years=5), None
+        prefetched = self._prefetched.pop(symbol)
+        if isinstance(prefetched, Exception):
+            raise prefetched
+        return prefetched
+
+    def _get_stock_data(self, symbol: str):
+        """קריאה מאוחדת - משלימה רק את נתוני השוק אם הדוחות נשלפו מראש"""
+        if symbol not in self._prefetched:
+            return self.financial_source.get_stock_data(symbol, years=5)
+        prefetched = self._prefetched.pop(symbol)
+        if isinstance(prefetched, Exception):
+            raise prefetched
+        financial_data, fiscal_dates = prefetched
+        return financial_data, self.financial_source.get_stock_market_data(symbol, fiscal_dates)
+
+    def _new_result(self, constituent: Dict) -> Dict:
+        symbol = self.normalize_symbol(constituent)
+        return {
+            "symbol": symbol,
+            "constituent": constituent,
+            "stock": None,
+            "failure": None,
+            "reused_financials": symbol in self._seeded,
+        }
+
+    @staticmethod
+    def _fail(result: Dict, category: str, reason: str) -> Dict:
+        """רישום כשל מסווג עבור data_failures"""
+        result["failure"] = (category, {
+            'symbol': result["symbol"],
+            'name': result["constituent"]['name'],
+            'reason': reason
+        })
+        return result
+
+    def fetch_one(self, constituent: Dict) -> Dict:
+        """
+        שליפה ותיקוף של מניה בודדת (רץ בתוך worker)
+
+        Args:
+            constituent: רשומת מניה מרשימת המדד
+
+        Returns:
+            Dict: תוצאה (ראה תיעוד המחלקה)
+
+        Raises:
+            DataSourceRateLimitError: עוצר את כל הריצה
+        """
+        if not self.use_unified_call:
+            result = self.fetch_financials(constituent)
+            if result.get("financial_data") is None:
+                return result
+            return self.fetch_pricing(result)
+
+        result = self._new_result(constituent)
+        symbol = result["symbol"]
+
+        try:
+            # Fresh data from the API, unless the statements were prefetched or seeded
+            # אופטימיזציה: קריאה מאוחדת אם שני המקורות זהים
+            logger.info(f"שולף נתוני {symbol} באמצעות קריאה מאוחדת מ-{self.financial_source_name}")
+            try:
+                financial_data, market_data = self._get_stock_data(symbol)
+            except DataSourceNotFoundError:
+                logger.warning(f"מניה {symbol} לא נמצאה ב-{self.financial_source_name}, מדלג")
+                return self._fail(result, 'not_found', 'Stock not found in data source')
+            except DataSourceRateLimitError as e:
+                logger.error(f"הגעת למגבלת קריאות API: {e}")
+                raise  # Stop processing
+            except DataSourceError as e:
+                logger.error(f"שגיאה בשליפת נתונים עבור {symbol}: {e}, מדלג")
+                return self._fail(result, 'api_error', f'API error: {str(e)}')
+
+            # תיקוף נתונים פיננסיים (strict validation for all indices)
+            if not self.adapter.validate_financial_data(financial_data, symbol, self.financial_source_name,
+                                                        is_index_constituent=False):
+                logger.error(f"נתונים פיננסיים לא תקינים עבור {symbol}, מדלג")
+                return self._fail(result, 'financial_validation', 'Invalid financial data (see logs for details)')
+
+            result["financial_data"] = financial_data
+            return self._complete(result, market_data, self.financial_source_name)
+
+        except DataSourceRateLimitError:
+            raise
+        except Exception as e:
+            return self._unclassified(result, e)
+
+    def fetch_financials(self, constituent: Dict) -> Dict:
+        """
+        שלב פיננסי בלבד (מקורות נפרדים): שליפה ותיקוף של הדוחות הכספיים
+
+        בהצלחה, התוצאה כוללת גם financial_data, fiscal_dates ו-pricing_symbol
+        לשלב התמחור (fetch_pricing או price_batch).
+
+        Raises:
+            DataSourceRateLimitError: עוצר את כל הריצה
+        """
+        result = self._new_result(constituent)
+        symbol = result["symbol"]
+        result["financial_data"] = None
+
+        try:
+            # שליפה ממקורות נפרדים - נתונים פיננסיים ומחירים
+            logger.info(
+                f"שולף נתוני {symbol}: "
+                f"פיננסיים מ-{self.financial_source_name}, "
+                f"מחירים מ-{self.pricing_source_name}"
+            )
+
+            # שליפת נתונים פיננסיים
+            try:
+                financial_data, fiscal_dates = self._get_financials(symbol)
+            except DataSourceNotFoundError:
+                logger.warning(f"מניה {symbol} לא נמצאה ב-{self.financial_source_name}, מדלג")
+                return self._fail(result, 'not_found', 'Stock not found in financial data source')
+            except DataSourceRateLimitError as e:
+                logger.error(f"הגעת למגבלת קריאות API: {e}")
+                raise  # Stop processing
+            except DataSourceError as e:
+                logger.error(f"שגיאה בשליפת נתונים פיננסיים עבור {symbol}: {e}, מדלג")
+                return self._fail(result, 'api_error', f'Financial API error: {str(e)}')
+
+            # תיקוף נתונים פיננסיים (strict validation for all indices)
+            if not self.adapter.validate_financial_data(financial_data, symbol, self.financial_source_name,
+                                                        is_index_constituent=False):
+                logger.error(f"נתונים פיננסיים לא תקינים עבור {symbol}, מדלג")
+                return self._fail(result, 'financial_validation', 'Invalid financial data (see logs for details)')
+
+            # Normalize symbol for pricing source (e.g., strip .US for yfinance)
+            result["pricing_symbol"] = self.adapter.normalize_symbol(
+                symbol, self.index_name, SOURCE_NAME_MAP.get(self.pricing_source_name, 'yfinance')
+            )
+
+            # Get fiscal dates from financial source for discrete price fetching
+            if fiscal_dates is None and hasattr(self.financial_source, '_last_fiscal_dates'):
+                fiscal_dates = self.financial_source._last_fiscal_dates.get(symbol)
+            result["fiscal_dates"] = fiscal_dates
+            result["financial_data"] = financial_data
+
+        except DataSourceRateLimitError:
+            raise
+        except Exception as e:
+            return self._unclassified(result, e)
+
+        return result
+
+    def fetch_pricing(self, result: Dict) -> Dict:
+        """
+        שלב התמחור הפרטני עבור תוצאה של fetch_financials
+
+        Raises:
+            DataSourceRateLimitError: עוצר את כל הריצה
+        """
+        symbol = result["symbol"]
+        try:
+            try:
+                market_data = self.pricing_source.get_stock_market_data(
+                    result["pricing_symbol"], fiscal_dates=result["fiscal_dates"]
+                )
+            except DataSourceNotFoundError:
+                logger.warning(f"נתוני מחירים עבור {symbol} לא נמצאו ב-{self.pricing_source_name}, מדלג")
+                return self._fail(result, 'not_found', 'Pricing data not found')
+            except DataSourceError as e:
+                logger.error(f"שגיאה בשליפת נתוני מחירים עבור {symbol}: {e}, מדלג")
+                return self._fail(result, 'api_error', f'Pricing API error: {str(e)}')
+
+            return self._complete(result, market_data)
+
+        except DataSourceRateLimitError:
+            raise
+        except Exception as e:
+            return self._unclassified(result, e)
+
+    def _complete(self, result: Dict, market_data, source_name: Optional[str] = None) -> Dict:
+        """סיום מיידי, או השארת נתוני השוק ל-finish() (defer_finish)"""
+        if not self.defer_finish:
+            return self._finish(result, market_data, source_name)
+        result["market_data"] = market_data
+        result["market_source"] = source_name
+        return result
+
+    def finish(self, result: Dict) -> Dict:
+        """
+        השלמת תוצאה שנדחתה (defer_finish): תיקוף נתוני השוק ויצירת אובייקט המניה
+
+        Thread-safe. Results that already failed, or were finished, are returned as is.
+        """
+        if "market_data" not in result:
+            return result
+        market_data = result.pop("market_data")
+        return self._finish(result, market_data, result.pop("market_source"))
+
+    def _finish(self, result: Dict, market_data, source_name: Optional[str] = None) -> Dict:
+        """תיקוף נתוני השוק ויצירת אובייקט המניה"""
+        symbol = result["symbol"]
+        source_name = source_name or self.pricing_source_name
+
+        try:
+            # תיקוף נתוני שוק (strict validation for all indices)
+            if not self.adapter.validate_market_data(market_data, symbol, source_name,
+                                                     is_index_constituent=False):
+                logger.error(f"נתוני מחירים לא תקינים עבור {symbol}, מדלג")
+                return self._fail(result, 'pricing_validation', 'Invalid pricing data (see logs for details)')
+
+            # יצירת אובייקט המניה
+            result["stock"] = Stock(
+                symbol=symbol,
+                name=result["constituent"]["name"],
+                index=self.index_name,
+                financial_data=result["financial_data"],
+                market_data=market_data
+            )
+        except Exception as e:
+            return self._unclassified(result, e)
+
+        return result
+
+    @staticmethod
+    def _unclassified(result: Dict, error: Exception) -> Dict:
+        """Unclassified errors are skipped without a failure category (as before)"""
+        logger.debug(f"שגיאה בטעינת {result['symbol']}: {error}")
+        result["error"] = str(error)
+        return result
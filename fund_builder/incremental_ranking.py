@@ -0,0 +1,221 @@
+"""
+דירוג אינקרמנטלי - עדכון מניה בודדת בלי לנרמל ולמיין מחדש את כל המועמדות
+כל עוד עדכון לא מזיז min / max של קריטריון רק המניה המעודכנת מקבלת ציון מחדש, אחרת - נרמול וקטורי אחד
+"""
+
+import bisect
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from fund_builder import scoring_engine
+from fund_builder.scoring_engine import BASE_CRITERIA, POTENTIAL_CRITERIA
+from models import Stock
+
+_KINDS = {
+    "base": (BASE_CRITERIA, "base_score", "base_scores_detail"),
+    "potential": (POTENTIAL_CRITERIA, "potential_score", "potential_scores_detail"),
+}
+
+
+class IncrementalRanking:
+    """
+    דירוג מועמדות בסיס או פוטנציאל שמתעדכן מניה אחר מניה
+
+    Args:
+        stocks: המועמדות (סדר הקלט קובע שוויון ציונים)
+        kind: "base" או "potential"
+        weights: משקלות (ברירת מחדל: settings.BASE_SCORE_WEIGHTS / POTENTIAL_SCORE_WEIGHTS)
+        index_pe: P/E המדד (פוטנציאל בלבד)
+
+    Attributes:
+        full_renormalizations: מספר הנרמולים המלאים (כולל הבנייה)
+        incremental_updates: מספר העדכונים שטופלו ללא נרמול מלא
+    """
+
+    def __init__(
+        self,
+        stocks: Sequence[Stock],
+        kind: str = "base",
+        weights: Optional[Dict[str, float]] = None,
+        index_pe: Optional[float] = None,
+    ):
+        if kind not in _KINDS:
+            raise ValueError(f"Unknown ranking kind: {kind}")
+        self.kind = kind
+        self.criteria, self._score_field, self._detail_field = _KINDS[kind]
+        default_weights = settings.BASE_SCORE_WEIGHTS if kind == "base" else settings.POTENTIAL_SCORE_WEIGHTS
+        self.weights = weights or default_weights
+        self.index_pe = index_pe
+
+        # rank_base drops candidates without financial_data
+        stocks = [s for s in stocks if s.financial_data] if kind == "base" else list(stocks)
+        self._stocks: List[Optional[Stock]] = list(stocks)
+        self._rows: Dict[str, int] = {s.symbol: i for i, s in enumerate(stocks)}
+        self._raw = self._raw_scores(stocks)
+        self._active = np.ones(len(stocks), dtype=bool)
+        self._min: Dict[str, float] = {}
+        self._max: Dict[str, float] = {}
+        self._keys: Dict[int, tuple] = {}
+        self._order: List[tuple] = []
+
+        self.full_renormalizations = 0
+        self.incremental_updates = 0
+        self._renormalize()
+
+    def _raw_scores(self, stocks: Sequence[Stock]) -> Dict[str, np.ndarray]:
+        if not stocks:
+            return {name: np.zeros(0) for name in self.criteria}
+        if self.kind == "base":
+            return scoring_engine.raw_base_scores(stocks)
+        return scoring_engine.raw_potential_scores(stocks, self.index_pe)
+
+    # ==================== Queries ====================
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def rank_of(self, symbol: str) -> Optional[int]:
+        """מקום המניה בדירוג (0 = הגבוה ביותר), או None אם אינה מדורגת"""
+        row = self._rows.get(symbol)
+        if row is None:
+            return None
+        return bisect.bisect_left(self._order, self._keys[row])
+
+    def top(self, count: int) -> List[Stock]:
+        """`count` המניות המובילות"""
+        return [self._stocks[row] for _, row in self._order[:count]]
+
+    def ranked(self) -> List[Stock]:
+        """כל המועמדות מהציון הגבוה לנמוך (כמו score_and_rank_*)"""
+        return self.top(len(self._order))
+
+    # ==================== Updates ====================
+
+    def update(self, stock: Stock) -> bool:
+        """
+        הוספה או עדכון של מניה אחרי שהנתונים שלה השתנו
+
+        Returns:
+            bool: True אם נדרש נרמול מלא (העדכון הזיז קיצון של קריטריון)
+        """
+        if self.kind == "base" and not stock.financial_data:
+            self.remove(stock.symbol)
+            return False
+
+        values = {name: float(v[0]) for name, v in self._raw_scores([stock]).items()}
+        row = self._rows.get(stock.symbol)
+        if row is None:
+            row = len(self._stocks)
+            self._stocks.append(stock)
+            self._rows[stock.symbol] = row
+            self._active = np.append(self._active, True)
+            for name in self.criteria:
+                self._raw[name] = np.append(self._raw[name], values[name])
+            old = None
+        else:
+            self._stocks[row] = stock
+            old = {name: float(self._raw[name][row]) for name in self.criteria}
+            for name in self.criteria:
+                self._raw[name][row] = values[name]
+
+        if self._extremes_moved(old, values):
+            self._renormalize()
+            return True
+
+        self._unindex(row)
+        self._score_row(row)
+        self.incremental_updates += 1
+        return False
+
+    def remove(self, symbol: str) -> bool:
+        """
+        הסרת מניה מהדירוג (למשל כשאיבדה כשירות)
+
+        Returns:
+            bool: True אם נדרש נרמול מלא
+        """
+        row = self._rows.pop(symbol, None)
+        if row is None:
+            return False
+        self._active[row] = False
+        self._stocks[row] = None
+        self._unindex(row)
+        old = {name: float(self._raw[name][row]) for name in self.criteria}
+
+        if self._extremes_moved(old, None):
+            self._renormalize()
+            return True
+        self.incremental_updates += 1
+        return False
+
+    # ==================== Internals ====================
+
+    def _extremes_moved(self, old: Optional[Dict[str, float]], new: Optional[Dict[str, float]]) -> bool:
+        """האם min / max של קריטריון כלשהו השתנו (נבדק מחדש רק כשהערך נגע בקיצון)"""
+        if len(self._rows) <= 1 or not self._min:
+            return True
+        for name in self.criteria:
+            low, high = self._min[name], self._max[name]
+            touched = (old is not None and old[name] in (low, high)) or (
+                new is not None and not low <= new[name] <= high
+            )
+            if touched:
+                active = self._raw[name][self._active]
+                if active.min() != low or active.max() != high:
+                    return True
+        return False
+
+    def _renormalize(self):
+        """נרמול מלא וקטורי של כל המניות הפעילות ובניית אינדקס הסדר מחדש"""
+        self.full_renormalizations += 1
+        rows = np.flatnonzero(self._active)
+        self._keys, self._order = {}, []
+        self._min, self._max = {}, {}
+        if rows.size == 0:
+            return
+
+        raw = {name: self._raw[name][rows] for name in self.criteria}
+        scored = scoring_engine.score(raw, self.weights, self.criteria)
+        for name in self.criteria:
+            self._min[name], self._max[name] = float(raw[name].min()), float(raw[name].max())
+
+        totals = scored["total"].tolist()
+        raw_lists = {name: raw[name].tolist() for name in self.criteria}
+        normalized_lists = {name: scored[name].tolist() for name in self.criteria}
+        for i, row in enumerate(rows.tolist()):
+            detail = {f"{name}_raw": raw_lists[name][i] for name in self.criteria}
+            detail.update({f"{name}_normalized": normalized_lists[name][i] for name in self.criteria})
+            self._set_score(row, totals[i], detail)
+        self._order = sorted(self._keys.values())
+
+    def _score_row(self, row: int):
+        """ציון מניה אחת מול הקיצונים הקיימים - אותן פעולות כמו scoring_engine.normalize / score"""
+        total = None
+        detail = {}
+        normalized = {}
+        for name in self.criteria:
+            value = float(self._raw[name][row])
+            low, high = self._min[name], self._max[name]
+            normalized[name] = 50.0 if high == low else ((value - low) / (high - low)) * 100
+            detail[f"{name}_raw"] = value
+            term = normalized[name] * self.weights[name]
+            total = term if total is None else total + term
+        detail.update({f"{name}_normalized": normalized[name] for name in self.criteria})
+        self._set_score(row, total, detail)
+        bisect.insort(self._order, self._keys[row])
+
+    def _set_score(self, row: int, total: float, detail: Dict):
+        stock = self._stocks[row]
+        setattr(stock, self._score_field, total)
+        setattr(stock, self._detail_field, detail)
+        self._keys[row] = (-total, row)
+
+    def _unindex(self, row: int):
+        key = self._keys.pop(row, None)
+        if key is not None:
+            del self._order[bisect.bisect_left(self._order, key)]
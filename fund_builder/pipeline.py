@@ -0,0 +1,259 @@
+"""
+צנרת זורמת לשלב 2 בבניית קרן - שליפה, תיקוף וכתיבה בשלבים נפרדים
+
+השלבים מחוברים בתורים חסומים (תור מלא מאט את השלב שמזין אותו), וכל שלב מדווח
+זמן עבודה, המתנה לקלט והמתנה לתור מלא.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream on a stage's input queue (one per worker)
+_END = object()
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int, queue_size: int):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.finished_workers = 0
+
+        self.processed = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+
+    def metrics(self) -> Dict:
+        with self.lock:
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "processed": self.processed,
+                "busy_seconds": self.busy,
+                "idle_seconds": self.idle,
+                "blocked_seconds": self.blocked,
+                "queue_capacity": self.queue.maxsize,
+                "max_queue_depth": self.max_depth,
+            }
+
+
+class StreamingPipeline:
+    """
+    שלבי עיבוד מחוברים בתורים חסומים, עם מספר threads לכל שלב
+
+    Usage:
+        with StreamingPipeline([("validate", finish, 2), ("persist", persist, 1)]) as pipeline:
+            for item in source:
+                pipeline.put(item)      # blocks while the first queue is full
+        pipeline.metrics()
+
+    Each stage function gets an item and returns the item for the next stage (None drops
+    it). The first error in any stage stops the stream: later items are drained without
+    processing, put() raises it to the producer and close() re-raises it.
+
+    Args:
+        stages: רשימת (שם, פונקציה, מספר threads)
+        queue_size: קיבולת כל תור בין שלבים (ברירת מחדל: settings.PIPELINE_QUEUE_SIZE)
+        source_name: שם השלב המזין, לדוח המדדים
+        source_workers: מספר ה-workers של השלב המזין, לדוח המדדים
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, Callable[[Any], Any], int]],
+        queue_size: Optional[int] = None,
+        source_name: str = "source",
+        source_workers: int = 1,
+    ):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        size = max(1, queue_size or settings.PIPELINE_QUEUE_SIZE)
+        self._stages = [_Stage(name, fn, workers, size) for name, fn, workers in stages]
+
+        # The producer is reported as a stage without an input queue
+        self._source = _Stage(source_name, None, source_workers, 0)
+
+        self._error_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._failed = threading.Event()
+        self._closed = False
+
+        for position, stage in enumerate(self._stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(position,), name=f"pipeline-{stage.name}-{n}", daemon=True
+                )
+                stage.threads.append(thread)
+                thread.start()
+
+    # ==================== Producer side ====================
+
+    def put(self, item: Any):
+        """
+        הזנת פריט לשלב הראשון (חוסם כשהתור מלא)
+
+        Raises:
+            RuntimeError: אם שלב כלשהו נכשל (השגיאה המקורית ב-__cause__)
+        """
+        self._raise_if_failed()
+        waited = self._enqueue(self._stages[0], item)
+        with self._source.lock:
+            self._source.processed += 1
+            self._source.blocked += waited
+
+    def close(self):
+        """
+        סוף הזרם: המתנה עד שכל השלבים סיימו
+
+        Raises:
+            RuntimeError: אם שלב כלשהו נכשל
+        """
+        if not self._closed:
+            self._closed = True
+            first = self._stages[0]
+            for _ in range(first.workers):
+                first.queue.put(_END)
+            for stage in self._stages:
+                for thread in stage.threads:
+                    thread.join()
+        self._raise_if_failed()
+
+    def metrics(self) -> List[Dict]:
+        """
+        מדדי עומס לכל שלב, מהמזין ועד האחרון
+
+        Returns:
+            List[Dict]: stage, workers, processed, busy_seconds, idle_seconds (המתנה לקלט),
+            blocked_seconds (המתנה לתור מלא בהמשך - לחץ חוזר), queue_capacity, max_queue_depth
+        """
+        return [self._source.metrics()] + [stage.metrics() for stage in self._stages]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except RuntimeError as e:
+            if exc_type is None:
+                raise
+            logger.error(f"Pipeline failed while handling another error: {e}")
+        return False
+
+    # ==================== Workers ====================
+
+    def _enqueue(self, stage: _Stage, item: Any) -> float:
+        """הכנסה לתור השלב; מחזיר את זמן ההמתנה לתור מלא"""
+        start = time.perf_counter()
+        stage.queue.put(item)
+        waited = time.perf_counter() - start
+        depth = stage.queue.qsize()
+        with stage.lock:
+            stage.max_depth = max(stage.max_depth, depth)
+        return waited
+
+    def _work(self, position: int):
+        stage = self._stages[position]
+        downstream = self._stages[position + 1] if position + 1 < len(self._stages) else None
+
+        while True:
+            start = time.perf_counter()
+            item = stage.queue.get()
+            idle = time.perf_counter() - start
+            if item is _END:
+                break
+            if self._failed.is_set():
+                continue  # drain without processing
+
+            start = time.perf_counter()
+            try:
+                output = stage.fn(item)
+            except BaseException as e:
+                self._fail(stage, e)
+                continue
+            busy = time.perf_counter() - start
+
+            blocked = 0.0
+            if downstream is not None and output is not None:
+                blocked = self._enqueue(downstream, output)
+
+            # Updated per item, so metrics() is live while the stream runs
+            with stage.lock:
+                stage.processed += 1
+                stage.busy += busy
+                stage.idle += idle
+                stage.blocked += blocked
+
+        with stage.lock:
+            stage.finished_workers += 1
+            last = stage.finished_workers == stage.workers
+        # The last worker out hands the end of the stream to the next stage
+        if last and downstream is not None:
+            for _ in range(downstream.workers):
+                downstream.queue.put(_END)
+
+    def _fail(self, stage: _Stage, error: BaseException):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+                logger.error(f"Pipeline stage '{stage.name}' failed: {error}")
+        self._failed.set()
+
+    def _raise_if_failed(self):
+        if self._failed.is_set():
+            raise RuntimeError(f"Pipeline stage failed: {self._error}") from self._error
+
+
+def fetch_pipeline(
+    fetcher,
+    persist: Callable[[Dict], None],
+    queue_size: Optional[int] = None,
+    validate_workers: Optional[int] = None,
+    persist_workers: Optional[int] = None,
+) -> StreamingPipeline:
+    """
+    הצנרת של שלב 2: ConstituentFetcher (defer_finish=True) → תיקוף → כתיבה
+
+    Feed it with fetcher.fetch_all(..., on_result=pipeline.put). Results are finished in
+    place, so the list fetch_all returns is complete once the pipeline is closed.
+
+    Args:
+        fetcher: ConstituentFetcher שנוצר עם defer_finish=True
+        persist: נקרא עבור כל תוצאה מתוקפת (checkpoint, cache, התקדמות)
+        queue_size: קיבולת התורים (ברירת מחדל: settings.PIPELINE_QUEUE_SIZE)
+        validate_workers: ברירת מחדל: settings.PIPELINE_VALIDATE_WORKERS
+        persist_workers: ברירת מחדל: settings.PIPELINE_PERSIST_WORKERS
+    """
+    return StreamingPipeline(
+        [
+            ("validate", fetcher.finish, validate_workers or settings.PIPELINE_VALIDATE_WORKERS),
+            ("persist", persist, persist_workers or settings.PIPELINE_PERSIST_WORKERS),
+        ],
+        queue_size=queue_size,
+        source_name="fetch",
+        source_workers=fetcher.max_workers,
+    )
+
+
+def format_metrics(metrics: List[Dict]) -> str:
+    """טבלת מדדי הצנרת להדפסה בסוף השלב"""
+    lines = [f"  {'stage':<10} {'workers':>7} {'items':>6} {'busy':>8} {'idle':>8} {'blocked':>8} {'queue':>9}"]
+    for m in metrics:
+        depth = f"{m['max_queue_depth']}/{m['queue_capacity']}" if m["queue_capacity"] else "-"
+        lines.append(
+            f"  {m['stage']:<10} {m['workers']:>7} {m['processed']:>6} {m['busy_seconds']:>7.1f}s "
+            f"{m['idle_seconds']:>7.1f}s {m['blocked_seconds']:>7.1f}s {depth:>9}"
+        )
+    return "\n".join(lines)
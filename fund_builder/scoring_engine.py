@@ -0,0 +1,291 @@
+"""
+מנוע ציון וקטורי (NumPy) לדירוג מניות בסיס ופוטנציאל
+
+הנתונים הופכים פעם אחת למטריצה מיושרת לפי שנים (FundamentalsMatrix), ו-CAGR, נרמול, שקלול
+ודירוג הם פעולות על מערכים. התוצאות זהות ביט לביט לחישוב המקורי של FundBuilder.
+"""
+
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from models import Stock
+from utils.score_cache import ScoreCache
+
+BASE_CRITERIA = ("net_income_growth", "revenue_growth", "market_cap")
+POTENTIAL_CRITERIA = ("future_growth", "momentum", "valuation")
+
+
+class FundamentalsMatrix:
+    """
+    ערכים שנתיים של שדה אחד לכל היקום, מיושרים לפי שנה
+
+    Attributes:
+        years: שנים בסדר עולה (עמודות)
+        values: מערך (מניות × שנים), 0 היכן שאין ערך
+        present: מסכה בוליאנית - האם לשנה יש ערך אצל המניה
+    """
+
+    def __init__(self, years: np.ndarray, values: np.ndarray, present: np.ndarray):
+        self.years = years
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_dicts(cls, series: Sequence[Optional[Dict[int, float]]]) -> "FundamentalsMatrix":
+        """בניית המטריצה ממילוני שנה → ערך (None או מילון ריק = אין נתונים)"""
+        series = [values or {} for values in series]
+        lengths = [len(values) for values in series]
+        total = sum(lengths)
+
+        # Keys and values are streamed straight into arrays; the dicts are never sorted
+        keys = np.fromiter(chain.from_iterable(series), dtype=np.int64, count=total)
+        flat = np.fromiter(chain.from_iterable(v.values() for v in series), dtype=np.float64, count=total)
+        years, cols = np.unique(keys, return_inverse=True)
+        rows = np.repeat(np.arange(len(series)), lengths)
+
+        values = np.zeros((len(series), len(years)), dtype=np.float64)
+        present = np.zeros((len(series), len(years)), dtype=bool)
+        values[rows, cols] = flat
+        present[rows, cols] = True
+        return cls(years, values, present)
+
+    def cagr(self, years: int) -> np.ndarray:
+        """
+        CAGR באחוזים על פני `years` השנים האחרונות של כל מניה (כמו FundBuilder.calculate_growth_rate)
+
+        Returns:
+            np.ndarray: שיעור צמיחה, NaN היכן שהלולאה מחזירה None
+        """
+        n = self.values.shape[0]
+        result = np.full(n, np.nan)
+        if years < 2 or self.values.shape[1] == 0:
+            return result  # years == 1 divides by zero in the loop engine
+
+        # present_from_right[i, j]: how many of stock i's years are >= column j
+        present_from_right = np.cumsum(self.present[:, ::-1], axis=1)[:, ::-1]
+        has_enough = present_from_right[:, 0] >= years
+
+        rows = np.arange(n)
+        end = self.values[rows, np.argmax(self.present & (present_from_right == 1), axis=1)]
+        start = self.values[rows, np.argmax(self.present & (present_from_right == years), axis=1)]
+
+        valid = has_enough & (start > 0)
+        ratios = end[valid] / start[valid]
+        exponent = 1 / (years - 1)
+        # libm pow, not np.power: NumPy's SIMD pow can differ in the last bit, which would
+        # reorder near-ties against the loop engine. Python returns a complex number for
+        # a negative ratio with a fractional exponent; those stay NaN here.
+        powered = [r ** exponent if r >= 0 or exponent == 1.0 else np.nan for r in ratios.tolist()]
+        result[valid] = (np.array(powered, dtype=np.float64) - 1) * 100
+        return result
+
+
+def normalize(values: np.ndarray) -> np.ndarray:
+    """נרמול min-max לטווח 0-100 (50 לכולם כאשר כל הערכים שווים)"""
+    if values.size == 0:
+        return values.astype(np.float64)
+    min_val, max_val = values.min(), values.max()
+    if max_val == min_val:
+        return np.full(values.shape, 50.0)
+    return ((values - min_val) / (max_val - min_val)) * 100
+
+
+def raw_base_scores(stocks: Sequence[Stock]) -> Dict[str, np.ndarray]:
+    """
+    ציוני בסיס גולמיים לכל המניות (כמו FundBuilder.calculate_base_score)
+
+    Stocks without financial_data are excluded by the loop engine; callers filter them first.
+    """
+    net_incomes = FundamentalsMatrix.from_dicts([s.financial_data.net_incomes for s in stocks])
+    revenues = FundamentalsMatrix.from_dicts([s.financial_data.revenues for s in stocks])
+    return {
+        "net_income_growth": np.nan_to_num(net_incomes.cagr(3), nan=0.0),
+        "revenue_growth": np.nan_to_num(revenues.cagr(3), nan=0.0),
+        "market_cap": np.array([s.market_cap or 0.0 for s in stocks], dtype=np.float64),
+    }
+
+
+def _complete(stocks: Sequence[Stock]) -> np.ndarray:
+    """מניות עם נתונים פיננסיים ונתוני שוק (אחרת ציון הפוטנציאל הגולמי הוא 0)"""
+    return np.array([s.financial_data is not None and s.market_data is not None for s in stocks], dtype=bool)
+
+
+def raw_potential_growth(stocks: Sequence[Stock]) -> Dict[str, np.ndarray]:
+    """צמיחה עתידית ומומנטום - החלק בציון הפוטנציאל שתלוי רק בנתוני המניה"""
+    complete = _complete(stocks)
+
+    net_incomes = FundamentalsMatrix.from_dicts(
+        [s.financial_data.net_incomes if ok else None for s, ok in zip(stocks, complete)]
+    )
+    future_growth = np.nan_to_num(net_incomes.cagr(2), nan=0.0)
+
+    # Momentum: current price vs the oldest price in price_history (needs two prices)
+    current = np.zeros(len(stocks))
+    oldest = np.zeros(len(stocks))
+    for i, (stock, ok) in enumerate(zip(stocks, complete)):
+        history = stock.market_data.price_history if ok else None
+        if history and len(history) >= 2:
+            current[i] = stock.market_data.current_price
+            oldest[i] = history[min(history)]
+    has_momentum = oldest > 0
+    momentum = np.zeros(len(stocks))
+    momentum[has_momentum] = (
+        (current[has_momentum] - oldest[has_momentum]) / oldest[has_momentum]
+    ) * 100
+
+    return {"future_growth": np.where(complete, future_growth, 0.0), "momentum": momentum}
+
+
+def raw_valuation(stocks: Sequence[Stock], index_pe: Optional[float]) -> np.ndarray:
+    """ציון שווי גולמי: P/E המניה מול P/E המדד"""
+    valuation = np.zeros(len(stocks))
+    if index_pe and index_pe > 0:
+        complete = _complete(stocks)
+        pe = np.array([(s.pe_ratio or 0.0) if ok else 0.0 for s, ok in zip(stocks, complete)], dtype=np.float64)
+        has_pe = pe != 0
+        valuation[has_pe] = (2 - pe[has_pe] / index_pe) * 50
+    return valuation
+
+
+def raw_potential_scores(stocks: Sequence[Stock], index_pe: Optional[float]) -> Dict[str, np.ndarray]:
+    """ציוני פוטנציאל גולמיים לכל המניות (כמו FundBuilder.calculate_potential_score)"""
+    return {**raw_potential_growth(stocks), "valuation": raw_valuation(stocks, index_pe)}
+
+
+def memoized_raw_scores(
+    stocks: Sequence[Stock],
+    kind: str,
+    criteria: Sequence[str],
+    compute: Callable[[Sequence[Stock]], Dict[str, np.ndarray]],
+    cache: ScoreCache,
+) -> Dict[str, np.ndarray]:
+    """
+    ציונים גולמיים דרך ה-cache: רק מניות שהנתונים שלהן השתנו (לפי המניפסט) מחושבות מחדש
+
+    Raw criteria are per stock, so computing the misses as a subset gives the same
+    values as computing the whole universe. Stocks without a manifest row are computed
+    and not stored.
+    """
+    symbols = [s.symbol for s in stocks]
+    found = cache.lookup(kind, symbols)
+    matrix = np.empty((len(stocks), len(criteria)), dtype=np.float64)
+    if found["positions"]:
+        matrix[found["positions"]] = found["scores"]
+
+    hit = np.zeros(len(stocks), dtype=bool)
+    hit[found["positions"]] = True
+    missing = np.flatnonzero(~hit).tolist()
+    if missing:
+        hashes = found["hashes"]
+        computed = compute([stocks[i] for i in missing])
+        matrix[missing] = np.column_stack([computed[name] for name in criteria])
+        cache.store(kind, {symbols[i]: (hashes[symbols[i]], matrix[i]) for i in missing if symbols[i] in hashes})
+
+    return {name: np.ascontiguousarray(matrix[:, j]) for j, name in enumerate(criteria)}
+
+
+def score(raw: Dict[str, np.ndarray], weights: Dict[str, float], criteria: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    נרמול כל קריטריון וחישוב הציון המשוקלל
+
+    The weighted sum is accumulated in `criteria` order, matching the loop engine's expression.
+
+    Returns:
+        Dict: total - הציון הסופי; <criterion> - הערך המנורמל
+    """
+    normalized = {name: normalize(raw[name]) for name in criteria}
+    total = None
+    for name in criteria:
+        term = normalized[name] * weights[name]
+        total = term if total is None else total + term
+    return {"total": total if total is not None else np.zeros(0), **normalized}
+
+
+def rank_order(totals: np.ndarray) -> np.ndarray:
+    """סדר הדירוג (אינדקסים) מהציון הגבוה לנמוך; שוויון שומר על סדר הקלט"""
+    return np.argsort(-totals, kind="stable")
+
+
+def _apply(
+    stocks: List[Stock],
+    raw: Dict[str, np.ndarray],
+    scored: Dict[str, np.ndarray],
+    criteria: Sequence[str],
+    score_field: str,
+    detail_field: str,
+) -> List[Stock]:
+    """כתיבת הציונים ופירוטם למניות והחזרתן בסדר הדירוג"""
+    totals = scored["total"].tolist()
+    raw_lists = {name: raw[name].tolist() for name in criteria}
+    normalized_lists = {name: scored[name].tolist() for name in criteria}
+
+    for i, stock in enumerate(stocks):
+        setattr(stock, score_field, totals[i])
+        detail = {f"{name}_raw": raw_lists[name][i] for name in criteria}
+        detail.update({f"{name}_normalized": normalized_lists[name][i] for name in criteria})
+        setattr(stock, detail_field, detail)
+
+    return [stocks[i] for i in rank_order(scored["total"]).tolist()]
+
+
+def rank_base(
+    stocks: Sequence[Stock],
+    weights: Optional[Dict[str, float]] = None,
+    cache: Optional[ScoreCache] = None,
+) -> List[Stock]:
+    """
+    ציון ודירוג מניות בסיס (זהה ל-FundBuilder.score_and_rank_base_stocks)
+
+    Args:
+        stocks: המועמדות
+        weights: משקלות (ברירת מחדל: settings.BASE_SCORE_WEIGHTS)
+        cache: cache ציונים גולמיים בין ריצות (None = חישוב מלא)
+
+    Returns:
+        List[Stock]: מניות עם financial_data, ממוינות לפי base_score
+    """
+    scored_stocks = [s for s in stocks if s.financial_data]
+    if not scored_stocks:
+        return []
+    if cache is not None:
+        raw = memoized_raw_scores(scored_stocks, "base", BASE_CRITERIA, raw_base_scores, cache)
+    else:
+        raw = raw_base_scores(scored_stocks)
+    scored = score(raw, weights or settings.BASE_SCORE_WEIGHTS, BASE_CRITERIA)
+    return _apply(scored_stocks, raw, scored, BASE_CRITERIA, "base_score", "base_scores_detail")
+
+
+def rank_potential(
+    stocks: Sequence[Stock],
+    index_pe: Optional[float],
+    weights: Optional[Dict[str, float]] = None,
+    cache: Optional[ScoreCache] = None,
+) -> List[Stock]:
+    """
+    ציון ודירוג מניות פוטנציאל (זהה ל-FundBuilder.score_and_rank_potential_stocks)
+
+    Args:
+        stocks: המועמדות
+        index_pe: P/E המדד
+        weights: משקלות (ברירת מחדל: settings.POTENTIAL_SCORE_WEIGHTS)
+        cache: cache ציונים גולמיים בין ריצות (None = חישוב מלא)
+
+    Returns:
+        List[Stock]: ממוינות לפי potential_score
+    """
+    scored_stocks = list(stocks)
+    if not scored_stocks:
+        return []
+    if cache is not None:
+        # Valuation depends on the index P/E of this run, so it is always computed
+        raw = memoized_raw_scores(
+            scored_stocks, "potential", ("future_growth", "momentum"), raw_potential_growth, cache,
+        )
+        raw["valuation"] = raw_valuation(scored_stocks, index_pe)
+    else:
+        raw = raw_potential_scores(scored_stocks, index_pe)
+    scored = score(raw, weights or settings.POTENTIAL_SCORE_WEIGHTS, POTENTIAL_CRITERIA)
+    return _apply(scored_stocks, raw, scored, POTENTIAL_CRITERIA, "potential_score", "potential_scores_detail")
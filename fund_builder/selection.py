@@ -0,0 +1,96 @@
+"""
+בחירת k המניות המובילות ללא כפילויות של חברות (GOOGL/GOOG, FOXA/FOX, BRK.A/BRK.B)
+מרשימה מדורגת או ממערכי ציונים - בשוויון ציונים המניה הקודמת בקלט גוברת
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+from models import Stock
+
+
+def select_distinct(ranked_stocks: Sequence[Stock], count: int) -> List[Stock]:
+    """
+    בחירת `count` המניות הראשונות מרשימה ממוינת, מניה אחת לכל חברה
+
+    Args:
+        ranked_stocks: מניות ממוינות לפי דירוג (גבוה לנמוך)
+        count: מספר מניות לבחור
+
+    Returns:
+        List[Stock]: המניות הנבחרות בסדר הדירוג
+    """
+    selected = []
+    seen_companies = set()
+    for stock in ranked_stocks:
+        if len(selected) >= count:
+            break
+        key = stock.company_key
+        if key in seen_companies:
+            continue
+        seen_companies.add(key)
+        selected.append(stock)
+    return selected
+
+
+def encode_company_keys(stocks: Sequence[Stock]) -> np.ndarray:
+    """
+    קוד מספרי לכל חברה (מניות של אותה חברה מקבלות אותו קוד)
+
+    Returns:
+        np.ndarray: מערך int64 באורך stocks
+    """
+    codes = {}
+    return np.fromiter(
+        (codes.setdefault(stock.company_key, len(codes)) for stock in stocks),
+        dtype=np.int64,
+        count=len(stocks),
+    )
+
+
+def top_distinct_indices(scores: np.ndarray, company_codes: np.ndarray, count: int) -> np.ndarray:
+    """
+    אינדקסי `count` החברות המובילות לפי מערך ציונים (ללא מיון של כל היקום)
+
+    Only a window of the best scores is sorted. Every score tied with the window's
+    lowest one is included, so the window is an exact prefix of the stable ranking;
+    if it holds too few distinct companies the window is doubled.
+
+    Args:
+        scores: ציונים (גבוה = טוב)
+        company_codes: קוד חברה לכל מניה (encode_company_keys)
+        count: מספר מניות לבחור
+
+    Returns:
+        np.ndarray: אינדקסים מהציון הגבוה לנמוך
+    """
+    n = len(scores)
+    if count <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    negated = -np.asarray(scores, dtype=np.float64)
+    codes = np.asarray(company_codes).tolist()
+    window = min(n, max(2 * count, 16))
+    while True:
+        if window >= n:
+            candidates = np.arange(n)
+        else:
+            threshold = np.partition(negated, window - 1)[window - 1]
+            candidates = np.flatnonzero(negated <= threshold)
+        order = candidates[np.argsort(negated[candidates], kind="stable")]
+
+        selected = []
+        seen_companies = set()
+        for i in order.tolist():
+            code = codes[i]
+            if code in seen_companies:
+                continue
+            seen_companies.add(code)
+            selected.append(i)
+            if len(selected) >= count:
+                break
+
+        if len(selected) >= count or window >= n:
+            return np.array(selected, dtype=np.int64)
+        window *= 2
@@ -0,0 +1,284 @@
+"""
+מריץ שלבי בנייה כגרף תלויות (DAG) - שלבים בלתי תלויים רצים במקביל
+
+כל שלב מצהיר על הערכים שהוא קורא ומייצר ומתחיל ברגע שהקלטים שלו קיימים.
+עם StepStore הפלטים של כל שלב נשמרים כשהוא מסתיים, כך שהרצה חוזרת (--resume) משחזרת אותם.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StepFailedError(RuntimeError):
+    """שלב בגרף נכשל (השגיאה המקורית ב-__cause__)"""
+
+    def __init__(self, step: "Step", error: BaseException):
+        super().__init__(f"{step.title} נכשל: {error}")
+        self.step = step
+
+
+class Step:
+    """
+    שלב בגרף
+
+    Args:
+        name: מזהה ייחודי
+        fn: נקרא עם ה-inputs כארגומנטים בשם; מחזיר dict עם כל ה-outputs (או None אם אין)
+        inputs: שמות הערכים שהשלב קורא
+        outputs: שמות הערכים שהשלב מייצר
+        title: לתצוגה ולהודעות שגיאה ("שלב 3")
+        description: תיאור לשורת ההתקדמות
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Optional[Dict[str, Any]]],
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        title: Optional[str] = None,
+        description: str = "",
+    ):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.title = title or name
+        self.description = description
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+
+class StepStore:
+    """
+    ערכי הביניים של ריצה אחת - קובץ pickle לכל שלב, נכתב מה-thread של השלב מיד כשהוא מסתיים
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.pkl"
+
+    def exists(self) -> bool:
+        """האם נשמר פלט של שלב כלשהו"""
+        return self.directory.is_dir() and any(self.directory.glob("*.pkl"))
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict]: הפלטים שהשלב הפיק, או None אם אין קובץ או שאינו קריא
+        """
+        path = self._path(name)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable step output {path.name}: {e}")
+            return None
+
+    def save(self, name: str, outputs: Dict[str, Any]):
+        """
+        Raises:
+            Exception: שגיאת כתיבה (הקובץ הקודם של השלב נמחק, כך שלא ישוחזר)
+        """
+        path = self._path(name)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            self.discard(name)
+            raise
+
+    def discard(self, name: str):
+        """מחיקת הפלטים השמורים של שלב (לפני שהוא רץ מחדש)"""
+        self._path(name).unlink(missing_ok=True)
+
+    def clear(self):
+        """מחיקת כל ערכי הביניים של הריצה (אחרי שהסתיימה בהצלחה)"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class StageGraph:
+    """
+    הרצת שלבים לפי תלויות
+
+    Args:
+        steps: השלבים (סדר הרשימה קובע עדיפות כשכמה שלבים מוכנים)
+        workers: מספר threads (ברירת מחדל: settings.BUILD_STEP_WORKERS)
+
+    Raises:
+        ValueError: פלט כפול, קלט שאף שלב לא מייצר, או מעגל תלויות
+    """
+
+    def __init__(self, steps: Sequence[Step], workers: Optional[int] = None):
+        self.steps = list(steps)
+        self.workers = max(1, workers or settings.BUILD_STEP_WORKERS)
+
+        self._producer: Dict[str, Step] = {}
+        for step in self.steps:
+            for output in step.outputs:
+                if output in self._producer:
+                    raise ValueError(f"'{output}' is produced by both {self._producer[output].name} and {step.name}")
+                self._producer[output] = step
+        names = [step.name for step in self.steps]
+        if len(set(names)) != len(names):
+            raise ValueError("Step names must be unique")
+        for step in self.steps:
+            missing = [name for name in step.inputs if name not in self._producer]
+            if missing:
+                raise ValueError(f"{step.name} reads {missing}, which no step produces")
+        self.order()  # raises on a cycle
+
+    def dependencies(self, step: Step) -> Set[str]:
+        """שמות השלבים שמייצרים את הקלטים של השלב"""
+        return {self._producer[name].name for name in step.inputs}
+
+    def order(self) -> List[Step]:
+        """סדר טופולוגי (יציב לפי סדר הרשימה)"""
+        ordered, placed = [], set()
+        while len(ordered) < len(self.steps):
+            ready = [s for s in self.steps if s.name not in placed and self.dependencies(s) <= placed]
+            if not ready:
+                cycle = sorted(s.name for s in self.steps if s.name not in placed)
+                raise ValueError(f"Dependency cycle between steps: {cycle}")
+            ordered.append(ready[0])
+            placed.add(ready[0].name)
+        return ordered
+
+    def run(
+        self,
+        store: Optional[StepStore] = None,
+        on_start: Optional[Callable[[Step], None]] = None,
+        on_finish: Optional[Callable[[Step, Dict], None]] = None,
+    ) -> Dict:
+        """
+        הרצת הגרף
+
+        Args:
+            store: שמירת ערכי ביניים ושחזור שלבים שהסתיימו בריצה קודמת (אופציונלי)
+            on_start: נקרא מה-thread של השלב כשהוא מתחיל
+            on_finish: נקרא עם השלב ורשומת התזמון שלו כשהסתיים, נכשל או שוחזר
+
+        Returns:
+            Dict: values (כל הערכים), timings (name -> status, seconds, error, started, finished,
+                resumable - False אם פלטי השלב לא נשמרו ולא ישוחזרו ב---resume)
+
+        Raises:
+            StepFailedError: השלב הראשון שנכשל
+        """
+        values: Dict[str, Any] = {}
+        timings: Dict[str, Dict] = {step.name: {"status": "pending", "seconds": 0.0} for step in self.steps}
+        completed: Set[str] = set()
+        lock = threading.Lock()
+        t0 = time.perf_counter()
+
+        if store is not None:
+            # שלב משוחזר רק אם כל השלבים שהוא קורא מהם שוחזרו - פלט ישן לא יתערבב עם קלט חדש
+            for step in self.order():
+                saved = store.load(step.name) if self.dependencies(step) <= completed else None
+                if saved is None or any(name not in saved for name in step.outputs):
+                    store.discard(step.name)
+                    continue
+                values.update({name: saved[name] for name in step.outputs})
+                completed.add(step.name)
+                timings[step.name] = {"status": "restored", "seconds": 0.0}
+                if on_finish:
+                    on_finish(step, timings[step.name])
+
+        def execute(step: Step):
+            with lock:
+                kwargs = {name: values[name] for name in step.inputs}
+            if on_start:
+                on_start(step)
+            started = time.perf_counter()
+            try:
+                produced = step.fn(**kwargs) or {}
+                missing = [name for name in step.outputs if name not in produced]
+                if missing:
+                    raise ValueError(f"{step.name} did not produce {missing}")
+            except BaseException as e:
+                timings[step.name] = {
+                    "status": "failed", "seconds": time.perf_counter() - started, "error": str(e),
+                    "started": started - t0, "finished": time.perf_counter() - t0,
+                }
+                if on_finish:
+                    on_finish(step, timings[step.name])
+                raise
+
+            timing = {
+                "status": "done", "seconds": time.perf_counter() - started,
+                "started": started - t0, "finished": time.perf_counter() - t0,
+            }
+            if store is not None:
+                try:
+                    store.save(step.name, {name: produced[name] for name in step.outputs})
+                    timing["resumable"] = True
+                except Exception as e:
+                    logger.warning(f"Could not persist the outputs of {step.name}: {e}")
+                    timing["resumable"] = False
+            timings[step.name] = timing
+            with lock:
+                values.update({name: produced[name] for name in step.outputs})
+                completed.add(step.name)
+            if on_finish:
+                on_finish(step, timings[step.name])
+
+        by_name = {step.name: step for step in self.steps}
+        failure = None
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="build-step") as executor:
+            while True:
+                if failure is None:
+                    with lock:
+                        done_names = set(completed)
+                    for step in self.steps:
+                        if (step.name not in done_names and step.name not in running.values()
+                                and self.dependencies(step) <= done_names):
+                            running[executor.submit(execute, step)] = step.name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = by_name[running.pop(future)]
+                    error = future.exception()
+                    if error is not None and failure is None:
+                        failure = (step, error)
+
+        for step in self.steps:
+            if timings[step.name]["status"] == "pending":
+                timings[step.name]["status"] = "skipped"
+
+        if failure is not None:
+            step, error = failure
+            raise StepFailedError(step, error) from error
+        return {"values": values, "timings": timings}
+
+
+def format_timings(steps: Sequence[Step], timings: Dict[str, Dict]) -> str:
+    """טבלת זמני השלבים להדפסה בסוף הבנייה"""
+    lines = [f"  {'step':<18} {'status':<9} {'start':>7} {'time':>8}"]
+    for step in steps:
+        timing = timings[step.name]
+        start = f"{timing['started']:.1f}s" if "started" in timing else "-"
+        lines.append(f"  {step.name:<18} {timing['status']:<9} {start:>7} {timing['seconds']:>7.2f}s")
+    return "\n".join(lines)
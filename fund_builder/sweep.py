@@ -0,0 +1,368 @@
+"""
+סריקת פרמטרים - משקלות ציון וקריטריוני כשירות על snapshot שמור, ללא בנייה מלאה
+כל תצורה מדווחת את 10 המניות שנבחרו, תחלופה מול הקרן הנוכחית ויציבות דירוג (Spearman)
+
+    python -m fund_builder.sweep --index SP500 --step 0.05
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from fund_builder import scoring_engine
+from fund_builder.eligibility import EligibilityMatrix, passed
+from fund_builder.scoring_engine import BASE_CRITERIA, POTENTIAL_CRITERIA
+from fund_builder.selection import encode_company_keys, top_distinct_indices
+from models import Stock
+
+BASE_COUNT = 6
+POTENTIAL_COUNT = 4
+# configurations per task sent to a worker
+CHUNK_SIZE = 500
+
+
+def current_config() -> Dict:
+    """התצורה הנוכחית מההגדרות"""
+    return {
+        "base_weights": dict(settings.BASE_SCORE_WEIGHTS),
+        "potential_weights": dict(settings.POTENTIAL_SCORE_WEIGHTS),
+        "base_eligibility": dict(settings.BASE_ELIGIBILITY),
+        "potential_eligibility": dict(settings.POTENTIAL_ELIGIBILITY),
+        "fund_weights": list(settings.FUND_WEIGHTS),
+    }
+
+
+def _rule_key(rules: Dict) -> Tuple:
+    return tuple(sorted(rules.items()))
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """מתאם דירוגים בין שני מערכי ציונים (NaN = לא דורג)"""
+    common = ~(np.isnan(a) | np.isnan(b))
+    n = int(common.sum())
+    if n < 2:
+        return 1.0
+    rank_a = np.argsort(np.argsort(-a[common], kind="stable"), kind="stable")
+    rank_b = np.argsort(np.argsort(-b[common], kind="stable"), kind="stable")
+    d = (rank_a - rank_b).astype(np.float64)
+    return float(1 - 6 * (d @ d) / (n * (n * n - 1)))
+
+
+class SweepUniverse:
+    """
+    יקום מוכן לסריקה - מערכים בלבד, כך שהעברתו לתהליכי worker זולה
+
+    Args:
+        stocks: מניות ה-snapshot (ללא ציונים)
+        index_pe: P/E המדד לציון פוטנציאל
+        configs: התצורות שייסרקו - מסכות הכשירות מחושבות מראש לכל סט כללים שונה
+    """
+
+    def __init__(self, stocks: Sequence[Stock], index_pe: Optional[float], configs: Iterable[Dict]):
+        stocks = list(stocks)
+        self.symbols = [s.symbol for s in stocks]
+        self.company_codes = encode_company_keys(stocks)
+        n = len(stocks)
+
+        # Base criteria only exist for stocks with financial_data (rank_base drops the rest)
+        has_financial = np.array([s.financial_data is not None for s in stocks], dtype=bool)
+        with_financial = [s for s in stocks if s.financial_data is not None]
+        self.raw_base = {name: np.zeros(n) for name in BASE_CRITERIA}
+        if with_financial:
+            for name, values in scoring_engine.raw_base_scores(with_financial).items():
+                self.raw_base[name][has_financial] = values
+        self.raw_potential = scoring_engine.raw_potential_scores(stocks, index_pe) if stocks else {
+            name: np.zeros(0) for name in POTENTIAL_CRITERIA
+        }
+
+        matrix = EligibilityMatrix(stocks)
+        self.base_eligible: Dict[Tuple, np.ndarray] = {}
+        self.potential_eligible: Dict[Tuple, np.ndarray] = {}
+        for config in itertools.chain([current_config()], configs):
+            base_key = _rule_key(config["base_eligibility"])
+            if base_key not in self.base_eligible:
+                self.base_eligible[base_key] = passed(matrix.base_failures(config["base_eligibility"]))
+            potential_key = _rule_key(config["potential_eligibility"])
+            if potential_key not in self.potential_eligible:
+                self.potential_eligible[potential_key] = passed(matrix.potential_failures(config["potential_eligibility"]))
+
+        self.baseline = self.evaluate(current_config())
+
+    def _rank(self, raw: Dict[str, np.ndarray], mask: np.ndarray, weights: Dict, criteria, count: int):
+        """ציון תת-היקום שבמסכה ובחירת `count` החברות המובילות; מחזיר (נבחרות, ציונים מלאים)"""
+        candidates = np.flatnonzero(mask)
+        totals = np.full(len(mask), np.nan)
+        if candidates.size == 0:
+            return candidates, totals
+        scored = scoring_engine.score({name: raw[name][candidates] for name in criteria}, weights, criteria)
+        totals[candidates] = scored["total"]
+        top = top_distinct_indices(scored["total"], self.company_codes[candidates], count)
+        return candidates[top], totals
+
+    def evaluate(self, config: Dict) -> Dict:
+        """
+        בחירת הקרן עבור תצורה אחת (זהה ל-FundBuilder.select_fund)
+
+        Returns:
+            Dict: selected (אינדקסים - 6 בסיס ואז 4 פוטנציאל), weights, base_totals, potential_totals
+        """
+        base_selected, base_totals = self._rank(
+            self.raw_base, self.base_eligible[_rule_key(config["base_eligibility"])],
+            config["base_weights"], BASE_CRITERIA, BASE_COUNT,
+        )
+        pool = self.potential_eligible[_rule_key(config["potential_eligibility"])].copy()
+        pool[base_selected] = False
+        potential_selected, potential_totals = self._rank(
+            self.raw_potential, pool, config["potential_weights"], POTENTIAL_CRITERIA, POTENTIAL_COUNT,
+        )
+        selected = base_selected.tolist() + potential_selected.tolist()
+        return {
+            "selected": selected,
+            "weights": dict(zip(selected, config["fund_weights"])),
+            "base_totals": base_totals,
+            "potential_totals": potential_totals,
+        }
+
+    def report(self, config: Dict) -> Dict:
+        """
+        מדדי תצורה מול הקרן הנוכחית
+
+        Returns:
+            Dict: selected (סימולים), turnover (חלק המשקל שמוחלף, 0-1), replaced (מניות שהוחלפו),
+                  rank_stability (ממוצע Spearman של דירוג הבסיס והפוטנציאל מול ההגדרות הנוכחיות)
+        """
+        result = self.evaluate(config)
+        current = self.baseline["weights"]
+        weights = result["weights"]
+        turnover = sum(abs(weights.get(i, 0.0) - current.get(i, 0.0)) for i in set(weights) | set(current)) / 2
+        stability = (
+            _spearman(result["base_totals"], self.baseline["base_totals"])
+            + _spearman(result["potential_totals"], self.baseline["potential_totals"])
+        ) / 2
+        return {
+            "selected": [self.symbols[i] for i in result["selected"]],
+            "turnover": turnover,
+            "replaced": len(set(weights) - set(current)),
+            "rank_stability": stability,
+        }
+
+
+# ==================== Configuration generators ====================
+
+def weight_grid(criteria: Sequence[str], step: float) -> List[Dict[str, float]]:
+    """כל צירופי המשקלות בקפיצות `step` שסכומם 1 (כל משקל > 0)"""
+    units = round(1 / step)
+    grid = []
+    for parts in itertools.product(range(1, units), repeat=len(criteria) - 1):
+        last = units - sum(parts)
+        if last > 0:
+            grid.append({name: round(p * step, 10) for name, p in zip(criteria, parts + (last,))})
+    return grid
+
+
+def random_weights(criteria: Sequence[str], rng: random.Random) -> Dict[str, float]:
+    """משקלות אקראיים (התפלגות Dirichlet אחידה) שסכומם 1"""
+    draws = [rng.expovariate(1.0) for _ in criteria]
+    total = sum(draws)
+    return {name: d / total for name, d in zip(criteria, draws)}
+
+
+def _eligibility_grid(base_options: Dict[str, List], potential_options: Dict[str, List]):
+    base = [dict(zip(base_options, values)) for values in itertools.product(*base_options.values())]
+    potential = [dict(zip(potential_options, values)) for values in itertools.product(*potential_options.values())]
+    return base, potential
+
+
+def grid_configs(
+    step: float,
+    base_options: Dict[str, List],
+    potential_options: Dict[str, List],
+    fund_weights: Optional[List[float]] = None,
+) -> List[Dict]:
+    """
+    רשת מלאה: משקלות בסיס × משקלות פוטנציאל × כללי כשירות
+
+    Args:
+        step: קפיצת המשקלות (0.05 → 171 צירופים לכל ציון)
+        base_options / potential_options: ערכים אפשריים לכל כלל כשירות
+        fund_weights: משקלות הקרן (ברירת מחדל: settings.FUND_WEIGHTS)
+    """
+    base_rules, potential_rules = _eligibility_grid(base_options, potential_options)
+    return [
+        {
+            "base_weights": bw, "potential_weights": pw,
+            "base_eligibility": be, "potential_eligibility": pe,
+            "fund_weights": list(fund_weights or settings.FUND_WEIGHTS),
+        }
+        for be, pe, bw, pw in itertools.product(
+            base_rules, potential_rules, weight_grid(BASE_CRITERIA, step), weight_grid(POTENTIAL_CRITERIA, step)
+        )
+    ]
+
+
+def sample_configs(
+    samples: int,
+    base_options: Dict[str, List],
+    potential_options: Dict[str, List],
+    fund_weights: Optional[List[float]] = None,
+    seed: int = 0,
+) -> List[Dict]:
+    """מדגם אקראי של `samples` תצורות (משקלות רציפים, כללי כשירות מתוך האפשרויות)"""
+    rng = random.Random(seed)
+    base_rules, potential_rules = _eligibility_grid(base_options, potential_options)
+    return [
+        {
+            "base_weights": random_weights(BASE_CRITERIA, rng),
+            "potential_weights": random_weights(POTENTIAL_CRITERIA, rng),
+            "base_eligibility": rng.choice(base_rules),
+            "potential_eligibility": rng.choice(potential_rules),
+            "fund_weights": list(fund_weights or settings.FUND_WEIGHTS),
+        }
+        for _ in range(samples)
+    ]
+
+
+# ==================== Parallel evaluation ====================
+
+_worker_universe: Optional[SweepUniverse] = None
+
+
+def _init_worker(universe: SweepUniverse):
+    global _worker_universe
+    _worker_universe = universe
+
+
+def _report_chunk(configs: List[Dict]) -> List[Dict]:
+    return [_worker_universe.report(config) for config in configs]
+
+
+def run_sweep(universe: SweepUniverse, configs: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """
+    הערכת כל התצורות, במקביל על פני תהליכים
+
+    Args:
+        universe: היקום המוכן (נשלח פעם אחת לכל worker)
+        configs: התצורות
+        workers: מספר תהליכים (ברירת מחדל: settings.SWEEP_WORKERS, 0 = מספר המעבדים; 1 = באותו תהליך)
+
+    Returns:
+        List[Dict]: config + תוצאות report, באותו סדר
+    """
+    workers = workers if workers is not None else settings.SWEEP_WORKERS
+    workers = workers or os.cpu_count() or 1
+    chunks = [configs[i:i + CHUNK_SIZE] for i in range(0, len(configs), CHUNK_SIZE)]
+
+    if workers == 1 or len(chunks) <= 1:
+        reports = [universe.report(config) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(universe,)) as executor:
+            reports = list(itertools.chain.from_iterable(executor.map(_report_chunk, chunks)))
+
+    return [{"config": config, **report} for config, report in zip(configs, reports)]
+
+
+# ==================== CLI ====================
+
+def _options(text: Optional[str], default, cast) -> List:
+    return [cast(v) for v in text.split(",")] if text else [default]
+
+
+def main():
+    from utils.snapshot_store import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="סריקת משקלות ציון וקריטריוני כשירות על snapshot שמור")
+    parser.add_argument("--index", required=True, choices=["TASE125", "SP500"])
+    parser.add_argument("--quarter", choices=["Q1", "Q2", "Q3", "Q4"], help="ברירת מחדל: ה-snapshot האחרון")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--step", type=float, default=0.05, help="רשת משקלות בקפיצות אלה (ברירת מחדל: 0.05)")
+    parser.add_argument("--samples", type=int, help="מדגם אקראי במקום רשת")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-profitable-years", help="ערכים לכשירות בסיס, למשל 4,5")
+    parser.add_argument("--min-operating-profit-years", help="למשל 3,4")
+    parser.add_argument("--max-debt-to-equity", help="למשל 0.5,0.6,0.8")
+    parser.add_argument("--potential-min-profitable-years", help="ערכים לכשירות פוטנציאל, למשל 2,3")
+    parser.add_argument("--fund-weights", help="10 משקלות קרן מופרדים בפסיקים")
+    parser.add_argument("--workers", type=int, help="מספר תהליכים (ברירת מחדל: SWEEP_WORKERS)")
+    parser.add_argument("--top", type=int, default=15, help="מספר הקרנות השונות להצגה")
+    parser.add_argument("--output", help="כתיבת כל התוצאות לקובץ JSON Lines")
+    args = parser.parse_args()
+
+    store = SnapshotStore()
+    if args.quarter and args.year:
+        quarter, year = args.quarter, args.year
+    else:
+        snapshots = store.snapshots(args.index)
+        if not snapshots:
+            parser.error(f"No fundamentals snapshot for {args.index} - run a build first")
+        quarter, year = snapshots[0]["quarter"], snapshots[0]["year"]
+
+    stocks = store.load(args.index, quarter, year)
+    if not stocks:
+        parser.error(f"No fundamentals snapshot for {args.index} {quarter} {year}")
+    index_pe = store.index_pe(args.index, quarter, year)
+    if index_pe is None:
+        pe_values = [s.pe_ratio for s in stocks if s.pe_ratio and s.pe_ratio > 0]
+        index_pe = sum(pe_values) / len(pe_values) if pe_values else None
+    store.close()
+
+    base_defaults = settings.BASE_ELIGIBILITY
+    base_options = {
+        "min_profitable_years": _options(args.min_profitable_years, base_defaults["min_profitable_years"], int),
+        "min_operating_profit_years": _options(
+            args.min_operating_profit_years, base_defaults["min_operating_profit_years"], int
+        ),
+        "max_debt_to_equity": _options(args.max_debt_to_equity, base_defaults["max_debt_to_equity"], float),
+    }
+    potential_options = {
+        "min_profitable_years": _options(
+            args.potential_min_profitable_years, settings.POTENTIAL_ELIGIBILITY["min_profitable_years"], int
+        ),
+    }
+    fund_weights = [float(w) for w in args.fund_weights.split(",")] if args.fund_weights else None
+    if fund_weights and len(fund_weights) != BASE_COUNT + POTENTIAL_COUNT:
+        parser.error(f"--fund-weights needs {BASE_COUNT + POTENTIAL_COUNT} values")
+
+    if args.samples:
+        configs = sample_configs(args.samples, base_options, potential_options, fund_weights, args.seed)
+    else:
+        configs = grid_configs(args.step, base_options, potential_options, fund_weights)
+
+    started = time.perf_counter()
+    universe = SweepUniverse(stocks, index_pe, configs)
+    results = run_sweep(universe, configs, args.workers)
+    elapsed = time.perf_counter() - started
+
+    current = [universe.symbols[i] for i in universe.baseline["selected"]]
+    print(f"{args.index} {quarter} {year}: {len(stocks)} stocks, index P/E {index_pe or '-'}")
+    print(f"{len(results)} configurations in {elapsed:.1f}s ({len(results) / max(elapsed, 1e-9):,.0f}/s)")
+    print(f"Current fund: {' '.join(current)}")
+
+    funds: Dict[Tuple[str, ...], List[Dict]] = {}
+    for result in results:
+        funds.setdefault(tuple(result["selected"]), []).append(result)
+    print(f"{len(funds)} distinct funds\n")
+    print(f"{'configs':>8} {'turnover':>9} {'replaced':>8} {'stability':>9}  selected")
+    for selected, group in sorted(funds.items(), key=lambda item: -len(item[1]))[:args.top]:
+        first = group[0]
+        print(
+            f"{len(group):>8} {first['turnover']:>9.0%} {first['replaced']:>8} "
+            f"{np.mean([r['rank_stability'] for r in group]):>9.3f}  {' '.join(selected)}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
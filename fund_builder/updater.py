@@ -19,8 +19,13 @@ from rich.panel import Panel
 from config import settings
 from models import Stock, Fund, FundPosition
 from fund_builder.builder import FundBuilder
+from fund_builder.eligibility import screen
+from fund_builder.incremental_ranking import IncrementalRanking
+from fund_builder.selection import select_distinct
 from utils.update_parser import parse_update_file, find_latest_update_file
 from utils.cache_loader import load_cached_stocks
+from utils.cache_manifest import manifest_status
+from utils.snapshot_store import capture_snapshot
 from utils.ltm_calculator import calculate_ltm, merge_ltm_into_stock
 from utils.date_utils import (
     format_fund_name,
@@ -29,6 +34,7 @@ from utils.date_utils import (
     get_current_date_string,
 )
 from data_sources.adapter import DataSourceAdapter as adapter
+from data_sources.twelvedata_async import create_async_source
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -101,6 +107,14 @@ class QuarterlyUpdater:
         for s in prev_data["potential_candidates"]:
             all_symbols.add(s["symbol"])
 
+        # Manifest check before any cache file is opened
+        status = manifest_status(all_symbols, self.index_name)
+        if status and status["stale"]:
+            console.print(
+                f"  [yellow]⚠ {len(status['stale'])} מניות ב-cache עשויות כבר לפרסם דוח שנתי חדש "
+                f"(python -m utils.cache_manifest status --verbose) - שקול בנייה מלאה[/yellow]"
+            )
+
         cached_stocks = load_cached_stocks(list(all_symbols), self.cache_dir)
         console.print(f"  [green]✓[/green] נטענו {len(cached_stocks)}/{len(all_symbols)} מניות מ-cache")
 
@@ -114,6 +128,36 @@ class QuarterlyUpdater:
         updated_stocks = {}
         failed_symbols = []
 
+        # Async mode: fetch all quarterly statements up front in one pipeline
+        prefetched_quarterly = {}
+        async_source = create_async_source(financial_source)
+        if async_source is not None:
+            console.print(
+                f"  [dim]שליפה אסינכרונית של דוחות רבעוניים "
+                f"({async_source.max_concurrency} מניות במקביל)...[/dim]"
+            )
+            prefetched_quarterly = async_source.prefetch_quarterly(list(cached_stocks.keys()))
+
+        # Bulk pricing: current quotes for all tracked stocks in one pass
+        prefetched_pricing = {}
+        if settings.PRICING_BATCH_SIZE > 0 and callable(getattr(pricing_source, 'get_bulk_market_data', None)):
+            pricing_symbols = [
+                adapter.normalize_symbol(symbol, self.index_name, pricing_source.name)
+                for symbol in cached_stocks
+            ]
+            try:
+                prefetched_pricing = pricing_source.get_bulk_market_data(pricing_symbols)
+            except Exception as e:
+                logger.warning(f"Bulk pricing failed, falling back to per-stock pricing: {e}")
+
+        # דירוג הבסיס מתעדכן מניה אחר מניה תוך כדי מיזוג ה-LTM
+        base_symbols_from_prev = {s["symbol"] for s in prev_data["base_candidates"]}
+        screen(cached_stocks.values())
+        base_ranking = IncrementalRanking(
+            [s for symbol, s in cached_stocks.items() if s.is_eligible_for_base and symbol in base_symbols_from_prev],
+            kind="base",
+        )
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -127,7 +171,12 @@ class QuarterlyUpdater:
             for symbol, stock in cached_stocks.items():
                 try:
                     # Fetch quarterly financials from TwelveData
-                    quarterly_data = financial_source.get_quarterly_financials(symbol)
+                    if symbol in prefetched_quarterly:
+                        quarterly_data = prefetched_quarterly[symbol]
+                        if isinstance(quarterly_data, Exception):
+                            raise quarterly_data
+                    else:
+                        quarterly_data = financial_source.get_quarterly_financials(symbol)
 
                     # Calculate LTM
                     ltm_data = calculate_ltm(quarterly_data)
@@ -140,7 +189,9 @@ class QuarterlyUpdater:
                         pricing_symbol = adapter.normalize_symbol(
                             symbol, self.index_name, pricing_source.name
                         )
-                        market_data = pricing_source.get_stock_market_data(pricing_symbol)
+                        market_data = prefetched_pricing.get(pricing_symbol)
+                        if market_data is None:
+                            market_data = pricing_source.get_stock_market_data(pricing_symbol)
                         current_price = market_data.current_price
                         market_cap = market_data.market_cap
                         pe_ratio = market_data.pe_ratio
@@ -167,23 +218,35 @@ class QuarterlyUpdater:
                     # Keep original cached stock as fallback
                     updated_stocks[symbol] = stock
 
+                # Re-check eligibility and move the stock in the base ranking
+                updated = updated_stocks[symbol]
+                screen([updated])
+                if updated.is_eligible_for_base and symbol in base_symbols_from_prev:
+                    base_ranking.update(updated)
+                else:
+                    base_ranking.remove(symbol)
+
                 progress.advance(task)
 
         console.print(f"  [green]✓[/green] עודכנו {len(updated_stocks) - len(failed_symbols)}/{len(updated_stocks)} מניות")
         if failed_symbols:
             console.print(f"  [yellow]⚠ נכשלו:[/yellow] {', '.join(failed_symbols[:10])}")
 
+        response_cache = getattr(financial_source, 'response_cache', None)
+        if response_cache is not None:
+            cache_stats = response_cache.stats()
+            console.print(
+                f"  [dim]Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"(~{cache_stats['credits_saved']:,} זיכויים נחסכו)[/dim]"
+            )
+
         # ===== Step 4: Re-check eligibility =====
+        # (each stock was screened as its LTM data was merged)
         console.print("\n[yellow]שלב 4:[/yellow] בדיקת כשירות מחדש...")
 
         base_eligible = []
         potential_eligible = []
-        base_symbols_from_prev = {s["symbol"] for s in prev_data["base_candidates"]}
-
         for symbol, stock in updated_stocks.items():
-            stock.check_base_eligibility()
-            stock.check_potential_eligibility()
-
             if stock.is_eligible_for_base and symbol in base_symbols_from_prev:
                 base_eligible.append(stock)
             elif stock.is_eligible_for_potential:
@@ -195,23 +258,29 @@ class QuarterlyUpdater:
         # ===== Step 5: Re-score and rank =====
         console.print("\n[yellow]שלב 5:[/yellow] ציון ודירוג מחדש...")
 
-        ranked_base = self.builder.score_and_rank_base_stocks(base_eligible)
+        ranked_base = base_ranking.ranked()
         console.print(f"  [green]✓[/green] דורגו {len(ranked_base)} מניות בסיס")
+        console.print(
+            f"  [dim]דירוג אינקרמנטלי: {base_ranking.incremental_updates} עדכונים, "
+            f"{base_ranking.full_renormalizations} נרמולים מלאים[/dim]"
+        )
 
         # Calculate index P/E for potential scoring
         pe_values = [s.pe_ratio for s in updated_stocks.values() if s.pe_ratio and s.pe_ratio > 0]
         index_pe = sum(pe_values) / len(pe_values) if pe_values else None
 
         # Remove base-selected stocks from potential pool
-        from build_fund import select_stocks_skip_duplicates
-        selected_base = select_stocks_skip_duplicates(ranked_base, 6)
+        selected_base = select_distinct(ranked_base, 6)
         selected_base_symbols = {s.symbol for s in selected_base}
 
         potential_pool = [s for s in potential_eligible if s.symbol not in selected_base_symbols]
         ranked_potential = self.builder.score_and_rank_potential_stocks(potential_pool, index_pe)
         console.print(f"  [green]✓[/green] דורגו {len(ranked_potential)} מניות פוטנציאל")
 
-        selected_potential = select_stocks_skip_duplicates(ranked_potential, 4)
+        selected_potential = select_distinct(ranked_potential, 4)
+
+        # snapshot נתוני היסוד המעודכנים (LTM) לרבעון - גם ב-dry-run, ללא עלות API
+        capture_snapshot(updated_stocks.values(), self.index_name, self.quarter, self.year, "update", index_pe)
 
         # ===== Step 6: Build fund =====
         console.print("\n[yellow]שלב 6:[/yellow] בניית קרן מעודכנת...")
@@ -418,9 +487,8 @@ class QuarterlyUpdater:
                     )
 
         # 4. Save updated cache files
-        from build_fund import save_stock_to_cache
-        for pos in fund.positions:
-            save_stock_to_cache(pos.stock, self.cache_dir)
+        from build_fund import save_stocks_to_cache
+        save_stocks_to_cache([pos.stock for pos in fund.positions], self.cache_dir, self.quarter, self.year)
 
         # 5. Append to CHANGELOG.md
         from utils.changelog import append_to_changelog
@@ -2,10 +2,54 @@
 מודל מניה
 """
 
+import re
+from functools import cached_property
 from pydantic import BaseModel, Field
 from typing import Optional
 from .financial_data import FinancialData, MarketData
 
+# סיומות שמוסרות משם החברה לזיהוי סוגי מניות של אותה חברה - מהודרות פעם אחת, מוחלות לפי הסדר
+_COMPANY_SUFFIX_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'\s+CLASS\s+[ABC]',  # Class A, Class B, Class C
+        r'\s+SERIES\s+[ABC]',  # Series A, Series B, Series C
+        r'\s+INC\.?$',  # Inc, Inc.
+        r'\s+LTD\.?$',  # Ltd, Ltd.
+        r'\s+CORP\.?$',  # Corp, Corp.
+        r'\s+PLC\.?$',  # PLC, PLC.
+        r'\s+LP\.?$',  # LP, LP.
+        r'\s+LLC\.?$',  # LLC, LLC.
+        r'\s+SA\.?$',  # SA, SA.
+        r'\s+AG\.?$',  # AG, AG.
+        r'\s+NV\.?$',  # NV, NV.
+        r'\s+\(.*\)$',  # (Class A), (NYSE), etc.
+    )
+]
+
+
+def company_key(name: str, symbol: str) -> str:
+    """
+    שם החברה הבסיסי - מזהה אחד לכל סוגי המניות של אותה חברה
+
+    Args:
+        name: שם החברה
+        symbol: סימול (משמש כאשר לא נשאר שם)
+
+    Returns:
+        str: שם בסיסי באותיות גדולות, ללא סיומות Class/Inc/Corp וכו'
+    """
+    base_name = name.upper()
+    for pattern in _COMPANY_SUFFIX_PATTERNS:
+        base_name = pattern.sub('', base_name)
+
+    base_name = base_name.strip()
+
+    # אם השם הבסיסי ריק, השתמש בסימול (בלי סיומת)
+    if not base_name:
+        base_name = symbol.upper().split('.')[0]
+
+    return base_name
+
 
 class Stock(BaseModel):
     """מחלקת מניה"""
@@ -68,6 +112,16 @@ class Stock(BaseModel):
             return self.financial_data.pe_ratio
         return None
 
+    @cached_property
+    def company_key(self) -> str:
+        """
+        מזהה החברה לדילוג על כפילויות (GOOGL/GOOG, BRK.A/BRK.B) - מחושב פעם אחת לכל מניה
+
+        The value lives in the instance __dict__, which pydantic leaves out of
+        equality, model_dump and JSON, so cached stocks and content hashes are unaffected.
+        """
+        return company_key(self.name, self.symbol)
+
     def check_base_eligibility(
         self,
         min_profitable_years: int = 5,
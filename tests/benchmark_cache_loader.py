@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+מדידת זמני טעינת cache של מניות
+Cache loading benchmark
+
+Writes N synthetic stocks (6 years of statements, price history) to a temp
+directory the way the build does, then times:
+1. sequential      - the original loop: json.load + Stock(**data) per file
+2. bulk, 1 thread  - load_cached_stocks with max_workers=1 (JSON-mode validation only)
+3. bulk, parallel  - load_cached_stocks with --workers threads
+4. msgpack (lazy)  - CACHE_BACKEND=msgpack, only when msgpack is installed
+
+Usage:
+    python tests/benchmark_cache_loader.py [--sizes 500 5000] [--workers 8]
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import FinancialData, MarketData, Stock
+from utils.cache_loader import load_cached_stocks
+from utils.cache_writer import stock_cache_path, write_stock_json
+from utils.stock_pack import convert_json_dir
+
+has_msgpack = importlib.util.find_spec("msgpack") is not None
+
+
+def make_stock(i: int) -> Stock:
+    years = range(2020, 2026)
+    symbol = f"S{i:05d}.US"
+    return Stock(
+        symbol=symbol,
+        name=f"Synthetic {i}",
+        index="SP500",
+        financial_data=FinancialData(
+            symbol=symbol,
+            revenues={y: 1e9 + i * 1e6 + y for y in years},
+            net_incomes={y: 1e8 + i * 1e5 + y for y in years},
+            operating_incomes={y: 2e8 + i * 1e5 + y for y in years},
+            operating_cash_flows={y: 1.5e8 + i * 1e5 + y for y in years},
+            total_debt=5e8,
+            total_equity=1e9,
+            market_cap=2e10,
+            current_price=100.0 + i % 50,
+            pe_ratio=20.0,
+        ),
+        market_data=MarketData(
+            symbol=symbol,
+            name=f"Synthetic {i}",
+            market_cap=2e10,
+            current_price=100.0 + i % 50,
+            price_history={f"{y}-12-31": 90.0 + y % 7 for y in years},
+        ),
+        base_score=50.0 + i % 40,
+        is_eligible_for_base=True,
+    )
+
+
+def load_sequential(symbols, cache_dir):
+    stocks = {}
+    for symbol in symbols:
+        with open(stock_cache_path(symbol, cache_dir), "r", encoding="utf-8") as f:
+            stocks[symbol] = Stock(**json.load(f))
+    return stocks
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run(size: int, workers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        symbols = []
+        for i in range(size):
+            stock = make_stock(i)
+            write_stock_json(stock, cache_dir)
+            symbols.append(stock.symbol)
+
+        seq_time, expected = timed(load_sequential, symbols, cache_dir)
+        single_time, single = timed(load_cached_stocks, symbols, cache_dir, max_workers=1)
+        bulk_time, bulk = timed(load_cached_stocks, symbols, cache_dir, max_workers=workers)
+
+        assert single == expected and bulk == expected
+        rows = [("sequential", seq_time), ("bulk, 1 thread", single_time), (f"bulk, {workers} threads", bulk_time)]
+
+        json_bytes = sum(path.stat().st_size for path in cache_dir.glob("*.json"))
+        print(f"\n{size:,} stocks (json {json_bytes / 1e6:.1f} MB", end="")
+        if has_msgpack:
+            pack_bytes = convert_json_dir(cache_dir, remove_json=True)["pack_bytes"]
+            settings.CACHE_BACKEND = "msgpack"
+            pack_time, packed = timed(load_cached_stocks, symbols, cache_dir, max_workers=workers)
+            settings.CACHE_BACKEND = "json"
+            assert len(packed) == size
+            rows.append(("msgpack (lazy)", pack_time))
+            print(f", msgpack {pack_bytes / 1e6:.1f} MB", end="")
+        print(")")
+
+    for label, seconds in rows:
+        print(f"  {label:<16} {seconds * 1000:9.1f} ms   x{seq_time / seconds:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached stock loading")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--workers", type=int, default=settings.CACHE_LOAD_WORKERS)
+    args = parser.parse_args()
+
+    settings.CACHE_BACKEND = "json"
+    for size in args.sizes:
+        run(size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
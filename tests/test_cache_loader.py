@@ -0,0 +1,54 @@
+"""
+בדיקות עבור טעינת cache מרוכזת (utils.cache_loader)
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import FinancialData, Stock
+from utils.cache_loader import load_cached_stocks
+from utils.cache_writer import write_stock_json
+
+
+def _stock(symbol):
+    return Stock(
+        symbol=symbol,
+        name=f"{symbol} Inc",
+        index="SP500",
+        financial_data=FinancialData(symbol=symbol, revenues={2024: 100.0, 2025: 120.0}),
+        base_score=70.0,
+    )
+
+
+@pytest.fixture(autouse=True)
+def json_backend(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "json")
+
+
+class TestLoadCachedStocks:
+    def test_parallel_matches_single_thread(self, tmp_path):
+        symbols = [f"S{i:03d}.US" for i in range(300)]
+        for symbol in symbols:
+            write_stock_json(_stock(symbol), tmp_path)
+
+        single = load_cached_stocks(symbols, tmp_path, max_workers=1)
+        parallel = load_cached_stocks(symbols, tmp_path, max_workers=4)
+
+        assert list(parallel) == symbols
+        assert parallel == single
+        assert parallel["S007.US"].financial_data.revenues == {2024: 100.0, 2025: 120.0}
+
+    def test_missing_and_corrupt_files_skipped(self, tmp_path):
+        write_stock_json(_stock("GOOD.US"), tmp_path)
+        (tmp_path / "BAD_US.json").write_text("{not json", encoding="utf-8")
+        (tmp_path / "INVALID_US.json").write_text(json.dumps({"symbol": "INVALID.US"}), encoding="utf-8")
+
+        stocks = load_cached_stocks(["GOOD.US", "BAD.US", "INVALID.US", "MISSING.US"], tmp_path)
+
+        assert list(stocks) == ["GOOD.US"]
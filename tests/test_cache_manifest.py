@@ -0,0 +1,92 @@
+"""
+בדיקות עבור מניפסט ה-cache (utils.cache_manifest)
+"""
+
+import pytest
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import Stock
+from models.financial_data import FinancialData, MarketData
+from utils.cache_manifest import CacheManifest, rebuild
+from utils.cache_writer import write_stock_json
+
+
+def _stock(symbol="AAA.US", fiscal_date="2024-12-31", base_score=None, eligible=True, price=100.0):
+    return Stock(
+        symbol=symbol,
+        name=f"{symbol} Inc",
+        index="SP500",
+        financial_data=FinancialData(symbol=symbol, revenues={2024: 10.0, 2023: 9.0}),
+        market_data=MarketData(
+            symbol=symbol, name=f"{symbol} Inc", market_cap=1e9, current_price=price,
+            price_history={fiscal_date: price},
+        ),
+        base_score=base_score,
+        is_eligible_for_base=eligible,
+    )
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = CacheManifest(tmp_path / "manifest.sqlite")
+    yield manifest
+    manifest.close()
+
+
+class TestCacheManifest:
+    def test_record_fields(self, manifest):
+        manifest.record_many([_stock(base_score=70.0)], source="twelvedata")
+        entry = manifest.get("AAA.US")
+
+        assert entry["source"] == "twelvedata"
+        assert entry["latest_fiscal_date"] == "2024-12-31"
+        assert entry["has_base_score"] == 1
+        assert len(entry["content_hash"]) == 64
+
+    def test_rescoring_keeps_fetched_at(self, manifest):
+        manifest.record_many([_stock()], source="twelvedata", fetched_at=1000.0)
+        manifest.record_many([_stock(base_score=70.0)], source="rebuild")
+        entry = manifest.get("AAA.US")
+        assert (entry["fetched_at"], entry["source"], entry["has_base_score"]) == (1000.0, "twelvedata", 1)
+
+        manifest.record_many([_stock(base_score=70.0, price=120.0)], source="eodhd")
+        entry = manifest.get("AAA.US")
+        assert entry["fetched_at"] > 1000.0 and entry["source"] == "eodhd"
+
+    def test_status(self, manifest):
+        manifest.record_many([
+            _stock("FRESH.US", "2024-12-31", base_score=70.0),
+            _stock("STALE.US", "2023-12-31", base_score=70.0),
+            _stock("UNSCORED.US", "2024-12-31"),
+            _stock("INELIGIBLE.US", "2024-12-31", eligible=False),
+        ])
+        status = manifest.status(
+            ["FRESH.US", "STALE.US", "UNSCORED.US", "INELIGIBLE.US", "NEW.US"], "SP500", today=date(2025, 3, 1)
+        )
+
+        assert status == {
+            "missing": ["NEW.US"],
+            "stale": ["STALE.US"],
+            "unscored": ["UNSCORED.US"],
+            "fresh": ["FRESH.US", "INELIGIBLE.US"],
+        }
+        # Same stocks become stale once the next annual report may be out
+        assert manifest.status(["FRESH.US"], today=date(2026, 3, 1))["stale"] == ["FRESH.US"]
+
+    def test_rebuild_from_json_dir(self, manifest, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "CACHE_BACKEND", "json")
+        cache_dir = tmp_path / "stocks_data"
+        cache_dir.mkdir()
+        write_stock_json(_stock("AAA.US", base_score=70.0), cache_dir)
+        write_stock_json(_stock("BBB.US"), cache_dir)
+        (cache_dir / "CCC_US.json").write_text("{broken", encoding="utf-8")
+
+        assert rebuild(manifest, cache_dir) == 2
+        assert sorted(manifest.get_many()) == ["AAA.US", "BBB.US"]
+        assert manifest.get("AAA.US")["fetched_at"] == pytest.approx((cache_dir / "AAA_US.json").stat().st_mtime)
@@ -0,0 +1,93 @@
+"""
+בדיקות עבור כותב ה-cache ברקע (utils.cache_writer)
+"""
+
+import json
+import time
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import Stock
+from utils import cache_manifest
+from utils.cache_manifest import CacheManifest
+from utils.cache_writer import CacheWriter
+
+
+def _stock(symbol, base_score=None):
+    return Stock(symbol=symbol, name=f"{symbol} Inc", index="SP500", base_score=base_score)
+
+
+@pytest.fixture(autouse=True)
+def json_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "json")
+    monkeypatch.setattr(cache_manifest, "_default_manifest", CacheManifest(tmp_path / "manifest.sqlite"))
+
+
+class TestCacheWriter:
+    def test_repeated_saves_coalesce(self, tmp_path):
+        stock = _stock("AAA.US")
+        with CacheWriter(tmp_path, batch_size=100, flush_interval=60) as writer:
+            writer.save(stock)
+            stock.base_score = 70.0
+            writer.save(stock)
+            stock.potential_score = 55.0
+            writer.save(stock)
+            writer.flush()
+
+            assert (writer.saves, writer.writes) == (3, 1)
+            assert writer.flushed_state("AAA.US") == {"base_score": 70.0, "potential_score": 55.0}
+
+        data = json.loads((tmp_path / "AAA_US.json").read_text(encoding="utf-8"))
+        assert data["potential_score"] == 55.0
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_batch_flushes_in_background(self, tmp_path):
+        writer = CacheWriter(tmp_path, batch_size=2, flush_interval=60)
+        writer.save_many([_stock("AAA.US"), _stock("BBB.US")])
+
+        deadline = time.time() + 5
+        while writer.writes < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert writer.writes == 2
+        writer.close()
+
+    def test_close_flushes_pending(self, tmp_path):
+        with CacheWriter(tmp_path, batch_size=100, flush_interval=60) as writer:
+            writer.save(_stock("AAA.US", 80.0))
+        assert (tmp_path / "AAA_US.json").exists()
+
+    def test_write_errors_surface_on_flush(self, tmp_path):
+        writer = CacheWriter(tmp_path / "missing", batch_size=100, flush_interval=60)
+        writer.save(_stock("AAA.US"))
+        with pytest.raises(RuntimeError):
+            writer.flush()
+        writer.close()
+
+    def test_sqlite_backend(self, tmp_path, monkeypatch):
+        from utils.stock_store import StockStore
+        import utils.stock_store as stock_store
+
+        monkeypatch.setattr(settings, "CACHE_BACKEND", "sqlite")
+        store = StockStore(tmp_path / "stocks.sqlite")
+        monkeypatch.setattr(stock_store, "_default_store", store)
+
+        with CacheWriter(tmp_path, "Q1", 2026, batch_size=100, flush_interval=60) as writer:
+            writer.save(_stock("AAA.US", 80.0))
+
+        assert store.get("AAA.US", "Q1", 2026).base_score == 80.0
+        assert not list(tmp_path.glob("*.json"))
+        store.close()
+
+    def test_flush_updates_manifest(self, tmp_path):
+        with CacheWriter(tmp_path, batch_size=100, flush_interval=60) as writer:
+            writer.save(_stock("AAA.US", 80.0))
+            writer.save(_stock("BBB.US"))
+
+        entries = cache_manifest.get_cache_manifest().get_many(["AAA.US", "BBB.US"])
+        assert entries["AAA.US"]["has_base_score"] == 1
+        assert entries["BBB.US"]["has_base_score"] == 0
@@ -0,0 +1,92 @@
+"""
+בדיקות עבור יומן ה-checkpoint של שלב 2 (utils.checkpoint)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Stock
+from models.financial_data import FinancialData, MarketData
+from utils.checkpoint import BuildCheckpoint
+
+
+def _stock(symbol="AAPL.US"):
+    return Stock(
+        symbol=symbol,
+        name="Apple Inc",
+        index="SP500",
+        financial_data=FinancialData(
+            symbol=symbol,
+            revenues={2024: 380000, 2023: 370000},
+            net_incomes={2024: 95000, 2023: 90000},
+            total_debt=10000,
+            total_equity=200000,
+        ),
+        market_data=MarketData(
+            symbol="AAPL",
+            name="Apple Inc",
+            market_cap=3000000000000,
+            current_price=185.0,
+            price_history={"2024-12-31": 250.0},
+        ),
+        is_eligible_for_base=True,
+    )
+
+
+def _result(symbol, stock=None, failure=None, error=None):
+    result = {"symbol": symbol, "constituent": {"symbol": symbol, "name": symbol}, "stock": stock, "failure": failure}
+    if error:
+        result["error"] = error
+    return result
+
+
+class TestBuildCheckpoint:
+    def test_round_trip(self, tmp_path):
+        checkpoint = BuildCheckpoint.create("SP500", "Q1", 2026, directory=tmp_path)
+        failure = ("not_found", {"symbol": "BBB.US", "name": "BBB", "reason": "Not found"})
+        checkpoint.record(_result("AAPL.US", stock=_stock()))
+        checkpoint.record(_result("BBB.US", failure=failure))
+
+        completed = BuildCheckpoint.open(checkpoint.run_id, directory=tmp_path).load()
+
+        stock = completed["AAPL.US"]["stock"]
+        assert stock.model_dump() == _stock().model_dump()
+        assert stock.financial_data.revenues[2024] == 380000
+        assert completed["BBB.US"] == {"stock": None, "failure": failure}
+
+    def test_unclassified_errors_are_retried(self, tmp_path):
+        checkpoint = BuildCheckpoint.create("SP500", "Q1", 2026, directory=tmp_path)
+        checkpoint.record(_result("CCC.US", error="timeout"))
+        assert checkpoint.load() == {}
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        checkpoint = BuildCheckpoint.create("SP500", "Q1", 2026, directory=tmp_path)
+        checkpoint.record(_result("AAPL.US", stock=_stock()))
+        with open(checkpoint.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "stock", "symbol": "MSFT.US", "sto')
+
+        assert list(checkpoint.load()) == ["AAPL.US"]
+
+    def test_resume_appends_after_truncated_line(self, tmp_path):
+        checkpoint = BuildCheckpoint.create("SP500", "Q1", 2026, directory=tmp_path)
+        checkpoint.record(_result("AAPL.US", stock=_stock()))
+        with open(checkpoint.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "stock", "symbol": "MSFT.US", "sto')
+
+        resumed = BuildCheckpoint.open(checkpoint.run_id, directory=tmp_path)
+        resumed.record(_result("NVDA.US", stock=_stock("NVDA.US")))
+
+        assert list(resumed.load()) == ["AAPL.US", "NVDA.US"]
+
+    def test_open_restores_run_parameters(self, tmp_path):
+        checkpoint = BuildCheckpoint.create("TASE125", "Q3", 2025, directory=tmp_path)
+        reopened = BuildCheckpoint.open(checkpoint.run_id, directory=tmp_path)
+        assert (reopened.index_name, reopened.quarter, reopened.year) == ("TASE125", "Q3", 2025)
+
+    def test_open_missing_run(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            BuildCheckpoint.open("SP500_Q1_2026_missing", directory=tmp_path)
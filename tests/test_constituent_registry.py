@@ -0,0 +1,68 @@
+"""
+בדיקות עבור רישום רכיבי המדד לפי רבעון (utils.constituent_registry)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from utils.constituent_registry import ConstituentRegistry, diff_constituents
+
+
+def _members(*symbols):
+    return [{"symbol": s, "name": f"{s} Inc", "sector": "", "sub_sector": ""} for s in symbols]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ConstituentRegistry(tmp_path / "index_constituents")
+    registry.save("SP500", "Q4", 2025, _members("AAA", "BBB", "CCC"))
+    registry.save("SP500", "Q1", 2026, _members("AAA", "CCC", "DDD"))
+    registry.save("TASE125", "Q2", 2026, _members("TEVA"))
+    return registry
+
+
+class TestConstituentRegistry:
+    def test_versions_ordered_by_quarter_not_name(self, registry):
+        # By file name SP500_Q4_2025 sorts after SP500_Q1_2026
+        assert registry.versions("SP500") == [("Q4", 2025), ("Q1", 2026)]
+        assert registry.latest("SP500")[:2] == ("Q1", 2026)
+        assert registry.latest("SP500", before=("Q1", 2026))[:2] == ("Q4", 2025)
+        assert registry.latest("SP500", before=("Q4", 2025)) is None
+
+    def test_diff_against_previous_quarter(self, registry):
+        diff = registry.diff("SP500", "Q1", 2026)
+
+        assert diff["previous"] == ("Q4", 2025)
+        assert [c["symbol"] for c in diff["added"]] == ["DDD"]
+        assert [c["symbol"] for c in diff["removed"]] == ["BBB"]
+        assert [c["symbol"] for c in diff["unchanged"]] == ["AAA", "CCC"]
+
+    def test_first_version_is_all_added(self, registry):
+        diff = registry.diff("SP500", "Q4", 2025)
+        assert diff["previous"] is None
+        assert len(diff["added"]) == 3 and not diff["unchanged"]
+
+    def test_corrupt_version_is_skipped(self, registry):
+        registry.path("SP500", "Q2", 2026).write_text("{broken", encoding="utf-8")
+        assert registry.load("SP500", "Q2", 2026) is None
+        assert registry.latest("SP500")[:2] == ("Q1", 2026)
+
+    def test_diff_constituents(self):
+        diff = diff_constituents(_members("A", "B"), _members("B", "C"))
+        assert {k: [c["symbol"] for c in v] for k, v in diff.items()} == {
+            "added": ["C"], "removed": ["A"], "unchanged": ["B"],
+        }
+
+    def test_twelvedata_uses_latest_quarter(self, registry, tmp_path, monkeypatch):
+        from data_sources.twelvedata_api import TwelveDataSource
+
+        monkeypatch.setattr(settings, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+        constituents = TwelveDataSource(api_key="test").get_index_constituents("SP500")
+
+        assert [c["symbol"] for c in constituents] == ["AAA", "CCC", "DDD"]
@@ -0,0 +1,110 @@
+"""
+בדיקות עבור מנוע הכשירות העמודתי (fund_builder.eligibility)
+- תוצאות זהות ל-Stock.check_base_eligibility / check_potential_eligibility
+- סיבות כישלון לכל כלל ודוח איכות הנתונים
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from build_fund import write_data_quality_log
+from fund_builder.eligibility import EligibilityMatrix, failure_reasons, passed, screen
+from models import FinancialData, Stock
+
+
+def _universe(n=300, seed=8):
+    """מניות עם שנים חסרות, הפסדים, תזרים שלילי, מינוף גבוה ונתונים חסרים"""
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(n):
+        symbol = f"S{i:03d}.US"
+        financial = None
+        if rng.random() > 0.05:
+            def series(low, high):
+                return {y: rng.uniform(low, high) for y in range(2018, 2026) if rng.random() > 0.1}
+            financial = FinancialData(
+                symbol=symbol,
+                revenues=series(10, 1000),
+                net_incomes=series(-30, 300),
+                operating_incomes=series(-30, 400),
+                operating_cash_flows=series(-50, 400),
+                total_debt=rng.choice([None, 0.0, rng.uniform(0, 200)]),
+                total_equity=rng.choice([None, -10.0, rng.uniform(10, 300)]),
+            )
+        stocks.append(Stock(symbol=symbol, name=symbol, index="SP500", financial_data=financial))
+    return stocks
+
+
+def _stock(**financial):
+    return Stock(symbol="X.US", name="X", index="SP500", financial_data=FinancialData(symbol="X.US", **financial))
+
+
+class TestEligibility:
+    @pytest.mark.parametrize("base_rules,potential_rules", [
+        ({"min_profitable_years": 5, "min_operating_profit_years": 4, "max_debt_to_equity": 0.60},
+         {"min_profitable_years": 2}),
+        ({"min_profitable_years": 3, "min_operating_profit_years": 3, "max_debt_to_equity": 1.5},
+         {"min_profitable_years": 4}),
+    ])
+    def test_identical_to_stock_checks(self, base_rules, potential_rules):
+        stocks = _universe()
+        expected_base = [s.model_copy().check_base_eligibility(**base_rules) for s in stocks]
+        expected_potential = [s.model_copy().check_potential_eligibility(**potential_rules) for s in stocks]
+
+        result = screen(stocks, base_rules, potential_rules)
+
+        assert result["base"].tolist() == expected_base
+        assert result["potential"].tolist() == expected_potential
+        assert [s.is_eligible_for_base for s in stocks] == expected_base
+        assert 0 < sum(expected_base) < len(stocks)
+
+    def test_screen_clears_stale_flags(self):
+        stock = _stock(net_incomes={2024: -1.0, 2025: 5.0})
+        stock.is_eligible_for_base = stock.is_eligible_for_potential = True
+        screen([stock])
+        assert not stock.is_eligible_for_base
+        assert not stock.is_eligible_for_potential
+
+    def test_failure_reasons(self):
+        years = range(2021, 2026)
+        stocks = [
+            Stock(symbol="NONE.US", name="None", index="SP500"),
+            _stock(
+                net_incomes={y: 10.0 for y in years},
+                operating_incomes={y: (10.0 if y > 2022 else -1.0) for y in years},
+                operating_cash_flows={2024: 5.0, 2025: -5.0},
+                total_debt=90.0, total_equity=100.0,
+            ),
+        ]
+        failures = EligibilityMatrix(stocks).base_failures()
+
+        assert failure_reasons(failures, 0) == ["financial_data"]
+        assert failure_reasons(failures, 1) == ["operating_profit_years", "positive_cash_flow", "debt_to_equity"]
+        assert not passed(failures).any()
+
+    def test_empty_universe(self):
+        result = screen([])
+        assert result["base"].size == 0 and result["potential"].size == 0
+
+    def test_data_quality_log_lists_reasons(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        stocks = _universe(n=40)
+        eligibility = screen(stocks)
+
+        log_file = write_data_quality_log(
+            "SP500", "Q1", 2026, [{"symbol": s.symbol} for s in stocks], stocks,
+            {"not_found": [], "api_error": [], "financial_validation": [], "pricing_validation": []},
+            eligibility=eligibility,
+        )
+        content = Path(log_file).read_text(encoding="utf-8")
+
+        assert "ELIGIBILITY SCREENING" in content
+        assert f"Base eligible: {int(eligibility['base'].sum())} / 40" in content
+        failing = next(i for i, ok in enumerate(eligibility["base"]) if not ok)
+        reasons = ", ".join(failure_reasons(eligibility["base_failures"], failing))
+        assert f"- {stocks[failing].symbol}: {reasons}" in content
@@ -0,0 +1,261 @@
+"""
+בדיקות עבור השליפה המקבילית של רכיבי מדד (fund_builder.fetcher)
+"""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from fund_builder.fetcher import ConstituentFetcher
+from models.financial_data import FinancialData, MarketData
+from data_sources.exceptions import (
+    DataSourceError,
+    DataSourceNotFoundError,
+    DataSourceRateLimitError,
+)
+
+
+class FakeSource:
+    """מקור נתונים מזויף - כל סימול ממופה להתנהגות שלו"""
+
+    def __init__(self, behaviours, delay=0.0):
+        self.behaviours = behaviours
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get_stock_data(self, symbol, years=5):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            behaviour = self.behaviours.get(symbol)
+            if behaviour is not None:
+                raise behaviour
+            raise ValueError("unexpected payload")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+FISCAL_DATES = ["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31", "2020-12-31"]
+
+
+class FakeFinancialSource:
+    """מקור פיננסי מזויף עם נתונים תקינים ו-fiscal dates כמו TwelveData"""
+
+    def __init__(self):
+        self._last_fiscal_dates = {}
+        self.calls = []
+
+    def get_stock_financials(self, symbol, years=5):
+        self.calls.append(symbol)
+        self._last_fiscal_dates[symbol] = FISCAL_DATES
+        values = {2020 + i: 100.0 + i * 10 for i in range(5)}
+        return FinancialData(
+            symbol=symbol,
+            revenues=values,
+            net_incomes=values,
+            operating_incomes=values,
+            operating_cash_flows=values,
+            total_debt=10.0,
+            total_equity=100.0,
+        )
+
+
+class FakeBulkPricingSource:
+    """מקור מחירים מזויף עם ממשק get_bulk_market_data"""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.batches = []
+        self.single_calls = 0
+
+    def _market_data(self, symbol, fiscal_dates):
+        return MarketData(
+            symbol=symbol,
+            name=symbol,
+            market_cap=1e9,
+            current_price=50.0,
+            price_history={d: 40.0 for d in fiscal_dates or []},
+        )
+
+    def get_stock_market_data(self, symbol, fiscal_dates=None):
+        self.single_calls += 1
+        return self._market_data(symbol, fiscal_dates)
+
+    def get_bulk_market_data(self, symbols, fiscal_dates_by_symbol=None):
+        self.batches.append(list(symbols))
+        return {
+            s: self._market_data(s, fiscal_dates_by_symbol[s])
+            for s in symbols if s not in self.missing
+        }
+
+
+class FakeAsyncSource:
+    """לקוח אסינכרוני מזויף - הדוחות של המניה הראשונה מגיעים, והשאר ממתינים לסיום עיבודה"""
+
+    def __init__(self, financial, first_processed):
+        self.financial = financial
+        self.first_processed = first_processed
+        self.overlapped = None
+
+    def prefetch_financials(self, symbols, years=5, on_done=None):
+        results = {}
+        for i, symbol in enumerate(symbols):
+            results[symbol] = (self.financial.get_stock_financials(symbol), FISCAL_DATES)
+            on_done(symbol, results[symbol])
+            if i == 0:
+                self.overlapped = self.first_processed.wait(timeout=5)
+        return results
+
+
+class BrokenAsyncSource:
+    def prefetch_financials(self, symbols, years=5, on_done=None):
+        raise RuntimeError("event loop died")
+
+
+def _constituents(*symbols):
+    return [{"symbol": s, "name": f"{s} Inc"} for s in symbols]
+
+
+class TestConstituentFetcher:
+    def test_symbol_suffix(self):
+        source = FakeSource({})
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=1)
+        assert fetcher.normalize_symbol({"symbol": "AAPL"}) == "AAPL.US"
+        assert fetcher.normalize_symbol({"symbol": "AAPL.US"}) == "AAPL.US"
+
+        fetcher = ConstituentFetcher("TASE125", source, source, max_workers=1)
+        assert fetcher.normalize_symbol({"symbol": "TEVA"}) == "TEVA.TA"
+
+    def test_results_in_input_order_with_failures(self):
+        source = FakeSource({
+            "AAA.US": DataSourceNotFoundError("missing"),
+            "BBB.US": DataSourceError("boom"),
+        })
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=4)
+        seen = []
+        results = fetcher.fetch_all(_constituents("AAA", "BBB", "CCC"), on_result=seen.append)
+
+        assert [r["symbol"] for r in results] == ["AAA.US", "BBB.US", "CCC.US"]
+        assert len(seen) == 3
+        assert results[0]["failure"][0] == "not_found"
+        assert results[1]["failure"][0] == "api_error"
+        assert results[1]["failure"][1]["reason"] == "API error: boom"
+        # Unclassified errors are skipped without a failure category
+        assert results[2]["failure"] is None
+        assert results[2]["stock"] is None
+        assert "unexpected payload" in results[2]["error"]
+
+    def test_runs_concurrently(self):
+        source = FakeSource({}, delay=0.05)
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=4)
+        fetcher.fetch_all(_constituents("A", "B", "C", "D", "E", "F", "G", "H"))
+        assert 1 < source.max_active <= 4
+
+    def test_rate_limit_stops_run(self):
+        source = FakeSource({"BBB.US": DataSourceRateLimitError("quota")})
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=2)
+        with pytest.raises(DataSourceRateLimitError):
+            fetcher.fetch_all(_constituents("AAA", "BBB", "CCC"))
+
+
+class TestBulkPricing:
+    def test_prices_in_batches(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 2)
+        pricing = FakeBulkPricingSource()
+        fetcher = ConstituentFetcher("SP500", FakeFinancialSource(), pricing, max_workers=2)
+        assert fetcher.use_bulk_pricing
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB", "CCC"))
+
+        assert all(r["stock"] is not None for r in results)
+        assert sorted(len(b) for b in pricing.batches) == [1, 2]
+        assert pricing.single_calls == 0
+        # yfinance symbols have the .US suffix stripped
+        assert "AAA" in sum(pricing.batches, [])
+
+    def test_missing_symbol_is_not_found(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 10)
+        pricing = FakeBulkPricingSource(missing={"BBB"})
+        fetcher = ConstituentFetcher("SP500", FakeFinancialSource(), pricing, max_workers=2)
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB"))
+
+        assert results[0]["stock"] is not None
+        assert results[1]["failure"][0] == "not_found"
+
+    def test_disabled_falls_back_to_per_symbol(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 0)
+        pricing = FakeBulkPricingSource()
+        fetcher = ConstituentFetcher("SP500", FakeFinancialSource(), pricing, max_workers=2)
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB"))
+
+        assert all(r["stock"] is not None for r in results)
+        assert pricing.batches == []
+        assert pricing.single_calls == 2
+
+
+class TestSeededFinancials:
+    def test_seeded_symbols_skip_statements_but_are_priced(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 10)
+        financial = FakeFinancialSource()
+        pricing = FakeBulkPricingSource()
+        fetcher = ConstituentFetcher("SP500", financial, pricing, max_workers=2)
+
+        cached = financial.get_stock_financials("AAA.US")
+        financial.calls.clear()
+        cached_dates = [f"{year}-06-30" for year in range(2024, 2019, -1)]
+        fetcher.seed_financials({"AAA.US": (cached, cached_dates)})
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB"))
+
+        assert financial.calls == ["BBB.US"]
+        assert results[0]["reused_financials"] and not results[1]["reused_financials"]
+        # Cached fiscal dates drive the price refresh
+        assert sorted(results[0]["stock"].market_data.price_history) == sorted(cached_dates)
+        assert results[1]["stock"] is not None
+
+
+class TestAsyncStatements:
+    def test_symbols_reach_the_pool_as_their_statements_arrive(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 0)
+        financial = FakeFinancialSource()
+        first_processed = threading.Event()
+        async_source = FakeAsyncSource(financial, first_processed)
+        fetcher = ConstituentFetcher(
+            "SP500", financial, FakeBulkPricingSource(), max_workers=2, async_source=async_source
+        )
+
+        def on_result(result):
+            if result["symbol"] == "AAA.US":
+                first_processed.set()
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB", "CCC"), on_result=on_result)
+
+        assert async_source.overlapped
+        assert [r["symbol"] for r in results] == ["AAA.US", "BBB.US", "CCC.US"]
+        assert all(r["stock"] is not None for r in results)
+        assert financial.calls == ["AAA.US", "BBB.US", "CCC.US"]  # all from the async client
+
+    def test_failed_async_client_falls_back_to_workers(self, monkeypatch):
+        monkeypatch.setattr(settings, "PRICING_BATCH_SIZE", 0)
+        financial = FakeFinancialSource()
+        fetcher = ConstituentFetcher(
+            "SP500", financial, FakeBulkPricingSource(), max_workers=2, async_source=BrokenAsyncSource()
+        )
+
+        results = fetcher.fetch_all(_constituents("AAA", "BBB"))
+
+        assert all(r["stock"] is not None for r in results)
+        assert sorted(financial.calls) == ["AAA.US", "BBB.US"]
@@ -0,0 +1,80 @@
+"""
+בדיקות עבור לוח הדיווחים של הבנייה האינקרמנטלית (utils.filing_calendar)
+"""
+
+import pytest
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import Stock
+from models.financial_data import FinancialData, MarketData
+from utils.filing_calendar import (
+    cached_fiscal_dates,
+    may_have_new_statements,
+    next_filing_date,
+    plan_incremental_refresh,
+)
+
+
+def _stock(fiscal_dates=("2024-09-28", "2023-09-30"), index="SP500"):
+    return Stock(
+        symbol="AAPL.US",
+        name="Apple Inc",
+        index=index,
+        financial_data=FinancialData(symbol="AAPL.US", revenues={2024: 391.0, 2023: 383.0}),
+        market_data=MarketData(
+            symbol="AAPL",
+            name="Apple Inc",
+            market_cap=3e12,
+            current_price=185.0,
+            price_history={d: 180.0 for d in fiscal_dates},
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def lags(monkeypatch):
+    monkeypatch.setattr(settings, "FILING_LAG_DAYS_US", 30)
+    monkeypatch.setattr(settings, "FILING_LAG_DAYS_TASE", 60)
+
+
+class TestFilingCalendar:
+    def test_fiscal_dates_from_price_history(self):
+        assert cached_fiscal_dates(_stock()) == ["2024-09-28", "2023-09-30"]
+
+    def test_fiscal_dates_fall_back_to_statement_years(self):
+        stock = _stock(fiscal_dates=())
+        assert cached_fiscal_dates(stock) == ["2024-12-31", "2023-12-31"]
+
+    def test_next_filing_date_per_market(self):
+        assert next_filing_date("2024-12-31", "SP500") == date(2026, 1, 30)
+        assert next_filing_date("2024-12-31", "TASE125") == date(2026, 3, 1)
+
+    def test_no_new_report_before_lag(self):
+        assert not may_have_new_statements(_stock(), "SP500", today=date(2025, 10, 15))
+
+    def test_new_report_possible_after_lag(self):
+        assert may_have_new_statements(_stock(), "SP500", today=date(2025, 10, 28))
+
+    def test_missing_cache_is_refreshed(self):
+        assert may_have_new_statements(None, "SP500")
+
+
+class TestPlanIncrementalRefresh:
+    def test_split(self):
+        stale = _stock(fiscal_dates=("2023-12-31",))
+        plan = plan_incremental_refresh(
+            {"AAPL.US": _stock(), "OLD.US": stale, "NEW.US": None},
+            "SP500",
+            today=date(2025, 6, 1),
+        )
+
+        assert sorted(plan["refresh"]) == ["NEW.US", "OLD.US"]
+        financial_data, fiscal_dates = plan["reuse"]["AAPL.US"]
+        assert financial_data.revenues[2024] == 391.0
+        assert fiscal_dates == ["2024-09-28", "2023-09-30"]
@@ -0,0 +1,125 @@
+"""
+בדיקות עבור הדירוג האינקרמנטלי (fund_builder.incremental_ranking)
+- אחרי כל עדכון הדירוג זהה (ביט לביט) לדירוג מלא של scoring_engine
+- נרמול מלא רק כשעדכון מזיז קיצון
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fund_builder.incremental_ranking import IncrementalRanking
+from fund_builder.scoring_engine import rank_base, rank_potential
+from models import FinancialData, MarketData, Stock
+
+
+def _stock(rng, i):
+    symbol = f"S{i:03d}.US"
+    years = range(2021, 2026)
+    return Stock(
+        symbol=symbol, name=symbol, index="SP500",
+        financial_data=FinancialData(
+            symbol=symbol,
+            revenues={y: rng.uniform(100, 1000) for y in years},
+            net_incomes={y: rng.uniform(10, 300) for y in years},
+        ),
+        market_data=MarketData(
+            symbol=symbol, name=symbol,
+            market_cap=rng.uniform(1e9, 1e11),
+            current_price=rng.uniform(10, 200),
+            pe_ratio=rng.uniform(5, 40),
+            price_history={"2024-12-31": rng.uniform(10, 200), "2025-12-31": rng.uniform(10, 200)},
+        ),
+    )
+
+
+def _tick(rng, stock, scale=0.02):
+    """עדכון קטן: מחיר ושווי שוק זזים בכמה אחוזים"""
+    market = stock.market_data.model_copy(update={
+        "current_price": stock.market_data.current_price * (1 + rng.uniform(-scale, scale)),
+        "market_cap": stock.market_data.market_cap * (1 + rng.uniform(-scale, scale)),
+    })
+    return stock.model_copy(update={"market_data": market})
+
+
+def _snapshot(stocks, score_field, detail_field):
+    return [(s.symbol, getattr(s, score_field), getattr(s, detail_field)) for s in stocks]
+
+
+class TestIncrementalRanking:
+    @pytest.mark.parametrize("kind", ["base", "potential"])
+    def test_matches_full_ranking_after_every_update(self, kind):
+        rng = random.Random(3)
+        universe = {s.symbol: s for s in (_stock(rng, i) for i in range(80))}
+        ranking = IncrementalRanking(list(universe.values()), kind=kind, index_pe=20.0)
+
+        for step in range(200):
+            symbol = rng.choice(list(universe))
+            action = rng.random()
+            if action < 0.05:
+                universe.pop(symbol)
+                ranking.remove(symbol)
+            elif action < 0.1:
+                new = _stock(rng, 100 + step)
+                universe[new.symbol] = new
+                ranking.update(new)
+            else:
+                universe[symbol] = _tick(rng, universe[symbol], scale=0.5 if action > 0.97 else 0.02)
+                ranking.update(universe[symbol])
+
+            # Reference: a full ranking of fresh copies, in insertion order
+            fresh = [s.model_copy(deep=True) for s in universe.values()]
+            if kind == "base":
+                expected = _snapshot(rank_base(fresh), "base_score", "base_scores_detail")
+                actual = _snapshot(ranking.ranked(), "base_score", "base_scores_detail")
+            else:
+                expected = _snapshot(rank_potential(fresh, 20.0), "potential_score", "potential_scores_detail")
+                actual = _snapshot(ranking.ranked(), "potential_score", "potential_scores_detail")
+            assert actual == expected, f"diverged at step {step}"
+
+        assert ranking.incremental_updates > ranking.full_renormalizations
+
+    def test_update_inside_extremes_skips_renormalization(self):
+        rng = random.Random(5)
+        stocks = [_stock(rng, i) for i in range(20)]
+        ranking = IncrementalRanking(stocks, kind="base")
+        middle = ranking.ranked()[10]
+        unchanged = {s.symbol: s.base_score for s in stocks if s is not middle}
+
+        bumped = middle.model_copy(update={"market_data": middle.market_data.model_copy(update={
+            "market_cap": middle.market_data.market_cap * 1.0001,
+        })})
+        assert ranking.update(bumped) is False
+        assert ranking.full_renormalizations == 1
+        assert {s.symbol: s.base_score for s in stocks if s is not middle} == unchanged
+        assert ranking.rank_of(bumped.symbol) == ranking.ranked().index(bumped)
+
+    def test_new_extreme_triggers_renormalization(self):
+        rng = random.Random(6)
+        stocks = [_stock(rng, i) for i in range(20)]
+        ranking = IncrementalRanking(stocks, kind="base")
+        giant = stocks[0].model_copy(update={"market_data": stocks[0].market_data.model_copy(update={
+            "market_cap": 1e15,
+        })})
+
+        assert ranking.update(giant) is True
+        assert ranking.full_renormalizations == 2
+        assert giant.base_scores_detail["market_cap_normalized"] == 100.0
+
+    def test_stock_without_financials_leaves_base_ranking(self):
+        rng = random.Random(7)
+        stocks = [_stock(rng, i) for i in range(5)]
+        ranking = IncrementalRanking(stocks, kind="base")
+
+        ranking.update(stocks[2].model_copy(update={"financial_data": None}))
+        assert stocks[2].symbol not in ranking
+        assert len(ranking) == 4
+        assert ranking.rank_of(stocks[2].symbol) is None
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            IncrementalRanking([], kind="growth")
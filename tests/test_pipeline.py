@@ -0,0 +1,132 @@
+"""
+בדיקות עבור הצנרת הזורמת של שלב 2 (fund_builder.pipeline)
+- שליפה עם defer_finish + צנרת נותנת את אותן תוצאות כמו שליפה רגילה
+- תורים חסומים: שלב איטי מאט את המזין ונמדד כ-blocked
+- שגיאה בשלב עוצרת את הזרם ומגיעה למזין
+"""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from fund_builder.fetcher import ConstituentFetcher
+from fund_builder.pipeline import StreamingPipeline, fetch_pipeline, format_metrics
+from models.financial_data import FinancialData, MarketData
+from data_sources.exceptions import DataSourceRateLimitError
+
+
+class FakeSource:
+    """מקור מאוחד מזויף: נתונים תקינים, מחיר שלילי עבור BAD, חסימה עבור STOP"""
+
+    def get_stock_data(self, symbol, years=5):
+        if symbol == "STOP.US":
+            raise DataSourceRateLimitError("quota")
+        values = {2021 + i: 100.0 + i * 10 for i in range(5)}
+        financial = FinancialData(
+            symbol=symbol, revenues=values, net_incomes=values, operating_incomes=values,
+            operating_cash_flows=values, total_debt=10.0, total_equity=100.0,
+        )
+        market = MarketData(
+            symbol=symbol, name=symbol, market_cap=1e9,
+            current_price=-1.0 if symbol == "BAD.US" else 50.0,
+            price_history={"2024-12-31": 40.0, "2025-12-31": 45.0},
+        )
+        return financial, market
+
+
+def _constituents(*symbols):
+    return [{"symbol": s, "name": f"{s} Inc"} for s in symbols]
+
+
+def _summary(results):
+    return [(r["symbol"], r["stock"] is not None, r["failure"] and r["failure"][0]) for r in results]
+
+
+class TestFetchPipeline:
+    def test_same_results_as_inline_fetch(self):
+        symbols = ("AAA", "BAD", "CCC", "DDD", "EEE")
+        source = FakeSource()
+        expected = ConstituentFetcher("SP500", source, source, max_workers=2).fetch_all(_constituents(*symbols))
+
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=2, defer_finish=True)
+        persisted = []
+        with fetch_pipeline(fetcher, persisted.append, queue_size=2, validate_workers=2) as pipeline:
+            results = fetcher.fetch_all(_constituents(*symbols), on_result=pipeline.put)
+
+        assert _summary(results) == _summary(expected)
+        assert results[1]["failure"][0] == "pricing_validation"
+        assert all("market_data" not in r for r in results)
+        assert sorted(r["symbol"] for r in persisted) == sorted(f"{s}.US" for s in symbols)
+
+        metrics = {m["stage"]: m for m in pipeline.metrics()}
+        assert [m["stage"] for m in pipeline.metrics()] == ["fetch", "validate", "persist"]
+        assert metrics["fetch"]["processed"] == metrics["persist"]["processed"] == len(symbols)
+        assert metrics["validate"]["max_queue_depth"] <= 2
+
+    def test_rate_limit_still_persists_finished_results(self):
+        source = FakeSource()
+        fetcher = ConstituentFetcher("SP500", source, source, max_workers=1, defer_finish=True)
+        persisted = []
+        with pytest.raises(DataSourceRateLimitError):
+            with fetch_pipeline(fetcher, persisted.append) as pipeline:
+                fetcher.fetch_all(_constituents("AAA", "STOP", "CCC"), on_result=pipeline.put)
+        assert "AAA.US" in [r["symbol"] for r in persisted]
+
+
+class TestStreamingPipeline:
+    def test_slow_stage_applies_backpressure(self):
+        done = []
+
+        def slow(item):
+            time.sleep(0.01)
+            done.append(item)
+
+        with StreamingPipeline([("double", lambda x: x * 2, 1), ("slow", slow, 1)], queue_size=2) as pipeline:
+            for i in range(20):
+                pipeline.put(i)
+
+        assert done == [i * 2 for i in range(20)]
+        source, double, slow_stage = pipeline.metrics()
+        assert double["blocked_seconds"] > 0.05  # waited on the slow stage's full queue
+        assert slow_stage["max_queue_depth"] <= 2
+        assert slow_stage["busy_seconds"] >= 0.2
+        assert "slow" in format_metrics(pipeline.metrics())
+
+    def test_stage_error_stops_stream(self):
+        def explode(item):
+            if item == 3:
+                raise OSError("disk full")
+            return item
+
+        pipeline = StreamingPipeline([("persist", explode, 2)], queue_size=1)
+        with pytest.raises(RuntimeError, match="disk full"):
+            for i in range(100):
+                pipeline.put(i)
+        with pytest.raises(RuntimeError):
+            pipeline.close()
+        assert all(not t.is_alive() for t in threading.enumerate() if t.name.startswith("pipeline-persist"))
+
+    def test_parallel_workers_per_stage(self, monkeypatch):
+        monkeypatch.setattr(settings, "PIPELINE_QUEUE_SIZE", 8)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work(item):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        with StreamingPipeline([("work", work, 3)]) as pipeline:
+            for i in range(12):
+                pipeline.put(i)
+        assert 1 < peak[0] <= 3
+        assert pipeline.metrics()[1]["queue_capacity"] == 8
@@ -0,0 +1,162 @@
+"""
+בדיקות עבור חיפוש מחיר ליום המסחר הקרוב (utils.price_lookup)
+ועבור שליפת מחירי fiscal ב-TwelveDataSource בבקשת /time_series אחת
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from utils.price_lookup import nearest_prior_close, prices_for_dates
+from data_sources.twelvedata_api import TwelveDataSource
+
+
+# 2023-12-29 is a Friday; 2023-12-30/31 fall on the weekend
+CLOSES = {
+    "2022-12-29": 95.0,
+    "2022-12-30": 96.0,
+    "2023-12-28": 110.0,
+    "2023-12-29": 111.0,
+    "2024-01-02": 112.0,
+}
+
+
+class TestNearestPriorClose:
+    def test_exact_date(self):
+        dates = sorted(CLOSES)
+        closes = [CLOSES[d] for d in dates]
+        assert nearest_prior_close(dates, closes, "2023-12-29") == ("2023-12-29", 111.0)
+
+    def test_weekend_falls_back_to_friday(self):
+        dates = sorted(CLOSES)
+        closes = [CLOSES[d] for d in dates]
+        assert nearest_prior_close(dates, closes, "2023-12-31") == ("2023-12-29", 111.0)
+
+    def test_gap_beyond_limit(self):
+        dates = sorted(CLOSES)
+        closes = [CLOSES[d] for d in dates]
+        assert nearest_prior_close(dates, closes, "2023-06-30") is None
+
+    def test_before_first_date(self):
+        assert nearest_prior_close(["2024-01-02"], [1.0], "2023-12-31") is None
+
+    def test_never_looks_forward(self):
+        dates = sorted(CLOSES)
+        closes = [CLOSES[d] for d in dates]
+        # 2024-01-01 (holiday) must not pick 2024-01-02
+        assert nearest_prior_close(dates, closes, "2024-01-01") == ("2023-12-29", 111.0)
+
+
+class TestPricesForDates:
+    def test_maps_all_targets(self):
+        result = prices_for_dates(CLOSES, ["2023-12-31", "2022-12-31"])
+        assert result == {"2023-12-31": 111.0, "2022-12-31": 96.0}
+
+    def test_missing_targets_are_omitted(self):
+        assert prices_for_dates(CLOSES, ["2020-12-31"]) == {}
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = "/" + url.rsplit("/", 1)[-1]
+        self.calls.append((endpoint, dict(params)))
+        if endpoint == "/time_series":
+            values = [{"datetime": d, "close": str(c * 100)} for d, c in sorted(CLOSES.items(), reverse=True)]
+            return FakeResponse({"values": values, "status": "ok"})
+        if endpoint == "/quote":
+            return FakeResponse({"close": "11200", "name": "Test Ltd"})
+        return FakeResponse({"statistics": {"valuations_metrics": {}}})
+
+
+class TestTwelveDataPriceHistory:
+    @pytest.fixture
+    def source(self, monkeypatch):
+        monkeypatch.setattr(settings, "TWELVEDATA_CREDITS_PER_MINUTE", 100000)
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+        source = TwelveDataSource(api_key="test")
+        source.session = FakeSession()
+        return source
+
+    def test_single_time_series_request(self, source):
+        market_data = source.get_stock_market_data("TEST.TA", fiscal_dates=["2023-12-31", "2022-12-31"])
+
+        endpoints = [endpoint for endpoint, _ in source.session.calls]
+        assert endpoints.count("/time_series") == 1
+        assert "/eod" not in endpoints
+
+        # TASE prices are converted from agorot
+        assert market_data.price_history == {"2023-12-31": 111.0, "2022-12-31": 96.0}
+
+    def test_range_covers_all_fiscal_dates(self, source):
+        source.get_stock_market_data("TEST.TA", fiscal_dates=["2023-12-31", "2022-12-31"])
+        params = next(p for endpoint, p in source.session.calls if endpoint == "/time_series")
+        assert params["start_date"] < "2022-12-28"
+        assert params["end_date"] > "2023-12-31"
+        assert params["exchange"] == "TASE"
+
+
+class TestYFinanceBulkMarketData:
+    @pytest.fixture
+    def source(self, monkeypatch):
+        import pandas as pd
+        import yfinance as yf
+        from data_sources.yfinance_source import YFinanceSource
+
+        index = pd.to_datetime(sorted(CLOSES))
+        columns = pd.MultiIndex.from_product([["Close", "Open"], ["AAA", "BBB"]])
+        values = [[CLOSES[d], CLOSES[d] * 2, 0.0, 0.0] for d in sorted(CLOSES)]
+        frame = pd.DataFrame(values, index=index, columns=columns)
+
+        downloads = []
+
+        def fake_download(tickers, **kwargs):
+            downloads.append(list(tickers))
+            return frame
+
+        class FakeTicker:
+            def __init__(self, symbol):
+                self.info = {"currentPrice": 120.0, "marketCap": 5e9, "trailingPE": 20.0, "longName": symbol}
+
+        monkeypatch.setattr(yf, "download", fake_download)
+        monkeypatch.setattr(yf, "Ticker", FakeTicker)
+        monkeypatch.setattr(settings, "PRICE_STORE_ENABLED", False)  # covered by test_price_store
+        source = YFinanceSource()
+        source.downloads = downloads
+        return source
+
+    def test_one_download_for_all_symbols(self, source):
+        fiscal = {"AAA": ["2023-12-31", "2022-12-31"], "BBB": ["2023-12-31"]}
+        result = source.get_bulk_market_data(["AAA", "BBB"], fiscal)
+
+        assert source.downloads == [["AAA", "BBB"]]
+        assert result["AAA"].price_history == {"2023-12-31": 111.0, "2022-12-31": 96.0}
+        assert result["BBB"].price_history == {"2023-12-31": 222.0}
+        assert result["AAA"].current_price == 120.0
+        assert result["BBB"].pe_ratio == 20.0
+
+    def test_no_fiscal_dates_skips_download(self, source):
+        result = source.get_bulk_market_data(["AAA"])
+        assert source.downloads == []
+        assert result["AAA"].price_history == {}
+        assert result["AAA"].market_cap == 5e9
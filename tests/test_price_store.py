@@ -0,0 +1,154 @@
+"""
+בדיקות עבור מאגר מחירי הסגירה היומיים (utils.price_store)
+"""
+
+import threading
+import pytest
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.price_store import PriceStore
+
+
+def _trading_days(start: str, end: str):
+    day, last = date.fromisoformat(start), date.fromisoformat(end)
+    while day <= last:
+        if day.weekday() < 5:
+            yield day.isoformat()
+        day += timedelta(days=1)
+
+
+class FakeDownloader:
+    """מוריד מחירים דטרמיניסטי שרושם כל קריאה"""
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self.calls = []
+
+    def __call__(self, symbols, start, end):
+        self.calls.append((list(symbols), start, end))
+        return {
+            symbol: {d: self.scale * (100 + date.fromisoformat(d).toordinal() % 50) for d in _trading_days(start, end)}
+            for symbol in symbols
+        }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(tmp_path / "prices")
+
+
+class TestPriceStore:
+    def test_ensure_downloads_once_per_group(self, store):
+        downloader = FakeDownloader()
+        added = store.ensure(["AAA", "BBB"], "2024-01-01", "2024-01-31", downloader)
+
+        assert len(downloader.calls) == 1
+        assert added == 2 * 23
+        assert store.covered_range("AAA") == ("2024-01-01", "2024-01-31")
+
+        # Fully covered: no further downloads
+        assert store.ensure(["AAA", "BBB"], "2024-01-10", "2024-01-20", downloader) == 0
+        assert len(downloader.calls) == 1
+
+    def test_append_fetches_only_missing_dates(self, store):
+        downloader = FakeDownloader()
+        store.ensure(["AAA"], "2024-01-01", "2024-01-31", downloader)
+        store.ensure(["AAA"], "2024-01-01", "2024-02-29", downloader)
+
+        # Re-fetch starts at the last stored trading day (overlap check), not at the beginning
+        assert downloader.calls[-1] == (["AAA"], "2024-01-31", "2024-02-29")
+        series = store.closes("AAA")
+        assert list(series.index.strftime("%Y-%m-%d")) == list(_trading_days("2024-01-01", "2024-02-29"))
+
+    def test_adjustment_change_rebuilds_series(self, store):
+        store.ensure(["AAA"], "2024-01-01", "2024-01-31", FakeDownloader())
+        rescaled = FakeDownloader(scale=0.5)  # e.g. a 2:1 split re-based the adjusted history
+        store.ensure(["AAA"], "2024-01-01", "2024-02-29", rescaled)
+
+        assert rescaled.calls[-1] == (["AAA"], "2024-01-01", "2024-02-29")
+        expected = rescaled(["AAA"], "2024-01-01", "2024-02-29")["AAA"]
+        assert list(store.closes("AAA").values) == pytest.approx(list(expected.values()))
+
+    def test_extending_backwards_rewrites_range(self, store):
+        downloader = FakeDownloader()
+        store.ensure(["AAA"], "2024-02-01", "2024-02-29", downloader)
+        store.ensure(["AAA"], "2024-01-01", "2024-02-15", downloader)
+
+        assert downloader.calls[-1] == (["AAA"], "2024-01-01", "2024-02-29")
+        assert store.covered_range("AAA") == ("2024-01-01", "2024-02-29")
+        assert len(store.closes("AAA")) == 21 + 23
+
+    def test_as_of_lookup(self, store):
+        store.ensure(["AAA"], "2023-12-01", "2023-12-31", FakeDownloader())
+        expected = FakeDownloader()(["AAA"], "2023-12-29", "2023-12-29")["AAA"]["2023-12-29"]
+
+        # 2023-12-31 is a Sunday: nearest prior trading day is Friday the 29th
+        assert store.as_of("AAA", "2023-12-31") == ("2023-12-29", expected)
+        assert store.prices_for_dates("AAA", ["2023-12-31", "2023-11-01"], max_days_back=5) == {"2023-12-31": expected}
+        assert store.as_of("AAA", "2024-01-10", max_days_back=5) is None
+
+    def test_today_is_never_stored(self, store):
+        today = date.today().isoformat()
+        store.ensure(["AAA"], (date.today() - timedelta(days=10)).isoformat(), today, FakeDownloader())
+
+        assert store.covered_range("AAA")[1] < today
+        assert today not in set(store.closes("AAA").index.strftime("%Y-%m-%d"))
+
+    def test_empty_download_is_retried(self, store):
+        store.ensure(["GONE"], "2024-01-01", "2024-01-31", lambda symbols, start, end: {})
+        assert store.covered_range("GONE") is None
+
+        downloader = FakeDownloader()
+        store.ensure(["GONE"], "2024-01-01", "2024-01-31", downloader)
+        assert len(downloader.calls) == 1
+
+    def test_reopen_reads_existing_files(self, store, tmp_path):
+        store.ensure(["AAA"], "2024-01-01", "2024-01-31", FakeDownloader())
+        reopened = PriceStore(tmp_path / "prices")
+
+        assert reopened.closes("AAA", "2024-01-08", "2024-01-12").equals(store.closes("AAA", "2024-01-08", "2024-01-12"))
+        assert len(reopened.closes("AAA", "2024-01-08", "2024-01-12")) == 5
+
+    def test_downloads_do_not_block_each_other(self, store):
+        both_downloading = threading.Barrier(2, timeout=5)
+        inner = FakeDownloader()
+
+        def downloader(symbols, start, end):
+            both_downloading.wait()  # BrokenBarrierError if the store serialized the downloads
+            return inner(symbols, start, end)
+
+        threads = [
+            threading.Thread(target=store.ensure, args=([symbol], "2024-01-01", "2024-01-31", downloader))
+            for symbol in ("AAA", "BBB")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.covered_range("AAA") == store.covered_range("BBB") == ("2024-01-01", "2024-01-31")
+
+    def test_concurrent_ensure_of_one_symbol_stores_it_once(self, store):
+        both_downloading = threading.Barrier(2, timeout=5)
+        inner = FakeDownloader()
+
+        def downloader(symbols, start, end):
+            both_downloading.wait()
+            return inner(symbols, start, end)
+
+        results = []
+
+        def ensure():
+            results.append(store.ensure(["AAA"], "2024-01-01", "2024-01-31", downloader))
+
+        threads = [threading.Thread(target=ensure) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == [0, 23]
+        assert list(store.closes("AAA").index.strftime("%Y-%m-%d")) == list(_trading_days("2024-01-01", "2024-01-31"))
@@ -0,0 +1,95 @@
+"""
+בדיקות עבור מתזמן הזיכויים (data_sources.rate_limiter)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_sources.rate_limiter import TokenBucket, endpoint_cost
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestEndpointCost:
+    def test_statement_costs(self):
+        assert endpoint_cost("/income_statement") == 100
+        assert endpoint_cost("/balance_sheet") == 100
+        assert endpoint_cost("/cash_flow") == 100
+
+    def test_price_costs(self):
+        assert endpoint_cost("/eod") == 1
+        assert endpoint_cost("/quote") == 1
+
+    def test_unknown_endpoint_defaults_to_one(self):
+        assert endpoint_cost("/something_new") == 1
+
+
+class TestTokenBucket:
+    def test_initial_burst_is_free(self):
+        bucket = TokenBucket(600, clock=FakeClock())
+        assert bucket.reserve(300) == 0.0
+        assert bucket.reserve(300) == 0.0
+
+    def test_wait_is_only_the_deficit(self):
+        clock = FakeClock()
+        bucket = TokenBucket(600, clock=clock)  # 10 credits/second
+        bucket.reserve(550)
+        # 50 left, need 100 → 50 credits short → 5 seconds
+        assert bucket.reserve(100) == pytest.approx(5.0)
+
+    def test_reservations_queue_in_order(self):
+        clock = FakeClock()
+        bucket = TokenBucket(600, initial=0, clock=clock)
+        assert bucket.reserve(100) == pytest.approx(10.0)
+        assert bucket.reserve(100) == pytest.approx(20.0)
+
+    def test_continuous_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(600, initial=0, clock=clock)
+        clock.advance(3)
+        assert bucket.available == pytest.approx(30.0)
+        clock.advance(600)
+        assert bucket.available == pytest.approx(600.0)  # capped at capacity
+
+    def test_cost_above_capacity_is_clamped(self):
+        bucket = TokenBucket(8, initial=0, clock=FakeClock())
+        assert bucket.reserve(100) == pytest.approx(60.0)
+
+    def test_settle_syncs_down_to_server(self):
+        bucket = TokenBucket(600, clock=FakeClock())
+        bucket.reserve(100)
+        bucket.reserve(100)  # still in flight
+        bucket.settle(100, credits_left=250)
+        # server saw 350 spent; 100 more reserved and not yet charged
+        assert bucket.available == pytest.approx(150.0)
+
+    def test_settle_never_raises_balance(self):
+        bucket = TokenBucket(600, clock=FakeClock())
+        bucket.reserve(500)
+        bucket.settle(500, credits_left=590)
+        assert bucket.available == pytest.approx(100.0)
+
+    def test_refund_and_drain(self):
+        bucket = TokenBucket(600, clock=FakeClock())
+        bucket.reserve(100)
+        bucket.refund(100)
+        assert bucket.available == pytest.approx(600.0)
+        bucket.drain()
+        assert bucket.available == pytest.approx(0.0)
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
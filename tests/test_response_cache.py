@@ -0,0 +1,132 @@
+"""
+בדיקות עבור ה-cache הקבוע של תשובות API (data_sources.response_cache)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from data_sources.response_cache import ResponseCache, ttl_for
+from data_sources.twelvedata_api import TwelveDataSource
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"api-credits-used": "100", "api-credits-left": "99000"}
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = "/" + url.rsplit("/", 1)[-1]
+        self.calls.append(endpoint)
+        return FakeResponse({"income_statement": [{"fiscal_date": "2023-12-31", "sales": 1.0}]})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+    yield cache
+    cache.close()
+
+
+class TestTTLPolicy:
+    def test_statements_use_long_ttl(self, monkeypatch):
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_STATEMENT_TTL_HOURS", 168)
+        assert ttl_for("/income_statement", {}) == 168 * 3600
+        assert ttl_for("CASH_FLOW", {}) == 168 * 3600  # Alpha Vantage naming
+
+    def test_quote_uses_minutes(self, monkeypatch):
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_QUOTE_TTL_MINUTES", 15)
+        assert ttl_for("/quote", {"symbol": "AAPL"}) == 15 * 60
+
+    def test_past_price_history_never_expires(self):
+        assert ttl_for("/time_series", {"end_date": "2024-01-01"}) is None
+        assert ttl_for("/eod", {"date": "2023-12-29"}) is None
+
+    def test_open_ended_price_history_expires(self):
+        assert ttl_for("/time_series", {"end_date": "2999-01-01"}) > 0
+
+    def test_usage_is_not_cached(self):
+        assert ttl_for("/api_usage", {}) == 0
+
+
+class TestResponseCache:
+    def test_key_ignores_api_key_and_param_order(self, cache):
+        cache.put("twelvedata", "/balance_sheet", {"symbol": "AAPL", "period": "annual", "apikey": "a"}, {"x": 1})
+        assert cache.get("twelvedata", "/balance_sheet", {"period": "annual", "symbol": "AAPL", "apikey": "b"}) == {"x": 1}
+
+    def test_expired_entry_is_a_miss(self, cache, monkeypatch):
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_QUOTE_TTL_MINUTES", 0.0001)
+        cache.put("twelvedata", "/quote", {"symbol": "AAPL"}, {"close": "1"})
+        cache._conn.execute("UPDATE responses SET expires_at = 0")
+        assert cache.get("twelvedata", "/quote", {"symbol": "AAPL"}) is None
+        assert cache.purge_expired() == 1
+
+    def test_stats(self, cache):
+        cache.put("twelvedata", "/income_statement", {"symbol": "AAPL"}, {"x": 1})
+        cache.get("twelvedata", "/income_statement", {"symbol": "AAPL"})
+        cache.get("twelvedata", "/income_statement", {"symbol": "MSFT"})
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+        assert stats["credits_saved"] == 100
+        assert stats["by_endpoint"]["income_statement"] == {"hits": 1, "misses": 1}
+
+    def test_bypass_skips_reads_but_refreshes(self, tmp_path):
+        cache = ResponseCache(tmp_path / "responses.sqlite", read_enabled=False)
+        cache.put("twelvedata", "/income_statement", {"symbol": "AAPL"}, {"x": 2})
+        assert cache.get("twelvedata", "/income_statement", {"symbol": "AAPL"}) is None
+        cache.close()
+
+        assert ResponseCache(tmp_path / "responses.sqlite").get(
+            "twelvedata", "/income_statement", {"symbol": "AAPL"}
+        ) == {"x": 2}
+
+
+class TestTwelveDataIntegration:
+    @pytest.fixture
+    def source(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "TWELVEDATA_CREDITS_PER_MINUTE", 100000)
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_BYPASS", False)
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_PATH", tmp_path / "responses.sqlite")
+        source = TwelveDataSource(api_key="test")
+        source.session = FakeSession()
+        yield source
+        source.logout()
+
+    def test_second_request_served_from_cache(self, source):
+        params = {"symbol": "AAPL", "period": "annual"}
+        first = source._api_request("/income_statement", dict(params))
+        bucket_before = source._credit_bucket.available
+        second = source._api_request("/income_statement", dict(params))
+
+        assert first == second
+        assert source.session.calls == ["/income_statement"]
+        # A hit reserves no credits
+        assert source._credit_bucket.available >= bucket_before
+
+    def test_error_payload_is_not_cached(self, source):
+        source.session.get = lambda url, params=None, timeout=None: FakeResponse({"status": "error", "message": "bad"})
+        with pytest.raises(RuntimeError):
+            source._api_request("/income_statement", {"symbol": "BAD"})
+        assert source.response_cache.stats()["writes"] == 0
@@ -0,0 +1,132 @@
+"""
+בדיקות עבור זיכרון הציונים הגולמיים (utils.score_cache)
+- דירוג עם cache זהה לדירוג בלעדיו
+- רק מניות שה-content_hash שלהן במניפסט השתנה מחושבות מחדש
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from fund_builder import FundBuilder
+from fund_builder.scoring_engine import rank_base, rank_potential
+from models import FinancialData, MarketData, Stock
+from utils import score_cache
+from utils.cache_manifest import CacheManifest
+from utils.score_cache import ScoreCache, format_stats
+
+
+def _universe(n, seed):
+    """יקום אקראי עם נתונים חסרים ושנים חסרות"""
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(n):
+        symbol = f"S{i:03d}.US"
+        years = [y for y in range(2019, 2026) if rng.random() > 0.15]
+        financial = FinancialData(
+            symbol=symbol,
+            revenues={y: rng.uniform(50, 5000) for y in years},
+            net_incomes={y: rng.uniform(1, 500) for y in years},
+            pe_ratio=rng.choice([None, rng.uniform(5, 60)]),
+            market_cap=rng.uniform(1e8, 1e12),
+        ) if rng.random() > 0.05 else None
+        market = MarketData(
+            symbol=symbol, name=symbol,
+            market_cap=rng.uniform(1e8, 1e12),
+            current_price=rng.uniform(1, 500),
+            pe_ratio=rng.choice([None, rng.uniform(5, 60)]),
+            price_history={f"{y}-12-31": rng.uniform(1, 500) for y in years[-3:]},
+        ) if rng.random() > 0.1 else None
+        stocks.append(Stock(symbol=symbol, name=symbol, index="SP500", financial_data=financial, market_data=market))
+    return stocks
+
+
+def _details(ranked, score_field, detail_field):
+    return [(s.symbol, getattr(s, score_field), getattr(s, detail_field)) for s in ranked]
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = CacheManifest(tmp_path / "manifest.sqlite")
+    yield manifest
+    manifest.close()
+
+
+@pytest.fixture
+def cache(manifest):
+    cache = ScoreCache(manifest.path)
+    yield cache
+    cache.close()
+
+
+class TestScoreCache:
+    def test_ranking_identical_with_cache(self, manifest, cache):
+        stocks = _universe(n=200, seed=21)
+        manifest.record_many(stocks)
+        expected_base = _details(rank_base(stocks), "base_score", "base_scores_detail")
+        expected_potential = _details(rank_potential(stocks, 18.0), "potential_score", "potential_scores_detail")
+
+        for _ in range(2):  # cold, then warm
+            assert _details(rank_base(stocks, cache=cache), "base_score", "base_scores_detail") == expected_base
+            assert _details(
+                rank_potential(stocks, 18.0, cache=cache), "potential_score", "potential_scores_detail"
+            ) == expected_potential
+
+        stats = cache.stats()
+        assert stats["by_kind"]["base"]["hits"] == stats["by_kind"]["base"]["misses"] == len(expected_base)
+        assert stats["hit_rate"] == pytest.approx(0.5)
+
+    def test_only_changed_stocks_miss(self, manifest, cache):
+        stocks = [s for s in _universe(n=30, seed=22) if s.financial_data]
+        manifest.record_many(stocks)
+        rank_base(stocks, cache=cache)
+
+        changed = stocks[3].financial_data.model_copy(update={"revenues": {2025: 1.0, 2024: 2.0, 2023: 3.0}})
+        stocks[3] = stocks[3].model_copy(update={"financial_data": changed})
+        manifest.record_many([stocks[3]])  # the cache writer records every stock it writes
+
+        rerun = ScoreCache(manifest.path)  # a later run: same file, fresh counters
+        ranked = rank_base(stocks, cache=rerun)
+        assert rerun.stats()["misses"] == 1
+        assert rerun.stats()["hits"] == len(stocks) - 1
+        assert _details(ranked, "base_score", "base_scores_detail") == _details(
+            rank_base(stocks), "base_score", "base_scores_detail"
+        )
+        rerun.close()
+
+    def test_index_pe_change_still_hits(self, manifest, cache):
+        stocks = _universe(n=20, seed=23)
+        manifest.record_many(stocks)
+        rank_potential(stocks, 20.0, cache=cache)
+
+        # Valuation is recomputed for the new index P/E; growth and momentum come from the cache
+        ranked = rank_potential(stocks, 21.0, cache=cache)
+        assert cache.stats()["hits"] == len(stocks)
+        assert _details(ranked, "potential_score", "potential_scores_detail") == _details(
+            rank_potential(stocks, 21.0), "potential_score", "potential_scores_detail"
+        )
+
+    def test_stocks_without_manifest_row_are_not_stored(self, manifest, cache):
+        stocks = [s for s in _universe(n=10, seed=24) if s.financial_data]
+        manifest.record_many(stocks[:4])
+        rank_base(stocks, cache=cache)
+        assert cache.count() == {"base": 4}
+
+    def test_builder_uses_configured_cache(self, manifest, cache):
+        stocks = _universe(n=20, seed=25)
+        manifest.record_many(stocks)
+        builder = FundBuilder("SP500")
+        builder.score_cache = cache
+        builder.score_and_rank_base_stocks(stocks)
+        assert cache.count()["base"] > 0
+        assert format_stats(cache).startswith("Score cache: 0 hits")
+
+    def test_disabled_by_setting(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+        assert score_cache.get_score_cache() is None
+        assert format_stats(None) is None
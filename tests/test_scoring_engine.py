@@ -0,0 +1,132 @@
+"""
+בדיקות עבור מנוע הציון הווקטורי (fund_builder.scoring_engine)
+- התוצאות חייבות להיות זהות (ביט לביט) ללולאת הציון המקורית
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from fund_builder import FundBuilder
+from fund_builder.scoring_engine import FundamentalsMatrix, normalize, rank_base, rank_potential
+from models import FinancialData, MarketData, Stock
+
+import numpy as np
+
+
+def _universe(n=300, seed=7):
+    """יקום אקראי עם שנים חסרות, ערכים שליליים, נתונים חסרים ושוויונות"""
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(n):
+        symbol = f"S{i:03d}.US"
+        years = [y for y in range(2019, 2026) if rng.random() > 0.15]
+        financial = None
+        if rng.random() > 0.05:
+            financial = FinancialData(
+                symbol=symbol,
+                revenues={y: rng.uniform(50, 5000) for y in years},
+                net_incomes={y: rng.choice([rng.uniform(-50, 500), 100.0]) for y in years},
+                pe_ratio=rng.choice([None, rng.uniform(-10, 60)]),
+                market_cap=rng.uniform(1e8, 1e12),
+            )
+        market = None
+        if rng.random() > 0.1:
+            dates = [f"{y}-12-31" for y in years][-rng.randint(0, 4):]
+            market = MarketData(
+                symbol=symbol, name=symbol,
+                market_cap=rng.choice([0.0, 5e9, rng.uniform(1e8, 1e12)]),
+                current_price=rng.uniform(1, 500),
+                pe_ratio=rng.choice([None, 0.0, 20.0, rng.uniform(-10, 60)]),
+                price_history={d: rng.choice([0.0, rng.uniform(1, 500)]) for d in dates},
+            )
+        stocks.append(Stock(symbol=symbol, name=symbol, index="SP500", financial_data=financial, market_data=market))
+    return stocks
+
+
+def _loop_rank(builder, stocks, raw_fn, criteria, weights):
+    """הלולאה המקורית: ציון גולמי לכל מניה, נרמול רשימות, שקלול ומיון"""
+    scored = [(s, raw_fn(s)) for s in stocks]
+    scored = [(s, raw) for s, raw in scored if raw]
+    normalized = {c: builder.normalize_score([raw[c] for _, raw in scored]) for c in criteria}
+    results = []
+    for i, (stock, raw) in enumerate(scored):
+        total = normalized[criteria[0]][i] * weights[criteria[0]]
+        for c in criteria[1:]:
+            total = total + normalized[c][i] * weights[c]
+        results.append((stock.symbol, total, {**{f"{c}_raw": raw[c] for c in criteria},
+                                              **{f"{c}_normalized": normalized[c][i] for c in criteria}}))
+    results.sort(key=lambda r: r[1] or 0, reverse=True)
+    return results
+
+
+def _has_complex_growth(stock):
+    """CAGR שלושה שנים עם רווח שלילי - הלולאה המקורית מחזירה מספר מרוכב"""
+    values = stock.financial_data.net_incomes if stock.financial_data else {}
+    years = sorted(values, reverse=True)[:3]
+    return len(years) == 3 and values[years[-1]] > 0 and values[years[0]] < 0
+
+
+class TestScoringEngine:
+    def test_base_identical_to_loop_engine(self):
+        builder = FundBuilder("SP500")
+        stocks = [s for s in _universe() if not _has_complex_growth(s)]
+
+        expected = _loop_rank(
+            builder, stocks, builder.calculate_base_score,
+            ("net_income_growth", "revenue_growth", "market_cap"), settings.BASE_SCORE_WEIGHTS,
+        )
+        ranked = rank_base(stocks)
+
+        assert [s.symbol for s in ranked] == [symbol for symbol, _, _ in expected]
+        assert [s.base_score for s in ranked] == [total for _, total, _ in expected]
+        assert [s.base_scores_detail for s in ranked] == [detail for _, _, detail in expected]
+
+    @pytest.mark.parametrize("index_pe", [22.5, None])
+    def test_potential_identical_to_loop_engine(self, index_pe):
+        builder = FundBuilder("SP500")
+        stocks = _universe(seed=11)
+
+        expected = _loop_rank(
+            builder, stocks, lambda s: builder.calculate_potential_score(s, index_pe),
+            ("future_growth", "momentum", "valuation"), settings.POTENTIAL_SCORE_WEIGHTS,
+        )
+        ranked = rank_potential(stocks, index_pe)
+
+        assert [s.symbol for s in ranked] == [symbol for symbol, _, _ in expected]
+        assert [s.potential_score for s in ranked] == [total for _, total, _ in expected]
+        assert [s.potential_scores_detail for s in ranked] == [detail for _, _, detail in expected]
+
+    def test_builder_delegates_to_engine(self):
+        stocks = _universe(n=40, seed=3)
+        ranked = FundBuilder("SP500").score_and_rank_base_stocks(stocks)
+        assert all(s.financial_data for s in ranked)
+        assert [s.base_score for s in ranked] == sorted((s.base_score for s in ranked), reverse=True)
+
+    def test_cagr_uses_each_stocks_latest_years(self):
+        matrix = FundamentalsMatrix.from_dicts([
+            {2021: 100.0, 2022: 110.0, 2023: 121.0},
+            {2019: 100.0, 2021: 400.0, 2024: 900.0},  # gaps: latest three keys, not calendar years
+            {2023: 100.0, 2024: 120.0},               # too short
+            {2022: -5.0, 2023: 10.0, 2024: 20.0},      # non-positive start
+            None,
+        ])
+        growth = matrix.cagr(3)
+
+        assert growth[0] == pytest.approx(10.0)
+        assert growth[1] == pytest.approx(200.0)
+        assert np.isnan(growth[2:]).all()
+
+    def test_normalize(self):
+        assert normalize(np.array([1.0, 3.0, 2.0])).tolist() == [0.0, 100.0, 50.0]
+        assert normalize(np.array([4.0, 4.0])).tolist() == [50.0, 50.0]
+        assert normalize(np.array([])).size == 0
+
+    def test_empty_universe(self):
+        assert rank_base([]) == []
+        assert rank_potential([], 20.0) == []
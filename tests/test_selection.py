@@ -0,0 +1,96 @@
+"""
+בדיקות עבור בחירת המניות המובילות ללא כפילויות חברות (fund_builder.selection)
+- מפתחות חברה מחושבים פעם אחת ונשמרים על המניה
+- argpartition בוחרת בדיוק כמו מיון יציב ואחריו סריקה
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from build_fund import get_base_company_name, select_stocks_skip_duplicates
+from fund_builder.selection import (
+    encode_company_keys,
+    select_distinct,
+    top_distinct_indices,
+)
+from models import Stock
+
+
+def _stock(symbol, name, score=None):
+    return Stock(symbol=symbol, name=name, index="SP500", base_score=score)
+
+
+def _reference(stocks, count):
+    """המימוש הקודם: מיון מלא של כל המניות ואז סריקה"""
+    ranked = sorted(stocks, key=lambda s: s.base_score or 0, reverse=True)
+    return select_distinct(ranked, count)
+
+
+def _universe(n=400, seed=5):
+    """יקום עם סוגי מניות של אותה חברה וציונים זהים"""
+    rng = random.Random(seed)
+    suffixes = ["Inc", "Inc.", "Corp", "Class A", "Class B", "Ltd", "(NYSE)", ""]
+    stocks = []
+    for i in range(n):
+        company = f"Company {rng.randint(0, n // 3)}"
+        score = rng.choice([None, 50.0, round(rng.uniform(0, 100), 1)])
+        stocks.append(_stock(f"S{i:03d}.US", f"{company} {rng.choice(suffixes)}".strip(), score))
+    return stocks
+
+
+class TestCompanyKey:
+    @pytest.mark.parametrize("first,second", [
+        (("GOOGL", "Alphabet Inc Class A"), ("GOOG", "Alphabet Inc Class C")),
+        (("FOXA", "Fox Corp Class A"), ("FOX", "Fox Corp Class B")),
+        (("BRK.A", "Berkshire Hathaway Inc."), ("BRK.B", "Berkshire Hathaway Inc Class B")),
+    ])
+    def test_share_classes_share_a_key(self, first, second):
+        assert _stock(*first).company_key == _stock(*second).company_key
+
+    def test_matches_build_fund_helper(self):
+        for stock in _universe(n=60):
+            assert get_base_company_name(stock) == stock.company_key
+        assert _stock("XYZ.US", " Inc").company_key == "XYZ"
+
+    def test_cached_key_does_not_leak_into_model(self):
+        stock = _stock("GOOGL", "Alphabet Inc Class A", 90.0)
+        fresh = _stock("GOOGL", "Alphabet Inc Class A", 90.0)
+        assert stock.company_key == "ALPHABET"
+
+        assert stock == fresh
+        assert stock.model_dump() == fresh.model_dump()
+        assert "company_key" not in stock.model_dump_json()
+        assert Stock.model_validate_json(stock.model_dump_json()).company_key == "ALPHABET"
+
+
+class TestSelection:
+    def test_skip_duplicates_keeps_first_class(self):
+        ranked = [
+            _stock("GOOGL", "Alphabet Inc Class A"),
+            _stock("GOOG", "Alphabet Inc Class C"),
+            _stock("AAPL", "Apple Inc"),
+        ]
+        assert [s.symbol for s in select_stocks_skip_duplicates(ranked, 2)] == ["GOOGL", "AAPL"]
+
+    @pytest.mark.parametrize("count", [1, 4, 6, 50, 1000])
+    def test_array_selection_matches_full_sort(self, count):
+        stocks = _universe(seed=9)
+        expected = _reference(stocks, count)
+        scores = np.array([s.base_score or 0 for s in stocks])
+        indices = top_distinct_indices(scores, encode_company_keys(stocks), count)
+        assert [stocks[i].symbol for i in indices.tolist()] == [s.symbol for s in expected]
+
+    def test_window_widens_when_one_company_dominates(self):
+        # 40 share classes of one company ahead of everyone else
+        stocks = [_stock(f"A{i}", "Mega Corp", 100.0 - i / 100) for i in range(40)]
+        stocks += [_stock(f"B{i}", f"Other {i} Inc", 50.0 - i) for i in range(10)]
+        scores = np.array([s.base_score for s in stocks])
+        indices = top_distinct_indices(scores, encode_company_keys(stocks), 4)
+        assert [stocks[i].symbol for i in indices.tolist()] == ["A0", "B0", "B1", "B2"]
@@ -0,0 +1,84 @@
+"""
+בדיקות עבור מאגר snapshots של נתוני יסוד (utils.snapshot_store)
+ודירוג מחדש offline (FundBuilder.rebuild_from_snapshot)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fund_builder import FundBuilder
+from models import FinancialData, MarketData, Stock
+from utils.snapshot_store import SnapshotStore
+
+
+def _stock(i, price=100.0, growth=1.1):
+    symbol = f"S{i:02d}.US"
+    years = range(2021, 2026)
+    return Stock(
+        symbol=symbol,
+        name=f"Company {i}",
+        index="SP500",
+        financial_data=FinancialData(
+            symbol=symbol,
+            revenues={y: 1000.0 * (growth + i / 100) ** (y - 2021) for y in years},
+            net_incomes={y: 100.0 * (growth + i / 50) ** (y - 2021) for y in years},
+            operating_incomes={y: 150.0 for y in years},
+            operating_cash_flows={y: 120.0 for y in years},
+            total_debt=10.0,
+            total_equity=100.0,
+        ),
+        market_data=MarketData(
+            symbol=symbol, name=f"Company {i}", market_cap=1e9 * (i + 1), current_price=price,
+            pe_ratio=15.0 + i, price_history={"2024-12-31": price * 0.8, "2025-12-31": price},
+        ),
+        base_score=99.0,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    yield store
+    store.close()
+
+
+class TestSnapshotStore:
+    def test_append_is_immutable_and_deduplicated(self, store):
+        assert store.append([_stock(1), _stock(2)], "SP500", "Q4", 2025) == 2
+        assert store.append([_stock(1), _stock(2)], "SP500", "Q4", 2025) == 0  # identical data
+        assert store.append([_stock(1, price=150.0)], "SP500", "Q4", 2025, source="update") == 1
+
+        loaded = {s.symbol: s for s in store.load("SP500", "Q4", 2025)}
+        assert loaded["S01.US"].current_price == 150.0  # latest capture wins
+        assert loaded["S01.US"].base_score is None  # scores are not part of the snapshot
+        assert store.load("SP500", "Q1", 2026) == []
+        assert store.snapshots()[0]["stocks"] == 2
+
+    def test_index_pe_latest(self, store):
+        store.record_index_pe("SP500", "Q4", 2025, 21.0)
+        store.record_index_pe("SP500", "Q4", 2025, None)
+        assert store.index_pe("SP500", "Q4", 2025) == 21.0
+        assert store.index_pe("TASE125", "Q4", 2025) is None
+
+
+class TestRebuildFromSnapshot:
+    def test_offline_rebuild_matches_live_selection(self, store):
+        stocks = [_stock(i) for i in range(15)]
+        store.append(stocks, "SP500", "Q4", 2025)
+        store.record_index_pe("SP500", "Q4", 2025, 20.0)
+
+        live = FundBuilder("SP500").select_fund([_stock(i) for i in range(15)], 20.0, "Q4", 2025)
+        offline = FundBuilder("SP500").rebuild_from_snapshot("Q4", 2025, store=store)
+
+        assert offline["stocks"] == 15 and offline["index_pe"] == 20.0
+        assert [p.stock.symbol for p in offline["fund"].positions] == [p.stock.symbol for p in live["fund"].positions]
+        assert len(offline["fund"].positions) == 10
+        assert sum(p.weight for p in offline["fund"].positions) == pytest.approx(1.0)
+
+    def test_missing_snapshot_raises(self, store):
+        with pytest.raises(ValueError, match="snapshot"):
+            FundBuilder("SP500").rebuild_from_snapshot("Q1", 2020, store=store)
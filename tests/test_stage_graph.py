@@ -0,0 +1,138 @@
+"""
+בדיקות עבור מריץ שלבי הבנייה (fund_builder.stage_graph)
+- שלבים בלתי תלויים רצים במקביל, תלויים ממתינים לקלטים
+- כשל עוצר שלבים חדשים; הרצה חוזרת משחזרת שלבים שהסתיימו
+"""
+
+import threading
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fund_builder.stage_graph import StageGraph, Step, StepFailedError, StepStore, format_timings
+
+
+def _diamond(calls, fail=None):
+    """fetch → (rank, log) → doc"""
+    def record(name, result):
+        def fn(**inputs):
+            calls.append(name)
+            if name == fail:
+                raise OSError("disk full")
+            return result(**inputs)
+        return fn
+
+    return [
+        Step("fetch", record("fetch", lambda: {"stocks": [3, 1, 2]}), (), ("stocks",), "שלב 2"),
+        Step("rank", record("rank", lambda stocks: {"ranked": sorted(stocks)}), ("stocks",), ("ranked",), "שלב 3"),
+        Step("log", record("log", lambda stocks: {"log": len(stocks)}), ("stocks",), ("log",)),
+        Step("doc", record("doc", lambda ranked, log: {"doc": f"{ranked}/{log}"}), ("ranked", "log"), ("doc",),
+             "שלב 12"),
+    ]
+
+
+class TestStageGraph:
+    def test_values_follow_dependencies(self):
+        calls = []
+        run = StageGraph(_diamond(calls), workers=2).run()
+
+        assert run["values"]["doc"] == "[1, 2, 3]/3"
+        assert calls[0] == "fetch" and calls[-1] == "doc"
+        assert {t["status"] for t in run["timings"].values()} == {"done"}
+        assert "rank" in format_timings(StageGraph(_diamond([])).order(), run["timings"])
+
+    def test_independent_steps_run_concurrently(self):
+        both_running = threading.Barrier(2, timeout=5)
+
+        def waits(**_):
+            both_running.wait()  # deadlocks (BrokenBarrierError) if the steps ran serially
+            return {}
+
+        steps = [Step("quality_log", waits), Step("index_pe", waits), Step("after", lambda: {"x": 1}, (), ("x",))]
+        run = StageGraph(steps, workers=2).run()
+        assert run["timings"]["quality_log"]["status"] == run["timings"]["index_pe"]["status"] == "done"
+
+    def test_failure_skips_dependents(self):
+        calls = []
+        with pytest.raises(StepFailedError, match="שלב 3 נכשל: disk full") as info:
+            StageGraph(_diamond(calls, fail="rank"), workers=1).run()
+
+        assert info.value.step.name == "rank"
+        assert isinstance(info.value.__cause__, OSError)
+        assert "doc" not in calls
+
+    def test_rerun_restores_finished_steps(self, tmp_path):
+        store = StepStore(tmp_path / "run.steps")
+        calls = []
+        with pytest.raises(StepFailedError):
+            StageGraph(_diamond(calls, fail="doc"), workers=1).run(store=store)
+        assert calls == ["fetch", "rank", "log", "doc"]
+
+        calls.clear()
+        restored = []
+        run = StageGraph(_diamond(calls), workers=1).run(
+            store=store, on_finish=lambda step, timing: restored.append((step.name, timing["status"]))
+        )
+        assert calls == ["doc"]  # the fetch is not redone
+        assert ("fetch", "restored") in restored and ("doc", "done") in restored
+        assert run["values"]["doc"] == "[1, 2, 3]/3"
+
+    def test_each_step_saves_only_its_outputs(self, tmp_path):
+        store = StepStore(tmp_path / "run.steps")
+        run = StageGraph(_diamond([]), workers=2).run(store=store)
+
+        assert store.load("fetch") == {"stocks": [3, 1, 2]}
+        assert store.load("rank") == {"ranked": [1, 2, 3]}
+        assert store.load("doc") == {"doc": "[1, 2, 3]/3"}
+        assert all(timing["resumable"] for timing in run["timings"].values())
+
+    def test_rerun_step_invalidates_saved_dependents(self, tmp_path):
+        store = StepStore(tmp_path / "run.steps")
+        StageGraph(_diamond([]), workers=1).run(store=store)
+        store.discard("fetch")
+
+        calls = []
+        StageGraph(_diamond(calls), workers=1).run(store=store)
+        assert calls == ["fetch", "rank", "log", "doc"]  # saved outputs of older inputs are not reused
+
+    def test_clear_removes_saved_steps(self, tmp_path):
+        store = StepStore(tmp_path / "run.steps")
+        StageGraph(_diamond([]), workers=1).run(store=store)
+        assert store.exists()
+
+        store.clear()
+        assert not store.exists() and not store.directory.exists()
+        store.clear()  # already gone
+
+    def test_failed_save_marks_step_not_resumable(self, tmp_path):
+        class FailingStore(StepStore):
+            def save(self, name, outputs):
+                if name == "rank":
+                    raise OSError("disk full")
+                super().save(name, outputs)
+
+        store = FailingStore(tmp_path / "run.steps")
+        run = StageGraph(_diamond([]), workers=1).run(store=store)
+        assert run["values"]["doc"] == "[1, 2, 3]/3"
+        assert run["timings"]["rank"]["resumable"] is False
+        assert run["timings"]["fetch"]["resumable"] is True
+
+        calls = []
+        StageGraph(_diamond(calls), workers=1).run(store=StepStore(tmp_path / "run.steps"))
+        assert calls == ["rank", "doc"]
+
+    @pytest.mark.parametrize("steps,message", [
+        ([Step("a", dict, ("x",), ("y",)), Step("b", dict, ("y",), ("x",))], "cycle"),
+        ([Step("a", dict, ("missing",), ())], "no step produces"),
+        ([Step("a", dict, (), ("x",)), Step("b", dict, (), ("x",))], "produced by both"),
+    ])
+    def test_invalid_graphs(self, steps, message):
+        with pytest.raises(ValueError, match=message):
+            StageGraph(steps)
+
+    def test_missing_output_is_a_failure(self):
+        with pytest.raises(StepFailedError, match="did not produce"):
+            StageGraph([Step("a", lambda: {}, (), ("x",))]).run()
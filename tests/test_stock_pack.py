@@ -0,0 +1,88 @@
+"""
+בדיקות עבור פורמט ה-cache הבינארי (utils.stock_pack)
+"""
+
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("msgpack")
+
+from config import settings
+from models import FinancialData, MarketData, Stock
+from utils.cache_loader import load_cached_stocks
+from utils.cache_writer import write_stock_json
+from utils.stock_pack import (
+    LazyStock, SCHEMA_VERSION, _packb, convert_json_dir, pack_stock, stock_pack_path, unpack_stock,
+)
+
+
+def _stock(symbol="AAA.US"):
+    return Stock(
+        symbol=symbol,
+        name=f"{symbol} Inc",
+        index="SP500",
+        financial_data=FinancialData(symbol=symbol, revenues={2024: 100.0, 2025: 120.0}, total_debt=5.0),
+        market_data=MarketData(
+            symbol=symbol, name=f"{symbol} Inc", market_cap=1e9, current_price=50.0,
+            price_history={"2024-12-31": 45.0, "2025-12-31": 50.0},
+        ),
+        base_score=70.0,
+        base_scores_detail={"revenue_growth": 20.0},
+        is_eligible_for_base=True,
+    )
+
+
+class TestStockPack:
+    def test_round_trip_decodes_lazily(self):
+        stock = unpack_stock(pack_stock(_stock()))
+
+        assert isinstance(stock, LazyStock)
+        assert stock.base_score == 70.0 and stock.is_eligible_for_base
+        assert stock.pending_fields == {"financial_data", "market_data"}
+
+        assert stock.current_price == 50.0
+        assert stock.pending_fields == {"financial_data"}
+        assert stock.financial_data.revenues == {2024: 100.0, 2025: 120.0}
+        assert stock.model_dump() == _stock().model_dump()
+
+    def test_repack_keeps_undecoded_and_assigned_fields(self):
+        stock = unpack_stock(pack_stock(_stock()))
+        stock.market_data = None
+        stock.potential_score = 40.0
+
+        again = unpack_stock(pack_stock(stock))
+
+        assert again.market_data is None
+        assert again.potential_score == 40.0
+        assert again.financial_data.total_debt == 5.0
+
+    def test_equals_plain_stock(self):
+        stock = unpack_stock(pack_stock(_stock()))
+        assert stock == _stock() and _stock() == stock
+        assert stock.pending_fields == set()
+        assert unpack_stock(pack_stock(_stock())) != _stock("BBB.US")
+
+    def test_schema_version_checked(self):
+        with pytest.raises(ValueError, match="schema"):
+            unpack_stock(_packb({"schema": SCHEMA_VERSION + 1, "stock": {}}))
+
+    def test_convert_json_dir_and_load(self, tmp_path, monkeypatch):
+        for symbol in ("AAA.US", "BBB.US"):
+            write_stock_json(_stock(symbol), tmp_path)
+        (tmp_path / "BAD_US.json").write_text("{", encoding="utf-8")
+
+        result = convert_json_dir(tmp_path, remove_json=True)
+
+        assert (result["converted"], result["failed"]) == (2, 1)
+        assert result["pack_bytes"] < result["json_bytes"]
+        assert stock_pack_path("AAA.US", tmp_path).exists()
+        assert not (tmp_path / "AAA_US.json").exists()
+
+        monkeypatch.setattr(settings, "CACHE_BACKEND", "msgpack")
+        stocks = load_cached_stocks(["AAA.US", "BBB.US", "BAD.US"], tmp_path)
+        assert sorted(stocks) == ["AAA.US", "BBB.US"]
+        assert stocks["BBB.US"].market_data.price_history["2025-12-31"] == 50.0
@@ -0,0 +1,106 @@
+"""
+בדיקות עבור מאגר המניות ב-SQLite (utils.stock_store)
+"""
+
+import json
+import pytest
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import Stock
+from models.financial_data import FinancialData, MarketData
+from utils.stock_store import StockStore
+
+
+def _stock(symbol, base_score=None, index="SP500", price=185.0):
+    return Stock(
+        symbol=symbol,
+        name=f"{symbol} Inc",
+        index=index,
+        financial_data=FinancialData(symbol=symbol, revenues={2024: 100.0, 2023: 90.0}),
+        market_data=MarketData(
+            symbol=symbol,
+            name=f"{symbol} Inc",
+            market_cap=1e9,
+            current_price=price,
+            price_history={"2024-12-31": 180.0},
+        ),
+        base_score=base_score,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StockStore(tmp_path / "stocks.sqlite")
+    yield store
+    store.close()
+
+
+class TestStockStore:
+    def test_bulk_round_trip(self, store):
+        stocks = [_stock("AAA.US", 80.0), _stock("BBB.US")]
+        assert store.put_many(stocks, "Q1", 2026) == 2
+
+        loaded = store.get_many(["AAA.US", "BBB.US", "MISSING.US"])
+        assert set(loaded) == {"AAA.US", "BBB.US"}
+        assert loaded["AAA.US"].model_dump() == stocks[0].model_dump()
+
+    def test_one_row_per_snapshot_latest_wins(self, store):
+        store.put(_stock("AAA.US", price=100.0), "Q4", 2025)
+        store.put(_stock("AAA.US", price=120.0), "Q1", 2026)
+        store.put(_stock("AAA.US", price=130.0), "Q1", 2026)  # upsert within a snapshot
+
+        assert store.count() == 2
+        assert store.get("AAA.US").market_data.current_price == 130.0
+        assert store.get("AAA.US", "Q4", 2025).market_data.current_price == 100.0
+
+    def test_query_by_score_and_index(self, store):
+        store.put_many([_stock("AAA.US", 80.0), _stock("BBB.US", 40.0)], "Q1", 2026)
+        store.put(_stock("TEVA.TA", 90.0, index="TASE125"), "Q1", 2026)
+
+        assert [s.symbol for s in store.query(min_base_score=50)] == ["AAA.US", "TEVA.TA"]
+        assert [s.symbol for s in store.query(index_name="SP500", min_base_score=50)] == ["AAA.US"]
+
+    def test_rescoring_keeps_fetched_at(self, store):
+        stock = _stock("AAA.US")
+        store.put_many([stock], "Q1", 2026, fetched_at=datetime(2026, 1, 5))
+        stock.base_score = 75.0
+        store.put_many([stock], "Q1", 2026, fetched_at=datetime(2026, 2, 1))
+
+        stale = store.query(fetched_before=datetime(2026, 1, 10))
+        assert [s.base_score for s in stale] == [75.0]
+
+    def test_import_json_dir(self, store, tmp_path):
+        json_dir = tmp_path / "stocks_data"
+        json_dir.mkdir()
+        for stock in (_stock("AAA.US", 80.0), _stock("BBB.US")):
+            with open(json_dir / f"{stock.symbol.replace('.', '_')}.json", "w", encoding="utf-8") as f:
+                json.dump(stock.model_dump(), f, indent=2)
+        (json_dir / "broken.json").write_text("{not json")
+
+        assert store.import_json_dir(json_dir, "Q4", 2025) == 2
+        assert store.get("AAA.US", "Q4", 2025).base_score == 80.0
+
+
+class TestCacheLoaderBackend:
+    def test_sqlite_backend(self, tmp_path, monkeypatch):
+        import utils.stock_store as stock_store
+        from build_fund import save_stocks_to_cache
+        from utils.cache_loader import load_cached_stocks
+
+        monkeypatch.setattr(settings, "CACHE_BACKEND", "sqlite")
+        monkeypatch.setattr(settings, "STOCK_STORE_PATH", tmp_path / "stocks.sqlite")
+        monkeypatch.setattr(stock_store, "_default_store", None)
+        monkeypatch.setattr(settings, "CACHE_MANIFEST_ENABLED", False)
+
+        save_stocks_to_cache([_stock("AAA.US", 80.0)], tmp_path, "Q1", 2026)
+        loaded = load_cached_stocks(["AAA.US", "BBB.US"], tmp_path)
+
+        assert list(loaded) == ["AAA.US"]
+        assert not list(tmp_path.glob("*.json"))
+        stock_store._default_store.close()
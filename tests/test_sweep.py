@@ -0,0 +1,98 @@
+"""
+בדיקות עבור סריקת הפרמטרים (fund_builder.sweep)
+- כל תצורה בוחרת בדיוק את מה ש-FundBuilder.select_fund בוחר עם אותן הגדרות
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from fund_builder import FundBuilder
+from fund_builder.sweep import SweepUniverse, current_config, grid_configs, run_sweep, sample_configs, weight_grid
+from models import FinancialData, MarketData, Stock
+
+
+def _universe(n=120, seed=4):
+    """יקום עם מניות כשירות ולא כשירות, כולל סוגי מניות של אותה חברה"""
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(n):
+        symbol = f"S{i:03d}.US"
+        years = range(2019, 2026)
+        financial = FinancialData(
+            symbol=symbol,
+            revenues={y: rng.uniform(100, 5000) for y in years},
+            net_incomes={y: rng.uniform(-20, 500) for y in years},
+            operating_incomes={y: rng.uniform(-20, 600) for y in years},
+            operating_cash_flows={y: rng.uniform(-10, 700) for y in years},
+            total_debt=rng.uniform(0, 100),
+            total_equity=rng.uniform(50, 300),
+        )
+        market = MarketData(
+            symbol=symbol, name=symbol,
+            market_cap=rng.uniform(1e9, 1e12),
+            current_price=rng.uniform(10, 500),
+            pe_ratio=rng.uniform(5, 60),
+            price_history={"2024-12-31": rng.uniform(10, 500), "2025-12-31": rng.uniform(10, 500)},
+        )
+        name = f"Company {i // 2 if i % 10 == 0 else i} {rng.choice(['Class A', 'Class B', 'Inc'])}"
+        stocks.append(Stock(symbol=symbol, name=name, index="SP500", financial_data=financial, market_data=market))
+    return stocks
+
+
+def _select_fund(stocks, index_pe, config, monkeypatch):
+    """הבחירה של FundBuilder.select_fund עם ההגדרות של התצורה"""
+    monkeypatch.setattr(settings, "BASE_SCORE_WEIGHTS", config["base_weights"])
+    monkeypatch.setattr(settings, "POTENTIAL_SCORE_WEIGHTS", config["potential_weights"])
+    fresh = [s.model_copy(deep=True) for s in stocks]
+    builder = FundBuilder("SP500")
+    builder.select_fund(fresh, index_pe, "Q1", 2026)
+    return [s.symbol for s in builder.selected_base + builder.selected_potential]
+
+
+class TestSweep:
+    def test_weight_grid(self):
+        grid = weight_grid(("a", "b", "c"), 0.05)
+        assert len(grid) == 171
+        assert all(abs(sum(w.values()) - 1) < 1e-9 and min(w.values()) > 0 for w in grid)
+
+    def test_configurations_match_select_fund(self, monkeypatch):
+        stocks = _universe()
+        options = {k: [v] for k, v in settings.BASE_ELIGIBILITY.items()}
+        potential = {k: [v] for k, v in settings.POTENTIAL_ELIGIBILITY.items()}
+        configs = sample_configs(6, options, potential, seed=1) + [current_config()]
+        universe = SweepUniverse(stocks, 21.0, configs)
+
+        for config in configs:
+            expected = _select_fund(stocks, 21.0, config, monkeypatch)
+            assert universe.report(config)["selected"] == expected
+
+    def test_current_settings_have_no_turnover(self):
+        universe = SweepUniverse(_universe(), 21.0, [])
+        report = universe.report(current_config())
+        assert report["turnover"] == 0
+        assert report["replaced"] == 0
+        assert report["rank_stability"] == pytest.approx(1.0)
+
+    def test_eligibility_rules_change_the_pool(self):
+        base_options = {
+            "min_profitable_years": [5], "min_operating_profit_years": [4], "max_debt_to_equity": [0.6, 10.0],
+        }
+        configs = grid_configs(0.25, base_options, {"min_profitable_years": [2]})
+        assert len(configs) == 2 * 3 * 3
+        universe = SweepUniverse(_universe(), 21.0, configs)
+        strict, loose = (universe.base_eligible[key].sum() for key in sorted(universe.base_eligible))
+        assert strict < loose
+
+    def test_parallel_matches_serial(self):
+        stocks = _universe(n=60)
+        options = {k: [v] for k, v in settings.BASE_ELIGIBILITY.items()}
+        configs = sample_configs(1200, options, {"min_profitable_years": [2, 3]}, seed=2)
+        universe = SweepUniverse(stocks, 21.0, configs)
+
+        assert run_sweep(universe, configs, workers=2) == run_sweep(universe, configs, workers=1)
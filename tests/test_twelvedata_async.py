@@ -0,0 +1,147 @@
+"""
+בדיקות עבור הלקוח האסינכרוני של Twelve Data (data_sources.twelvedata_async)
+
+משתמש בתשובות HTTP קבועות - ללא גישה לרשת.
+"""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+
+from config import settings
+from data_sources.twelvedata_api import TwelveDataSource
+from data_sources.twelvedata_async import AsyncTwelveDataSource
+
+
+PAYLOADS = {
+    "/income_statement": {"income_statement": [
+        {"fiscal_date": "2023-12-31", "sales": 120.0, "net_income": 12.0, "operating_income": 15.0},
+        {"fiscal_date": "2022-12-31", "sales": 100.0, "net_income": 10.0, "pretax_income": 11.0},
+    ]},
+    "/balance_sheet": {"balance_sheet": [{
+        "liabilities": {"non_current_liabilities": {"long_term_debt": 40.0}},
+        "shareholders_equity": {"total_shareholders_equity": 80.0},
+    }]},
+    "/cash_flow": {"cash_flow": [
+        {"fiscal_date": "2023-12-31", "operating_activities": {"operating_cash_flow": 20.0}},
+        {"fiscal_date": "2022-12-31", "operating_activities": {"operating_cash_flow": 18.0}},
+    ]},
+}
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = {"api-credits-used": "100", "api-credits-left": "99000"}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+
+class FakeHTTP:
+    """מחליף את session.get ומודד כמה בקשות רצות בו-זמנית"""
+
+    def __init__(self, delay=0.0, fail_endpoints=()):
+        self.delay = delay
+        self.fail_endpoints = set(fail_endpoints)
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, params=None, timeout=None):
+        endpoint = "/" + url.rsplit("/", 1)[-1]
+        with self._lock:
+            self.calls.append((endpoint, params.get("symbol"), params.get("period")))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if endpoint in self.fail_endpoints:
+                return FakeResponse({}, status_code=500)
+            return FakeResponse(PAYLOADS[endpoint])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def source(monkeypatch):
+    monkeypatch.setattr(settings, "TWELVEDATA_CREDITS_PER_MINUTE", 100000)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "TWELVEDATA_MAX_STOCKS_PER_MINUTE", 0)
+    return TwelveDataSource(api_key="test")
+
+
+class TestAsyncTwelveDataSource:
+    def test_matches_blocking_client(self, source, monkeypatch):
+        monkeypatch.setattr(source.session, "get", FakeHTTP())
+        sync_data = source.get_stock_financials("AAPL.US")
+
+        client = AsyncTwelveDataSource(source, max_concurrency=2)
+        results = client.prefetch_financials(["AAPL.US"])
+        async_data, fiscal_dates = results["AAPL.US"]
+
+        assert async_data.model_dump() == sync_data.model_dump()
+        assert "2023-12-31" in fiscal_dates
+        assert source._last_fiscal_dates["AAPL.US"] == fiscal_dates
+
+    def test_statements_run_concurrently(self, source, monkeypatch):
+        http = FakeHTTP(delay=0.05)
+        monkeypatch.setattr(source.session, "get", http)
+
+        client = AsyncTwelveDataSource(source, max_concurrency=4)
+        results = client.prefetch_financials(["A.US", "B.US", "C.US", "D.US"])
+
+        assert len(results) == 4
+        assert len(http.calls) == 12
+        assert http.max_active > 3
+
+    def test_quarterly_matches_blocking_client(self, source, monkeypatch):
+        monkeypatch.setattr(source.session, "get", FakeHTTP())
+        sync_data = source.get_quarterly_financials("TEVA.TA")
+
+        client = AsyncTwelveDataSource(source)
+        async_data = client.prefetch_quarterly(["TEVA.TA"])["TEVA.TA"]
+
+        assert async_data == sync_data
+        assert async_data["total_debt"] == 40.0
+
+    def test_optional_statement_failure_is_tolerated(self, source, monkeypatch):
+        monkeypatch.setattr(source.session, "get", FakeHTTP(fail_endpoints={"/cash_flow"}))
+        client = AsyncTwelveDataSource(source)
+        financial_data, _ = client.prefetch_financials(["AAPL.US"])["AAPL.US"]
+        assert financial_data.operating_cash_flows == {}
+        assert financial_data.revenues[2023] == 120.0
+
+    def test_income_failure_is_returned_per_symbol(self, source, monkeypatch):
+        monkeypatch.setattr(source.session, "get", FakeHTTP(fail_endpoints={"/income_statement"}))
+        client = AsyncTwelveDataSource(source)
+        result = client.prefetch_financials(["AAPL.US"])["AAPL.US"]
+        assert isinstance(result, RuntimeError)
+        assert source._stocks_in_flight == 0
+
+
+class TestSessionPooling:
+    def test_source_owns_pooled_session(self, source):
+        adapter = source.session.get_adapter("https://api.twelvedata.com")
+        assert adapter._pool_maxsize == settings.HTTP_POOL_SIZE
+        assert 429 not in adapter.max_retries.status_forcelist
+
+    def test_async_client_uses_source_session(self, source, monkeypatch):
+        http = FakeHTTP()
+        monkeypatch.setattr(source.session, "get", http)
+        AsyncTwelveDataSource(source).prefetch_financials(["AAPL.US"])
+        assert len(http.calls) == 3
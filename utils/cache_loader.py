@@ -1,18 +1,48 @@
 """
 טעינת נתוני מניות מקבצי cache
 
-טוען אובייקטי Stock שלמים מקבצי JSON ב-cache/stocks_data/.
+טוען אובייקטי Stock שלמים מקבצי JSON ב-cache/stocks_data/,
+מהמאגר המאונדקס (utils.stock_store) כאשר CACHE_BACKEND=sqlite,
+או מקבצי msgpack (utils.stock_pack) כאשר CACHE_BACKEND=msgpack.
 """
 
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
+from config import settings
 from models.stock import Stock
+from utils.cache_writer import stock_cache_path
 
 logger = logging.getLogger(__name__)
 
+# Below this many symbols per worker, threads cost more than they save
+_MIN_CHUNK_SIZE = 64
+
+
+def _read_stock(symbol: str, cache_dir: Path) -> Optional[Stock]:
+    """קריאת קובץ מניה בודד; None אם חסר או פגום"""
+    if settings.CACHE_BACKEND == "msgpack":
+        from utils.stock_pack import stock_pack_path, unpack_stock
+        path, parse = stock_pack_path(symbol, cache_dir), unpack_stock
+    else:
+        path, parse = stock_cache_path(symbol, cache_dir), Stock.model_validate_json
+
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        return parse(raw)
+    except Exception as e:
+        logger.error(f"Failed to load cache for {symbol}: {e}")
+        return None
+
+
+def _read_chunk(symbols: List[str], cache_dir: Path) -> List[Optional[Stock]]:
+    return [_read_stock(symbol, cache_dir) for symbol in symbols]
+
 
 def load_cached_stock(symbol: str, cache_dir: Path) -> Optional[Stock]:
     """
@@ -25,44 +55,50 @@ def load_cached_stock(symbol: str, cache_dir: Path) -> Optional[Stock]:
     Returns:
         Stock object, או None אם לא נמצא
     """
-    # Convert symbol to filename: NVDA.US -> NVDA_US.json
-    filename = symbol.replace(".", "_") + ".json"
-    filepath = cache_dir / filename
+    if settings.CACHE_BACKEND == "sqlite":
+        from utils.stock_store import get_stock_store
+        return get_stock_store().get(symbol)
 
-    if not filepath.exists():
-        logger.warning(f"Cache file not found: {filepath.name}")
-        return None
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return Stock(**data)
-    except Exception as e:
-        logger.error(f"Failed to load cache for {symbol}: {e}")
-        return None
+    stock = _read_stock(symbol, cache_dir)
+    if stock is None:
+        logger.warning(f"No usable cache file for {symbol} in {cache_dir.name}")
+    return stock
 
 
-def load_cached_stocks(symbols: list[str], cache_dir: Path) -> dict[str, Stock]:
+def load_cached_stocks(
+    symbols: list[str],
+    cache_dir: Path,
+    max_workers: Optional[int] = None,
+) -> dict[str, Stock]:
     """
-    טוען מניות מרובות מ-cache
+    טוען מניות מרובות מ-cache (קריאה מקבילית)
 
     Args:
         symbols: רשימת סימולים (e.g., ["NVDA.US", "CRM.US"])
         cache_dir: תיקיית cache/stocks_data
+        max_workers: מספר threads (ברירת מחדל: settings.CACHE_LOAD_WORKERS)
 
     Returns:
         dict mapping symbol -> Stock (only successfully loaded)
     """
-    stocks = {}
-    missing = []
-
-    for symbol in symbols:
-        stock = load_cached_stock(symbol, cache_dir)
-        if stock is not None:
-            stocks[symbol] = stock
+    if settings.CACHE_BACKEND == "sqlite":
+        from utils.stock_store import get_stock_store
+        stocks = get_stock_store().get_many(symbols)
+    else:
+        symbols = list(symbols)
+        workers = max(1, min(max_workers or settings.CACHE_LOAD_WORKERS, len(symbols) // _MIN_CHUNK_SIZE))
+
+        if workers == 1:
+            loaded = _read_chunk(symbols, cache_dir)
         else:
-            missing.append(symbol)
+            size = -(-len(symbols) // workers)
+            chunks = [symbols[start:start + size] for start in range(0, len(symbols), size)]
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-load") as executor:
+                loaded = [stock for chunk in executor.map(_read_chunk, chunks, [cache_dir] * len(chunks)) for stock in chunk]
+
+        stocks = {symbol: stock for symbol, stock in zip(symbols, loaded) if stock is not None}
 
+    missing = [symbol for symbol in symbols if symbol not in stocks]
     if missing:
         logger.warning(f"Missing cache files for {len(missing)} stocks: {missing[:5]}{'...' if len(missing) > 5 else ''}")
 
@@ -0,0 +1,335 @@
+"""
+מניפסט ה-cache - טביעת אצבע ומטא-נתוני טריות לכל מניה שמורה
+שורה לכל סימול שמתעדכנת עם כל כתיבת cache, כך שזיהוי מניות ישנות, חסרות או ללא ציון
+לא פותח את קבצי המניות
+"""
+
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+from models.stock import Stock
+from utils.filing_calendar import cached_fiscal_dates, next_filing_date
+from utils.stock_store import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Max host parameters per statement (SQLite's conservative default is 999)
+_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    symbol                    TEXT PRIMARY KEY,
+    index_name                TEXT NOT NULL,
+    source                    TEXT NOT NULL,
+    fetched_at                REAL NOT NULL,
+    updated_at                REAL NOT NULL,
+    latest_fiscal_date        TEXT,
+    content_hash              TEXT NOT NULL,
+    has_financial_data        INTEGER NOT NULL,
+    has_base_score            INTEGER NOT NULL,
+    has_potential_score       INTEGER NOT NULL,
+    is_eligible_for_base      INTEGER NOT NULL,
+    is_eligible_for_potential INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_manifest_index ON manifest (index_name);
+"""
+
+_UPSERT = """
+INSERT INTO manifest VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (symbol) DO UPDATE SET
+    index_name = excluded.index_name,
+    source = CASE WHEN manifest.content_hash = excluded.content_hash
+                  THEN manifest.source ELSE excluded.source END,
+    fetched_at = CASE WHEN manifest.content_hash = excluded.content_hash
+                      THEN manifest.fetched_at ELSE excluded.fetched_at END,
+    updated_at = excluded.updated_at,
+    latest_fiscal_date = excluded.latest_fiscal_date,
+    content_hash = excluded.content_hash,
+    has_financial_data = excluded.has_financial_data,
+    has_base_score = excluded.has_base_score,
+    has_potential_score = excluded.has_potential_score,
+    is_eligible_for_base = excluded.is_eligible_for_base,
+    is_eligible_for_potential = excluded.is_eligible_for_potential
+"""
+
+def is_stale(entry: Dict, today: Optional[date] = None) -> bool:
+    """האם דוח שנתי חדש עשוי כבר להתפרסם עבור רשומת מניפסט (כמו may_have_new_statements)"""
+    if not entry["has_financial_data"] or not entry["latest_fiscal_date"]:
+        return True
+    return next_filing_date(entry["latest_fiscal_date"], entry["index_name"]) <= (today or date.today())
+
+
+def is_unscored(entry: Dict) -> bool:
+    """מניה כשירה שחסר לה ציון (למשל נשמרה בשלב 2 והבנייה נעצרה לפני הדירוג)"""
+    return bool(
+        (entry["is_eligible_for_base"] and not entry["has_base_score"])
+        or (entry["is_eligible_for_potential"] and not entry["has_potential_score"])
+    )
+
+
+class CacheManifest:
+    """
+    מניפסט ה-cache מבוסס SQLite, משותף בין threads
+
+    Columns:
+        source              מקור הנתונים הפיננסיים ששלף את המניה
+        fetched_at          מתי הנתונים (לא הציונים) השתנו לאחרונה
+        latest_fiscal_date  סוף שנת הכספים האחרונה בנתונים
+        content_hash        טביעת אצבע של הנתונים (utils.stock_store.content_hash)
+        scores / flags      האם יש ציונים, ולאילו רשימות המניה כשירה
+
+    Args:
+        path: קובץ ה-SQLite (ברירת מחדל: settings.CACHE_MANIFEST_PATH)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.CACHE_MANIFEST_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ==================== Writes ====================
+
+    def record_many(
+        self,
+        stocks: Iterable[Stock],
+        source: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> int:
+        """
+        עדכון רשומות המניפסט למניות שנכתבו ל-cache (טרנזקציה אחת)
+
+        fetched_at ו-source נשמרים כאשר הנתונים לא השתנו (דירוג מחדש בלבד).
+
+        Args:
+            stocks: המניות שנכתבו
+            source: מקור הנתונים (ברירת מחדל: settings.FINANCIAL_DATA_SOURCE)
+            fetched_at: זמן השליפה (ברירת מחדל: עכשיו)
+
+        Returns:
+            int: מספר המניות שנרשמו
+        """
+        source = source or settings.FINANCIAL_DATA_SOURCE
+        now = time.time()
+        fetched_at = fetched_at or now
+        rows = []
+        for stock in stocks:
+            fiscal_dates = cached_fiscal_dates(stock)
+            rows.append((
+                stock.symbol,
+                stock.index,
+                source,
+                fetched_at,
+                now,
+                fiscal_dates[0] if fiscal_dates else None,
+                content_hash(stock),
+                int(stock.financial_data is not None),
+                int(stock.base_score is not None),
+                int(stock.potential_score is not None),
+                int(stock.is_eligible_for_base),
+                int(stock.is_eligible_for_potential),
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def remove(self, symbols: Iterable[str]):
+        """הסרת סימולים (למשל אחרי מחיקת קבצי cache)"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM manifest WHERE symbol = ?", [(s,) for s in symbols])
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM manifest")
+
+    # ==================== Reads ====================
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """רשומת המניפסט של סימול, או None"""
+        return self.get_many([symbol]).get(symbol)
+
+    def get_many(self, symbols: Optional[Iterable[str]] = None, index_name: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        רשומות המניפסט
+
+        Args:
+            symbols: סימולים מבוקשים (None = הכול)
+            index_name: סינון לפי מדד
+
+        Returns:
+            Dict[str, Dict]: symbol -> רשומה (רק סימולים שנמצאו)
+        """
+        condition, params = ("WHERE index_name = ?", [index_name]) if index_name else ("", [])
+        if symbols is None:
+            with self._lock:
+                rows = self._conn.execute(f"SELECT * FROM manifest {condition}", params).fetchall()
+        else:
+            symbols = list(dict.fromkeys(symbols))
+            rows = []
+            for start in range(0, len(symbols), _CHUNK_SIZE):
+                chunk = symbols[start:start + _CHUNK_SIZE]
+                where = f"{condition} {'AND' if condition else 'WHERE'} symbol IN ({','.join('?' * len(chunk))})"
+                with self._lock:
+                    rows.extend(self._conn.execute(f"SELECT * FROM manifest {where}", [*params, *chunk]).fetchall())
+        return {row["symbol"]: dict(row) for row in rows}
+
+    def status(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        index_name: Optional[str] = None,
+        today: Optional[date] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        סיווג מניות לפי המניפסט בלבד - ללא פתיחת קבצי cache
+
+        Args:
+            symbols: סימולים לבדיקה (None = כל המניפסט)
+            index_name: סינון לפי מדד
+            today: תאריך הבדיקה (ברירת מחדל: היום)
+
+        Returns:
+            Dict: missing - סימולים ללא רשומה
+                  stale - דוח שנתי חדש עשוי להתפרסם (או שאין נתונים פיננסיים)
+                  unscored - כשירות שחסר להן ציון
+                  fresh - כל השאר
+        """
+        symbols = list(dict.fromkeys(symbols)) if symbols is not None else None
+        entries = self.get_many(symbols, index_name)
+
+        result = {"missing": [], "stale": [], "unscored": [], "fresh": []}
+        for symbol in symbols if symbols is not None else sorted(entries):
+            entry = entries.get(symbol)
+            if entry is None:
+                result["missing"].append(symbol)
+            elif is_stale(entry, today):
+                result["stale"].append(symbol)
+            elif is_unscored(entry):
+                result["unscored"].append(symbol)
+            else:
+                result["fresh"].append(symbol)
+        return result
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_manifest: Optional[CacheManifest] = None
+_default_lock = threading.Lock()
+
+
+def get_cache_manifest() -> CacheManifest:
+    """המניפסט המשותף של התהליך (נוצר בשימוש הראשון)"""
+    global _default_manifest
+    with _default_lock:
+        if _default_manifest is None:
+            _default_manifest = CacheManifest()
+        return _default_manifest
+
+
+def record_cached(stocks: Iterable[Stock], source: Optional[str] = None) -> int:
+    """
+    רישום מניות שנכתבו ל-cache אם CACHE_MANIFEST_ENABLED; כשל נרשם ביומן ואינו עוצר את הכתיבה
+
+    Returns:
+        int: מספר המניות שנרשמו (0 אם כבוי או נכשל)
+    """
+    if not settings.CACHE_MANIFEST_ENABLED:
+        return 0
+    try:
+        return get_cache_manifest().record_many(stocks, source)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to update the cache manifest: {e}")
+        return 0
+
+
+def manifest_status(symbols: Iterable[str], index_name: Optional[str] = None) -> Optional[Dict[str, List[str]]]:
+    """CacheManifest.status אם CACHE_MANIFEST_ENABLED, אחרת None"""
+    if not settings.CACHE_MANIFEST_ENABLED:
+        return None
+    try:
+        return get_cache_manifest().status(symbols, index_name)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to read the cache manifest: {e}")
+        return None
+
+
+def rebuild(manifest: CacheManifest, cache_dir: Path, source: str = "rebuild") -> int:
+    """
+    בנייה מחדש של המניפסט מתוך ה-cache הקיים (לפי CACHE_BACKEND)
+
+    fetched_at של מניות חדשות במניפסט הוא זמן שינוי הקובץ.
+
+    Returns:
+        int: מספר המניות שנרשמו
+    """
+    manifest.clear()
+    if settings.CACHE_BACKEND == "sqlite":
+        from utils.stock_store import get_stock_store
+        return manifest.record_many(get_stock_store().query(), source)
+
+    if settings.CACHE_BACKEND == "msgpack":
+        from utils.stock_pack import PACK_SUFFIX, unpack_stock
+        pattern, parse = f"*{PACK_SUFFIX}", unpack_stock
+    else:
+        pattern, parse = "*.json", Stock.model_validate_json
+
+    recorded = 0
+    for path in sorted(Path(cache_dir).glob(pattern)):
+        try:
+            stock = parse(path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Skipping unreadable cache file {path.name}: {e}")
+            continue
+        recorded += manifest.record_many([stock], source, fetched_at=path.stat().st_mtime)
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="מניפסט ה-cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = subparsers.add_parser("status", help="מניות ישנות / חסרות ציון (מהמניפסט בלבד)")
+    status_parser.add_argument("--index", choices=["TASE125", "SP500"])
+    status_parser.add_argument("--symbols", nargs="+", help="סימולים לבדיקה (ברירת מחדל: כל המניפסט)")
+    status_parser.add_argument("--verbose", action="store_true", help="הצגת הסימולים בכל קטגוריה")
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="בנייה מחדש מתוך קבצי ה-cache הקיימים")
+    rebuild_parser.add_argument("--dir", type=Path, default=settings.CACHE_DIR / "stocks_data")
+
+    args = parser.parse_args()
+
+    manifest = CacheManifest()
+    if args.command == "rebuild":
+        recorded = rebuild(manifest, args.dir)
+        print(f"Indexed {recorded} cached stocks into {manifest.path}")
+    else:
+        status = manifest.status(args.symbols, args.index)
+        for category in ("fresh", "stale", "unscored", "missing"):
+            symbols = status[category]
+            if category == "missing" and args.symbols is None:
+                continue
+            print(f"{category:<9} {len(symbols):>5}")
+            if args.verbose and symbols and category != "fresh":
+                print("          " + " ".join(symbols))
+    manifest.close()
+
+
+if __name__ == "__main__":
+    main()
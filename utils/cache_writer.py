@@ -0,0 +1,212 @@
+"""
+כותב cache ברקע (write-behind) עבור בניית הקרן
+
+שמירות חוזרות של אותו סימול מתאחדות, ו-thread רקע כותב את המניות במנות
+(JSON, SQLite או msgpack לפי CACHE_BACKEND) ומעדכן את מניפסט ה-cache.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+from models.stock import Stock
+from utils.cache_manifest import record_cached
+
+logger = logging.getLogger(__name__)
+
+
+def stock_cache_path(symbol: str, cache_dir: Path) -> Path:
+    """NVDA.US -> cache_dir/NVDA_US.json"""
+    return Path(cache_dir) / f"{symbol.replace('.', '_')}.json"
+
+
+def write_stock_json(stock: Stock, cache_dir: Path) -> Dict:
+    """
+    כתיבה אטומית של מניה לקובץ JSON (temp file + os.replace)
+
+    Returns:
+        Dict: הנתונים שנכתבו
+    """
+    data = stock.model_dump(mode="json")
+    path = stock_cache_path(stock.symbol, cache_dir)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return data
+
+
+class CacheWriter:
+    """
+    כתיבת מניות ל-cache ברקע, עם איחוד שמירות חוזרות ושטיפה במנות
+
+    Usage:
+        with CacheWriter(cache_dir, quarter, year) as writer:
+            writer.save(stock)      # marks dirty, returns immediately
+            ...
+            writer.flush()          # blocks until everything dirty is on disk
+
+    Args:
+        cache_dir: תיקיית cache/stocks_data (מבנה JSON)
+        quarter, year: snapshot עבור CACHE_BACKEND=sqlite
+        batch_size: מספר מניות מלוכלכות שמפעיל שטיפה (ברירת מחדל: settings.CACHE_WRITE_BATCH_SIZE)
+        flush_interval: שניות מקסימליות בין שטיפות (ברירת מחדל: settings.CACHE_WRITE_INTERVAL)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.quarter = quarter
+        self.year = year
+        self.batch_size = max(1, batch_size or settings.CACHE_WRITE_BATCH_SIZE)
+        self.flush_interval = flush_interval or settings.CACHE_WRITE_INTERVAL
+
+        self._pending: Dict[str, Stock] = {}  # dirty stocks, coalesced by symbol
+        self._flushed: Dict[str, Dict] = {}  # symbol -> scores as last written
+        self._errors: List[Exception] = []
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+
+        self.saves = 0  # save() calls
+        self.writes = 0  # stocks actually written
+
+        self._thread = threading.Thread(target=self._run, name="cache-writer", daemon=True)
+        self._thread.start()
+
+    # ==================== Public API ====================
+
+    def save(self, stock: Stock):
+        """סימון מניה כמלוכלכת (שמירה חוזרת של אותו סימול מתאחדת)"""
+        self.save_many([stock])
+
+    def save_many(self, stocks: Iterable[Stock]):
+        """סימון מניות רבות כמלוכלכות"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CacheWriter is closed")
+            for stock in stocks:
+                self._pending[stock.symbol] = stock
+                self.saves += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self):
+        """
+        המתנה עד שכל המניות המלוכלכות נכתבו
+
+        Raises:
+            RuntimeError: אם כתיבה ברקע נכשלה (השגיאה הראשונה)
+        """
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._pending and not self._writing)
+            self._flush_requested = False
+            if self._errors:
+                errors, self._errors = self._errors, []
+                raise RuntimeError(f"Cache write failed for {len(errors)} batch(es): {errors[0]}") from errors[0]
+
+    def close(self):
+        """שטיפה אחרונה ועצירת ה-thread"""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+            logger.info(f"Cache writer: {self.saves} saves coalesced into {self.writes} writes")
+
+    def flushed_state(self, symbol: str) -> Optional[Dict]:
+        """
+        המצב שנכתב לאחרונה עבור סימול
+
+        Returns:
+            Optional[Dict]: base_score, potential_score כפי שנשמרו, או None אם לא נכתב
+        """
+        with self._cond:
+            return self._flushed.get(symbol)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except RuntimeError as e:
+            if exc_type is None:
+                raise
+            logger.error(f"Cache flush failed while handling another error: {e}")
+        return False
+
+    # ==================== Background thread ====================
+
+    def _ready(self) -> bool:
+        return self._closed or (
+            bool(self._pending) and (self._flush_requested or len(self._pending) >= self.batch_size)
+        )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Timeout = flush interval: dirty stocks never wait longer than that
+                self._cond.wait_for(self._ready, timeout=self.flush_interval)
+                if not self._pending:
+                    if self._closed:
+                        return
+                    continue
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._writing = True
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Cache write failed for {len(batch)} stocks: {e}")
+                with self._cond:
+                    self._errors.append(e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Stock]):
+        if settings.CACHE_BACKEND == "sqlite":
+            from utils.stock_store import get_stock_store
+            get_stock_store().put_many(batch, self.quarter, self.year)
+            written = {s.symbol: {"base_score": s.base_score, "potential_score": s.potential_score} for s in batch}
+        elif settings.CACHE_BACKEND == "msgpack":
+            from utils.stock_pack import write_stock_pack
+            for stock in batch:
+                write_stock_pack(stock, self.cache_dir)
+            written = {s.symbol: {"base_score": s.base_score, "potential_score": s.potential_score} for s in batch}
+        else:
+            written = {}
+            for stock in batch:
+                data = write_stock_json(stock, self.cache_dir)
+                written[stock.symbol] = {
+                    "base_score": data.get("base_score"),
+                    "potential_score": data.get("potential_score"),
+                }
+
+        record_cached(batch)
+
+        with self._cond:
+            self._flushed.update(written)
+            self.writes += len(batch)
+        logger.debug(f"Cache writer: flushed {len(batch)} stocks")
@@ -0,0 +1,166 @@
+"""
+יומן checkpoint לשלב 2 של בניית הקרן (שליפת רכיבי המדד)
+
+כל רכיב שהסתיים נרשם ל-cache/checkpoints/<run_id>.jsonl, והרצה עם --resume <run_id>
+שולפת רק את הסימולים החסרים. שגיאות שלא סווגו אינן נרשמות ונשלפות מחדש.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import settings
+from models.stock import Stock
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR_NAME = "checkpoints"
+
+
+def checkpoint_dir() -> Path:
+    """תיקיית יומני ה-checkpoint (cache/checkpoints)"""
+    return settings.CACHE_DIR / CHECKPOINT_DIR_NAME
+
+
+class BuildCheckpoint:
+    """
+    יומן append-only של תוצאות שליפה עבור ריצת בנייה אחת
+
+    Every line is a JSON object. The first line is a header with the run parameters;
+    every following line is the outcome of one symbol. Lines are flushed and fsync'ed
+    on write, so a killed process loses at most the symbol it was writing.
+    """
+
+    def __init__(self, run_id: str, path: Path, index_name: str, quarter: str, year: int):
+        self.run_id = run_id
+        self.path = path
+        self.index_name = index_name
+        self.quarter = quarter
+        self.year = year
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, index_name: str, quarter: str, year: int, directory: Optional[Path] = None) -> "BuildCheckpoint":
+        """
+        יצירת יומן חדש לריצה
+
+        Args:
+            index_name: שם המדד
+            quarter: רבעון (Q1-Q4)
+            year: שנה
+            directory: תיקיית היומנים (ברירת מחדל: cache/checkpoints)
+
+        Returns:
+            BuildCheckpoint: יומן ריק עם שורת header
+        """
+        directory = directory or checkpoint_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        run_id = f"{index_name}_{quarter}_{year}_{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        checkpoint = cls(run_id, directory / f"{run_id}.jsonl", index_name, quarter, year)
+        checkpoint._write({
+            "type": "header",
+            "run_id": run_id,
+            "index": index_name,
+            "quarter": quarter,
+            "year": year,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_id: str, directory: Optional[Path] = None) -> "BuildCheckpoint":
+        """
+        פתיחת יומן קיים להמשך ריצה (--resume)
+
+        Args:
+            run_id: מזהה הריצה שהודפס בתחילת הריצה הקודמת
+            directory: תיקיית היומנים (ברירת מחדל: cache/checkpoints)
+
+        Returns:
+            BuildCheckpoint: היומן הקיים (שורה אחרונה קטועה נמחקת; כתיבות נוספות מצטרפות לסופו)
+
+        Raises:
+            FileNotFoundError: אם אין יומן עבור run_id
+            ValueError: אם שורת ה-header חסרה או פגומה
+        """
+        directory = directory or checkpoint_dir()
+        path = directory / f"{run_id}.jsonl"
+        if not path.exists():
+            raise FileNotFoundError(f"Checkpoint not found: {path}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+        try:
+            header = json.loads(first_line)
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("type") != "header":
+            raise ValueError(f"Invalid checkpoint header in {path.name}")
+
+        # A line cut off by a killed process would otherwise swallow the next appended record
+        with open(path, "r+b") as f:
+            content = f.read()
+            if not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+                logger.warning(f"Dropped a truncated last line from {path.name}")
+
+        return cls(run_id, path, header["index"], header["quarter"], header["year"])
+
+    def record(self, result: Dict):
+        """
+        רישום תוצאת שליפה של מניה בודדת
+
+        Args:
+            result: dict תוצאה מ-ConstituentFetcher (symbol, stock, failure, error)
+        """
+        if result["stock"] is not None:
+            entry = {"type": "stock", "symbol": result["symbol"], "stock": result["stock"].model_dump(mode="json")}
+        elif result["failure"] is not None:
+            category, failure = result["failure"]
+            entry = {"type": "failure", "symbol": result["symbol"], "category": category, "failure": failure}
+        else:
+            return  # Unclassified error - retry on resume
+
+        self._write(entry)
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        קריאת התוצאות שכבר נרשמו ביומן
+
+        A truncated last line (process killed mid-write) is ignored.
+        If a symbol appears more than once, the last entry wins.
+
+        Returns:
+            Dict[str, Dict]: symbol -> {"stock": Stock|None, "failure": (category, entry)|None}
+        """
+        completed = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    if entry["type"] == "stock":
+                        completed[entry["symbol"]] = {"stock": Stock(**entry["stock"]), "failure": None}
+                    elif entry["type"] == "failure":
+                        completed[entry["symbol"]] = {
+                            "stock": None,
+                            "failure": (entry["category"], entry["failure"]),
+                        }
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable checkpoint line {line_number} in {self.path.name}: {e}")
+        return completed
+
+    def _write(self, entry: Dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
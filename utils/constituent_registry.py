@@ -0,0 +1,127 @@
+"""
+רישום רכיבי מדד לפי רבעון - גרסה לכל רבעון והשוואה לרבעון הקודם (added / removed / unchanged)
+הגרסאות ממוינות לפי (שנה, רבעון) ולא לפי שם הקובץ
+"""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_QUARTERS = ("Q1", "Q2", "Q3", "Q4")
+
+
+def _version_key(quarter: str, year: int) -> Tuple[int, int]:
+    return year, _QUARTERS.index(quarter)
+
+
+def diff_constituents(previous: List[Dict], current: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    השוואת שתי רשימות רכיבים לפי סימול
+
+    Returns:
+        Dict: added / removed / unchanged - רשומות הרכיבים (מהרשימה הנוכחית, removed מהקודמת)
+    """
+    previous_symbols = {c["symbol"] for c in previous}
+    current_symbols = {c["symbol"] for c in current}
+    return {
+        "added": [c for c in current if c["symbol"] not in previous_symbols],
+        "removed": [c for c in previous if c["symbol"] not in current_symbols],
+        "unchanged": [c for c in current if c["symbol"] in previous_symbols],
+    }
+
+
+class ConstituentRegistry:
+    """
+    גרסאות רשימת רכיבי המדד לפי רבעון
+
+    Args:
+        root: תיקיית הרשימות (ברירת מחדל: settings.CACHE_DIR / "index_constituents")
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.CACHE_DIR / "index_constituents")
+
+    def path(self, index_name: str, quarter: str, year: int) -> Path:
+        return self.root / f"{index_name}_{quarter}_{year}.json"
+
+    def versions(self, index_name: str) -> List[Tuple[str, int]]:
+        """
+        הרבעונים השמורים של מדד, מהישן לחדש
+
+        Returns:
+            List[Tuple[str, int]]: (quarter, year)
+        """
+        pattern = re.compile(rf"^{re.escape(index_name)}_(Q[1-4])_(\d{{4}})\.json$")
+        found = []
+        for path in self.root.glob(f"{index_name}_*.json") if self.root.exists() else []:
+            match = pattern.match(path.name)
+            if match:
+                found.append((match.group(1), int(match.group(2))))
+        return sorted(found, key=lambda v: _version_key(*v))
+
+    def load(self, index_name: str, quarter: str, year: int) -> Optional[List[Dict]]:
+        """רשימת הרכיבים של רבעון, או None אם אינה שמורה או פגומה"""
+        try:
+            with open(self.path(index_name, quarter, year), "r", encoding="utf-8") as f:
+                constituents = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Corrupt constituent list {index_name} {quarter} {year}: {e}")
+            return None
+        return constituents or None
+
+    def save(self, index_name: str, quarter: str, year: int, constituents: List[Dict]):
+        """שמירה אטומית של רשימת הרכיבים לרבעון"""
+        path = self.path(index_name, quarter, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(constituents, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def latest(
+        self,
+        index_name: str,
+        before: Optional[Tuple[str, int]] = None,
+    ) -> Optional[Tuple[str, int, List[Dict]]]:
+        """
+        הגרסה השמורה האחרונה (שאינה ריקה או פגומה)
+
+        Args:
+            index_name: שם המדד
+            before: (quarter, year) - רק גרסאות מוקדמות יותר
+
+        Returns:
+            Optional[Tuple[str, int, List[Dict]]]: (quarter, year, constituents) או None
+        """
+        for quarter, year in reversed(self.versions(index_name)):
+            if before and _version_key(quarter, year) >= _version_key(*before):
+                continue
+            constituents = self.load(index_name, quarter, year)
+            if constituents:
+                return quarter, year, constituents
+        return None
+
+    def diff(self, index_name: str, quarter: str, year: int) -> Dict:
+        """
+        השוואת הרבעון לגרסה השמורה הקודמת
+
+        Returns:
+            Dict: added, removed, unchanged (רשומות רכיבים) ו-previous - (quarter, year) או None.
+                  ללא גרסה קודמת כל הרכיבים נחשבים added.
+        """
+        current = self.load(index_name, quarter, year) or []
+        previous = self.latest(index_name, before=(quarter, year))
+        if previous is None:
+            return {"added": list(current), "removed": [], "unchanged": [], "previous": None}
+
+        prev_quarter, prev_year, prev_constituents = previous
+        return {**diff_constituents(prev_constituents, current), "previous": (prev_quarter, prev_year)}
@@ -0,0 +1,83 @@
+"""
+לוח דיווחים משוער - האם ייתכן שחברה פרסמה דוחות שנתיים חדשים מאז הבנייה האחרונה
+(סוף השנה הפיסקלית הבאה + פיגור הדיווח של השוק <= היום)
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+from config import settings
+from models import FinancialData, Stock
+
+
+def filing_lag_days(index_name: str) -> int:
+    """מספר הימים מסוף שנת הכספים ועד שדוחות חדשים עשויים להיות זמינים"""
+    if index_name == "TASE125":
+        return settings.FILING_LAG_DAYS_TASE
+    return settings.FILING_LAG_DAYS_US
+
+
+def cached_fiscal_dates(stock: Stock) -> List[str]:
+    """
+    תאריכי סוף שנת הכספים של מניה שמורה (YYYY-MM-DD, מהחדש לישן)
+
+    Fiscal dates are the keys of market_data.price_history (prices are fetched per
+    fiscal date). Without price history, the statement years are assumed to end on Dec 31.
+    """
+    if stock.market_data and stock.market_data.price_history:
+        return sorted(stock.market_data.price_history, reverse=True)
+    if stock.financial_data and stock.financial_data.revenues:
+        return [f"{year}-12-31" for year in sorted(stock.financial_data.revenues, reverse=True)]
+    return []
+
+
+def next_filing_date(latest_fiscal_date: str, index_name: str) -> date:
+    """התאריך המוקדם ביותר שבו דוח שנתי חדש עשוי להתפרסם"""
+    latest = datetime.strptime(latest_fiscal_date[:10], "%Y-%m-%d").date()
+    return latest + relativedelta(years=1) + relativedelta(days=filing_lag_days(index_name))
+
+
+def may_have_new_statements(stock: Optional[Stock], index_name: str, today: Optional[date] = None) -> bool:
+    """
+    האם יש לשלוף מחדש את הדוחות הכספיים של מניה
+
+    Returns:
+        bool: True אם אין נתונים שמורים שמישים, או שדוח שנתי חדש כבר עשוי להתפרסם
+    """
+    if stock is None or stock.financial_data is None:
+        return True
+    fiscal_dates = cached_fiscal_dates(stock)
+    if not fiscal_dates:
+        return True
+    return next_filing_date(fiscal_dates[0], index_name) <= (today or date.today())
+
+
+def plan_incremental_refresh(
+    cached_stocks: Dict[str, Optional[Stock]],
+    index_name: str,
+    today: Optional[date] = None,
+) -> Dict:
+    """
+    חלוקת המניות למניות שהדוחות שלהן ממוחזרים ולמניות שיש לשלוף מחדש
+
+    Args:
+        cached_stocks: symbol -> Stock שמור (או None אם אין cache)
+        index_name: שם המדד (קובע את פיגור הדיווח)
+        today: תאריך הבנייה (ברירת מחדל: היום)
+
+    Returns:
+        Dict: reuse - symbol -> (FinancialData, fiscal_dates) לשימוש חוזר (מחירים עדיין מתרעננים)
+              refresh - רשימת סימולים לשליפה מלאה
+    """
+    reuse: Dict[str, Tuple[FinancialData, List[str]]] = {}
+    refresh: List[str] = []
+
+    for symbol, stock in cached_stocks.items():
+        if may_have_new_statements(stock, index_name, today):
+            refresh.append(symbol)
+        else:
+            reuse[symbol] = (stock.financial_data, cached_fiscal_dates(stock))
+
+    return {"reuse": reuse, "refresh": refresh}
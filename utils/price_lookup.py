@@ -0,0 +1,70 @@
+"""
+חיפוש מחיר סגירה ליום המסחר הקרוב (לפני או בתאריך נתון)
+בחיפוש בינארי על סדרה יומית שהורדה פעם אחת
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# The fiscal date itself plus up to 3 previous calendar days (weekends and holidays)
+DEFAULT_MAX_DAYS_BACK = 3
+
+
+def _to_date(value: str) -> datetime:
+    return datetime.strptime(value[:10], "%Y-%m-%d")
+
+
+def nearest_prior_close(
+    dates: List[str],
+    closes: List[float],
+    target: str,
+    max_days_back: int = DEFAULT_MAX_DAYS_BACK,
+) -> Optional[Tuple[str, float]]:
+    """
+    מחיר הסגירה ביום המסחר האחרון שלפני (או ב-) target
+
+    Args:
+        dates: תאריכי מסחר בפורמט YYYY-MM-DD, ממוינים בסדר עולה
+        closes: מחירי סגירה מקבילים ל-dates
+        target: תאריך מבוקש (YYYY-MM-DD)
+        max_days_back: מספר ימים קלנדריים מקסימלי אחורה
+
+    Returns:
+        Optional[Tuple[str, float]]: (תאריך המסחר שנמצא, מחיר) או None
+    """
+    pos = bisect_right(dates, target[:10]) - 1
+    if pos < 0:
+        return None
+
+    found = dates[pos]
+    if (_to_date(target) - _to_date(found)).days > max_days_back:
+        return None
+    return found, closes[pos]
+
+
+def prices_for_dates(
+    closes_by_date: Dict[str, float],
+    targets: Iterable[str],
+    max_days_back: int = DEFAULT_MAX_DAYS_BACK,
+) -> Dict[str, float]:
+    """
+    מיפוי כל תאריך מבוקש למחיר הסגירה הקרוב שלפניו
+
+    Args:
+        closes_by_date: תאריך מסחר (YYYY-MM-DD) → מחיר סגירה (סדר כלשהו)
+        targets: תאריכים מבוקשים (e.g., fiscal year-ends)
+        max_days_back: מספר ימים קלנדריים מקסימלי אחורה
+
+    Returns:
+        Dict[str, float]: תאריך מבוקש → מחיר (תאריכים ללא מחיר מושמטים)
+    """
+    dates = sorted(closes_by_date)
+    closes = [closes_by_date[d] for d in dates]
+
+    result = {}
+    for target in targets:
+        match = nearest_prior_close(dates, closes, target, max_days_back)
+        if match is not None:
+            result[target] = match[1]
+    return result
@@ -0,0 +1,340 @@
+"""
+מאגר מחירי סגירה יומיים מקומי (NumPy memmap) - משותף לתמחור, מומנטום ו-backtest
+סדרה אחת לכל סימול תחת cache/prices/, שמורחבת רק בתאריכים שטרם נשמרו
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# downloader(symbols, start, end) -> symbol -> {YYYY-MM-DD: close}; start/end inclusive
+Downloader = Callable[[List[str], str, str], Dict[str, Dict[str, float]]]
+
+_DAYS_DTYPE = np.int32
+_CLOSE_DTYPE = np.float64
+_EPOCH = date(1970, 1, 1)
+
+# A gap this short may contain no trading days at all (weekend + holiday)
+_MAX_EMPTY_GAP_DAYS = 4
+
+# Relative tolerance for the overlap check against a re-fetched day
+_OVERLAP_RTOL = 1e-6
+
+
+def _day_number(value) -> int:
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], "%Y-%m-%d").date()
+    elif isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def _day_string(day: int) -> str:
+    return (_EPOCH + timedelta(days=int(day))).isoformat()
+
+
+class PriceStore:
+    """
+    מאגר מחירי סגירה יומיים לפי סימול, משותף בין threads
+
+    Files per symbol:
+        <SYM>.days    int32   trading day as days since 1970-01-01, ascending
+        <SYM>.close   float64 adjusted close for the same day
+        <SYM>.json    {"rows": n, "first": covered-from, "last": covered-through}
+
+    Closes are split/dividend adjusted: an append re-fetches the last stored day and
+    rewrites the series when that overlap no longer matches. Today's bar is never stored.
+
+    Args:
+        root: תיקיית המאגר (ברירת מחדל: settings.PRICE_STORE_DIR)
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.PRICE_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.RLock] = {}
+
+    @classmethod
+    def from_settings(cls) -> Optional["PriceStore"]:
+        """המאגר לפי ההגדרות, או None אם PRICE_STORE_ENABLED כבוי"""
+        if not settings.PRICE_STORE_ENABLED:
+            return None
+        return get_price_store()
+
+    # ==================== Files ====================
+
+    def _paths(self, symbol: str) -> Tuple[Path, Path, Path]:
+        key = symbol.replace(".", "_").replace("/", "_")
+        return self.root / f"{key}.days", self.root / f"{key}.close", self.root / f"{key}.json"
+
+    def _symbol_lock(self, symbol: str) -> threading.RLock:
+        """
+        נעילה לסימול: קריאה מה-memmap וכתיבת הקבצים שלו לא חופפות
+
+        Readers copy what they need and drop their maps before releasing it, so no map is
+        open when a write replaces the files (os.replace fails on a mapped file on Windows).
+        """
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.RLock())
+
+    def _meta(self, symbol: str) -> Optional[Dict]:
+        meta_path = self._paths(symbol)[2]
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _arrays(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        """מערכי memmap (ימים, מחירים) לקריאה בלבד - רק בזמן החזקת _symbol_lock"""
+        meta = self._meta(symbol)
+        rows = meta["rows"] if meta else 0
+        if rows == 0:
+            return np.empty(0, _DAYS_DTYPE), np.empty(0, _CLOSE_DTYPE)
+        days_path, close_path, _ = self._paths(symbol)
+        days = np.memmap(days_path, dtype=_DAYS_DTYPE, mode="r", shape=(rows,))
+        closes = np.memmap(close_path, dtype=_CLOSE_DTYPE, mode="r", shape=(rows,))
+        return days, closes
+
+    def _write_meta(self, symbol: str, rows: int, first: int, last: int):
+        meta_path = self._paths(symbol)[2]
+        tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"rows": rows, "first": _day_string(first), "last": _day_string(last)}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, meta_path)
+
+    def _rewrite(self, symbol: str, days: np.ndarray, closes: np.ndarray, first: int, last: int):
+        days_path, close_path, _ = self._paths(symbol)
+        for path, values in ((days_path, days.astype(_DAYS_DTYPE)), (close_path, closes.astype(_CLOSE_DTYPE))):
+            tmp_path = path.with_name(path.name + ".tmp")
+            values.tofile(tmp_path)
+            os.replace(tmp_path, path)
+        self._write_meta(symbol, len(days), first, last)
+
+    def _append(self, symbol: str, rows: int, days: np.ndarray, closes: np.ndarray, first: int, last: int):
+        days_path, close_path, _ = self._paths(symbol)
+        for path, values, itemsize in (
+            (days_path, days.astype(_DAYS_DTYPE), np.dtype(_DAYS_DTYPE).itemsize),
+            (close_path, closes.astype(_CLOSE_DTYPE), np.dtype(_CLOSE_DTYPE).itemsize),
+        ):
+            with open(path, "r+b" if path.exists() else "wb") as f:
+                f.truncate(rows * itemsize)  # drop a partial append left by a crash
+                f.seek(rows * itemsize)
+                values.tofile(f)
+        self._write_meta(symbol, rows + len(days), first, last)
+
+    # ==================== Reads ====================
+
+    def covered_range(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """טווח התאריכים שנשלף עבור הסימול (כולל), או None"""
+        meta = self._meta(symbol)
+        return (meta["first"], meta["last"]) if meta else None
+
+    def closes(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.Series:
+        """
+        מחירי סגירה בטווח (כולל) כ-Series עם DatetimeIndex
+
+        Only the requested slice is copied out of the memory map.
+        """
+        with self._symbol_lock(symbol):
+            days, closes = self._arrays(symbol)
+            lo = int(np.searchsorted(days, _day_number(start), side="left")) if start else 0
+            hi = int(np.searchsorted(days, _day_number(end), side="right")) if end else len(days)
+            day_slice, close_slice = np.array(days[lo:hi], dtype="int64"), np.array(closes[lo:hi])
+            del days, closes
+        return pd.Series(close_slice, index=pd.to_datetime(day_slice, unit="D"), name=symbol)
+
+    def as_of(self, symbol: str, target: str, max_days_back: Optional[int] = None) -> Optional[Tuple[str, float]]:
+        """
+        מחיר הסגירה ביום המסחר האחרון שלפני (או ב-) target
+
+        Returns:
+            Optional[Tuple[str, float]]: (תאריך המסחר, מחיר) או None
+        """
+        return self.prices_for_dates(symbol, [target], max_days_back, with_dates=True).get(target)
+
+    def prices_for_dates(
+        self,
+        symbol: str,
+        targets: Iterable[str],
+        max_days_back: Optional[int] = None,
+        with_dates: bool = False,
+    ) -> Dict:
+        """
+        מיפוי כל תאריך מבוקש למחיר הסגירה הקרוב שלפניו (כמו utils.price_lookup)
+
+        Args:
+            symbol: סימול
+            targets: תאריכים מבוקשים (YYYY-MM-DD)
+            max_days_back: מספר ימים קלנדריים מקסימלי אחורה (None = ללא הגבלה)
+            with_dates: להחזיר (תאריך מסחר, מחיר) במקום מחיר בלבד
+
+        Returns:
+            Dict: תאריך מבוקש → מחיר (תאריכים ללא מחיר מושמטים)
+        """
+        targets = list(targets)
+        if not targets:
+            return {}
+        wanted = np.array([_day_number(t) for t in targets], dtype=np.int64)
+
+        with self._symbol_lock(symbol):
+            days, closes = self._arrays(symbol)
+            positions = np.searchsorted(days, wanted, side="right") - 1
+            found = positions >= 0
+            matched_days = np.zeros(len(targets), dtype=np.int64)
+            matched_closes = np.zeros(len(targets), dtype=_CLOSE_DTYPE)
+            matched_days[found] = days[positions[found]]
+            matched_closes[found] = closes[positions[found]]
+            del days, closes
+
+        result = {}
+        for target, want, ok, day, price in zip(targets, wanted, found, matched_days.tolist(), matched_closes.tolist()):
+            if not ok or (max_days_back is not None and want - day > max_days_back):
+                continue
+            result[target] = (_day_string(day), price) if with_dates else price
+        return result
+
+    # ==================== Writes ====================
+
+    def ensure(
+        self,
+        symbols: Iterable[str],
+        start: str,
+        end: str,
+        downloader: Downloader,
+    ) -> int:
+        """
+        הבטחה שהטווח [start, end] קיים במאגר - שליפה רק של מה שחסר
+
+        Symbols missing the same range are downloaded together, in one downloader call.
+        No lock is held during the download; each symbol is locked only while its result
+        is merged, after checking again what is still missing.
+
+        Returns:
+            int: מספר ימי המסחר שנוספו
+        """
+        yesterday = _day_number(date.today()) - 1
+        want_first, want_last = _day_number(start), min(_day_number(end), yesterday)
+        if want_first > want_last:
+            return 0
+
+        plans: Dict[Tuple[int, int], List[str]] = {}
+        for symbol in dict.fromkeys(symbols):
+            with self._symbol_lock(symbol):
+                fetch = self._missing_range(symbol, want_first, want_last)
+            if fetch is not None:
+                plans.setdefault(fetch, []).append(symbol)
+
+        added = 0
+        replan = []
+        for (fetch_first, fetch_last), group in plans.items():
+            try:
+                downloaded = downloader(group, _day_string(fetch_first), _day_string(fetch_last))
+            except Exception as e:
+                logger.warning(f"Price download failed for {len(group)} symbols: {e}")
+                continue
+            for symbol in group:
+                with self._symbol_lock(symbol):
+                    # Another thread may have stored this symbol while the download ran
+                    fetch = self._missing_range(symbol, want_first, want_last)
+                    if fetch is None:
+                        continue
+                    if fetch[0] < fetch_first or fetch[1] > fetch_last:
+                        replan.append(symbol)  # what is missing now is outside what was downloaded
+                        continue
+                    added += self._merge(
+                        symbol, downloaded.get(symbol) or {}, fetch[0], fetch[1], want_first, want_last, downloader
+                    )
+        if replan:
+            added += self.ensure(replan, start, end, downloader)
+        return added
+
+    def _missing_range(self, symbol: str, want_first: int, want_last: int) -> Optional[Tuple[int, int]]:
+        """טווח השליפה הנדרש (כולל ימי חפיפה לבדיקת התאמה), או None אם מכוסה"""
+        meta = self._meta(symbol)
+        if meta is None:
+            return want_first, want_last
+
+        first, last = _day_number(meta["first"]), _day_number(meta["last"])
+        if want_first < first:
+            # Extending backwards: rebuild the whole series on one adjustment basis
+            return want_first, max(want_last, last)
+        if want_last > last:
+            days, _ = self._arrays(symbol)
+            overlap = int(days[-1]) if len(days) else last + 1
+            return min(overlap, last + 1), want_last
+        return None
+
+    def _merge(
+        self,
+        symbol: str,
+        closes_by_date: Dict[str, float],
+        fetch_first: int,
+        fetch_last: int,
+        want_first: int,
+        want_last: int,
+        downloader: Downloader,
+    ) -> int:
+        """מיזוג תוצאת הורדה לסדרה השמורה (בזמן החזקת _symbol_lock)"""
+        new = sorted(
+            (_day_number(d), float(c)) for d, c in closes_by_date.items()
+            if c == c and fetch_first <= _day_number(d) <= fetch_last  # c == c drops NaN
+        )
+        if not new and fetch_last - fetch_first > _MAX_EMPTY_GAP_DAYS:
+            # No rows for a range that must contain trading days: leave it uncovered and retry next time
+            logger.debug(f"No prices for {symbol} {_day_string(fetch_first)}..{_day_string(fetch_last)}")
+            return 0
+
+        new_days = np.array([d for d, _ in new], dtype=_DAYS_DTYPE)
+        new_closes = np.array([c for _, c in new], dtype=_CLOSE_DTYPE)
+
+        meta = self._meta(symbol)
+        if meta is None or fetch_first < _day_number(meta["first"]):
+            last = max(fetch_last, _day_number(meta["last"])) if meta else fetch_last
+            self._rewrite(symbol, new_days, new_closes, fetch_first, last)
+            return len(new_days)
+
+        rows, first = meta["rows"], _day_number(meta["first"])
+        days, closes = self._arrays(symbol)
+        if len(days):
+            stored_last_day, stored_last_close = int(days[-1]), float(closes[-1])
+            overlap = new_days == stored_last_day
+            if overlap.any() and not np.isclose(new_closes[overlap][0], stored_last_close, rtol=_OVERLAP_RTOL):
+                # Split or dividend re-based the adjusted series: refetch it from scratch
+                logger.info(f"Adjusted prices for {symbol} changed since last fetch - rebuilding series")
+                full = downloader([symbol], _day_string(first), _day_string(fetch_last)).get(symbol) or {}
+                del days, closes
+                self._write_meta(symbol, 0, first, first - 1)
+                return self._merge(symbol, full, first, fetch_last, want_first, want_last, downloader)
+            keep = new_days > stored_last_day
+            new_days, new_closes = new_days[keep], new_closes[keep]
+        del days, closes
+
+        self._append(symbol, rows, new_days, new_closes, first, max(fetch_last, _day_number(meta["last"])))
+        return len(new_days)
+
+
+_default_store: Optional[PriceStore] = None
+_default_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """המאגר המשותף של התהליך (נוצר בשימוש הראשון)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
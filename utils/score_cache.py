@@ -0,0 +1,208 @@
+"""
+זיכרון ציונים גולמיים בין ריצות - לפי טביעת האצבע שמניפסט ה-cache כבר שומר לכל מניה
+רק מניות שהנתונים שלהן השתנו מאז הריצה הקודמת מחושבות מחדש; הנרמול והשקלול תמיד מחושבים מחדש
+"""
+
+import argparse
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from utils.cache_manifest import get_cache_manifest
+
+logger = logging.getLogger(__name__)
+
+# Bump when a raw criterion's formula changes in scoring_engine
+SCORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_scores (
+    kind        TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL,
+    payload     BLOB NOT NULL,    -- pickled symbols, content hashes and a float64 score matrix
+    created_at  REAL NOT NULL
+)
+"""
+
+
+class ScoreCache:
+    """
+    ציונים גולמיים לכל סוג (base / potential) בקובץ המניפסט, משותף בין threads
+
+    Each kind is one blob, read with a single query, and a stored row is used only while
+    its content_hash equals the manifest's current hash for the symbol, so nothing is
+    re-hashed here. The cache writer updates the manifest; callers flush it before
+    scoring stocks fetched in the same run.
+
+    Args:
+        path: קובץ ה-SQLite של המניפסט (ברירת מחדל: settings.CACHE_MANIFEST_PATH)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.CACHE_MANIFEST_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def _load(self, kind: str) -> Dict:
+        row = self._conn.execute("SELECT version, payload FROM raw_scores WHERE kind = ?", (kind,)).fetchone()
+        if row is None or row[0] != SCORE_VERSION:
+            return {"symbols": [], "hashes": [], "scores": np.empty((0, 0))}
+        return pickle.loads(row[1])
+
+    def lookup(self, kind: str, symbols: Sequence[str]) -> Dict:
+        """
+        הציונים השמורים שעדיין תואמים את המניפסט (נספר כ-hit / miss)
+
+        Returns:
+            Dict: positions - אינדקסים ב-symbols של המניות שנמצאו
+                  scores - מטריצה (נמצאו × קריטריונים) באותו סדר
+                  hashes - symbol -> content_hash הנוכחי במניפסט, לשמירת החסרים
+        """
+        with self._lock:
+            current = dict(self._conn.execute("SELECT symbol, content_hash FROM manifest"))
+            saved = self._load(kind)
+
+        stored = {symbol: (digest, i) for i, (symbol, digest) in enumerate(zip(saved["symbols"], saved["hashes"]))}
+        positions, sources, hashes = [], [], {}
+        for i, symbol in enumerate(symbols):
+            digest = current.get(symbol)
+            if digest is None:
+                continue
+            hashes[symbol] = digest
+            entry = stored.get(symbol)
+            if entry is not None and entry[0] == digest:
+                positions.append(i)
+                sources.append(entry[1])
+
+        with self._lock:
+            self._hits[kind] = self._hits.get(kind, 0) + len(positions)
+            self._misses[kind] = self._misses.get(kind, 0) + len(symbols) - len(positions)
+        return {"positions": positions, "scores": saved["scores"][sources], "hashes": hashes}
+
+    def store(self, kind: str, rows: Dict[str, Tuple[str, Sequence[float]]]):
+        """שמירת ציונים גולמיים (symbol -> (content_hash, ערך לכל קריטריון)) - ממוזגים עם הקיימים"""
+        if not rows:
+            return
+        with self._lock, self._conn:
+            saved = self._load(kind)
+            merged = {
+                symbol: (digest, values)
+                for symbol, digest, values in zip(saved["symbols"], saved["hashes"], saved["scores"])
+            }
+            merged.update(rows)
+            payload = {
+                "symbols": list(merged),
+                "hashes": [digest for digest, _ in merged.values()],
+                "scores": np.array([values for _, values in merged.values()], dtype=np.float64),
+            }
+            self._conn.execute(
+                "INSERT OR REPLACE INTO raw_scores VALUES (?, ?, ?, ?)",
+                (kind, SCORE_VERSION, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+            )
+
+    def stats(self) -> Dict:
+        """
+        סטטיסטיקת hit/miss מאז יצירת ה-cache
+
+        Returns:
+            Dict: hits, misses, hit_rate, by_kind
+        """
+        with self._lock:
+            hits, misses = dict(self._hits), dict(self._misses)
+        total_hits = sum(hits.values())
+        total_lookups = total_hits + sum(misses.values())
+        return {
+            "hits": total_hits,
+            "misses": sum(misses.values()),
+            "hit_rate": total_hits / total_lookups if total_lookups else 0.0,
+            "by_kind": {
+                kind: {"hits": hits.get(kind, 0), "misses": misses.get(kind, 0)}
+                for kind in sorted(set(hits) | set(misses))
+            },
+        }
+
+    def count(self) -> Dict[str, int]:
+        """מספר המניות השמורות לכל סוג"""
+        with self._lock:
+            kinds = [kind for (kind,) in self._conn.execute("SELECT kind FROM raw_scores")]
+            return {kind: len(self._load(kind)["symbols"]) for kind in kinds}
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM raw_scores")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[ScoreCache] = None
+_default_lock = threading.Lock()
+
+
+def get_score_cache() -> Optional[ScoreCache]:
+    """
+    ה-cache המשותף של התהליך, או None אם SCORE_CACHE_ENABLED או CACHE_MANIFEST_ENABLED כבויים
+
+    The cache is an optimization: if the file cannot be opened, scoring runs uncached.
+    """
+    global _default_cache
+    if not (settings.SCORE_CACHE_ENABLED and settings.CACHE_MANIFEST_ENABLED):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ScoreCache(get_cache_manifest().path)
+            except sqlite3.Error as e:
+                logger.warning(f"Score cache disabled - cannot open {settings.CACHE_MANIFEST_PATH}: {e}")
+                return None
+        return _default_cache
+
+
+def format_stats(cache: Optional[ScoreCache]) -> Optional[str]:
+    """שורת סיכום לריצה (None אם אין cache או שלא בוצעו חיפושים)"""
+    if cache is None:
+        return None
+    stats = cache.stats()
+    if not stats["hits"] + stats["misses"]:
+        return None
+    by_kind = ", ".join(
+        f"{kind} {counts['hits']}/{counts['hits'] + counts['misses']}" for kind, counts in stats["by_kind"].items()
+    )
+    return f"Score cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}; {by_kind})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="זיכרון ציונים גולמיים בין ריצות")
+    parser.add_argument("command", choices=["info", "clear"])
+    args = parser.parse_args()
+
+    cache = ScoreCache()
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared raw scores in {cache.path}")
+    else:
+        counts = cache.count()
+        print(f"{cache.path} (score version {SCORE_VERSION})")
+        for kind in ("base", "potential"):
+            print(f"  {kind:<10} {counts.get(kind, 0):>6} entries")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
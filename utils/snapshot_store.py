@@ -0,0 +1,242 @@
+"""
+מאגר snapshots של נתוני יסוד לפי רבעון - לדירוג מחדש של רבעונים קודמים ללא קריאות API
+
+append-only: לכל מניה נשמרים FinancialData ו-MarketData תחת מדד + רבעון + שנה, ו-P/E המדד לצידם.
+קריאה מחזירה את הלכידה האחרונה של כל סימול.
+"""
+
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+from models import FinancialData, MarketData, Stock
+from utils.stock_store import content_hash
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    index_name     TEXT NOT NULL,
+    year           INTEGER NOT NULL,
+    quarter        TEXT NOT NULL,
+    symbol         TEXT NOT NULL,
+    content_hash   TEXT NOT NULL,
+    captured_at    REAL NOT NULL,
+    source         TEXT NOT NULL,
+    name           TEXT NOT NULL,
+    financial_data TEXT,
+    market_data    TEXT,
+    PRIMARY KEY (index_name, year, quarter, symbol, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_fundamentals_symbol ON fundamentals (symbol, year, quarter);
+CREATE TABLE IF NOT EXISTS index_pe (
+    index_name   TEXT NOT NULL,
+    year         INTEGER NOT NULL,
+    quarter      TEXT NOT NULL,
+    captured_at  REAL NOT NULL,
+    pe_ratio     REAL NOT NULL,
+    PRIMARY KEY (index_name, year, quarter, captured_at)
+);
+"""
+
+
+class SnapshotStore:
+    """
+    מאגר snapshots בלתי ניתנים לשינוי (append-only), משותף בין threads
+
+    Args:
+        path: קובץ ה-SQLite (ברירת מחדל: settings.SNAPSHOT_STORE_PATH)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.SNAPSHOT_STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ==================== Writes ====================
+
+    def append(
+        self,
+        stocks: Iterable[Stock],
+        index_name: str,
+        quarter: str,
+        year: int,
+        source: str = "build",
+    ) -> int:
+        """
+        הוספת snapshot של נתוני היסוד (ציונים ודגלי כשירות אינם נשמרים)
+
+        Args:
+            stocks: מניות עם financial_data / market_data
+            index_name, quarter, year: ה-snapshot
+            source: "build" או "update"
+
+        Returns:
+            int: מספר השורות החדשות (נתונים זהים שכבר נשמרו אינם נספרים)
+        """
+        now = time.time()
+        rows = [
+            (
+                index_name,
+                year,
+                quarter,
+                stock.symbol,
+                content_hash(stock),
+                now,
+                source,
+                stock.name,
+                stock.financial_data.model_dump_json() if stock.financial_data else None,
+                stock.market_data.model_dump_json() if stock.market_data else None,
+            )
+            for stock in stocks
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            added = self._conn.total_changes - before
+        logger.info(f"Snapshot {index_name} {quarter} {year}: {added} new / {len(rows)} stocks ({source})")
+        return added
+
+    def record_index_pe(self, index_name: str, quarter: str, year: int, pe_ratio: Optional[float]):
+        """שמירת P/E המדד ששימש לציון הפוטנציאל"""
+        if pe_ratio is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO index_pe VALUES (?, ?, ?, ?, ?)",
+                (index_name, year, quarter, time.time(), pe_ratio),
+            )
+
+    # ==================== Reads ====================
+
+    def load(self, index_name: str, quarter: str, year: int) -> List[Stock]:
+        """
+        המניות של snapshot (הלכידה האחרונה של כל מניה), ללא ציונים
+
+        Returns:
+            List[Stock]: ממוינות לפי סימול
+        """
+        sql = (
+            "SELECT symbol, name, financial_data, market_data FROM ("
+            "  SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY captured_at DESC) AS rn"
+            "  FROM fundamentals WHERE index_name = ? AND year = ? AND quarter = ?"
+            ") WHERE rn = 1 ORDER BY symbol"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (index_name, year, quarter)).fetchall()
+
+        return [
+            Stock(
+                symbol=symbol,
+                name=name,
+                index=index_name,
+                financial_data=FinancialData.model_validate_json(financial) if financial else None,
+                market_data=MarketData.model_validate_json(market) if market else None,
+            )
+            for symbol, name, financial, market in rows
+        ]
+
+    def index_pe(self, index_name: str, quarter: str, year: int) -> Optional[float]:
+        """P/E המדד האחרון שנשמר עבור ה-snapshot"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pe_ratio FROM index_pe WHERE index_name = ? AND year = ? AND quarter = ? "
+                "ORDER BY captured_at DESC LIMIT 1",
+                (index_name, year, quarter),
+            ).fetchone()
+        return row[0] if row else None
+
+    def snapshots(self, index_name: Optional[str] = None) -> List[Dict]:
+        """
+        רשימת ה-snapshots הקיימים
+
+        Returns:
+            List[Dict]: index_name, quarter, year, stocks, captured_at - מהחדש לישן
+        """
+        sql = (
+            "SELECT index_name, quarter, year, COUNT(DISTINCT symbol), MAX(captured_at) FROM fundamentals"
+            + (" WHERE index_name = ?" if index_name else "")
+            + " GROUP BY index_name, year, quarter ORDER BY year DESC, quarter DESC, index_name"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (index_name,) if index_name else ()).fetchall()
+        return [
+            {"index_name": i, "quarter": q, "year": y, "stocks": n, "captured_at": t}
+            for i, q, y, n, t in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[SnapshotStore] = None
+_default_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """המאגר המשותף של התהליך (נוצר בשימוש הראשון)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = SnapshotStore()
+        return _default_store
+
+
+def capture_snapshot(
+    stocks: Iterable[Stock],
+    index_name: str,
+    quarter: str,
+    year: int,
+    source: str = "build",
+    index_pe: Optional[float] = None,
+) -> int:
+    """
+    לכידת snapshot אם SNAPSHOT_STORE_ENABLED; כשל נרשם ביומן ואינו עוצר את הריצה
+
+    Returns:
+        int: מספר השורות החדשות (0 אם כבוי או נכשל)
+    """
+    if not settings.SNAPSHOT_STORE_ENABLED:
+        return 0
+    try:
+        store = get_snapshot_store()
+        added = store.append(stocks, index_name, quarter, year, source)
+        store.record_index_pe(index_name, quarter, year, index_pe)
+        return added
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to capture fundamentals snapshot for {index_name} {quarter} {year}: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="מאגר snapshots של נתוני יסוד")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="רשימת ה-snapshots הקיימים")
+    list_parser.add_argument("--index", choices=["TASE125", "SP500"])
+
+    args = parser.parse_args()
+
+    store = SnapshotStore()
+    for snapshot in store.snapshots(args.index):
+        pe = store.index_pe(snapshot["index_name"], snapshot["quarter"], snapshot["year"])
+        print(
+            f"{snapshot['index_name']:<8} {snapshot['quarter']} {snapshot['year']}  "
+            f"{snapshot['stocks']:>4} stocks  index P/E: {pe if pe is not None else '-'}"
+        )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+פורמט cache בינארי (msgpack) למניות, עם גרסת סכמה ופענוח עצל (CACHE_BACKEND=msgpack)
+דורש את חבילת msgpack (נטענת בשימוש הראשון)
+"""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from pydantic import PrivateAttr
+
+from config import settings
+from models.financial_data import FinancialData, MarketData
+from models.stock import Stock
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+PACK_SUFFIX = ".msgpack"
+
+# Fields kept encoded until first access -> their model class
+LAZY_FIELDS = {"financial_data": FinancialData, "market_data": MarketData}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError("CACHE_BACKEND=msgpack requires the msgpack package: pip install msgpack") from e
+    return msgpack
+
+
+def _packb(obj) -> bytes:
+    return _msgpack().packb(obj, use_bin_type=True)
+
+
+def _unpackb(raw: bytes):
+    # Year-keyed statement dicts use int map keys
+    return _msgpack().unpackb(raw, raw=False, strict_map_key=False)
+
+
+class LazyStock(Stock):
+    """
+    Stock שנטען מקובץ msgpack - financial_data ו-market_data מפוענחים בגישה הראשונה
+
+    Behaves like Stock everywhere; dumping, copying or comparing it decodes the
+    remaining fields first.
+    """
+
+    _blobs: Dict[str, Optional[bytes]] = PrivateAttr(default_factory=dict)
+
+    def __getattr__(self, name: str):
+        if name in LAZY_FIELDS:
+            return self._decode(name)
+        return super().__getattr__(name)
+
+    def __setattr__(self, name: str, value):
+        super().__setattr__(name, value)
+        if name in LAZY_FIELDS:
+            self.__pydantic_private__["_blobs"].pop(name, None)
+
+    def _decode(self, name: str):
+        blobs = self.__pydantic_private__["_blobs"]
+        if name in blobs:
+            raw = blobs[name]
+            self.__dict__[name] = None if raw is None else LAZY_FIELDS[name].model_validate(_unpackb(raw))
+            blobs.pop(name, None)
+        return self.__dict__[name]
+
+    def materialize(self) -> "LazyStock":
+        """פענוח כל השדות שטרם פוענחו"""
+        for name in list(self.__pydantic_private__["_blobs"]):
+            self._decode(name)
+        return self
+
+    @property
+    def pending_fields(self) -> set:
+        """שדות שעדיין מקודדים"""
+        return set(self.__pydantic_private__["_blobs"])
+
+    def model_dump(self, **kwargs):
+        return super(LazyStock, self.materialize()).model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs):
+        return super(LazyStock, self.materialize()).model_dump_json(**kwargs)
+
+    def model_copy(self, **kwargs):
+        return super(LazyStock, self.materialize()).model_copy(**kwargs)
+
+    def __copy__(self):
+        return super(LazyStock, self.materialize()).__copy__()
+
+    def __deepcopy__(self, memo=None):
+        return super(LazyStock, self.materialize()).__deepcopy__(memo)
+
+    def __getstate__(self):
+        return super(LazyStock, self.materialize()).__getstate__()
+
+    def __iter__(self):
+        return super(LazyStock, self.materialize()).__iter__()
+
+    def __eq__(self, other):
+        if isinstance(other, LazyStock):
+            other.materialize()
+        elif isinstance(other, Stock):
+            # A plain Stock with the same field values is equal (also for stock == lazy_stock)
+            return self.model_dump() == other.model_dump()
+        return super(LazyStock, self.materialize()).__eq__(other)
+
+
+def pack_stock(stock: Stock) -> bytes:
+    """
+    קידוד Stock לרשומת msgpack (שדות שטרם פוענחו ב-LazyStock נשמרים כמו שהם)
+
+    Record:
+        {"schema": SCHEMA_VERSION,
+         "stock": {symbol, name, index, scores, details, eligibility flags},
+         "financial_data": <msgpack bytes> | None,
+         "market_data": <msgpack bytes> | None}
+    """
+    pending = stock.__pydantic_private__["_blobs"] if isinstance(stock, LazyStock) else {}
+
+    record = {"schema": SCHEMA_VERSION, "stock": stock.model_dump(exclude=set(LAZY_FIELDS))}
+    for name in LAZY_FIELDS:
+        if name in pending:
+            record[name] = pending[name]
+        else:
+            value = getattr(stock, name)
+            record[name] = None if value is None else _packb(value.model_dump())
+    return _packb(record)
+
+
+def unpack_stock(raw: bytes) -> LazyStock:
+    """
+    פענוח רשומת msgpack ל-LazyStock
+
+    Raises:
+        ValueError: גרסת סכמה לא נתמכת או רשומה פגומה
+    """
+    record = _unpackb(raw)
+    if not isinstance(record, dict) or record.get("schema") != SCHEMA_VERSION:
+        version = record.get("schema") if isinstance(record, dict) else None
+        raise ValueError(f"Unsupported stock pack schema {version!r} (expected {SCHEMA_VERSION})")
+
+    stock = LazyStock.model_validate(record["stock"])
+    for name in LAZY_FIELDS:
+        del stock.__dict__[name]
+    stock.__pydantic_private__["_blobs"] = {name: record.get(name) for name in LAZY_FIELDS}
+    return stock
+
+
+def stock_pack_path(symbol: str, cache_dir: Path) -> Path:
+    """NVDA.US -> cache_dir/NVDA_US.msgpack"""
+    return Path(cache_dir) / f"{symbol.replace('.', '_')}{PACK_SUFFIX}"
+
+
+def write_stock_pack(stock: Stock, cache_dir: Path) -> Path:
+    """כתיבה אטומית של מניה לקובץ msgpack (temp file + os.replace)"""
+    path = stock_pack_path(stock.symbol, cache_dir)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(pack_stock(stock))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_stock_pack(symbol: str, cache_dir: Path) -> Optional[LazyStock]:
+    """קריאת קובץ msgpack של מניה; None אם אינו קיים"""
+    try:
+        raw = stock_pack_path(symbol, cache_dir).read_bytes()
+    except FileNotFoundError:
+        return None
+    return unpack_stock(raw)
+
+
+def convert_json_dir(cache_dir: Path, remove_json: bool = False) -> Dict:
+    """
+    המרת cache/stocks_data/*.json לקבצי msgpack
+
+    Args:
+        cache_dir: תיקיית cache/stocks_data
+        remove_json: מחיקת קובצי ה-JSON שהומרו בהצלחה
+
+    Returns:
+        Dict: converted, failed, json_bytes, pack_bytes
+    """
+    converted = failed = json_bytes = pack_bytes = 0
+    for path in sorted(Path(cache_dir).glob("*.json")):
+        try:
+            stock = Stock.model_validate_json(path.read_bytes())
+            pack_path = write_stock_pack(stock, cache_dir)
+        except Exception as e:
+            logger.warning(f"Skipping {path.name}: {e}")
+            failed += 1
+            continue
+
+        converted += 1
+        json_bytes += path.stat().st_size
+        pack_bytes += pack_path.stat().st_size
+        if remove_json:
+            path.unlink()
+
+    logger.info(f"Converted {converted} stocks in {cache_dir} to {PACK_SUFFIX} ({failed} failed)")
+    return {"converted": converted, "failed": failed, "json_bytes": json_bytes, "pack_bytes": pack_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="המרת cache המניות לפורמט msgpack")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="המרת cache/stocks_data/*.json לקבצי msgpack")
+    convert_parser.add_argument("--dir", type=Path, default=settings.CACHE_DIR / "stocks_data")
+    convert_parser.add_argument("--remove-json", action="store_true", help="מחיקת קובצי JSON לאחר המרה")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    result = convert_json_dir(args.dir, remove_json=args.remove_json)
+    ratio = result["pack_bytes"] / result["json_bytes"] if result["json_bytes"] else 0.0
+    print(
+        f"Converted {result['converted']} stocks ({result['failed']} failed): "
+        f"{result['json_bytes']:,} -> {result['pack_bytes']:,} bytes ({ratio:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
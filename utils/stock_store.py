@@ -0,0 +1,335 @@
+"""
+מאגר מניות בקובץ SQLite יחיד (CACHE_BACKEND=sqlite)
+שורה לכל סימול בכל snapshot (רבעון + שנה), עם אינדקסים לשאילתות חוצות סימולים
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from config import settings
+from models.stock import Stock
+from utils.date_utils import get_quarter_and_year
+
+logger = logging.getLogger(__name__)
+
+# Max host parameters per statement (SQLite's conservative default is 999)
+_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stocks (
+    symbol                    TEXT NOT NULL,
+    index_name                TEXT NOT NULL,
+    year                      INTEGER NOT NULL,
+    quarter                   TEXT NOT NULL,
+    fetched_at                REAL NOT NULL,
+    content_hash              TEXT NOT NULL,
+    base_score                REAL,
+    potential_score           REAL,
+    is_eligible_for_base      INTEGER NOT NULL DEFAULT 0,
+    is_eligible_for_potential INTEGER NOT NULL DEFAULT 0,
+    data                      TEXT NOT NULL,
+    PRIMARY KEY (symbol, year, quarter)
+);
+CREATE INDEX IF NOT EXISTS idx_stocks_index ON stocks (index_name, year, quarter);
+CREATE INDEX IF NOT EXISTS idx_stocks_snapshot ON stocks (year, quarter);
+CREATE INDEX IF NOT EXISTS idx_stocks_fetched_at ON stocks (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_stocks_base_score ON stocks (base_score);
+"""
+
+_UPSERT = """
+INSERT INTO stocks (
+    symbol, index_name, year, quarter, fetched_at, content_hash,
+    base_score, potential_score, is_eligible_for_base, is_eligible_for_potential, data
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (symbol, year, quarter) DO UPDATE SET
+    index_name = excluded.index_name,
+    fetched_at = CASE WHEN stocks.content_hash = excluded.content_hash
+                      THEN stocks.fetched_at ELSE excluded.fetched_at END,
+    content_hash = excluded.content_hash,
+    base_score = excluded.base_score,
+    potential_score = excluded.potential_score,
+    is_eligible_for_base = excluded.is_eligible_for_base,
+    is_eligible_for_potential = excluded.is_eligible_for_potential,
+    data = excluded.data
+"""
+
+# Latest snapshot first
+_SNAPSHOT_ORDER = "year DESC, quarter DESC, fetched_at DESC"
+
+
+def content_hash(stock: Stock) -> str:
+    """טביעת אצבע של הנתונים שנשלפו (פיננסיים + שוק), ללא ציונים ודגלים"""
+    payload = json.dumps(
+        {
+            "financial_data": stock.financial_data.model_dump(mode="json") if stock.financial_data else None,
+            "market_data": stock.market_data.model_dump(mode="json") if stock.market_data else None,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _timestamp(value: Union[datetime, float, None]) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class StockStore:
+    """
+    מאגר Stock מבוסס SQLite, משותף בין threads
+
+    Args:
+        path: קובץ ה-SQLite (ברירת מחדל: settings.STOCK_STORE_PATH)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.STOCK_STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ==================== Writes ====================
+
+    def put(self, stock: Stock, quarter: Optional[str] = None, year: Optional[int] = None):
+        """שמירת מניה בודדת (ראה put_many)"""
+        self.put_many([stock], quarter, year)
+
+    def put_many(
+        self,
+        stocks: Iterable[Stock],
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+        fetched_at: Union[datetime, float, None] = None,
+    ) -> int:
+        """
+        שמירת מניות רבות בטרנזקציה אחת (upsert לפי symbol + snapshot)
+
+        Args:
+            stocks: מניות לשמירה
+            quarter: רבעון ה-snapshot (ברירת מחדל: הרבעון הנוכחי)
+            year: שנת ה-snapshot (ברירת מחדל: השנה הנוכחית)
+            fetched_at: זמן השליפה (ברירת מחדל: עכשיו)
+
+        Returns:
+            int: מספר המניות שנשמרו
+        """
+        quarter, year = get_quarter_and_year(quarter, year)
+        fetched_at = _timestamp(fetched_at) or time.time()
+
+        rows = [
+            (
+                stock.symbol,
+                stock.index,
+                year,
+                quarter,
+                fetched_at,
+                content_hash(stock),
+                stock.base_score,
+                stock.potential_score,
+                int(stock.is_eligible_for_base),
+                int(stock.is_eligible_for_potential),
+                stock.model_dump_json(),
+            )
+            for stock in stocks
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def import_json_dir(
+        self,
+        cache_dir: Path,
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> int:
+        """
+        ייבוא קבצי JSON מהמבנה הישן (cache/stocks_data/*.json)
+
+        Without an explicit snapshot, each file is stamped with the quarter of its
+        modification time; fetched_at is always the file's modification time.
+
+        Returns:
+            int: מספר המניות שיובאו (קבצים פגומים מדולגים)
+        """
+        imported = 0
+        for path in sorted(Path(cache_dir).glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stock = Stock(**json.load(f))
+            except Exception as e:
+                logger.warning(f"Skipping {path.name}: {e}")
+                continue
+
+            mtime = datetime.fromtimestamp(path.stat().st_mtime)
+            file_quarter = quarter or f"Q{(mtime.month - 1) // 3 + 1}"
+            file_year = year or mtime.year
+            imported += self.put_many([stock], file_quarter, file_year, fetched_at=mtime)
+
+        logger.info(f"Imported {imported} stocks from {cache_dir} into {self.path.name}")
+        return imported
+
+    # ==================== Reads ====================
+
+    def get(self, symbol: str, quarter: Optional[str] = None, year: Optional[int] = None) -> Optional[Stock]:
+        """מניה בודדת - מה-snapshot המבוקש, או מהחדש ביותר אם לא צוין"""
+        return self.get_many([symbol], quarter, year).get(symbol)
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> Dict[str, Stock]:
+        """
+        טעינת מניות רבות
+
+        Args:
+            symbols: סימולים (e.g., ["NVDA.US", "CRM.US"])
+            quarter, year: snapshot מסוים (שניהם), או None לחדש ביותר של כל מניה
+
+        Returns:
+            Dict[str, Stock]: symbol -> Stock (רק מניות שנמצאו)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        stocks: Dict[str, Stock] = {}
+
+        for start in range(0, len(symbols), _CHUNK_SIZE):
+            chunk = symbols[start:start + _CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            if quarter and year:
+                sql = f"SELECT symbol, data FROM stocks WHERE year = ? AND quarter = ? AND symbol IN ({placeholders})"
+                params = [year, quarter, *chunk]
+            else:
+                sql = (
+                    "SELECT symbol, data FROM ("
+                    f"  SELECT symbol, data, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY {_SNAPSHOT_ORDER}) AS rn"
+                    f"  FROM stocks WHERE symbol IN ({placeholders})"
+                    ") WHERE rn = 1"
+                )
+                params = chunk
+
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            for symbol, data in rows:
+                stocks[symbol] = Stock.model_validate_json(data)
+
+        return stocks
+
+    def query(
+        self,
+        index_name: Optional[str] = None,
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+        min_base_score: Optional[float] = None,
+        min_potential_score: Optional[float] = None,
+        fetched_before: Union[datetime, float, None] = None,
+        latest_only: bool = True,
+    ) -> List[Stock]:
+        """
+        שאילתה חוצת-מניות על העמודות המאונדקסות
+
+        Args:
+            index_name: סינון לפי מדד
+            quarter, year: סינון לפי snapshot
+            min_base_score / min_potential_score: ציון מינימלי
+            fetched_before: רק מניות שלא נשלפו מאז (datetime או timestamp) - "stale since"
+            latest_only: רק ה-snapshot החדש ביותר של כל מניה
+
+        Returns:
+            List[Stock]: המניות התואמות, לפי סימול
+        """
+        conditions, params = [], []
+        if index_name:
+            conditions.append("index_name = ?")
+            params.append(index_name)
+        if quarter:
+            conditions.append("quarter = ?")
+            params.append(quarter)
+        if year:
+            conditions.append("year = ?")
+            params.append(year)
+        if min_base_score is not None:
+            conditions.append("base_score >= ?")
+            params.append(min_base_score)
+        if min_potential_score is not None:
+            conditions.append("potential_score >= ?")
+            params.append(min_potential_score)
+        if fetched_before is not None:
+            conditions.append("fetched_at < ?")
+            params.append(_timestamp(fetched_before))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if latest_only:
+            # The latest snapshot is chosen per symbol before the filters apply
+            sql = (
+                "SELECT data FROM ("
+                f"  SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY {_SNAPSHOT_ORDER}) AS rn FROM stocks"
+                f") {where} {'AND' if where else 'WHERE'} rn = 1 ORDER BY symbol"
+            )
+        else:
+            sql = f"SELECT data FROM stocks {where} ORDER BY symbol, {_SNAPSHOT_ORDER}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Stock.model_validate_json(data) for (data,) in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stocks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[StockStore] = None
+_default_lock = threading.Lock()
+
+
+def get_stock_store() -> StockStore:
+    """המאגר המשותף של התהליך (נוצר בשימוש הראשון)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = StockStore()
+        return _default_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ניהול מאגר המניות (SQLite)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="ייבוא cache/stocks_data/*.json למאגר")
+    import_parser.add_argument("--dir", type=Path, default=settings.CACHE_DIR / "stocks_data")
+    import_parser.add_argument("--quarter", choices=["Q1", "Q2", "Q3", "Q4"])
+    import_parser.add_argument("--year", type=int)
+
+    subparsers.add_parser("count", help="מספר הרשומות במאגר")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    store = StockStore()
+    if args.command == "import":
+        imported = store.import_json_dir(args.dir, args.quarter, args.year)
+        print(f"Imported {imported} stocks into {store.path}")
+    else:
+        print(store.count())
+    store.close()
+
+
+if __name__ == "__main__":
+    main()